@@ -14,6 +14,9 @@ import subprocess
 from datetime import datetime
 from pathlib import Path
 
+sys.path.insert(0, '/home/m1ndb0t/Desktop/J1MSKY/j1msky-framework')
+from runtime.sysstats import get_sampler
+
 class AutonomousImprover:
     def __init__(self):
         self.workspace = Path("/home/m1ndb0t/Desktop/J1MSKY")
@@ -87,16 +90,9 @@ class AutonomousImprover:
     def check_system_health(self):
         """Check system temperature and memory"""
         try:
-            # Temperature
-            with open('/sys/class/thermal/thermal_zone0/temp', 'r') as f:
-                temp = int(f.read()) / 1000.0
-            
-            # Memory
-            with open('/proc/meminfo', 'r') as f:
-                lines = f.readlines()
-                total = int(lines[0].split()[1])
-                available = int(lines[2].split()[1])
-                mem_used = ((total - available) / total) * 100
+            sample = get_sampler().latest()
+            temp = sample['temp']
+            mem_used = sample['mem_pct']
             
             status = "OK"
             if temp > 80:
@@ -8,10 +8,12 @@ import os
 import sys
 import time
 import json
-import subprocess
 from datetime import datetime
 from pathlib import Path
 
+sys.path.insert(0, '/home/m1ndb0t/Desktop/J1MSKY/j1msky-framework')
+from runtime.sysstats import get_sampler
+
 class VitalsAgent:
     def __init__(self):
         self.name = "VITALS"
@@ -48,58 +50,17 @@ class VitalsAgent:
             
     def get_system_stats(self):
         """Get current system statistics"""
-        stats = {}
-        
-        # CPU Temperature
-        try:
-            with open('/sys/class/thermal/thermal_zone0/temp', 'r') as f:
-                stats['temp'] = int(f.read().strip()) / 1000.0
-        except:
-            stats['temp'] = 0.0
-            
-        # CPU Load
-        try:
-            with open('/proc/loadavg', 'r') as f:
-                load = float(f.read().split()[0])
-                stats['load'] = min(100, (load / 4) * 100)  # Assuming 4 cores
-        except:
-            stats['load'] = 0.0
-            
-        # Memory
-        try:
-            with open('/proc/meminfo', 'r') as f:
-                lines = f.readlines()
-                total = int(lines[0].split()[1])
-                available = int(lines[2].split()[1])
-                stats['memory'] = ((total - available) / total) * 100
-        except:
-            stats['memory'] = 0.0
-            
-        # Uptime
-        try:
-            with open('/proc/uptime', 'r') as f:
-                uptime_secs = float(f.read().split()[0])
-                hours = int(uptime_secs // 3600)
-                mins = int((uptime_secs % 3600) // 60)
-                stats['uptime'] = f"{hours}h {mins}m"
-        except:
-            stats['uptime'] = "--"
-            
-        # Disk usage
-        try:
-            result = subprocess.run(['df', '-h', '/'], capture_output=True, text=True)
-            lines = result.stdout.strip().split('\n')
-            if len(lines) > 1:
-                parts = lines[1].split()
-                stats['disk_used'] = parts[2]
-                stats['disk_total'] = parts[1]
-                stats['disk_pct'] = parts[4]
-        except:
-            stats['disk_used'] = "--"
-            stats['disk_total'] = "--"
-            stats['disk_pct'] = "--"
-            
-        return stats
+        sample = get_sampler().latest()
+        uptime_secs = sample['uptime_seconds']
+        return {
+            'temp': sample['temp'],
+            'load': sample['load_pct'],
+            'memory': sample['mem_pct'],
+            'uptime': f"{int(uptime_secs // 3600)}h {int((uptime_secs % 3600) // 60)}m" if uptime_secs else "--",
+            'disk_used': sample['disk_used_h'],
+            'disk_total': sample['disk_total_h'],
+            'disk_pct': f"{sample['disk_pct']}%"
+        }
         
     def check_alerts(self, stats):
         """Check if any values exceed thresholds"""
@@ -8,7 +8,6 @@ import tkinter as tk
 from tkinter import ttk
 import os
 import sys
-import subprocess
 import threading
 import time
 import random
@@ -20,6 +19,9 @@ from datetime import datetime
 from pathlib import Path
 from collections import deque
 
+sys.path.insert(0, '/home/m1ndb0t/Desktop/J1MSKY/j1msky-framework')
+from runtime.sysstats import get_sampler
+
 class J1MSKYOffice:
     def __init__(self):
         self.root = tk.Tk()
@@ -797,8 +799,8 @@ class J1MSKYOffice:
                 if counter % 3 == 0:
                     # Check if we're actually processing something
                     try:
-                        result = subprocess.run(['ps', 'aux'], capture_output=True, text=True)
-                        if 'python' in result.stdout and ('replicate' in result.stdout or 'generate' in result.stdout):
+                        cmdlines = get_sampler().latest()['python_cmdlines']
+                        if any('replicate' in cmd or 'generate' in cmd for cmd in cmdlines):
                             self.is_processing = True
                             self.root.after(0, lambda: self.processing_label.config(text="◈ PROCESSING", fg='#ff00ff'))
                         else:
@@ -820,21 +822,14 @@ class J1MSKYOffice:
             while self.running:
                 # Get system stats
                 try:
-                    with open('/sys/class/thermal/thermal_zone0/temp', 'r') as f:
-                        temp = int(f.read().strip()) / 1000.0
-                    with open('/proc/loadavg', 'r') as f:
-                        load = float(f.read().split()[0])
-                        load_pct = min(100, (load / 4) * 100)
-                    with open('/proc/meminfo', 'r') as f:
-                        lines = f.readlines()
-                        total = int(lines[0].split()[1])
-                        available = int(lines[2].split()[1])
-                        mem_pct = ((total - available) / total) * 100
-                    with open('/proc/uptime', 'r') as f:
-                        uptime_secs = float(f.read().split()[0])
-                        hours = int(uptime_secs // 3600)
-                        mins = int((uptime_secs % 3600) // 60)
-                        uptime_str = f"{hours}h {mins}m"
+                    sample = get_sampler().latest()
+                    temp = sample['temp']
+                    load_pct = sample['load_pct']
+                    mem_pct = sample['mem_pct']
+                    uptime_secs = sample['uptime_seconds']
+                    hours = int(uptime_secs // 3600)
+                    mins = int((uptime_secs % 3600) // 60)
+                    uptime_str = f"{hours}h {mins}m"
                         
                     # Update vitals
                     self.vitals["CPU"].config(
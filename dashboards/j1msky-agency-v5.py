@@ -11,35 +11,30 @@ import http.server
 import socketserver
 import json
 import os
-import subprocess
+import sys
 import time
 from datetime import datetime
 from urllib.parse import parse_qs, urlparse
 
+sys.path.insert(0, '/home/m1ndb0t/Desktop/J1MSKY/j1msky-framework')
+from runtime.sysstats import get_sampler
+
 # Stats tracking
 START_TIME = time.time()
 REQUEST_COUNT = 0
 
 def get_stats():
-    stats = {'temp': 66, 'load': 0.5, 'mem': 30, 'uptime': '0h', 'requests': 0}
-    try:
-        with open('/sys/class/thermal/thermal_zone0/temp', 'r') as f:
-            stats['temp'] = round(int(f.read()) / 1000.0, 1)
-        with open('/proc/loadavg', 'r') as f:
-            stats['load'] = round(float(f.read().split()[0]), 2)
-        with open('/proc/meminfo', 'r') as f:
-            lines = f.readlines()
-            total = int(lines[0].split()[1])
-            available = int(lines[2].split()[1])
-            stats['mem'] = round(((total - available) / total) * 100, 1)
-        uptime_secs = time.time() - START_TIME
-        h = int(uptime_secs // 3600)
-        m = int((uptime_secs % 3600) // 60)
-        stats['uptime'] = f"{h}h {m:02d}m"
-        stats['requests'] = REQUEST_COUNT
-    except:
-        pass
-    return stats
+    sample = get_sampler().latest()
+    uptime_secs = time.time() - START_TIME
+    h = int(uptime_secs // 3600)
+    m = int((uptime_secs % 3600) // 60)
+    return {
+        'temp': sample['temp'] or 66,
+        'load': sample['load'],
+        'mem': sample['mem_pct'],
+        'uptime': f"{h}h {m:02d}m",
+        'requests': REQUEST_COUNT
+    }
 
 # Enhanced HTML with better UX
 HTML = '''<!DOCTYPE html>
@@ -2027,13 +2022,7 @@ class AgencyServer(http.server.BaseHTTPRequestHandler):
             self.wfile.write(html.encode())
         elif self.path == '/api/live':
             stats = get_stats()
-            # lightweight process count
-            py_count = 0
-            try:
-                out = subprocess.run(['bash','-lc','ps aux | grep python | grep -v grep | wc -l'], capture_output=True, text=True)
-                py_count = int((out.stdout or '0').strip() or 0)
-            except Exception:
-                py_count = 0
+            py_count = get_sampler().latest()['python_processes']
 
             # gather short logs from known files
             logs = []
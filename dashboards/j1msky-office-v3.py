@@ -9,6 +9,7 @@ import http.server
 import socketserver
 import json
 import os
+import sys
 import subprocess
 import threading
 import time
@@ -16,6 +17,9 @@ import random
 from datetime import datetime
 from urllib.parse import parse_qs, urlparse
 
+sys.path.insert(0, '/home/m1ndb0t/Desktop/J1MSKY/j1msky-framework')
+from runtime.sysstats import get_sampler
+
 # Global state for "video game" feel
 AGENT_POSITIONS = {
     'scout': {'x': 10, 'y': 20, 'status': 'active', 'task': 'Fetching news'},
@@ -40,26 +44,15 @@ def add_event(message, type='info'):
         EVENTS_LOG.pop(0)
 
 def get_system_stats():
-    """Get comprehensive system stats"""
-    stats = {'temp': 0, 'load': 0, 'mem': 0, 'uptime': '--:--', 'disk_free': '0G'}
-    try:
-        with open('/sys/class/thermal/thermal_zone0/temp', 'r') as f:
-            stats['temp'] = round(int(f.read()) / 1000.0, 1)
-        with open('/proc/loadavg', 'r') as f:
-            stats['load'] = round(float(f.read().split()[0]), 2)
-        with open('/proc/meminfo', 'r') as f:
-            lines = f.readlines()
-            total = int(lines[0].split()[1])
-            available = int(lines[2].split()[1])
-            stats['mem'] = round(((total - available) / total) * 100, 1)
-        with open('/proc/uptime', 'r') as f:
-            secs = float(f.read().split()[0])
-            h = int(secs // 3600)
-            m = int((secs % 3600) // 60)
-            stats['uptime'] = f"{h}h {m:02d}m"
-    except:
-        pass
-    return stats
+    """Get comprehensive system stats from the shared sampler"""
+    sample = get_sampler().latest()
+    return {
+        'temp': sample['temp'],
+        'load': sample['load'],
+        'mem': sample['mem_pct'],
+        'uptime': sample['uptime'],
+        'disk_free': sample['disk_free_h']
+    }
 
 HTML_OFFICE = '''
 <!DOCTYPE html>
@@ -5,18 +5,63 @@ Team-based agents with subagent spawning
 Rate limit tracking, model selection, business-ready
 """
 
+import gzip
+import hashlib
+import heapq
 import http.server
+import itertools
 import socketserver
 import json
+import string
 import os
-import subprocess
+import signal
+import sys
 import threading
 import time
 import random
+import re
+from collections import defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timedelta
 from urllib.parse import parse_qs, urlparse
 from pathlib import Path
 
+sys.path.insert(0, '/home/m1ndb0t/Desktop/J1MSKY/j1msky-framework')
+from runtime.persistence import WriteBehindStore, flush_all
+from runtime.ratelimit import create_limiter
+from runtime.sysstats import get_sampler
+from runtime.ledger import QuoteLedger
+from runtime.quoting import QuotePolicy, iter_ndjson, price_quotes
+
+# Write-behind durability per store (seconds; flush_interval=0 writes synchronously)
+PERSISTENCE_CONFIG = {
+    'task_queue': {'flush_interval': 0.5, 'max_delay': 2.0, 'fsync': True},
+    'cost_tracker': {'flush_interval': 2.0, 'max_delay': 10.0, 'fsync': False},
+    'metrics': {'flush_interval': 5.0, 'max_delay': 30.0, 'fsync': False}
+}
+
+# HTTP Serving Configuration (override via environment)
+HTTP_SERVER_CONFIG = {
+    'mode': os.environ.get('J1MSKY_HTTP_MODE', 'threaded'),  # threaded | single
+    'port': int(os.environ.get('J1MSKY_HTTP_PORT', '8080')),
+    'workers': int(os.environ.get('J1MSKY_HTTP_WORKERS', '32')),
+    'queue_limit': int(os.environ.get('J1MSKY_HTTP_QUEUE_LIMIT', '64')),
+    'keepalive_timeout': float(os.environ.get('J1MSKY_HTTP_KEEPALIVE_TIMEOUT', '5'))
+}
+
+# Streaming NDJSON pricing endpoints (Content-Type: application/x-ndjson)
+NDJSON_CONFIG = {
+    'batch_rows': int(os.environ.get('J1MSKY_NDJSON_BATCH_ROWS', '512')),  # rows priced per flush
+    'max_line_bytes': int(os.environ.get('J1MSKY_NDJSON_MAX_LINE_BYTES', '65536')),
+    'read_size': int(os.environ.get('J1MSKY_NDJSON_READ_SIZE', '65536'))
+}
+
+
+class BodyFramingError(ValueError):
+    """Raised when a request body's framing (chunking, length, line size) is broken"""
+    pass
+
+
 # Rate Limit Tracking
 RATE_LIMITS = {
     'kimi': {'requests': 0, 'last_reset': time.time(), 'limit': 100, 'window': 3600},
@@ -26,6 +71,34 @@ RATE_LIMITS = {
     'github': {'requests': 0, 'last_reset': time.time(), 'limit': 30, 'window': 3600}
 }
 
+# MODEL_AGENTS provider -> RATE_LIMITS key
+PROVIDER_RATE_LIMIT_KEYS = {
+    'kimi-coding': 'kimi',
+    'anthropic': 'anthropic'
+}
+
+# Limiter backing RATE_LIMITS (sliding_log | token_bucket). Set a shared dir
+# (e.g. /dev/shm/j1msky-ratelimit) to share budgets with the orchestrator.
+RATE_LIMIT_CONFIG = {
+    'algorithm': os.environ.get('J1MSKY_RATE_LIMIT_ALGORITHM', 'sliding_log'),
+    'shared_dir': os.environ.get('J1MSKY_RATE_LIMIT_SHARED_DIR') or None
+}
+RATE_LIMITERS = {}
+_rate_limiters_lock = threading.Lock()
+
+# Workflow execution: steps resume on subagent completion, on a shared pool
+WORKFLOW_CONFIG = {
+    'workers': int(os.environ.get('J1MSKY_WORKFLOW_WORKERS', '8')),
+    'step_timeout': float(os.environ.get('J1MSKY_WORKFLOW_STEP_TIMEOUT', '300')),
+    'max_parallel_per_provider': int(os.environ.get('J1MSKY_WORKFLOW_MAX_PARALLEL', '4'))
+}
+
+# Queue dispatch: one worker per this many hourly requests, capped per provider
+QUEUE_WORKER_CONFIG = {
+    'requests_per_worker': int(os.environ.get('J1MSKY_QUEUE_REQUESTS_PER_WORKER', '50')),
+    'max_workers_per_provider': int(os.environ.get('J1MSKY_QUEUE_MAX_WORKERS', '4'))
+}
+
 # Model Teams - Each model is its own agent
 AGENT_TEAMS = {
     'team_coding': {
@@ -89,8 +162,22 @@ MODEL_AGENTS = {
     }
 }
 
+# Dashboard render cache: bump a panel's version whenever its state changes
+DASHBOARD_VERSIONS = {'teams': 0, 'models': 0, 'subagents': 0, 'events': 0}
+DASHBOARD_CONFIG = {
+    'stats_ttl': float(os.environ.get('J1MSKY_DASHBOARD_STATS_TTL', '5')),
+    'gzip_min_bytes': 1024
+}
+
+def bump_dashboard(*panels):
+    """Invalidate cached dashboard panels (a lost concurrent bump still changes the version)"""
+    for panel in panels:
+        DASHBOARD_VERSIONS[panel] += 1
+
 # Active Subagents
 ACTIVE_SUBAGENTS = {}
+SUBAGENT_FUTURES = {}  # agent_id -> Future resolved with the agent record when it finishes
+_subagent_futures_lock = threading.Lock()
 EVENTS_LOG = []
 
 # Notification System
@@ -392,16 +479,45 @@ def get_all_circuit_breaker_metrics():
 
 # Task Queue System for Rate Limit Management
 class TaskQueue:
-    """Persistent task queue for handling rate limits and deferred execution"""
+    """Persistent task queue for handling rate limits and deferred execution
+
+    Tasks are split into one lane per rate-limit key (provider). Each lane
+    keeps a heap of ready items keyed by (priority, arrival) and a min-heap
+    of delayed items keyed by execute_after epoch; delayed items are promoted
+    lazily. Per-priority counters are kept incrementally.
+
+    start_worker() runs a small worker pool per lane. Workers sleep on the
+    lane's condition and wake on enqueue, on the next delayed item coming
+    due, or when the provider's rate-limit window resets, so a limited
+    provider never holds up tasks bound for another one.
+    """
+    
+    PRIORITY_ORDER = {'high': 0, 'normal': 1, 'low': 2}
     
-    def __init__(self, storage_path='/home/m1ndb0t/Desktop/J1MSKY/logs'):
+    def __init__(self, storage_path='/home/m1ndb0t/Desktop/J1MSKY/logs', durability=None):
         self.storage_path = Path(storage_path)
         self.storage_path.mkdir(exist_ok=True)
         self.queue_file = self.storage_path / 'task_queue.json'
-        self._queue = self._load_queue()
         self._lock = threading.Lock()
+        self._seq = itertools.count()
+        self._lanes = {}      # key -> {'ready': [(rank, seq, item)], 'delayed': [(due, seq, item)], 'cond': Condition}
+        self._held = []       # (priority_rank, seq, item) not in 'queued' status, kept for the file
+        self._counts = {'high': 0, 'normal': 0, 'low': 0}
+        self._total = 0
+        # Set before loading: _push() -> _lane() reads _processing
         self._processing = False
-        self._worker_thread = None
+        self._workers = {}    # key -> [Thread]
+        self._dispatched = {}
+        now = time.time()
+        with self._lock:  # _push() notifies lane conditions, which needs the lock
+            for item in self._load_queue():
+                self._push(item, now)
+        self._store = WriteBehindStore(
+            self.queue_file,
+            snapshot=self._snapshot,
+            lock=self._lock,
+            durability=durability or PERSISTENCE_CONFIG['task_queue']
+        )
         
     def _load_queue(self):
         """Load queue from disk"""
@@ -414,131 +530,230 @@ class TaskQueue:
         return []
     
     def _save_queue(self):
-        """Save queue to disk"""
-        with open(self.queue_file, 'w') as f:
-            json.dump(self._queue, f, indent=2)
+        """Schedule queue write-behind (call with lock held)"""
+        self._store.mark_dirty()
+    
+    def _snapshot(self):
+        """Queue in file order: priority, then arrival"""
+        entries = list(self._held)
+        for lane in self._lanes.values():
+            entries.extend(lane['ready'])
+            entries.extend((self._rank(item), seq, item) for _, seq, item in lane['delayed'])
+        entries.sort(key=lambda e: (e[0], e[1]))
+        return [item for _, _, item in entries]
+    
+    def _rank(self, item):
+        return self.PRIORITY_ORDER.get(item.get('priority', 'normal'), 1)
+    
+    def _lane(self, key):
+        """Get or create the lane for a rate-limit key (call with lock held)"""
+        lane = self._lanes.get(key)
+        if lane is None:
+            lane = {'ready': [], 'delayed': [], 'cond': threading.Condition(self._lock)}
+            self._lanes[key] = lane
+            if self._processing:
+                self._start_lane_workers(key)
+        return lane
+    
+    def _push(self, item, now, due=None):
+        """Place an item in its lane or the held set (call with lock held)"""
+        seq = next(self._seq)
+        rank = self._rank(item)
+        if item.get('status') != 'queued':
+            self._held.append((rank, seq, item))
+            return
+        
+        if due is None:
+            try:
+                due = datetime.fromisoformat(item['execute_after']).timestamp()
+            except (KeyError, TypeError, ValueError):
+                due = now
+        lane = self._lane(get_rate_limit_key(item.get('model')))
+        if due <= now:
+            heapq.heappush(lane['ready'], (rank, seq, item))
+        else:
+            heapq.heappush(lane['delayed'], (due, seq, item))
+        
+        priority = item.get('priority', 'normal')
+        if priority in self._counts:
+            self._counts[priority] += 1
+        self._total += 1
+        lane['cond'].notify()
+    
+    def _promote(self, lane, now):
+        """Move delayed items whose time has come into the ready heap"""
+        while lane['delayed'] and lane['delayed'][0][0] <= now:
+            _, seq, item = heapq.heappop(lane['delayed'])
+            heapq.heappush(lane['ready'], (self._rank(item), seq, item))
+    
+    def _pop_ready(self, lane):
+        """Pop the head ready item of a lane (call with lock held)"""
+        _, _, item = heapq.heappop(lane['ready'])
+        priority = item.get('priority', 'normal')
+        if priority in self._counts:
+            self._counts[priority] -= 1
+        self._total -= 1
+        self._save_queue()
+        return item
     
     def enqueue(self, task, model, team=None, priority='normal', delay_seconds=0):
         """Add task to queue"""
         with self._lock:
+            now = datetime.now()
             queue_item = {
                 'id': f"queued_{int(time.time())}_{random.randint(1000,9999)}",
                 'task': task,
                 'model': model,
                 'team': team,
                 'priority': priority,
-                'created_at': datetime.now().isoformat(),
-                'execute_after': (datetime.now() + timedelta(seconds=delay_seconds)).isoformat(),
+                'created_at': now.isoformat(),
+                'execute_after': (now + timedelta(seconds=delay_seconds)).isoformat(),
                 'attempts': 0,
                 'max_attempts': 3,
                 'status': 'queued'
             }
             
-            # Insert based on priority (higher priority = earlier in queue)
-            priority_order = {'high': 0, 'normal': 1, 'low': 2}
-            insert_idx = len(self._queue)
-            for i, item in enumerate(self._queue):
-                if priority_order.get(priority, 1) < priority_order.get(item.get('priority', 'normal'), 1):
-                    insert_idx = i
-                    break
-            
-            self._queue.insert(insert_idx, queue_item)
+            # Heap position: higher priority first, FIFO within a priority
+            self._push(queue_item, now.timestamp(), due=now.timestamp() + max(delay_seconds, 0))
             self._save_queue()
             
             add_event(f"Task queued: {task[:40]}... (priority: {priority})", type='info')
             return queue_item['id']
     
-    def dequeue(self):
-        """Get next ready task from queue"""
+    def requeue(self, item, delay_seconds=0):
+        """Put a dequeued item back, keeping its id and attempt count"""
         with self._lock:
             now = datetime.now()
-            for i, item in enumerate(self._queue):
-                if item['status'] != 'queued':
-                    continue
-                execute_after = datetime.fromisoformat(item['execute_after'])
-                if now >= execute_after:
-                    self._queue.pop(i)
-                    self._save_queue()
-                    return item
-            return None
+            item['status'] = 'queued'
+            item['execute_after'] = (now + timedelta(seconds=delay_seconds)).isoformat()
+            self._push(item, now.timestamp(), due=now.timestamp() + max(delay_seconds, 0))
+            self._save_queue()
+    
+    def dequeue(self, provider=None):
+        """Get next ready task from queue (optionally for one rate-limit key)"""
+        with self._lock:
+            now = time.time()
+            if provider is not None:
+                lane = self._lanes.get(provider)
+                if not lane:
+                    return None
+                self._promote(lane, now)
+                return self._pop_ready(lane) if lane['ready'] else None
+            
+            best = None
+            for lane in self._lanes.values():
+                self._promote(lane, now)
+                if lane['ready'] and (best is None or lane['ready'][0][:2] < best['ready'][0][:2]):
+                    best = lane
+            return self._pop_ready(best) if best else None
     
     def get_queue_status(self):
         """Get current queue statistics"""
         with self._lock:
-            pending = [q for q in self._queue if q['status'] == 'queued']
             return {
-                'total_queued': len(pending),
-                'high_priority': len([q for q in pending if q.get('priority') == 'high']),
-                'normal_priority': len([q for q in pending if q.get('priority') == 'normal']),
-                'low_priority': len([q for q in pending if q.get('priority') == 'low']),
-                'next_available': self._get_next_available()
+                'total_queued': self._total,
+                'high_priority': self._counts['high'],
+                'normal_priority': self._counts['normal'],
+                'low_priority': self._counts['low'],
+                'next_available': self._get_next_available(),
+                'providers': {
+                    key: {
+                        'ready': len(lane['ready']),
+                        'delayed': len(lane['delayed']),
+                        'workers': len(self._workers.get(key, [])),
+                        'dispatched': self._dispatched.get(key, 0)
+                    }
+                    for key, lane in self._lanes.items()
+                }
             }
     
     def _get_next_available(self):
         """Get timestamp of next available task"""
-        for item in self._queue:
-            if item['status'] == 'queued':
-                return item['execute_after']
+        ready = [lane['ready'][0] for lane in self._lanes.values() if lane['ready']]
+        if ready:
+            return min(ready, key=lambda e: e[:2])[2]['execute_after']
+        delayed = [lane['delayed'][0] for lane in self._lanes.values() if lane['delayed']]
+        if delayed:
+            return min(delayed, key=lambda e: e[:2])[2]['execute_after']
         return None
     
     def start_worker(self):
-        """Start background worker to process queued tasks"""
-        if self._processing:
-            return
-        
-        self._processing = True
-        self._worker_thread = threading.Thread(target=self._worker_loop, daemon=True)
-        self._worker_thread.start()
-        add_event("Task queue worker started", type='info')
+        """Start per-provider worker pools to process queued tasks"""
+        with self._lock:
+            if self._processing:
+                return
+            self._processing = True
+            keys = {get_rate_limit_key(model) for model in MODEL_AGENTS} | set(self._lanes)
+            for key in keys:
+                self._lane(key)
+                self._start_lane_workers(key)
+        add_event(f"Task queue workers started ({len(keys)} providers)", type='info')
     
     def stop_worker(self):
-        """Stop background worker"""
-        self._processing = False
-        if self._worker_thread:
-            self._worker_thread.join(timeout=5)
+        """Stop background workers"""
+        with self._lock:
+            self._processing = False
+            for lane in self._lanes.values():
+                lane['cond'].notify_all()
+            workers = [t for threads in self._workers.values() for t in threads]
+            self._workers = {}
+        for thread in workers:
+            thread.join(timeout=5)
+    
+    def _start_lane_workers(self, key):
+        """Start the worker pool for one lane (call with lock held)"""
+        if self._workers.get(key):
+            return
+        size = get_provider_pool_size(key)
+        self._workers[key] = []
+        for i in range(size):
+            thread = threading.Thread(target=self._worker_loop, args=(key,),
+                                      name=f'queue-{key}-{i}', daemon=True)
+            self._workers[key].append(thread)
+            thread.start()
     
-    def _worker_loop(self):
-        """Background worker loop"""
+    def _next_for(self, key):
+        """Block until a task for this lane is ready and its provider has headroom"""
+        with self._lock:
+            lane = self._lanes[key]
+            while self._processing:
+                now = time.time()
+                self._promote(lane, now)
+                wait = None
+                if lane['ready']:
+                    is_limited, _ = check_rate_limit(key)
+                    if not is_limited:
+                        self._dispatched[key] = self._dispatched.get(key, 0) + 1
+                        return self._pop_ready(lane)
+                    wait = get_rate_limiter(key).retry_after()
+                if lane['delayed']:
+                    due_in = lane['delayed'][0][0] - now
+                    wait = due_in if wait is None else min(wait, due_in)
+                lane['cond'].wait(None if wait is None else max(wait, 0.05))
+            return None
+    
+    def _worker_loop(self, key):
+        """Background worker loop for one provider lane"""
         while self._processing:
+            queued_task = self._next_for(key)
+            if not queued_task:
+                continue
             try:
-                # Check rate limits before processing
-                provider = 'kimi'  # Default check
-                is_limited, remaining = check_rate_limit(provider)
-                
-                if is_limited:
-                    # Rate limited, wait and retry
-                    time.sleep(30)
-                    continue
-                
-                # Get next task
-                queued_task = self.dequeue()
-                if queued_task:
-                    # Attempt to spawn
-                    agent_id = spawn_subagent(
-                        queued_task['task'],
-                        queued_task['model'],
-                        queued_task.get('team')
-                    )
-                    
-                    if not agent_id and queued_task['attempts'] < queued_task['max_attempts']:
-                        # Re-queue with exponential backoff
-                        queued_task['attempts'] += 1
-                        delay = 60 * (2 ** queued_task['attempts'])  # 2min, 4min, 8min
-                        self.enqueue(
-                            queued_task['task'],
-                            queued_task['model'],
-                            queued_task.get('team'),
-                            queued_task.get('priority', 'normal'),
-                            delay
-                        )
-                        add_event(f"Task re-queued (attempt {queued_task['attempts']})", type='warning')
-                
-                # Sleep before next check
-                time.sleep(10)
-                
+                agent_id = spawn_subagent(
+                    queued_task['task'],
+                    queued_task['model'],
+                    queued_task.get('team')
+                )
             except Exception as e:
                 add_event(f"Queue worker error: {e}", type='error')
-                time.sleep(30)
+                agent_id = None
+            
+            if not agent_id and queued_task['attempts'] < queued_task['max_attempts']:
+                # Re-queue with exponential backoff
+                queued_task['attempts'] += 1
+                delay = 60 * (2 ** queued_task['attempts'])  # 2min, 4min, 8min
+                self.requeue(queued_task, delay)
+                add_event(f"Task re-queued (attempt {queued_task['attempts']})", type='warning')
 
 # Initialize global task queue
 task_queue = TaskQueue()
@@ -553,12 +768,45 @@ class CostTracker:
         'opus': {'input': 0.015, 'output': 0.075, 'per_1k': True},
         'minimax-m2.5': {'input': 0.0001, 'output': 0.0001, 'per_1k': True}
     }
+
+    # Quote pricing rules (shared by the scalar and columnar quote paths)
+    SEGMENT_ADJUSTMENTS = {
+        'enterprise': 0.5,
+        'mid_market': 0.0,
+        'smb': -0.5,
+        'startup': -1.0
+    }
+    COMPLEXITY_MARKUP = {'low': 3.0, 'medium': 4.0, 'high': 5.0}
+    DEFAULT_MARKUP = 4.0
+    MINIMUM_PRICE = 0.50
+    MARGIN_THRESHOLDS = {'task': 55.0, 'subscription': 50.0, 'enterprise': 45.0}
     
-    def __init__(self, storage_path='/home/m1ndb0t/Desktop/J1MSKY/logs'):
+    def __init__(self, storage_path='/home/m1ndb0t/Desktop/J1MSKY/logs', durability=None):
         self.storage_path = Path(storage_path)
         self.storage_path.mkdir(exist_ok=True)
         self.daily_usage = self._load_daily_usage()
         self.session_start = datetime.now()
+        self._lock = threading.Lock()
+        self._store = WriteBehindStore(
+            lambda: self.storage_path / f"usage_{datetime.now().strftime('%Y-%m-%d')}.json",
+            snapshot=lambda: self.daily_usage,
+            lock=self._lock,
+            durability=durability or PERSISTENCE_CONFIG['cost_tracker']
+        )
+        self.quote_policy = self._build_quote_policy(self.MODEL_PRICING)
+
+    def _build_quote_policy(self, pricing):
+        """Columnar pricing rules matching recommend_task_quote/evaluate_margin_guardrail"""
+        return QuotePolicy(
+            rates={model: (p['input'], p['output']) for model, p in pricing.items()},
+            complexity_markup=self.COMPLEXITY_MARKUP,
+            default_markup=self.DEFAULT_MARKUP,
+            segment_adjustments=self.SEGMENT_ADJUSTMENTS,
+            minimum_price=self.MINIMUM_PRICE,
+            margin_on_rounded_price=True,
+            guardrail_thresholds=self.MARGIN_THRESHOLDS,
+            default_threshold=55.0
+        )
         
     def _load_daily_usage(self):
         """Load today's usage from file"""
@@ -570,11 +818,8 @@ class CostTracker:
         return {'models': {}, 'total_cost': 0.0, 'tasks_completed': 0}
     
     def _save_daily_usage(self):
-        """Save usage to file"""
-        today = datetime.now().strftime('%Y-%m-%d')
-        usage_file = self.storage_path / f'usage_{today}.json'
-        with open(usage_file, 'w') as f:
-            json.dump(self.daily_usage, f, indent=2)
+        """Schedule usage write-behind (call with lock held)"""
+        self._store.mark_dirty()
     
     def record_usage(self, model, input_tokens=0, output_tokens=0, task_type='unknown'):
         """Record token usage and calculate cost"""
@@ -588,22 +833,23 @@ class CostTracker:
         output_cost = (output_tokens / 1000) * pricing['output'] if pricing['per_1k'] else output_tokens * pricing['output']
         total_cost = input_cost + output_cost
         
-        # Update daily usage
-        if model not in self.daily_usage['models']:
-            self.daily_usage['models'][model] = {
-                'input_tokens': 0, 'output_tokens': 0, 
-                'cost': 0.0, 'calls': 0
-            }
-        
-        self.daily_usage['models'][model]['input_tokens'] += input_tokens
-        self.daily_usage['models'][model]['output_tokens'] += output_tokens
-        self.daily_usage['models'][model]['cost'] += total_cost
-        self.daily_usage['models'][model]['calls'] += 1
-        self.daily_usage['total_cost'] += total_cost
-        self.daily_usage['tasks_completed'] += 1
-        
-        # Persist to disk
-        self._save_daily_usage()
+        with self._lock:
+            # Update daily usage
+            if model not in self.daily_usage['models']:
+                self.daily_usage['models'][model] = {
+                    'input_tokens': 0, 'output_tokens': 0, 
+                    'cost': 0.0, 'calls': 0
+                }
+            
+            self.daily_usage['models'][model]['input_tokens'] += input_tokens
+            self.daily_usage['models'][model]['output_tokens'] += output_tokens
+            self.daily_usage['models'][model]['cost'] += total_cost
+            self.daily_usage['models'][model]['calls'] += 1
+            self.daily_usage['total_cost'] += total_cost
+            self.daily_usage['tasks_completed'] += 1
+            
+            # Persist to disk (write-behind)
+            self._save_daily_usage()
         
         return total_cost
     
@@ -644,20 +890,13 @@ class CostTracker:
     def recommend_task_quote(self, model, estimated_input=1000, estimated_output=500, complexity='medium', segment='mid_market'):
         """Generate a customer-facing quote recommendation from model cost estimates."""
         # Segment markup adjustments
-        segment_adjustments = {
-            'enterprise': 0.5,
-            'mid_market': 0.0,
-            'smb': -0.5,
-            'startup': -1.0
-        }
-        segment_adj = segment_adjustments.get(segment, 0.0)
+        segment_adj = self.SEGMENT_ADJUSTMENTS.get(segment, 0.0)
 
-        complexity_markup = {'low': 3.0, 'medium': 4.0, 'high': 5.0}
-        base_markup = complexity_markup.get(complexity, 4.0)
+        base_markup = self.COMPLEXITY_MARKUP.get(complexity, self.DEFAULT_MARKUP)
         markup = base_markup + segment_adj
 
         internal_cost = self.estimate_task_cost(model, estimated_input, estimated_output)
-        minimum_price = 0.50
+        minimum_price = self.MINIMUM_PRICE
         recommended_price = round(max(internal_cost * markup, minimum_price), 2)
         margin_pct = round(((recommended_price - internal_cost) / recommended_price) * 100, 2) if recommended_price else 0.0
 
@@ -685,8 +924,7 @@ class CostTracker:
 
     def evaluate_margin_guardrail(self, quote, delivery_type='task'):
         """Evaluate quote against minimum margin thresholds."""
-        thresholds = {'task': 55.0, 'subscription': 50.0, 'enterprise': 45.0}
-        threshold = thresholds.get(delivery_type, 55.0)
+        threshold = self.MARGIN_THRESHOLDS.get(delivery_type, 55.0)
         margin = quote.get('gross_margin_pct', 0.0)
         compliant = margin >= threshold
 
@@ -698,19 +936,179 @@ class CostTracker:
             'action': 'approve_quote' if compliant else 'escalate_deal_desk'
         }
 
+    def recommend_task_quotes(self, models, complexities, segments, estimated_input, estimated_output, delivery_type='task'):
+        """Price a batch of quotes columnar; same results as recommend_task_quote + evaluate_margin_guardrail per row."""
+        policy = self.quote_policy
+        unknown = set(models).difference(self.MODEL_PRICING)
+        if unknown:
+            # estimate_task_cost prices unknown models at zero
+            policy = self._build_quote_policy({**self.MODEL_PRICING, **{m: {'input': 0.0, 'output': 0.0} for m in unknown}})
+
+        cols = price_quotes(policy, models, complexities, segments, estimated_input, estimated_output,
+                            delivery_types=delivery_type)
+
+        results = []
+        for row in zip(models, complexities, segments, estimated_input, estimated_output,
+                       cols['internal_cost'], cols['base_markup'], cols['segment_adjustment'],
+                       cols['final_markup'], cols['recommended_price'], cols['gross_margin_pct'],
+                       cols['margin_band'], cols['minimum_margin_pct'], cols['is_compliant']):
+            model, complexity, segment, tokens_in, tokens_out, cost, base, adj, markup, price, margin, band, threshold, compliant = row
+            results.append({
+                'quote': {
+                    'model': model,
+                    'complexity': complexity,
+                    'segment': segment,
+                    'estimated_input_tokens': int(tokens_in),
+                    'estimated_output_tokens': int(tokens_out),
+                    'internal_cost': cost,
+                    'base_markup': base,
+                    'segment_adjustment': adj,
+                    'final_markup': markup,
+                    'recommended_price': price,
+                    'gross_margin_pct': margin,
+                    'margin_band': band
+                },
+                'guardrail_check': {
+                    'delivery_type': delivery_type,
+                    'minimum_margin_pct': threshold,
+                    'actual_margin_pct': margin,
+                    'is_compliant': compliant,
+                    'action': 'approve_quote' if compliant else 'escalate_deal_desk'
+                }
+            })
+        return results
+
+    def recommend_segment_quotes(self, requests, delivery_type='task'):
+        """Quote each (model, complexity, estimated_input, estimated_output) request for every segment."""
+        segments = list(self.SEGMENT_ADJUSTMENTS)
+        n = len(segments)
+        models, complexities, inputs, outputs = [], [], [], []
+        for model, complexity, estimated_input, estimated_output in requests:
+            models += [model] * n
+            complexities += [complexity] * n
+            inputs += [estimated_input] * n
+            outputs += [estimated_output] * n
+        priced = self.recommend_task_quotes(models, complexities, segments * len(requests), inputs, outputs,
+                                            delivery_type=delivery_type)
+
+        results = []
+        for i, (model, complexity, estimated_input, estimated_output) in enumerate(requests):
+            quotes_by_segment = dict(zip(segments, priced[i * n:(i + 1) * n]))
+
+            # Find best value and highest margin options
+            best_value = min(quotes_by_segment.items(), key=lambda x: x[1]['quote']['recommended_price'])
+            highest_margin = max(quotes_by_segment.items(), key=lambda x: x[1]['quote']['gross_margin_pct'])
+            results.append({
+                'input_params': {
+                    'model': model,
+                    'complexity': complexity,
+                    'estimated_input': estimated_input,
+                    'estimated_output': estimated_output,
+                    'delivery_type': delivery_type
+                },
+                'quotes_by_segment': quotes_by_segment,
+                'comparison': {
+                    'best_value_segment': best_value[0],
+                    'best_value_price': best_value[1]['quote']['recommended_price'],
+                    'highest_margin_segment': highest_margin[0],
+                    'highest_margin_pct': highest_margin[1]['quote']['gross_margin_pct']
+                }
+            })
+        return results
+
 # Initialize global cost tracker
 cost_tracker = CostTracker()
 
+
+def parse_quote_scenario(item, idx):
+    """Validate one pricing scenario; returns (model, complexity, segment, input, output) or raises ValueError"""
+    if not isinstance(item, dict):
+        raise ValueError(f'Invalid scenario {idx}: expected a JSON object')
+    model = item.get('model', 'k2p5')
+    complexity = item.get('complexity', 'medium')
+    segment = item.get('segment', 'mid_market')
+    try:
+        estimated_input = int(item.get('estimated_input', 1000))
+        estimated_output = int(item.get('estimated_output', 500))
+    except (TypeError, ValueError):
+        raise ValueError(f'Invalid token estimates in scenario {idx}')
+
+    if not isinstance(model, str) or model not in cost_tracker.MODEL_PRICING:
+        raise ValueError(f'Unsupported model in scenario {idx}: {model}')
+    if not isinstance(complexity, str) or complexity not in {'low', 'medium', 'high'}:
+        raise ValueError(f'Invalid complexity in scenario {idx}: {complexity}')
+    if not isinstance(segment, str) or segment not in {'enterprise', 'mid_market', 'smb', 'startup'}:
+        raise ValueError(f'Invalid segment in scenario {idx}: {segment}')
+    return model, complexity, segment, estimated_input, estimated_output
+
+
+def parse_batch_quote_request(item):
+    """Validate one batch-quotes request (dict of single values); returns (model, complexity, input, output) or raises ValueError"""
+    model = item.get('model', 'k2p5')
+    complexity = item.get('complexity', 'medium')
+    try:
+        estimated_input = int(item.get('estimated_input', 1000))
+        estimated_output = int(item.get('estimated_output', 500))
+    except (TypeError, ValueError):
+        raise ValueError('estimated_input and estimated_output must be integers')
+
+    if not isinstance(model, str) or model not in cost_tracker.MODEL_PRICING:
+        raise ValueError(f'Unsupported model: {model}')
+    if not isinstance(complexity, str) or complexity not in {'low', 'medium', 'high'}:
+        raise ValueError('complexity must be low|medium|high')
+    return model, complexity, estimated_input, estimated_output
+
+
+def new_quote_ledger():
+    """Quote ledger using the CostTracker margin guardrails"""
+    return QuoteLedger(CostTracker.MARGIN_THRESHOLDS, default_threshold=55.0)
+
+
+def scenario_portfolio_summary(ledger, delivery_type):
+    """/api/pricing/scenario portfolio summary from ledger totals"""
+    totals = ledger.totals()
+    count = max(totals.count, 1)
+    compliant_count = ledger.compliant_count(delivery_type)
+    compliance_ratio = round(compliant_count / count, 2)
+    return {
+        'delivery_type': delivery_type,
+        'scenario_count': totals.count,
+        'compliant_count': compliant_count,
+        'compliance_ratio': compliance_ratio,
+        'needs_escalation': compliant_count < totals.count,
+        'requires_executive_review': compliance_ratio < 0.67,
+        'average_margin_pct': totals.avg_margin()
+    }
+
+
+def weekly_metrics_summary(totals):
+    """/api/pricing/weekly-metrics figures from ledger totals"""
+    return {
+        'total_quotes': totals.count,
+        'approved_count': totals.approved,
+        'escalated_count': totals.escalated,
+        'approval_rate': round(totals.approved / max(totals.count, 1), 2),
+        'avg_margin_pct': totals.avg_margin(),
+        'exceptions_created': totals.exceptions_created,
+        'exceptions_closed': totals.exceptions_closed
+    }
+
 # Metrics and Analytics Module
 class MetricsCollector:
     """Collect and aggregate system metrics for monitoring and optimization"""
     
-    def __init__(self, storage_path='/home/m1ndb0t/Desktop/J1MSKY/logs'):
+    def __init__(self, storage_path='/home/m1ndb0t/Desktop/J1MSKY/logs', durability=None):
         self.storage_path = Path(storage_path)
         self.storage_path.mkdir(exist_ok=True)
         self.metrics_file = self.storage_path / 'metrics.json'
         self._metrics = self._load_metrics()
         self._lock = threading.Lock()
+        self._store = WriteBehindStore(
+            self.metrics_file,
+            snapshot=lambda: self._metrics,
+            lock=self._lock,
+            durability=durability or PERSISTENCE_CONFIG['metrics']
+        )
         
     def _load_metrics(self):
         """Load metrics from disk"""
@@ -756,9 +1154,8 @@ class MetricsCollector:
         }
     
     def _save_metrics(self):
-        """Save metrics to disk"""
-        with open(self.metrics_file, 'w') as f:
-            json.dump(self._metrics, f, indent=2)
+        """Schedule metrics write-behind (call with lock held)"""
+        self._store.mark_dirty()
     
     def record_agent_spawn(self, model, team=None):
         """Record agent spawn event"""
@@ -974,6 +1371,7 @@ class PrometheusExporter:
             lines.append(f'j1msky_model_failures{{model="{model}"}} {stats.get("failed", 0)}')
         
         # Rate limit metrics
+        refresh_rate_limits()
         lines.append('# HELP j1msky_rate_limit_remaining Remaining requests in current window')
         lines.append('# TYPE j1msky_rate_limit_remaining gauge')
         for provider, limits in self.rate_limits.items():
@@ -1012,6 +1410,17 @@ class PrometheusExporter:
         lines.append('# TYPE j1msky_budget_status gauge')
         lines.append(f'j1msky_budget_status {budget_value}')
         
+        # HTTP worker pool metrics
+        if http_server is not None and hasattr(http_server, 'get_stats'):
+            http_stats = http_server.get_stats()
+            lines.append('# HELP j1msky_http_in_flight Connections being served or queued')
+            lines.append('# TYPE j1msky_http_in_flight gauge')
+            lines.append(f'j1msky_http_in_flight {http_stats["in_flight"]}')
+            
+            lines.append('# HELP j1msky_http_rejected_total Connections rejected because the queue was full')
+            lines.append('# TYPE j1msky_http_rejected_total counter')
+            lines.append(f'j1msky_http_rejected_total {http_stats["total_rejected"]}')
+        
         return '\n'.join(lines) + '\n'
     
     def get_metrics_dict(self) -> dict:
@@ -1019,6 +1428,7 @@ class PrometheusExporter:
         dashboard = self.metrics.get_dashboard_metrics()
         health = self.metrics.get_health_status()
         budget_status, budget_message = self.cost_tracker.check_budget_alert()
+        refresh_rate_limits()
         
         return {
             'agents': dashboard['agents'],
@@ -1051,13 +1461,29 @@ class WorkflowEngine:
     """
     Define and execute multi-step agent workflows.
     Allows chaining multiple agents with conditional logic.
+    
+    Steps form a dependency DAG inferred from the variables they read
+    (task_template placeholders, input_vars, condition) and write
+    (output_var); independent steps run concurrently, giving the same
+    results as running them in order. A step with 'map_over' fans out one
+    agent per list item and fans the results back in as a list.
     """
     
-    def __init__(self, storage_path='/home/m1ndb0t/Desktop/J1MSKY/workflows'):
+    def __init__(self, storage_path='/home/m1ndb0t/Desktop/J1MSKY/workflows', workers=None):
         self.storage_path = Path(storage_path)
         self.storage_path.mkdir(exist_ok=True)
         self.active_workflows = {}
         self._lock = threading.Lock()
+        # Steps run on a shared pool and resume from subagent completion
+        # callbacks, so a waiting workflow holds no thread
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers or WORKFLOW_CONFIG['workers'],
+            thread_name_prefix='workflow'
+        )
+        self._timeouts = []  # (deadline, seq, fire)
+        self._timeout_seq = itertools.count()
+        self._timeout_cond = threading.Condition()
+        self._timeout_thread = None
         
     def create_workflow(self, name, steps, description=''):
         """
@@ -1078,6 +1504,14 @@ class WorkflowEngine:
                 'task_template': 'Write based on: {research_result}',
                 'input_vars': ['research_result'],
                 'output_var': 'final_output'
+            },
+            {
+                'name': 'review',
+                'model': 'sonnet',
+                'map_over': 'sections',     # Optional: one agent per item of a list var
+                'task_template': 'Review section {item_index}: {item}',
+                'join': '\n',               # Optional: join mapped results into a string
+                'output_var': 'reviews'
             }
         ]
         """
@@ -1128,99 +1562,301 @@ class WorkflowEngine:
         with self._lock:
             self.active_workflows[execution_id] = execution
         
-        # Start execution in background
-        threading.Thread(
-            target=self._run_workflow,
-            args=(execution, workflow, callback),
-            daemon=True
-        ).start()
+        # Start execution on the shared pool
+        run = {
+            'execution': execution,
+            'workflow': workflow,
+            'callback': callback,
+            'context': execution['inputs'].copy()
+        }
+        self._executor.submit(self._start_run, run)
         
         return execution_id, None
     
-    def _run_workflow(self, execution, workflow, callback=None):
-        """Internal method to run workflow steps"""
+    @staticmethod
+    def _step_reads(step):
+        """Variables a step reads"""
+        reads = set(step.get('input_vars') or [])
+        for _, field, _, _ in string.Formatter().parse(step.get('task_template', '')):
+            if field:
+                reads.add(field.split('.')[0].split('[')[0])
+        condition = step.get('condition')
+        if condition:
+            for op in ('==', '!='):
+                if op in condition:
+                    reads.add(condition.split(op)[0].strip())
+                    break
+        if step.get('map_over'):
+            reads.add(step['map_over'])
+        reads.discard('item')
+        reads.discard('item_index')
+        return reads
+    
+    def _build_dag(self, steps):
+        """Dependencies per step that preserve sequential semantics"""
+        deps = []
+        last_writer = {}
+        readers_since_write = defaultdict(list)
+        for i, step in enumerate(steps):
+            step_deps = set()
+            for var in self._step_reads(step):
+                if var in last_writer:
+                    step_deps.add(last_writer[var])
+                readers_since_write[var].append(i)
+            output_var = step.get('output_var', f'step_{i}_output')
+            # Writes wait for the previous write and for earlier readers of the old value
+            if output_var in last_writer:
+                step_deps.add(last_writer[output_var])
+            step_deps.update(r for r in readers_since_write[output_var] if r != i)
+            readers_since_write[output_var] = []
+            last_writer[output_var] = i
+            deps.append(step_deps)
+        return deps
+    
+    def _start_run(self, run):
+        """Prepare DAG state for an execution and launch its first steps"""
+        steps = run['workflow']['steps']
+        run.update({
+            'lock': threading.Lock(),
+            'deps': self._build_dag(steps),
+            'state': ['pending'] * len(steps),
+            'units': {},          # step -> [(item_index, task)] not yet spawned
+            'results': {},        # step -> [result per item]
+            'agents': {},         # step -> [agent_id per item]
+            'outstanding': {},    # step -> items still running
+            'cost': defaultdict(float),
+            'inflight': defaultdict(int),
+            'timing': {},         # step -> [start, end] (monotonic)
+            'retry_keys': set(),
+            'finished': False,
+            'started': time.monotonic()
+        })
+        self._schedule(run)
+    
+    def _schedule(self, run):
+        """Start every step whose dependencies are met, within provider limits"""
         try:
-            context = execution['inputs'].copy()
+            self._schedule_ready(run)
+        except Exception as e:
+            with run['lock']:
+                if run['finished']:
+                    return
+                run['finished'] = True
+            self._fail(run, str(e), prefix='Workflow error: ')
+    
+    def _schedule_ready(self, run):
+        execution = run['execution']
+        steps = run['workflow']['steps']
+        context = run['context']
+        launches = []
+        error = None
+        finished = False
+        
+        with run['lock']:
+            if run['finished']:
+                return
             
-            for i, step in enumerate(workflow['steps']):
-                step_name = step['name']
-                add_event(f"Workflow {execution['id'][:8]}: Starting step '{step_name}'", type='info')
-                
-                # Check condition if present
-                if 'condition' in step and step['condition']:
-                    if not self._evaluate_condition(step['condition'], context):
-                        add_event(f"Step {step_name} skipped (condition not met)", type='info')
+            # Resolve ready steps; skipping one can unblock others
+            progressed = True
+            while progressed and error is None:
+                progressed = False
+                for i, step in enumerate(steps):
+                    if run['state'][i] != 'pending':
                         continue
-                
-                # Build task from template
-                task_template = step['task_template']
-                try:
-                    task = task_template.format(**context)
-                except KeyError as e:
-                    error = f"Missing variable {e} for step {step_name}"
-                    add_event(error, type='error')
-                    execution['status'] = 'failed'
-                    execution['error'] = error
-                    if callback:
-                        callback(execution)
-                    return
-                
-                # Spawn agent for this step
-                model = step.get('model', 'k2p5')
-                agent_id = spawn_subagent(task, model)
-                
-                if not agent_id:
-                    error = f"Failed to spawn agent for step {step_name}"
-                    add_event(error, type='error')
-                    execution['status'] = 'failed'
-                    execution['error'] = error
-                    if callback:
-                        callback(execution)
-                    return
-                
-                # Wait for completion (in real impl, this would be async)
-                # For now, we simulate waiting
-                max_wait = 300  # 5 minutes
-                waited = 0
-                while waited < max_wait:
-                    if agent_id in ACTIVE_SUBAGENTS:
-                        agent = ACTIVE_SUBAGENTS[agent_id]
-                        if agent['status'] == 'completed':
+                    if any(run['state'][d] not in ('done', 'skipped') for d in run['deps'][i]):
+                        continue
+                    step_name = step['name']
+                    
+                    # Check condition if present
+                    if 'condition' in step and step['condition']:
+                        if not self._evaluate_condition(step['condition'], context):
+                            add_event(f"Step {step_name} skipped (condition not met)", type='info')
+                            run['state'][i] = 'skipped'
+                            progressed = True
+                            continue
+                    
+                    # Build one task per item (a single item unless the step maps)
+                    if step.get('map_over'):
+                        items = context.get(step['map_over'], [])
+                        items = list(items) if isinstance(items, (list, tuple)) else [items]
+                    else:
+                        items = [None]
+                    units = []
+                    try:
+                        for item_index, item in enumerate(items):
+                            values = dict(context, item=item, item_index=item_index) if step.get('map_over') else context
+                            units.append((item_index, step['task_template'].format(**values)))
+                    except KeyError as e:
+                        error = f"Missing variable {e} for step {step_name}"
+                        break
+                    
+                    add_event(f"Workflow {execution['id'][:8]}: Starting step '{step_name}'", type='info')
+                    run['state'][i] = 'running'
+                    run['timing'][i] = [time.monotonic(), None]
+                    run['units'][i] = units
+                    run['results'][i] = [None] * len(units)
+                    run['agents'][i] = [None] * len(units)
+                    run['outstanding'][i] = len(units)
+                    if not units:
+                        self._finish_step(run, i)
+                        progressed = True
+            
+            if error is None:
+                # Hand out pending units, bounded per provider
+                for i, units in run['units'].items():
+                    if not units:
+                        continue
+                    model = steps[i].get('model', 'k2p5')
+                    key = get_rate_limit_key(model)
+                    while units and run['inflight'][key] < WORKFLOW_CONFIG['max_parallel_per_provider']:
+                        is_limited, _ = check_rate_limit(key)
+                        if is_limited:
+                            self._retry_when_available(run, key)
                             break
-                        elif agent['status'] == 'failed':
-                            error = f"Step {step_name} failed"
-                            add_event(error, type='error')
-                            execution['status'] = 'failed'
-                            execution['error'] = error
-                            if callback:
-                                callback(execution)
-                            return
-                    time.sleep(1)
-                    waited += 1
-                
-                # Get result and add to context
-                result = ACTIVE_SUBAGENTS.get(agent_id, {}).get('result', 'No result')
-                output_var = step.get('output_var', f'step_{i}_output')
-                context[output_var] = result
+                        run['inflight'][key] += 1
+                        launches.append((i, model, key, units.pop(0)))
                 
-                # Track cost
-                step_cost = ACTIVE_SUBAGENTS.get(agent_id, {}).get('actual_cost', 0)
-                execution['total_cost'] += step_cost
-                
-                execution['step_results'].append({
-                    'step': step_name,
-                    'agent_id': agent_id,
-                    'output': result,
-                    'cost': step_cost
-                })
-                
-                add_event(f"Step {step_name} completed (${step_cost:.4f})", type='success')
-            
-            # Workflow complete
+                if all(state in ('done', 'skipped') for state in run['state']):
+                    finished = run['finished'] = True
+            else:
+                run['finished'] = True
+        
+        if error is not None:
+            self._fail(run, error)
+            return
+        if finished:
+            self._complete(run)
+            return
+        
+        for i, model, key, (item_index, task) in launches:
+            agent_id = spawn_subagent(task, model)
+            if not agent_id:
+                # Lost a race for the provider budget: put the unit back and retry later
+                with run['lock']:
+                    run['inflight'][key] -= 1
+                    run['units'][i].insert(0, (item_index, task))
+                    self._retry_when_available(run, key)
+                continue
+            with run['lock']:
+                run['agents'][i][item_index] = agent_id
+            self._await_unit(run, i, item_index, agent_id, key)
+    
+    def _retry_when_available(self, run, key):
+        """Re-run the scheduler once the provider has headroom (call with run lock held)"""
+        if key in run['retry_keys']:
+            return
+        run['retry_keys'].add(key)
+        
+        def retry():
+            with run['lock']:
+                run['retry_keys'].discard(key)
+            self._executor.submit(self._schedule, run)
+        
+        limiter = get_rate_limiter(key)
+        self._schedule_timeout(limiter.retry_after() if limiter else 0, retry)
+    
+    def _await_unit(self, run, index, item_index, agent_id, key):
+        """Continue the workflow once one of the step's subagents finishes"""
+        fired = []
+        fired_lock = threading.Lock()
+        
+        def fire(timed_out=False):
+            with fired_lock:
+                if fired:
+                    return
+                fired.append(True)
+            self._executor.submit(self._on_unit_done, run, index, item_index, agent_id, key, timed_out)
+        
+        self._schedule_timeout(WORKFLOW_CONFIG['step_timeout'], lambda: fire(timed_out=True))
+        get_subagent_future(agent_id).add_done_callback(lambda f: fire())
+    
+    def _on_unit_done(self, run, index, item_index, agent_id, key, timed_out=False):
+        """Record a finished subagent and schedule whatever it unblocked"""
+        step_name = run['workflow']['steps'][index]['name']
+        agent = ACTIVE_SUBAGENTS.get(agent_id, {})
+        with run['lock']:
+            run['inflight'][key] -= 1
+            if run['finished']:
+                return
+            failed = agent.get('status') == 'failed'
+            if failed:
+                run['finished'] = True
+            else:
+                if timed_out:
+                    add_event(f"Step {step_name} timed out, continuing with partial result", type='warning')
+                run['results'][index][item_index] = agent.get('result') or 'No result'
+                run['cost'][index] += agent.get('actual_cost', 0)
+                run['outstanding'][index] -= 1
+                if run['outstanding'][index] == 0:
+                    self._finish_step(run, index)
+        
+        if failed:
+            self._fail(run, f"Step {step_name} failed")
+            return
+        self._schedule(run)
+    
+    def _finish_step(self, run, index):
+        """Publish a step's output and record it (call with run lock held)"""
+        step = run['workflow']['steps'][index]
+        execution = run['execution']
+        results = run['results'][index]
+        if step.get('map_over'):
+            output = step['join'].join(str(r) for r in results) if step.get('join') is not None else results
+        else:
+            output = results[0]
+        output_var = step.get('output_var', f'step_{index}_output')
+        run['context'][output_var] = output
+        run['state'][index] = 'done'
+        run['timing'][index][1] = time.monotonic()
+        
+        step_cost = run['cost'][index]
+        execution['total_cost'] += step_cost
+        agents = run['agents'][index]
+        execution['step_results'].append({
+            'step': step['name'],
+            'agent_id': agents if step.get('map_over') else agents[0],
+            'output': output,
+            'cost': step_cost,
+            'duration': round(run['timing'][index][1] - run['timing'][index][0], 3)
+        })
+        
+        add_event(f"Step {step['name']} completed (${step_cost:.4f})", type='success')
+    
+    def _critical_path(self, run):
+        """Longest chain of dependent step durations for an execution"""
+        steps = run['workflow']['steps']
+        finish = []
+        previous = []
+        for i in range(len(steps)):
+            start, end = run['timing'].get(i, [0, 0])
+            duration = (end - start) if end else 0.0
+            best = max(run['deps'][i], key=lambda d: finish[d], default=None)
+            finish.append(duration + (finish[best] if best is not None else 0.0))
+            previous.append(best)
+        if not finish:
+            return {'seconds': 0.0, 'steps': []}
+        
+        node = max(range(len(finish)), key=lambda i: finish[i])
+        seconds = finish[node]
+        path = []
+        while node is not None:
+            if run['state'][node] == 'done':
+                path.append(steps[node]['name'])
+            node = previous[node]
+        return {'seconds': round(seconds, 3), 'steps': list(reversed(path))}
+    
+    def _complete(self, run):
+        """Mark a workflow execution as completed"""
+        execution = run['execution']
+        workflow = run['workflow']
+        try:
             execution['status'] = 'completed'
             execution['completed_at'] = datetime.now().isoformat()
-            execution['outputs'] = {k: v for k, v in context.items() 
+            execution['outputs'] = {k: v for k, v in run['context'].items() 
                                    if k not in execution['inputs']}
+            execution['critical_path'] = self._critical_path(run)
+            execution['wall_seconds'] = round(time.monotonic() - run['started'], 3)
+            execution['serial_seconds'] = round(sum(r.get('duration', 0) for r in execution['step_results']), 3)
             
             # Update workflow usage count
             workflow['usage_count'] = workflow.get('usage_count', 0) + 1
@@ -1229,15 +1865,46 @@ class WorkflowEngine:
                 json.dump(workflow, f, indent=2)
             
             add_event(f"Workflow {execution['id'][:8]} completed (${execution['total_cost']:.4f})", type='success')
-            
         except Exception as e:
             execution['status'] = 'failed'
             execution['error'] = str(e)
             add_event(f"Workflow error: {e}", type='error')
         
-        finally:
-            if callback:
-                callback(execution)
+        if run['callback']:
+            run['callback'](execution)
+    
+    def _fail(self, run, error, prefix=''):
+        """Mark a workflow execution as failed"""
+        execution = run['execution']
+        add_event(f"{prefix}{error}", type='error')
+        execution['status'] = 'failed'
+        execution['error'] = error
+        if run['callback']:
+            run['callback'](execution)
+    
+    def _schedule_timeout(self, delay, fn):
+        """Call fn after delay seconds from the shared timeout thread"""
+        with self._timeout_cond:
+            heapq.heappush(self._timeouts, (time.time() + delay, next(self._timeout_seq), fn))
+            if self._timeout_thread is None:
+                self._timeout_thread = threading.Thread(
+                    target=self._timeout_loop, name='workflow-timeouts', daemon=True
+                )
+                self._timeout_thread.start()
+            self._timeout_cond.notify()
+    
+    def _timeout_loop(self):
+        """Fire step timeouts as their deadlines pass"""
+        while True:
+            with self._timeout_cond:
+                while not self._timeouts or self._timeouts[0][0] > time.time():
+                    wait = self._timeouts[0][0] - time.time() if self._timeouts else None
+                    self._timeout_cond.wait(wait)
+                _, _, fn = heapq.heappop(self._timeouts)
+            try:
+                fn()
+            except Exception as e:
+                add_event(f"Workflow timeout handler error: {e}", type='error')
     
     def _evaluate_condition(self, condition, context):
         """Evaluate a simple condition against context"""
@@ -1465,27 +2132,70 @@ def add_event(message, agent=None, model=None, type='info'):
     EVENTS_LOG.append(event)
     if len(EVENTS_LOG) > 100:
         EVENTS_LOG.pop(0)
+    bump_dashboard('events')
+
+def get_rate_limiter(service):
+    """Limiter for a RATE_LIMITS key (rebuilt if its limit or window changes)"""
+    config = RATE_LIMITS.get(service)
+    if not config:
+        return None
+    with _rate_limiters_lock:
+        limiter = RATE_LIMITERS.get(service)
+        if limiter is None or limiter.limit != config['limit'] or limiter.window != config['window']:
+            # Shared budgets are named by provider so the orchestrator draws from the same one
+            shared_names = {key: provider for provider, key in PROVIDER_RATE_LIMIT_KEYS.items()}
+            limiter = create_limiter(
+                shared_names.get(service, service),
+                config['limit'],
+                config['window'],
+                algorithm=RATE_LIMIT_CONFIG['algorithm'],
+                shared_dir=RATE_LIMIT_CONFIG['shared_dir']
+            )
+            RATE_LIMITERS[service] = limiter
+        return limiter
 
 def check_rate_limit(service):
     """Check if service is rate limited"""
-    limit = RATE_LIMITS.get(service, {})
-    if not limit:
+    limiter = get_rate_limiter(service)
+    if not limiter:
         return False, 0
     
-    # Reset if window passed
-    if time.time() - limit['last_reset'] > limit['window']:
-        limit['requests'] = 0
-        limit['last_reset'] = time.time()
-    
-    remaining = limit['limit'] - limit['requests']
+    remaining = limiter.remaining()
+    RATE_LIMITS[service]['requests'] = limiter.used()
     is_limited = remaining <= 0
     
     return is_limited, remaining
 
+def acquire_service(service, timeout=0):
+    """Take one request from a service's budget, waiting up to timeout seconds"""
+    limiter = get_rate_limiter(service)
+    if not limiter:
+        return True
+    granted = limiter.acquire(timeout=timeout) if timeout else limiter.try_acquire()
+    RATE_LIMITS[service]['requests'] = limiter.used()
+    return granted
+
+def refresh_rate_limits():
+    """Bring RATE_LIMITS request counts up to date with the limiters"""
+    for service in RATE_LIMITS:
+        check_rate_limit(service)
+    return RATE_LIMITS
+
+def get_rate_limit_key(model):
+    """Map a model to the RATE_LIMITS key of its provider"""
+    provider = MODEL_AGENTS.get(model, {}).get('provider', 'kimi-coding').split(':')[0]
+    return PROVIDER_RATE_LIMIT_KEYS.get(provider, provider)
+
+def get_provider_pool_size(service):
+    """Dispatch workers for a provider, sized from its hourly limit"""
+    limit = RATE_LIMITS.get(service, {}).get('limit', 0)
+    per_worker = max(QUEUE_WORKER_CONFIG['requests_per_worker'], 1)
+    workers = -(-limit // per_worker)
+    return max(1, min(workers, QUEUE_WORKER_CONFIG['max_workers_per_provider']))
+
 def use_service(service):
     """Record service usage"""
-    if service in RATE_LIMITS:
-        RATE_LIMITS[service]['requests'] += 1
+    acquire_service(service)
 
 
 def validate_model(model):
@@ -1503,18 +2213,26 @@ def sanitize_task(task, max_len=2000):
 
 def spawn_subagent(task, model, team=None):
     """Spawn a subagent with specific model"""
-    agent_id = f"subagent_{int(time.time())}_{random.randint(1000,9999)}"
+    # Reserve a unique id (and its completion future) up front
+    with _subagent_futures_lock:
+        agent_id = f"subagent_{int(time.time())}_{random.randint(1000,9999)}"
+        while agent_id in ACTIVE_SUBAGENTS or agent_id in SUBAGENT_FUTURES:
+            agent_id = f"subagent_{int(time.time())}_{random.randint(1000,9999)}"
+        SUBAGENT_FUTURES[agent_id] = Future()
     
     # Record metrics for spawn attempt
     metrics.record_agent_spawn(model, team)
     
     # Check rate limit for model provider
     provider = MODEL_AGENTS.get(model, {}).get('provider', 'kimi-coding')
-    is_limited, remaining = check_rate_limit(provider.split(':')[0])
+    rate_key = get_rate_limit_key(model)
     
-    if is_limited:
+    # Check and record usage in one step so concurrent spawns cannot overshoot
+    if not acquire_service(rate_key):
         add_event(f"Rate limited: {provider}. Cannot spawn {model}", type='error')
         metrics.record_agent_fail(model, 'rate_limited')
+        with _subagent_futures_lock:
+            SUBAGENT_FUTURES.pop(agent_id, None)
         return None
     
     # Estimate cost before spawning
@@ -1525,9 +2243,6 @@ def spawn_subagent(task, model, team=None):
     if budget_status == 'critical':
         add_event(f"Budget critical - spawning with caution: {budget_msg}", type='warning')
     
-    # Record usage
-    use_service(provider.split(':')[0])
-    
     # Create subagent record with cost tracking
     ACTIVE_SUBAGENTS[agent_id] = {
         'id': agent_id,
@@ -1547,18 +2262,33 @@ def spawn_subagent(task, model, team=None):
     if model in MODEL_AGENTS:
         MODEL_AGENTS[model]['last_used'] = datetime.now().isoformat()
         MODEL_AGENTS[model]['status'] = 'working'
+    bump_dashboard('subagents', 'models')
     
     add_event(f"Spawned {model} subagent for: {task[:50]}... (est: ${estimated_cost:.4f})", agent=agent_id, model=model, type='success')
     
     # Simulate subagent work (in real impl, this would call sessions_spawn)
     def run_subagent():
+        try:
+            _run_subagent()
+        except Exception as e:
+            ACTIVE_SUBAGENTS[agent_id]['status'] = 'failed'
+            ACTIVE_SUBAGENTS[agent_id]['result'] = str(e)
+            bump_dashboard('subagents')
+            add_event(f"Subagent {agent_id} failed: {e}", agent=agent_id, model=model, type='error')
+            metrics.record_agent_fail(model, 'error')
+        finally:
+            resolve_subagent(agent_id)
+    
+    def _run_subagent():
         time.sleep(2)  # Simulate work
         ACTIVE_SUBAGENTS[agent_id]['status'] = 'running'
         ACTIVE_SUBAGENTS[agent_id]['started'] = datetime.now().isoformat()
+        bump_dashboard('subagents')
         time.sleep(5)  # Simulate processing
         ACTIVE_SUBAGENTS[agent_id]['status'] = 'completed'
         ACTIVE_SUBAGENTS[agent_id]['completed'] = datetime.now().isoformat()
         ACTIVE_SUBAGENTS[agent_id]['result'] = f"Task completed using {model}"
+        bump_dashboard('subagents')
         
         # Record actual cost (simulated)
         actual_cost = cost_tracker.record_usage(
@@ -1572,6 +2302,7 @@ def spawn_subagent(task, model, team=None):
         if model in MODEL_AGENTS:
             MODEL_AGENTS[model]['status'] = 'active'
             MODEL_AGENTS[model]['tasks_completed'] = MODEL_AGENTS[model].get('tasks_completed', 0) + 1
+            bump_dashboard('models')
         
         add_event(f"Subagent {agent_id} completed task (cost: ${actual_cost:.4f})", agent=agent_id, model=model, type='success')
         
@@ -1586,33 +2317,34 @@ def spawn_subagent(task, model, team=None):
     
     return agent_id
 
+def resolve_subagent(agent_id):
+    """Signal everyone waiting on a subagent that it has finished"""
+    with _subagent_futures_lock:
+        future = SUBAGENT_FUTURES.pop(agent_id, None)
+    if future is not None and not future.done():
+        future.set_result(ACTIVE_SUBAGENTS.get(agent_id))
+
+def get_subagent_future(agent_id):
+    """Future resolving to the subagent record once it completes or fails"""
+    with _subagent_futures_lock:
+        future = SUBAGENT_FUTURES.get(agent_id)
+    if future is None:
+        # Already finished (or unknown): hand back a resolved future
+        future = Future()
+        future.set_result(ACTIVE_SUBAGENTS.get(agent_id))
+    return future
+
 def get_system_stats():
-    """Get system stats"""
-    stats = {'temp': 0, 'load': 0, 'mem': 0, 'uptime': '--:--', 'disk_free': '0G', 'processes': 0}
-    try:
-        with open('/sys/class/thermal/thermal_zone0/temp', 'r') as f:
-            stats['temp'] = round(int(f.read()) / 1000.0, 1)
-        with open('/proc/loadavg', 'r') as f:
-            stats['load'] = round(float(f.read().split()[0]), 2)
-        with open('/proc/meminfo', 'r') as f:
-            lines = f.readlines()
-            total = int(lines[0].split()[1])
-            available = int(lines[2].split()[1])
-            stats['mem'] = round(((total - available) / total) * 100, 1)
-        with open('/proc/uptime', 'r') as f:
-            secs = float(f.read().split()[0])
-            h = int(secs // 3600)
-            m = int((secs % 3600) // 60)
-            stats['uptime'] = f"{h}h {m:02d}m"
-        result = subprocess.run(['df', '-h', '/'], capture_output=True, text=True)
-        lines = result.stdout.strip().split('\n')
-        if len(lines) > 1:
-            stats['disk_free'] = lines[1].split()[3]
-        result = subprocess.run(['ps', 'aux'], capture_output=True, text=True)
-        stats['processes'] = len(result.stdout.strip().split('\n')) - 1
-    except:
-        pass
-    return stats
+    """Get system stats from the shared sampler"""
+    sample = get_sampler().latest()
+    return {
+        'temp': sample['temp'],
+        'load': sample['load'],
+        'mem': sample['mem_pct'],
+        'uptime': sample['uptime'],
+        'disk_free': sample['disk_free_h'],
+        'processes': sample['processes']
+    }
 
 # HTML Template with Rate Limit Panel and Team View
 HTML_V4 = '''<!DOCTYPE html>
@@ -2263,61 +2995,123 @@ LOGS_PANEL = '''<div id="logs" class="panel">
     </div>
 </div>'''
 
-class MultiAgentServer(http.server.BaseHTTPRequestHandler):
-    def log_message(self, format, *args):
-        pass
+class DashboardRenderer:
+    """
+    Render the root dashboard from a template compiled once into segments.
     
-    def do_GET(self):
-        if self.path == '/api/pricing/status':
-            sample_quote = cost_tracker.recommend_task_quote('k2p5', estimated_input=1200, estimated_output=600, complexity='medium', segment='mid_market')
-            enterprise_quote = cost_tracker.recommend_task_quote('sonnet', estimated_input=2000, estimated_output=1000, complexity='high', segment='enterprise')
-            smb_quote = cost_tracker.recommend_task_quote('k2p5', estimated_input=1000, estimated_output=400, complexity='low', segment='smb')
-            guardrail = cost_tracker.evaluate_margin_guardrail(sample_quote, delivery_type='task')
-            self.send_json({
-                'success': True,
-                'pricing_policy': {
-                    'complexity_markup': {'low': 3.0, 'medium': 4.0, 'high': 5.0},
-                    'segment_adjustments': {'enterprise': 0.5, 'mid_market': 0.0, 'smb': -0.5, 'startup': -1.0},
-                    'minimum_price': 0.50,
-                    'margin_thresholds': {'task': 55.0, 'subscription': 50.0, 'enterprise': 45.0}
-                },
-                'example_quotes': {
-                    'mid_market': sample_quote,
-                    'enterprise': enterprise_quote,
-                    'smb': smb_quote
-                },
-                'guardrail_check': guardrail
-            })
-
-        elif self.path == '/metrics':
-            # Prometheus metrics endpoint
-            prometheus_data = prometheus_exporter.export_metrics()
-            self.send_response(200)
-            self.send_header('Content-Type', 'text/plain; version=0.0.4')
-            self.end_headers()
-            self.wfile.write(prometheus_data.encode())
-
-        elif self.path == '/api/metrics':
-            # JSON metrics endpoint for dashboard
-            metrics_data = prometheus_exporter.get_metrics_dict()
-            self.send_json(metrics_data)
-
-        elif self.path == '/':
-            stats = get_system_stats()
-            
-            # Build rate limits HTML
-            rates_html = ''
-            for service, data in RATE_LIMITS.items():
-                is_limited, remaining = check_rate_limit(service)
-                used = data['requests']
-                limit = data['limit']
-                percent = (used / limit) * 100
-                
-                status_class = 'safe' if percent < 50 else 'warning' if percent < 80 else 'limited'
-                status_text = 'OK' if percent < 50 else 'WARN' if percent < 80 else 'LIMIT'
-                fill_class = 'fill-safe' if percent < 50 else 'fill-warn' if percent < 80 else 'fill-limit'
-                
-                rates_html += f'''
+    Each panel fragment is cached under a key (its DASHBOARD_VERSIONS
+    counter, or the live values it shows) and the whole page, its ETag and
+    its gzip encoding are reused until one of those keys changes.
+    """
+    
+    PLACEHOLDER = re.compile(r'\{\{([A-Z_]+)\}\}')
+    
+    def __init__(self, template=None, content=None):
+        template = template if template is not None else HTML_V4
+        content = content if content is not None else (
+            RATES_PANEL + TEAMS_PANEL + MODELS_PANEL + SPAWN_PANEL + SUBAGENTS_PANEL + LOGS_PANEL
+        )
+        self._segments = self._compile(template.replace('{{CONTENT}}', content))
+        self._fragments = {}   # name -> (key, html)
+        self._page = None      # {'key', 'body', 'etag', 'gzip'}
+        self._stats = None
+        self._stats_at = 0.0
+        self._lock = threading.Lock()
+        
+        # Metrics
+        self.renders = 0
+        self.cache_hits = 0
+    
+    def _compile(self, template):
+        """Split a template into alternating literals and placeholder names"""
+        segments = []
+        pos = 0
+        for match in self.PLACEHOLDER.finditer(template):
+            segments.append((False, template[pos:match.start()]))
+            segments.append((True, match.group(1)))
+            pos = match.end()
+        segments.append((False, template[pos:]))
+        return segments
+    
+    def _fragment(self, name, key, build):
+        """Cached fragment, rebuilt only when its key changes"""
+        cached = self._fragments.get(name)
+        if cached and cached[0] == key:
+            return cached[1]
+        html = build()
+        self._fragments[name] = (key, html)
+        return html
+    
+    def _system_stats(self):
+        """System stats, refreshed at most every stats_ttl seconds"""
+        now = time.time()
+        if self._stats is None or now - self._stats_at >= DASHBOARD_CONFIG['stats_ttl']:
+            self._stats = get_system_stats()
+            self._stats_at = now
+        return self._stats
+    
+    def render(self):
+        """Current page as {'key', 'body', 'etag', 'gzip'}"""
+        with self._lock:
+            refresh_rate_limits()
+            rate_key = tuple((service, data['requests'], data['limit']) for service, data in RATE_LIMITS.items())
+            temp = self._system_stats()['temp']
+            versions = tuple(sorted(DASHBOARD_VERSIONS.items()))
+            key = (versions, rate_key, temp, len(AGENT_TEAMS), len(MODEL_AGENTS))
+            
+            if self._page and self._page['key'] == key:
+                self.cache_hits += 1
+                return self._page
+            
+            values = {
+                'RATE_LIMITS': self._fragment('rates', rate_key, self._build_rates),
+                'TEAMS': self._fragment('teams', DASHBOARD_VERSIONS['teams'], self._build_teams),
+                'MODELS': self._fragment('models', DASHBOARD_VERSIONS['models'], self._build_models),
+                'SUBAGENTS': self._fragment('subagents', DASHBOARD_VERSIONS['subagents'], self._build_subagents),
+                'ACTIVE_SUBAGENTS': self._fragment('active_count', DASHBOARD_VERSIONS['subagents'], self._count_active),
+                'EVENTS': self._fragment('events', DASHBOARD_VERSIONS['events'], self._build_events),
+                'TEAM_COUNT': str(len(AGENT_TEAMS)),
+                'MODEL_COUNT': str(len(MODEL_AGENTS)),
+                'TEMP': str(temp),
+                'TEMP_COLOR': 'var(--accent-green)' if temp < 70 else 'var(--accent-yellow)' if temp < 80 else 'var(--accent-red)',
+                'MODEL_REQUESTS': str(sum(RATE_LIMITS[k]['requests'] for k in ['kimi', 'anthropic'])),
+                'WEB_REQUESTS': str(RATE_LIMITS['web_search']['requests']),
+                'IMAGE_REQUESTS': str(RATE_LIMITS['image_gen']['requests']),
+                'GITHUB_REQUESTS': str(RATE_LIMITS['github']['requests'])
+            }
+            body = ''.join(
+                values.get(text, '{{' + text + '}}') if is_placeholder else text
+                for is_placeholder, text in self._segments
+            ).encode()
+            
+            self.renders += 1
+            self._page = {
+                'key': key,
+                'body': body,
+                'etag': '"' + hashlib.md5(body).hexdigest()[:16] + '"',
+                'gzip': None
+            }
+            return self._page
+    
+    def gzipped(self, page):
+        """gzip-encoded body for a rendered page (compressed once per page)"""
+        if page['gzip'] is None:
+            page['gzip'] = gzip.compress(page['body'], compresslevel=6)
+        return page['gzip']
+    
+    def _build_rates(self):
+        rates_html = ''
+        for service, data in RATE_LIMITS.items():
+            used = data['requests']
+            limit = data['limit']
+            remaining = max(limit - used, 0)
+            percent = (used / limit) * 100
+            
+            status_class = 'safe' if percent < 50 else 'warning' if percent < 80 else 'limited'
+            status_text = 'OK' if percent < 50 else 'WARN' if percent < 80 else 'LIMIT'
+            fill_class = 'fill-safe' if percent < 50 else 'fill-warn' if percent < 80 else 'fill-limit'
+            
+            rates_html += f'''
                 <div class="rate-item {status_class}">
                     <div class="rate-name">
                         {service.upper()}
@@ -2328,12 +3122,13 @@ class MultiAgentServer(http.server.BaseHTTPRequestHandler):
                         <div class="rate-fill {fill_class}" style="width: {percent}%;"></div>
                     </div>
                 </div>'''
-            
-            # Build teams HTML
-            teams_html = ''
-            for team_id, team in AGENT_TEAMS.items():
-                status_class = team['status']
-                teams_html += f'''
+        return rates_html
+    
+    def _build_teams(self):
+        teams_html = ''
+        for team_id, team in AGENT_TEAMS.items():
+            status_class = team['status']
+            teams_html += f'''
                 <div class="team-card {status_class}">
                     <div class="team-name">{team['name']}</div>
                     <div class="team-models">{', '.join(team['models'])}</div>
@@ -2344,18 +3139,19 @@ class MultiAgentServer(http.server.BaseHTTPRequestHandler):
                     </div>
                     <button class="btn btn-primary" style="margin-top: 15px; width: 100%;" onclick="spawnTeam('{team_id}')">🚀 Deploy Team</button>
                 </div>'''
+        return teams_html
+    
+    def _build_models(self):
+        models_html = ''
+        for model_id, model in MODEL_AGENTS.items():
+            status = model['status']
+            last_used = model.get('last_used', 'Never')
+            if last_used and last_used != 'Never':
+                last_used = last_used.split('T')[1][:5] if 'T' in last_used else last_used[:10]
+            else:
+                last_used = 'Never'
             
-            # Build models HTML
-            models_html = ''
-            for model_id, model in MODEL_AGENTS.items():
-                status = model['status']
-                last_used = model.get('last_used', 'Never')
-                if last_used and last_used != 'Never':
-                    last_used = last_used.split('T')[1][:5] if 'T' in last_used else last_used[:10]
-                else:
-                    last_used = 'Never'
-                
-                models_html += f'''
+            models_html += f'''
                 <div class="model-card {status}" onclick="spawnAgent('{model_id}')" style="cursor: pointer;">
                     <div class="model-name">{model['name']}</div>
                     <div class="model-role">{model['role']}</div>
@@ -2363,13 +3159,16 @@ class MultiAgentServer(http.server.BaseHTTPRequestHandler):
                     <div style="margin-top: 10px; font-size: 10px; color: var(--text-secondary);">Last: {last_used}</div>
                     <div style="font-size: 10px; color: var(--accent-cyan);">Success: {int(model['success_rate']*100)}%</div>
                 </div>'''
-            
-            # Build subagents HTML
-            subagents_html = ''
-            if ACTIVE_SUBAGENTS:
-                for agent_id, agent in sorted(ACTIVE_SUBAGENTS.items(), key=lambda x: x[1]['created'], reverse=True)[:10]:
-                    status = agent['status']
-                    subagents_html += f'''
+        return models_html
+    
+    def _build_subagents(self):
+        if not ACTIVE_SUBAGENTS:
+            return '<div style="text-align: center; padding: 40px; color: var(--text-secondary);">No active subagents. Spawn one from the Models or Spawn tab!</div>'
+        subagents_html = ''
+        recent = heapq.nlargest(10, list(ACTIVE_SUBAGENTS.items()), key=lambda x: x[1]['created'])
+        for agent_id, agent in recent:
+            status = agent['status']
+            subagents_html += f'''
                     <div class="subagent-item {status}">
                         <div class="subagent-info">
                             <div class="subagent-id">{agent_id[:20]}...</div>
@@ -2378,54 +3177,124 @@ class MultiAgentServer(http.server.BaseHTTPRequestHandler):
                         </div>
                         <div class="subagent-status status-{status}">{status.upper()}</div>
                     </div>'''
-            else:
-                subagents_html = '<div style="text-align: center; padding: 40px; color: var(--text-secondary);">No active subagents. Spawn one from the Models or Spawn tab!</div>'
-            
-            # Build events HTML
-            events_html = ''
-            for event in reversed(EVENTS_LOG[-20:]):
-                event_class = f"event-{event.get('type', 'info')}"
-                events_html += f'''
+        return subagents_html
+    
+    def _count_active(self):
+        return str(sum(1 for a in list(ACTIVE_SUBAGENTS.values()) if a['status'] != 'completed'))
+    
+    def _build_events(self):
+        events_html = ''
+        for event in reversed(EVENTS_LOG[-20:]):
+            event_class = f"event-{event.get('type', 'info')}"
+            events_html += f'''
                 <div class="event-line">
                     <span class="event-time">{event['time']}</span>
                     <span class="{event_class}">[{event.get('model', 'SYSTEM')}] {event['message']}</span>
                 </div>'''
+        
+        if not events_html:
+            events_html = '<div class="event-line"><span class="event-time">--:--:--</span><span class="event-info">System initialized. Ready to spawn agents.</span></div>'
+        return events_html
+    
+    def get_stats(self):
+        """Get render cache statistics"""
+        return {
+            'renders': self.renders,
+            'cache_hits': self.cache_hits,
+            'segments': len(self._segments)
+        }
+
+# Initialize dashboard renderer
+dashboard_renderer = DashboardRenderer()
+
+class MultiAgentServer(http.server.BaseHTTPRequestHandler):
+    # HTTP/1.1 enables keep-alive; every response must carry Content-Length
+    protocol_version = 'HTTP/1.1'
+    timeout = HTTP_SERVER_CONFIG['keepalive_timeout']
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_response(self, code, message=None):
+        super().send_response(code, message)
+        # Keep-alive only pays off with the worker pool; when the pool is busy,
+        # hand the worker back instead of idling on the connection
+        is_saturated = getattr(self.server, 'is_saturated', None)
+        if is_saturated is None or is_saturated():
+            self.send_header('Connection', 'close')
+
+    def do_GET(self):
+        if self.path == '/api/pricing/status':
+            sample_quote = cost_tracker.recommend_task_quote('k2p5', estimated_input=1200, estimated_output=600, complexity='medium', segment='mid_market')
+            enterprise_quote = cost_tracker.recommend_task_quote('sonnet', estimated_input=2000, estimated_output=1000, complexity='high', segment='enterprise')
+            smb_quote = cost_tracker.recommend_task_quote('k2p5', estimated_input=1000, estimated_output=400, complexity='low', segment='smb')
+            guardrail = cost_tracker.evaluate_margin_guardrail(sample_quote, delivery_type='task')
+            self.send_json({
+                'success': True,
+                'pricing_policy': {
+                    'complexity_markup': {'low': 3.0, 'medium': 4.0, 'high': 5.0},
+                    'segment_adjustments': {'enterprise': 0.5, 'mid_market': 0.0, 'smb': -0.5, 'startup': -1.0},
+                    'minimum_price': 0.50,
+                    'margin_thresholds': {'task': 55.0, 'subscription': 50.0, 'enterprise': 45.0}
+                },
+                'example_quotes': {
+                    'mid_market': sample_quote,
+                    'enterprise': enterprise_quote,
+                    'smb': smb_quote
+                },
+                'guardrail_check': guardrail
+            })
+
+        elif self.path == '/metrics':
+            # Prometheus metrics endpoint
+            prometheus_data = prometheus_exporter.export_metrics().encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4')
+            self.send_header('Content-Length', str(len(prometheus_data)))
+            self.end_headers()
+            self.wfile.write(prometheus_data)
+
+        elif self.path == '/api/metrics':
+            # JSON metrics endpoint for dashboard
+            metrics_data = prometheus_exporter.get_metrics_dict()
+            self.send_json(metrics_data)
+
+        elif self.path == '/':
+            page = dashboard_renderer.render()
             
-            if not events_html:
-                events_html = '<div class="event-line"><span class="event-time">--:--:--</span><span class="event-info">System initialized. Ready to spawn agents.</span></div>'
-            
-            # Build content
-            content = RATES_PANEL + TEAMS_PANEL + MODELS_PANEL + SPAWN_PANEL + SUBAGENTS_PANEL + LOGS_PANEL
-            content = content.replace('{{RATE_LIMITS}}', rates_html)
-            content = content.replace('{{TEAMS}}', teams_html)
-            content = content.replace('{{MODELS}}', models_html)
-            content = content.replace('{{SUBAGENTS}}', subagents_html)
-            content = content.replace('{{EVENTS}}', events_html)
-            
-            # Calculate totals
-            total_model_requests = sum(RATE_LIMITS[k]['requests'] for k in ['kimi', 'anthropic'])
-            
-            html = HTML_V4
-            html = html.replace('{{CONTENT}}', content)
-            html = html.replace('{{TEAM_COUNT}}', str(len(AGENT_TEAMS)))
-            html = html.replace('{{MODEL_COUNT}}', str(len(MODEL_AGENTS)))
-            html = html.replace('{{ACTIVE_SUBAGENTS}}', str(len([a for a in ACTIVE_SUBAGENTS.values() if a['status'] != 'completed'])))
-            html = html.replace('{{TEMP}}', str(stats['temp']))
-            html = html.replace('{{TEMP_COLOR}}', 'var(--accent-green)' if stats['temp'] < 70 else 'var(--accent-yellow)' if stats['temp'] < 80 else 'var(--accent-red)')
-            html = html.replace('{{MODEL_REQUESTS}}', str(total_model_requests))
-            html = html.replace('{{WEB_REQUESTS}}', str(RATE_LIMITS['web_search']['requests']))
-            html = html.replace('{{IMAGE_REQUESTS}}', str(RATE_LIMITS['image_gen']['requests']))
-            html = html.replace('{{GITHUB_REQUESTS}}', str(RATE_LIMITS['github']['requests']))
+            # Browsers revalidate with the ETag; unchanged pages cost a 304
+            if page['etag'] in self.headers.get('If-None-Match', ''):
+                self.send_response(304)
+                self.send_header('ETag', page['etag'])
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
             
+            body = page['body']
+            use_gzip = 'gzip' in self.headers.get('Accept-Encoding', '') and len(body) >= DASHBOARD_CONFIG['gzip_min_bytes']
+            if use_gzip:
+                body = dashboard_renderer.gzipped(page)
             self.send_response(200)
             self.send_header('Content-type', 'text/html')
+            self.send_header('ETag', page['etag'])
+            self.send_header('Cache-Control', 'no-cache')
+            self.send_header('Vary', 'Accept-Encoding')
+            if use_gzip:
+                self.send_header('Content-Encoding', 'gzip')
+            self.send_header('Content-Length', str(len(body)))
             self.end_headers()
-            self.wfile.write(html.encode())
+            self.wfile.write(body)
             
         else:
             self.send_error(404)
     
     def do_POST(self):
+        route = urlparse(self.path)
+        content_type = self.headers.get('Content-Type', '').split(';')[0].strip().lower()
+        if content_type == 'application/x-ndjson' and route.path in self.NDJSON_ROUTES:
+            self.handle_ndjson_pricing(route.path, parse_qs(route.query))
+            return
+
         content_length = int(self.headers.get('Content-Length', 0))
         body = self.rfile.read(content_length).decode()
         params = parse_qs(body)
@@ -2533,53 +3402,19 @@ class MultiAgentServer(http.server.BaseHTTPRequestHandler):
                 self.send_json({'success': False, 'error': f'Invalid scenarios payload: {e}'})
                 return
 
-            evaluated = []
-            for idx, item in enumerate(scenarios):
-                model = item.get('model', 'k2p5')
-                complexity = item.get('complexity', 'medium')
-                segment = item.get('segment', 'mid_market')
-                try:
-                    estimated_input = int(item.get('estimated_input', 1000))
-                    estimated_output = int(item.get('estimated_output', 500))
-                except (TypeError, ValueError):
-                    self.send_json({'success': False, 'error': f'Invalid token estimates in scenario {idx}'})
-                    return
-
-                if model not in cost_tracker.MODEL_PRICING:
-                    self.send_json({'success': False, 'error': f'Unsupported model in scenario {idx}: {model}'})
-                    return
-                if complexity not in {'low', 'medium', 'high'}:
-                    self.send_json({'success': False, 'error': f'Invalid complexity in scenario {idx}: {complexity}'})
-                    return
-                if segment not in {'enterprise', 'mid_market', 'smb', 'startup'}:
-                    self.send_json({'success': False, 'error': f'Invalid segment in scenario {idx}: {segment}'})
-                    return
-
-                quote = cost_tracker.recommend_task_quote(
-                    model,
-                    estimated_input=estimated_input,
-                    estimated_output=estimated_output,
-                    complexity=complexity,
-                    segment=segment
-                )
-                guardrail = cost_tracker.evaluate_margin_guardrail(quote, delivery_type=delivery_type)
-                evaluated.append({'quote': quote, 'guardrail_check': guardrail})
+            try:
+                rows = [parse_quote_scenario(item, idx) for idx, item in enumerate(scenarios)]
+            except ValueError as e:
+                self.send_json({'success': False, 'error': str(e)})
+                return
 
-            compliant_count = sum(1 for e in evaluated if e['guardrail_check'].get('is_compliant'))
-            avg_margin = round(sum(e['quote'].get('gross_margin_pct', 0.0) for e in evaluated) / len(evaluated), 2)
-            compliance_ratio = round(compliant_count / len(evaluated), 2)
+            # Price every validated scenario in one columnar pass
+            evaluated = cost_tracker.recommend_task_quotes(*map(list, zip(*rows)), delivery_type=delivery_type)
+            ledger = new_quote_ledger()
+            for result in evaluated:
+                ledger.record(result['quote'])
 
-            self.send_json({
-                'success': True,
-                'delivery_type': delivery_type,
-                'scenario_count': len(evaluated),
-                'compliant_count': compliant_count,
-                'compliance_ratio': compliance_ratio,
-                'needs_escalation': compliant_count < len(evaluated),
-                'requires_executive_review': compliance_ratio < 0.67,
-                'average_margin_pct': avg_margin,
-                'results': evaluated
-            })
+            self.send_json({'success': True, **scenario_portfolio_summary(ledger, delivery_type), 'results': evaluated})
 
         elif self.path == '/api/pricing/exception-alert':
             try:
@@ -2681,25 +3516,13 @@ class MultiAgentServer(http.server.BaseHTTPRequestHandler):
                 self.send_json({'success': False, 'error': f'Invalid quotes payload: {e}'})
                 return
 
-            total = len(quotes)
-            approved = sum(1 for q in quotes if q.get('decision_status') == 'approved')
-            escalated = total - approved
-            avg_margin = round(sum(q.get('gross_margin_pct', 0.0) for q in quotes) / max(total, 1), 2) if total else 0.0
-            exceptions_created = sum(1 for q in quotes if q.get('exception_created'))
-            exceptions_closed = sum(1 for q in quotes if q.get('exception_closed'))
+            try:
+                ledger = QuoteLedger.from_quotes(quotes)
+            except (AttributeError, ValueError) as e:
+                self.send_json({'success': False, 'error': f'Invalid quotes payload: {e}'})
+                return
 
-            self.send_json({
-                'success': True,
-                'weekly_metrics': {
-                    'total_quotes': total,
-                    'approved_count': approved,
-                    'escalated_count': escalated,
-                    'approval_rate': round(approved / max(total, 1), 2),
-                    'avg_margin_pct': avg_margin,
-                    'exceptions_created': exceptions_created,
-                    'exceptions_closed': exceptions_closed
-                }
-            })
+            self.send_json({'success': True, 'weekly_metrics': weekly_metrics_summary(ledger.totals())})
 
         elif self.path == '/api/pricing/weekly-comparison':
             try:
@@ -2753,23 +3576,27 @@ class MultiAgentServer(http.server.BaseHTTPRequestHandler):
                 self.send_json({'success': False, 'error': f'Invalid quotes payload: {e}'})
                 return
 
-            control = [q for q in quotes if q.get('variant') == 'control']
-            test = [q for q in quotes if q.get('variant') == 'test']
+            ledger = new_quote_ledger()
+            try:
+                for q in quotes:
+                    if q.get('variant') in ('control', 'test'):
+                        ledger.record(q, variant=q['variant'])
+            except (AttributeError, ValueError) as e:
+                self.send_json({'success': False, 'error': f'Invalid quotes payload: {e}'})
+                return
+            variants = ledger.variant_totals()
 
-            def summarize_variant(variant_quotes):
-                if not variant_quotes:
+            def summarize_variant(totals):
+                if totals is None:
                     return {'count': 0, 'approval_rate': 0.0, 'avg_margin_pct': 0.0}
-                total = len(variant_quotes)
-                approved = sum(1 for q in variant_quotes if q.get('decision_status') == 'approved')
-                avg_margin = sum(q.get('gross_margin_pct', 0.0) for q in variant_quotes) / total
                 return {
-                    'count': total,
-                    'approval_rate': round(approved / total, 2),
-                    'avg_margin_pct': round(avg_margin, 2)
+                    'count': totals.count,
+                    'approval_rate': totals.approval_rate(),
+                    'avg_margin_pct': totals.avg_margin()
                 }
 
-            control_summary = summarize_variant(control)
-            test_summary = summarize_variant(test)
+            control_summary = summarize_variant(variants.get('control'))
+            test_summary = summarize_variant(variants.get('test'))
 
             recommendation = 'inconclusive'
             if control_summary['count'] > 0 and test_summary['count'] > 0:
@@ -2825,62 +3652,15 @@ class MultiAgentServer(http.server.BaseHTTPRequestHandler):
 
         elif self.path == '/api/pricing/batch-quotes':
             # Generate quotes for multiple segments at once
-            model = params.get('model', ['k2p5'])[0]
-            complexity = params.get('complexity', ['medium'])[0]
             delivery_type = params.get('delivery_type', ['task'])[0]
-
             try:
-                estimated_input = int(params.get('estimated_input', ['1000'])[0])
-                estimated_output = int(params.get('estimated_output', ['500'])[0])
-            except ValueError:
-                self.send_json({'success': False, 'error': 'estimated_input and estimated_output must be integers'})
+                request = parse_batch_quote_request({k: v[0] for k, v in params.items()})
+            except ValueError as e:
+                self.send_json({'success': False, 'error': str(e)})
                 return
 
-            if model not in cost_tracker.MODEL_PRICING:
-                self.send_json({'success': False, 'error': f'Unsupported model: {model}'})
-                return
-            if complexity not in {'low', 'medium', 'high'}:
-                self.send_json({'success': False, 'error': 'complexity must be low|medium|high'})
-                return
-
-            segments = ['enterprise', 'mid_market', 'smb', 'startup']
-            quotes_by_segment = {}
-
-            for seg in segments:
-                quote = cost_tracker.recommend_task_quote(
-                    model,
-                    estimated_input=estimated_input,
-                    estimated_output=estimated_output,
-                    complexity=complexity,
-                    segment=seg
-                )
-                guardrail = cost_tracker.evaluate_margin_guardrail(quote, delivery_type=delivery_type)
-                quotes_by_segment[seg] = {
-                    'quote': quote,
-                    'guardrail_check': guardrail
-                }
-
-            # Find best value and highest margin options
-            best_value = min(quotes_by_segment.items(), key=lambda x: x[1]['quote']['recommended_price'])
-            highest_margin = max(quotes_by_segment.items(), key=lambda x: x[1]['quote']['gross_margin_pct'])
-
-            self.send_json({
-                'success': True,
-                'input_params': {
-                    'model': model,
-                    'complexity': complexity,
-                    'estimated_input': estimated_input,
-                    'estimated_output': estimated_output,
-                    'delivery_type': delivery_type
-                },
-                'quotes_by_segment': quotes_by_segment,
-                'comparison': {
-                    'best_value_segment': best_value[0],
-                    'best_value_price': best_value[1]['quote']['recommended_price'],
-                    'highest_margin_segment': highest_margin[0],
-                    'highest_margin_pct': highest_margin[1]['quote']['gross_margin_pct']
-                }
-            })
+            result = cost_tracker.recommend_segment_quotes([request], delivery_type=delivery_type)[0]
+            self.send_json({'success': True, **result})
 
         elif self.path == '/api/spawn':
             model = params.get('model', ['k2p5'])[0]
@@ -2923,6 +3703,7 @@ class MultiAgentServer(http.server.BaseHTTPRequestHandler):
                 
                 if agent_id:
                     team['tasks_completed'] += 1
+                    bump_dashboard('teams')
                     self.send_json({'success': True, 'agent_id': agent_id, 'team': team_id})
                 else:
                     self.send_json({'success': False, 'error': 'Rate limited'})
@@ -2998,8 +3779,7 @@ class MultiAgentServer(http.server.BaseHTTPRequestHandler):
             })
 
         elif self.path == '/api/pricing/webhook':
-            content_length = int(self.headers.get('Content-Length', 0))
-            body = self.rfile.read(content_length).decode()
+            # Body was already consumed above; re-reading would stall keep-alive connections
             try:
                 data = json.loads(body)
                 url = data.get('url')
@@ -3047,10 +3827,236 @@ class MultiAgentServer(http.server.BaseHTTPRequestHandler):
             self.send_error(404)
     
     def send_json(self, data):
+        body = json.dumps(data).encode()
         self.send_response(200)
         self.send_header('Content-type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
         self.end_headers()
-        self.wfile.write(json.dumps(data).encode())
+        self.wfile.write(body)
+
+    # ------------------------------------------------------------------
+    # Streaming NDJSON pricing
+    #
+    # POST one JSON object per line with Content-Type: application/x-ndjson
+    # (Content-Length or chunked). Rows are priced in batches as they arrive
+    # and each batch is flushed as a chunk of NDJSON result lines; the last
+    # line is a summary. Invalid rows get an error line and do not stop the
+    # stream. Request-wide options (delivery_type, defaults) go in the query.
+    # ------------------------------------------------------------------
+
+    NDJSON_ROUTES = {
+        '/api/pricing/scenario': '_stream_scenarios',
+        '/api/pricing/batch-quotes': '_stream_batch_quotes',
+        '/api/pricing/weekly-metrics': '_stream_weekly_metrics'
+    }
+
+    def handle_ndjson_pricing(self, path, query):
+        """Price an NDJSON request body incrementally, answering with chunked NDJSON"""
+        stream = getattr(self, self.NDJSON_ROUTES[path])
+        options = {k: v[0] for k, v in query.items()}
+
+        self.send_response(200)
+        self.send_header('Content-type', 'application/x-ndjson')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        try:
+            try:
+                for lines in stream(self._iter_ndjson_batches(), options):
+                    if lines:
+                        self._write_chunk(b''.join(iter_ndjson(lines)))
+            except BodyFramingError as e:
+                # Malformed framing: the rest of the body cannot be trusted
+                self.close_connection = True
+                self._write_chunk(b''.join(iter_ndjson([{'success': False, 'error': str(e)}])))
+            self._write_chunk(b'')
+        except OSError:
+            # Client went away mid-stream
+            self.close_connection = True
+
+    def _write_chunk(self, data):
+        """Write one HTTP/1.1 chunk (empty data ends the body)"""
+        self.wfile.write(b'%x\r\n%s\r\n' % (len(data), data))
+        self.wfile.flush()
+
+    def _iter_body_blocks(self):
+        """Yield the request body as it arrives, de-chunking Transfer-Encoding: chunked"""
+        read_size = NDJSON_CONFIG['read_size']
+        if 'chunked' in self.headers.get('Transfer-Encoding', '').lower():
+            while True:
+                size_line = self.rfile.readline(1024)
+                try:
+                    size = int(size_line.split(b';')[0].strip(), 16)
+                except ValueError:
+                    raise BodyFramingError('Malformed chunked request body')
+                if size == 0:
+                    # Skip trailers
+                    while self.rfile.readline(1024) not in (b'\r\n', b'\n', b''):
+                        pass
+                    return
+                while size > 0:
+                    block = self.rfile.read1(min(size, read_size))
+                    if not block:
+                        raise BodyFramingError('Request body ended mid-chunk')
+                    size -= len(block)
+                    yield block
+                self.rfile.readline(1024)
+        else:
+            try:
+                remaining = int(self.headers.get('Content-Length', 0))
+            except ValueError:
+                raise BodyFramingError('Invalid Content-Length')
+            while remaining > 0:
+                block = self.rfile.read1(min(remaining, read_size))
+                if not block:
+                    raise BodyFramingError('Request body ended early')
+                remaining -= len(block)
+                yield block
+
+    def _iter_ndjson_batches(self):
+        """
+        Yield lists of (index, item, error) for the NDJSON lines received so far.
+
+        A batch closes when a read completes or batch_rows lines are buffered,
+        so slow senders see results for the rows they have already sent.
+        """
+        batch_rows = max(NDJSON_CONFIG['batch_rows'], 1)
+        max_line = NDJSON_CONFIG['max_line_bytes']
+        pending = b''
+        index = 0
+
+        def parse(lines):
+            nonlocal index
+            batch = []
+            for line in lines:
+                if not line.strip():
+                    continue
+                try:
+                    batch.append((index, json.loads(line), None))
+                except ValueError as e:
+                    batch.append((index, None, f'Invalid JSON on line {index}: {e}'))
+                index += 1
+            return batch
+
+        for block in self._iter_body_blocks():
+            lines = (pending + block).split(b'\n')
+            pending = lines.pop()
+            if len(pending) > max_line or any(len(line) > max_line for line in lines):
+                raise BodyFramingError(f'NDJSON line exceeds {max_line} bytes')
+            for start in range(0, len(lines), batch_rows):
+                batch = parse(lines[start:start + batch_rows])
+                if batch:
+                    yield batch
+        batch = parse([pending])
+        if batch:
+            yield batch
+
+    @staticmethod
+    def _price_rows(price, rows):
+        """
+        Price rows with one batch call; if it fails, price them one at a time so only
+        the failing rows are lost. Returns one result or exception per row.
+        """
+        if not rows:
+            return []
+        try:
+            return price(rows)
+        except (ArithmeticError, TypeError, ValueError):
+            results = []
+            for row in rows:
+                try:
+                    results.extend(price([row]))
+                except (ArithmeticError, TypeError, ValueError) as e:
+                    results.append(e)
+            return results
+
+    def _stream_scenarios(self, batches, options):
+        """Rows: scenario objects. Emits {index, quote, guardrail_check} per row, then the portfolio summary"""
+        delivery_type = options.get('delivery_type', 'task')
+        ledger = new_quote_ledger()
+        rejected = 0
+        for batch in batches:
+            out, valid, positions = [], [], []
+            for idx, item, error in batch:
+                if error is None:
+                    try:
+                        valid.append(parse_quote_scenario(item, idx))
+                        positions.append(len(out))
+                        out.append(None)
+                        continue
+                    except (TypeError, ValueError) as e:
+                        error = str(e)
+                rejected += 1
+                out.append({'index': idx, 'success': False, 'error': error})
+            if valid:
+                priced = self._price_rows(
+                    lambda rows: cost_tracker.recommend_task_quotes(*map(list, zip(*rows)), delivery_type=delivery_type),
+                    valid
+                )
+                for pos, result in zip(positions, priced):
+                    idx = batch[pos][0]
+                    if isinstance(result, Exception):
+                        rejected += 1
+                        out[pos] = {'index': idx, 'success': False, 'error': f'Pricing failed for scenario {idx}: {result}'}
+                        continue
+                    ledger.record(result['quote'])
+                    out[pos] = {'index': idx, **result}
+            yield out
+        yield [{'success': True, 'summary': {**scenario_portfolio_summary(ledger, delivery_type), 'rejected_count': rejected}}]
+
+    def _stream_batch_quotes(self, batches, options):
+        """Rows: {model, complexity, estimated_input, estimated_output} (defaults from the query). Emits per-segment quotes per row"""
+        delivery_type = options.get('delivery_type', 'task')
+        quoted = rejected = 0
+        for batch in batches:
+            out, valid, positions = [], [], []
+            for idx, item, error in batch:
+                if error is None:
+                    if isinstance(item, dict):
+                        try:
+                            valid.append(parse_batch_quote_request({**options, **item}))
+                            positions.append(len(out))
+                            out.append(None)
+                            continue
+                        except (TypeError, ValueError) as e:
+                            error = str(e)
+                    else:
+                        error = f'Invalid request on line {idx}: expected a JSON object'
+                rejected += 1
+                out.append({'index': idx, 'success': False, 'error': error})
+            priced = self._price_rows(
+                lambda rows: cost_tracker.recommend_segment_quotes(rows, delivery_type=delivery_type),
+                valid
+            )
+            for pos, result in zip(positions, priced):
+                idx = batch[pos][0]
+                if isinstance(result, Exception):
+                    rejected += 1
+                    out[pos] = {'index': idx, 'success': False, 'error': f'Pricing failed on line {idx}: {result}'}
+                    continue
+                quoted += 1
+                out[pos] = {'index': idx, 'success': True, **result}
+            yield out
+        yield [{'success': True, 'summary': {'request_count': quoted, 'rejected_count': rejected}}]
+
+    def _stream_weekly_metrics(self, batches, options):
+        """Rows: quote records. Emits only error lines while reading, then the weekly metrics"""
+        ledger = new_quote_ledger()
+        rejected = 0
+        for batch in batches:
+            out = []
+            for idx, item, error in batch:
+                if error is None:
+                    try:
+                        if not isinstance(item, dict):
+                            raise ValueError('expected a JSON object')
+                        ledger.record(item)
+                        continue
+                    except (TypeError, ValueError) as e:
+                        error = f'Invalid quote on line {idx}: {e}'
+                rejected += 1
+                out.append({'index': idx, 'success': False, 'error': error})
+            yield out
+        yield [{'success': True, 'weekly_metrics': weekly_metrics_summary(ledger.totals()), 'rejected_count': rejected}]
 
     def do_PUT(self):
         """Handle PUT requests for webhooks"""
@@ -3078,10 +4084,21 @@ class MultiAgentServer(http.server.BaseHTTPRequestHandler):
             except json.JSONDecodeError:
                 self.send_json({'success': False, 'error': 'Invalid JSON'})
         else:
+            self._discard_body()
             self.send_error(404)
     
+    def _discard_body(self):
+        """Read and drop a request body the route ignores, so keep-alive does not parse it as the next request"""
+        try:
+            for _ in self._iter_body_blocks():
+                pass
+        except BodyFramingError:
+            # Unreadable framing: the connection cannot be reused
+            self.close_connection = True
+
     def do_DELETE(self):
         """Handle DELETE requests"""
+        self._discard_body()
         if self.path.startswith('/api/webhooks/'):
             webhook_id = self.path.split('/')[-1]
             notification_mgr.unregister_webhook(webhook_id)
@@ -3097,13 +4114,125 @@ class MultiAgentServer(http.server.BaseHTTPRequestHandler):
         else:
             self.send_error(404)
 
+class PooledHTTPServer(http.server.HTTPServer):
+    """
+    HTTP server that dispatches connections to a bounded worker pool.
+
+    Slow handlers (dashboard renders, batch quotes) no longer block other
+    clients. At most `workers` connections are served concurrently and up to
+    `queue_limit` more wait for a free worker; anything beyond that is
+    rejected immediately with 503 so latency stays bounded under overload.
+    """
+
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self, server_address, handler_class, workers=32, queue_limit=64):
+        super().__init__(server_address, handler_class)
+        self.workers = max(int(workers), 1)
+        self.queue_limit = max(int(queue_limit), 0)
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='j1msky-http')
+        self._slots = threading.BoundedSemaphore(self.workers + self.queue_limit)
+        self._stats_lock = threading.Lock()
+        self._in_flight = 0
+        self.total_accepted = 0
+        self.total_rejected = 0
+
+    def is_saturated(self):
+        """True when every worker is busy and new connections are queueing"""
+        return self._in_flight >= self.workers
+
+    def process_request(self, request, client_address):
+        """Queue the connection for a worker, or shed it if the queue is full"""
+        if not self._slots.acquire(blocking=False):
+            with self._stats_lock:
+                self.total_rejected += 1
+            self._reject(request)
+            return
+        with self._stats_lock:
+            self._in_flight += 1
+            self.total_accepted += 1
+        self._executor.submit(self._process_request_worker, request, client_address)
+
+    def _process_request_worker(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+            with self._stats_lock:
+                self._in_flight -= 1
+            self._slots.release()
+
+    def _reject(self, request):
+        try:
+            request.sendall(
+                b'HTTP/1.1 503 Service Unavailable\r\n'
+                b'Retry-After: 1\r\n'
+                b'Content-Length: 0\r\n'
+                b'Connection: close\r\n\r\n'
+            )
+        except OSError:
+            pass
+        self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self._executor.shutdown(wait=False)
+
+    def get_stats(self):
+        """Get worker pool statistics"""
+        with self._stats_lock:
+            in_flight = self._in_flight
+        return {
+            'mode': 'threaded',
+            'workers': self.workers,
+            'queue_limit': self.queue_limit,
+            'in_flight': in_flight,
+            'busy_workers': min(in_flight, self.workers),
+            'queued': max(in_flight - self.workers, 0),
+            'total_accepted': self.total_accepted,
+            'total_rejected': self.total_rejected
+        }
+
+
+# Active HTTP server (set by run)
+http_server = None
+
+
+def create_server(config=None):
+    """Build the HTTP server for the configured serving mode"""
+    config = {**HTTP_SERVER_CONFIG, **(config or {})}
+    address = ("", config['port'])
+    if config['mode'] == 'single':
+        socketserver.TCPServer.allow_reuse_address = True
+        return socketserver.TCPServer(address, MultiAgentServer)
+    return PooledHTTPServer(
+        address,
+        MultiAgentServer,
+        workers=config['workers'],
+        queue_limit=config['queue_limit']
+    )
+
+
 def run():
-    socketserver.TCPServer.allow_reuse_address = True
-    with socketserver.TCPServer(("", 8080), MultiAgentServer) as httpd:
+    global http_server
+    # SIGTERM exits through atexit so pending write-behind data is flushed
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    with create_server() as httpd:
+        http_server = httpd
         print("◈ J1MSKY AGENT TEAMS v4.0 Started ◈")
         print("Multi-model subagent system with rate limit protection")
-        print("Access: http://localhost:8080")
-        httpd.serve_forever()
+        if isinstance(httpd, PooledHTTPServer):
+            print(f"Serving: threaded ({httpd.workers} workers, queue limit {httpd.queue_limit})")
+        else:
+            print("Serving: single-threaded")
+        print(f"Access: http://localhost:{HTTP_SERVER_CONFIG['port']}")
+        try:
+            httpd.serve_forever()
+        finally:
+            flush_all()
 
 if __name__ == '__main__':
     add_event("Agent Teams v4.0 initialized", type='success')
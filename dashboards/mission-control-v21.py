@@ -15,6 +15,9 @@ import subprocess
 from datetime import datetime
 from urllib.parse import parse_qs, urlparse
 
+sys.path.insert(0, '/home/m1ndb0t/Desktop/J1MSKY/j1msky-framework')
+from runtime.sysstats import get_sampler
+
 # Enhanced HTML with better styling
 HTML_V21 = '''<!DOCTYPE html>
 <html lang="en">
@@ -788,12 +791,8 @@ class MissionControlV21(http.server.BaseHTTPRequestHandler):
         pass
     
     def get_stats(self):
-        try:
-            with open('/sys/class/thermal/thermal_zone0/temp', 'r') as f:
-                temp = round(int(f.read()) / 1000.0, 1)
-            return {'temp': temp, 'revenue': '230-1050'}
-        except:
-            return {'temp': 66.0, 'revenue': '230-1050'}
+        temp = get_sampler().latest()['temp']
+        return {'temp': temp or 66.0, 'revenue': '230-1050'}
     
     def do_GET(self):
         if self.path == '/':
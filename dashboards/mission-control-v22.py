@@ -8,12 +8,16 @@ import http.server
 import socketserver
 import json
 import os
+import sys
 import subprocess
 import threading
 import time
 from datetime import datetime
 from urllib.parse import parse_qs, urlparse
 
+sys.path.insert(0, '/home/m1ndb0t/Desktop/J1MSKY/j1msky-framework')
+from runtime.sysstats import get_sampler
+
 # Read gateway log if available
 def read_gateway_log(lines=50):
     """Read OpenClaw gateway logs"""
@@ -45,49 +49,16 @@ def get_gateway_status():
     return False, None
 
 def get_system_stats():
-    """Get comprehensive system stats"""
-    stats = {
-        'temp': 0, 'load': 0, 'mem': 0, 'uptime': '--:--',
-        'disk_free': '0G', 'processes': 0
+    """Get comprehensive system stats from the shared sampler"""
+    sample = get_sampler().latest()
+    return {
+        'temp': sample['temp'],
+        'load': sample['load'],
+        'mem': sample['mem_pct'],
+        'uptime': sample['uptime'],
+        'disk_free': sample['disk_free_h'],
+        'processes': sample['processes']
     }
-    
-    try:
-        # Temperature
-        with open('/sys/class/thermal/thermal_zone0/temp', 'r') as f:
-            stats['temp'] = round(int(f.read()) / 1000.0, 1)
-        
-        # Load
-        with open('/proc/loadavg', 'r') as f:
-            stats['load'] = round(float(f.read().split()[0]), 2)
-        
-        # Memory
-        with open('/proc/meminfo', 'r') as f:
-            lines = f.readlines()
-            total = int(lines[0].split()[1])
-            available = int(lines[2].split()[1])
-            stats['mem'] = round(((total - available) / total) * 100, 1)
-        
-        # Uptime
-        with open('/proc/uptime', 'r') as f:
-            secs = float(f.read().split()[0])
-            h = int(secs // 3600)
-            m = int((secs % 3600) // 60)
-            stats['uptime'] = f"{h}h {m:02d}m"
-        
-        # Disk free
-        result = subprocess.run(['df', '-h', '/'], capture_output=True, text=True)
-        lines = result.stdout.strip().split('\n')
-        if len(lines) > 1:
-            stats['disk_free'] = lines[1].split()[3]
-        
-        # Process count
-        result = subprocess.run(['ps', 'aux'], capture_output=True, text=True)
-        stats['processes'] = len(result.stdout.strip().split('\n')) - 1
-        
-    except:
-        pass
-    
-    return stats
 
 # Enhanced HTML Template with Animations & Performance Optimizations
 HTML_TEMPLATE = '''<!DOCTYPE html>
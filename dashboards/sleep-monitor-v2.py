@@ -16,6 +16,9 @@ from datetime import datetime
 from pathlib import Path
 from urllib.parse import parse_qs, urlparse
 
+sys.path.insert(0, '/home/m1ndb0t/Desktop/J1MSKY/j1msky-framework')
+from runtime.sysstats import get_sampler
+
 # Mission database
 MISSIONS_DB = "/tmp/j1msky_missions.json"
 JOBS_QUEUE = "/tmp/j1msky_jobs.json"
@@ -1104,30 +1107,14 @@ class MissionHandler(http.server.BaseHTTPRequestHandler):
     
     def get_system_stats(self):
         """Get current system stats"""
-        stats = {'temp': 0, 'load': 0, 'mem': 0, 'uptime': '--:--', 'disk_free': '0G'}
-        try:
-            with open('/sys/class/thermal/thermal_zone0/temp', 'r') as f:
-                stats['temp'] = round(int(f.read()) / 1000.0, 1)
-            with open('/proc/loadavg', 'r') as f:
-                stats['load'] = round(float(f.read().split()[0]) * 25, 1)
-            with open('/proc/meminfo', 'r') as f:
-                lines = f.readlines()
-                total = int(lines[0].split()[1])
-                available = int(lines[2].split()[1])
-                stats['mem'] = round(((total - available) / total) * 100, 1)
-            with open('/proc/uptime', 'r') as f:
-                secs = float(f.read().split()[0])
-                h = int(secs // 3600)
-                m = int((secs % 3600) // 60)
-                stats['uptime'] = f"{h}h {m:02d}m"
-            # Disk free
-            result = subprocess.run(['df', '-h', '/'], capture_output=True, text=True)
-            lines = result.stdout.strip().split('\n')
-            if len(lines) > 1:
-                stats['disk_free'] = lines[1].split()[3]
-        except:
-            pass
-        return stats
+        sample = get_sampler().latest()
+        return {
+            'temp': sample['temp'],
+            'load': sample['load_pct'],
+            'mem': sample['mem_pct'],
+            'uptime': sample['uptime'],
+            'disk_free': sample['disk_free_h']
+        }
     
     def get_audio_status(self):
         try:
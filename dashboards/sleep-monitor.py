@@ -14,6 +14,9 @@ import threading
 from datetime import datetime
 from pathlib import Path
 
+sys.path.insert(0, '/home/m1ndb0t/Desktop/J1MSKY/j1msky-framework')
+from runtime.sysstats import get_sampler
+
 # HTML Template
 HTML_TEMPLATE = '''<!DOCTYPE html>
 <html>
@@ -234,23 +237,11 @@ class SleepMonitor:
         
     def get_system_stats(self):
         """Get current system stats"""
-        try:
-            with open('/sys/class/thermal/thermal_zone0/temp', 'r') as f:
-                self.stats['temp'] = int(f.read()) / 1000.0
-            with open('/proc/loadavg', 'r') as f:
-                self.stats['load'] = round(float(f.read().split()[0]) * 25, 1)
-            with open('/proc/meminfo', 'r') as f:
-                lines = f.readlines()
-                total = int(lines[0].split()[1])
-                available = int(lines[2].split()[1])
-                self.stats['mem'] = round(((total - available) / total) * 100, 1)
-            with open('/proc/uptime', 'r') as f:
-                secs = float(f.read().split()[0])
-                h = int(secs // 3600)
-                m = int((secs % 3600) // 60)
-                self.stats['uptime'] = f"{h}h {m:02d}m"
-        except:
-            pass
+        sample = get_sampler().latest()
+        self.stats['temp'] = sample['temp']
+        self.stats['load'] = sample['load_pct']
+        self.stats['mem'] = sample['mem_pct']
+        self.stats['uptime'] = sample['uptime']
             
     def check_gateway(self):
         """Check OpenClaw gateway"""
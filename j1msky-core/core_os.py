@@ -20,6 +20,9 @@ import urllib.request
 import urllib.parse
 import re
 
+sys.path.insert(0, '/home/m1ndb0t/Desktop/J1MSKY/j1msky-framework')
+from runtime.sysstats import get_sampler
+
 class J1MSKYCoreOS:
     def __init__(self):
         self.root = tk.Tk()
@@ -332,36 +335,14 @@ class J1MSKYCoreOS:
         
     def update_vitals(self):
         """Update system vitals"""
-        try:
-            # CPU Temp
-            with open('/sys/class/thermal/thermal_zone0/temp', 'r') as f:
-                temp = int(f.read().strip()) / 1000.0
-                color = '#00ff00' if temp < 60 else '#ffff00' if temp < 75 else '#ff0000'
-                self.vital_labels["CPU TEMP"].config(text=f"{temp:.1f}°C", fg=color)
-                
-            # CPU Load
-            with open('/proc/loadavg', 'r') as f:
-                load = float(f.read().split()[0])
-                load_pct = min(100, (load / 4) * 100)
-                self.vital_labels["CPU LOAD"].config(text=f"{load_pct:.0f}%")
-                
-            # Memory
-            with open('/proc/meminfo', 'r') as f:
-                lines = f.readlines()
-                total = int(lines[0].split()[1])
-                available = int(lines[2].split()[1])
-                mem_pct = ((total - available) / total) * 100
-                self.vital_labels["MEMORY"].config(text=f"{mem_pct:.0f}%")
-                
-            # Uptime
-            with open('/proc/uptime', 'r') as f:
-                uptime_secs = float(f.read().split()[0])
-                hours = int(uptime_secs // 3600)
-                mins = int((uptime_secs % 3600) // 60)
-                self.vital_labels["UPTIME"].config(text=f"{hours}h {mins}m")
-                
-        except Exception as e:
-            pass
+        sample = get_sampler().latest()
+        temp = sample['temp']
+        color = '#00ff00' if temp < 60 else '#ffff00' if temp < 75 else '#ff0000'
+        self.vital_labels["CPU TEMP"].config(text=f"{temp:.1f}°C", fg=color)
+        self.vital_labels["CPU LOAD"].config(text=f"{sample['load_pct']:.0f}%")
+        self.vital_labels["MEMORY"].config(text=f"{sample['mem_pct']:.0f}%")
+        uptime_secs = sample['uptime_seconds']
+        self.vital_labels["UPTIME"].config(text=f"{int(uptime_secs // 3600)}h {int((uptime_secs % 3600) // 60)}m")
             
     def update_time(self):
         """Update clock"""
@@ -18,6 +18,9 @@ from datetime import datetime
 from pathlib import Path
 from collections import deque
 
+sys.path.insert(0, '/home/m1ndb0t/Desktop/J1MSKY/j1msky-framework')
+from runtime.sysstats import get_sampler
+
 class J1MSKYCoreOSv11:
     def __init__(self):
         self.root = tk.Tk()
@@ -378,39 +381,22 @@ class J1MSKYCoreOSv11:
         
     def update_stats(self):
         """Update system statistics"""
-        try:
-            # CPU Temp
-            with open('/sys/class/thermal/thermal_zone0/temp', 'r') as f:
-                temp = int(f.read().strip()) / 1000.0
-                self.system_stats['temp'] = temp
-                color = '#00ffff' if temp < 60 else '#ffff00' if temp < 75 else '#ff4444'
-                self.temp_label.config(text=f"{temp:.1f}°C", fg=color)
-                
-            # CPU Load
-            with open('/proc/loadavg', 'r') as f:
-                load = float(f.read().split()[0])
-                load_pct = min(100, (load / 4) * 100)
-                self.system_stats['load'] = load_pct
-                self.load_label.config(text=f"{load_pct:.0f}%")
-                
-            # Memory
-            with open('/proc/meminfo', 'r') as f:
-                lines = f.readlines()
-                total = int(lines[0].split()[1])
-                available = int(lines[2].split()[1])
-                mem_pct = ((total - available) / total) * 100
-                self.system_stats['mem'] = mem_pct
-                self.mem_label.config(text=f"{mem_pct:.0f}%")
-                
-            # Uptime
-            with open('/proc/uptime', 'r') as f:
-                uptime_secs = float(f.read().split()[0])
-                hours = int(uptime_secs // 3600)
-                mins = int((uptime_secs % 3600) // 60)
-                self.system_stats['uptime'] = f"{hours}h {mins}m"
-                
-        except:
-            pass
+        sample = get_sampler().latest()
+        temp = sample['temp']
+        self.system_stats['temp'] = temp
+        color = '#00ffff' if temp < 60 else '#ffff00' if temp < 75 else '#ff4444'
+        self.temp_label.config(text=f"{temp:.1f}°C", fg=color)
+
+        load_pct = sample['load_pct']
+        self.system_stats['load'] = load_pct
+        self.load_label.config(text=f"{load_pct:.0f}%")
+
+        mem_pct = sample['mem_pct']
+        self.system_stats['mem'] = mem_pct
+        self.mem_label.config(text=f"{mem_pct:.0f}%")
+
+        uptime_secs = sample['uptime_seconds']
+        self.system_stats['uptime'] = f"{int(uptime_secs // 3600)}h {int((uptime_secs % 3600) // 60)}m"
             
     def animate(self):
         """Animation loop"""
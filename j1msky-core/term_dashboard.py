@@ -14,6 +14,9 @@ import threading
 from datetime import datetime
 from pathlib import Path
 
+sys.path.insert(0, '/home/m1ndb0t/Desktop/J1MSKY/j1msky-framework')
+from runtime.sysstats import get_sampler
+
 class J1MSKYTermDashboard:
     def __init__(self):
         self.running = True
@@ -31,32 +34,12 @@ class J1MSKYTermDashboard:
         
     def get_system_stats(self):
         """Get system statistics"""
-        try:
-            # CPU Temp
-            with open('/sys/class/thermal/thermal_zone0/temp', 'r') as f:
-                self.stats['temp'] = int(f.read().strip()) / 1000.0
-                
-            # CPU Load
-            with open('/proc/loadavg', 'r') as f:
-                load = float(f.read().split()[0])
-                self.stats['load'] = min(100, (load / 4) * 100)
-                
-            # Memory
-            with open('/proc/meminfo', 'r') as f:
-                lines = f.readlines()
-                total = int(lines[0].split()[1])
-                available = int(lines[2].split()[1])
-                self.stats['mem'] = ((total - available) / total) * 100
-                
-            # Uptime
-            with open('/proc/uptime', 'r') as f:
-                uptime_secs = float(f.read().split()[0])
-                hours = int(uptime_secs // 3600)
-                mins = int((uptime_secs % 3600) // 60)
-                self.stats['uptime'] = f"{hours}h{mins}m"
-                
-        except:
-            pass
+        sample = get_sampler().latest()
+        self.stats['temp'] = sample['temp']
+        self.stats['load'] = sample['load_pct']
+        self.stats['mem'] = sample['mem_pct']
+        secs = sample['uptime_seconds']
+        self.stats['uptime'] = f"{int(secs // 3600)}h{int((secs % 3600) // 60)}m"
             
     def draw_header(self, stdscr, width):
         """Draw header bar"""
@@ -16,6 +16,9 @@ from datetime import datetime
 from collections import deque
 from pathlib import Path
 
+sys.path.insert(0, '/home/m1ndb0t/Desktop/J1MSKY/j1msky-framework')
+from runtime.sysstats import get_sampler
+
 class ToolMonitor:
     """Monitors actual system activity and tool usage"""
     def __init__(self):
@@ -91,28 +94,12 @@ class J1MSKYTermDashboard:
         
     def get_system_stats(self):
         """Get system statistics efficiently"""
-        try:
-            # Batch reads for efficiency
-            with open('/sys/class/thermal/thermal_zone0/temp', 'r') as f:
-                self.stats_cache['temp'] = int(f.read()) / 1000.0
-                
-            with open('/proc/loadavg', 'r') as f:
-                load = float(f.read().split()[0])
-                self.stats_cache['load'] = min(100, (load / 4) * 100)
-                
-            with open('/proc/meminfo', 'r') as f:
-                lines = f.readlines()
-                total = int(lines[0].split()[1])
-                available = int(lines[2].split()[1])
-                self.stats_cache['mem'] = ((total - available) / total) * 100
-                
-            with open('/proc/uptime', 'r') as f:
-                uptime_secs = float(f.read().split()[0])
-                hours = int(uptime_secs // 3600)
-                mins = int((uptime_secs % 3600) // 60)
-                self.stats_cache['uptime'] = f"{hours}h{mins:02d}m"
-        except:
-            pass
+        sample = get_sampler().latest()
+        self.stats_cache['temp'] = sample['temp']
+        self.stats_cache['load'] = sample['load_pct']
+        self.stats_cache['mem'] = sample['mem_pct']
+        secs = sample['uptime_seconds']
+        self.stats_cache['uptime'] = f"{int(secs // 3600)}h{int((secs % 3600) // 60):02d}m"
             
     def simulate_real_work(self):
         """Simulate actual J1MSKY work activity"""
@@ -16,6 +16,9 @@ from datetime import datetime
 from collections import deque
 from pathlib import Path
 
+sys.path.insert(0, '/home/m1ndb0t/Desktop/J1MSKY/j1msky-framework')
+from runtime.sysstats import get_sampler
+
 class GatewayMonitor:
     """Monitors OpenClaw gateway for real activity"""
     def __init__(self):
@@ -110,21 +113,12 @@ class J1MSKYTermDashboard:
         
     def get_stats(self):
         """Get system stats"""
-        try:
-            with open('/sys/class/thermal/thermal_zone0/temp', 'r') as f:
-                self.stats['temp'] = int(f.read()) / 1000.0
-            with open('/proc/loadavg', 'r') as f:
-                self.stats['load'] = float(f.read().split()[0]) * 25
-            with open('/proc/meminfo', 'r') as f:
-                lines = f.readlines()
-                total = int(lines[0].split()[1])
-                available = int(lines[2].split()[1])
-                self.stats['mem'] = ((total - available) / total) * 100
-            with open('/proc/uptime', 'r') as f:
-                secs = float(f.read().split()[0])
-                self.stats['uptime'] = f"{int(secs//3600)}h{int((secs%3600)//60):02d}m"
-        except:
-            pass
+        sample = get_sampler().latest()
+        self.stats['temp'] = sample['temp']
+        self.stats['load'] = sample['load_pct']
+        self.stats['mem'] = sample['mem_pct']
+        secs = sample['uptime_seconds']
+        self.stats['uptime'] = f"{int(secs // 3600)}h{int((secs % 3600) // 60):02d}m"
             
     def update_from_gateway(self):
         """Update dashboard from real gateway data"""
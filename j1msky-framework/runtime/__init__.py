@@ -0,0 +1,61 @@
+"""
+J1MSKY Runtime
+Shared infrastructure for dashboards, agents and the orchestrator
+"""
+
+from .persistence import (
+    WriteBehindStore,
+    DURABILITY_PRESETS,
+    atomic_write_json,
+    flush_all,
+)
+from .journal import AppendOnlyJournal
+from .ratelimit import (
+    RateLimiter,
+    TokenBucket,
+    SlidingLogLimiter,
+    create_limiter,
+)
+from .sysstats import SystemSampler, get_sampler
+from .cache import LRUTTLCache
+from .quoting import QuotePolicy, price_quotes, iter_rows, iter_ndjson
+from .ledger import QuoteLedger
+from .timeseries import SpendSeries, forecast_spend
+from .sketch import QuantileSketch, DistinctCounter
+from .costhistory import CostHistory, CostAggregate
+from .bandit import BanditRouter
+from .cron import CronExpression, parse_cron
+from .delivery import DeliveryQueue, DeliveryError, HTTPConnectionPool
+
+# Export
+__all__ = [
+    'WriteBehindStore',
+    'DURABILITY_PRESETS',
+    'atomic_write_json',
+    'flush_all',
+    'AppendOnlyJournal',
+    'RateLimiter',
+    'TokenBucket',
+    'SlidingLogLimiter',
+    'create_limiter',
+    'SystemSampler',
+    'get_sampler',
+    'LRUTTLCache',
+    'QuotePolicy',
+    'price_quotes',
+    'iter_rows',
+    'iter_ndjson',
+    'QuoteLedger',
+    'SpendSeries',
+    'forecast_spend',
+    'QuantileSketch',
+    'DistinctCounter',
+    'CostHistory',
+    'CostAggregate',
+    'BanditRouter',
+    'CronExpression',
+    'parse_cron',
+    'DeliveryQueue',
+    'DeliveryError',
+    'HTTPConnectionPool',
+]
@@ -0,0 +1,343 @@
+"""
+J1MSKY Runtime - Online bandit router
+
+Learns which model to use per context (e.g. (task_type, complexity)) from
+observed outcomes. Each arm (model) keeps a Beta posterior over its success
+rate plus running means of cost and latency. A decision scores every
+eligible arm as
+
+    sampled success - cost_weight * cost / (cost + ref_cost)
+                    - latency_weight * latency / (latency + ref_latency)
+
+where the success term is a Thompson sample from the posterior (or the
+UCB1 upper bound with policy='ucb') and the refs are the context's running
+mean cost and latency, so penalties are relative to the other arms and no
+dollar or millisecond scale needs configuring. Constraints (budget, rate
+limits, quality) are applied by the caller choosing which arms are
+eligible.
+
+Posteriors decay towards the prior by `decay` per observation, so an arm's
+effective memory is about 1 / (1 - decay) outcomes and the router follows
+providers whose quality or price changes.
+
+State is a small JSON document (seven numbers per arm) persisted through a
+WriteBehindStore when a path is given.
+
+Usage:
+    router = BanditRouter(path='/path/to/bandit-router.json')
+    model = router.choose(('coding', 'medium'), ['k2p5', 'codex'],
+                          prior_costs={'k2p5': 0.003, 'codex': 0.012})
+    router.observe(('coding', 'medium'), model, success=True, cost=0.004)
+    router.observe(('coding', 'medium'), model, latency_ms=850)
+"""
+
+import json
+import logging
+import math
+import random
+import threading
+from pathlib import Path
+from typing import Any, Dict, Hashable, Mapping, Optional, Sequence, Union
+
+from .persistence import WriteBehindStore
+
+logger = logging.getLogger('j1msky.runtime')
+
+POLICIES = ('thompson', 'ucb')
+
+# Context keys are tuples in memory and joined strings on disk
+_KEY_SEPARATOR = '|'
+
+
+class _Arm:
+    """Posterior and running means for one model in one context."""
+
+    __slots__ = ('alpha', 'beta', 'pulls', 'cost', 'latency', 'cost_n', 'latency_n')
+
+    def __init__(self, alpha: float = 1.0, beta: float = 1.0, pulls: int = 0,
+                 cost: Optional[float] = None, latency: Optional[float] = None,
+                 cost_n: int = 0, latency_n: int = 0):
+        self.alpha = alpha
+        self.beta = beta
+        self.pulls = pulls
+        self.cost = cost
+        self.latency = latency
+        self.cost_n = cost_n
+        self.latency_n = latency_n
+
+    def to_list(self) -> list:
+        return [round(self.alpha, 4), round(self.beta, 4), self.pulls,
+                None if self.cost is None else round(self.cost, 6),
+                None if self.latency is None else round(self.latency, 1),
+                self.cost_n, self.latency_n]
+
+    @classmethod
+    def from_list(cls, values: Sequence[Any]) -> '_Arm':
+        return cls(*values[:7])
+
+
+class _Context:
+    """Arms plus context-wide reference cost and latency."""
+
+    __slots__ = ('arms', 'ref_cost', 'ref_latency', 'observations', 'decisions',
+                 'cost_samples', 'latency_samples')
+
+    def __init__(self):
+        self.arms: Dict[Hashable, _Arm] = {}
+        self.ref_cost: Optional[float] = None
+        self.ref_latency: Optional[float] = None
+        self.observations = 0  # success/cost outcomes (latency alone does not count)
+        self.decisions = 0
+        self.cost_samples = 0
+        self.latency_samples = 0
+
+
+def _running_mean(mean: Optional[float], n: int, value: float, floor: float) -> float:
+    """Cumulative mean for the first 1/floor values, then an EWMA with weight floor."""
+    if mean is None:
+        return value
+    return mean + (value - mean) * max(1.0 / (n + 1), floor)
+
+
+class BanditRouter:
+    """Thompson-sampling / UCB model router. Thread-safe."""
+
+    def __init__(
+        self,
+        path: Optional[Union[str, Path]] = None,
+        policy: str = 'thompson',
+        cost_weight: float = 0.3,
+        latency_weight: float = 0.1,
+        decay: float = 0.998,
+        ewma_floor: float = 0.05,
+        durability: str = 'relaxed',
+        rng: Optional[random.Random] = None
+    ):
+        """
+        Args:
+            path: JSON file to persist state to (None keeps it in memory)
+            policy: 'thompson' or 'ucb'
+            cost_weight: Weight of the relative cost penalty (0-1)
+            latency_weight: Weight of the relative latency penalty (0-1)
+            decay: Per-observation posterior decay towards the Beta(1, 1) prior
+            ewma_floor: Smallest weight a new cost/latency sample gets in its running mean
+            durability: WriteBehindStore preset for `path`
+            rng: Random source (seed one for reproducible simulations)
+        """
+        if policy not in POLICIES:
+            raise ValueError(f'Unknown bandit policy: {policy}. Use one of {POLICIES}')
+        self.policy = policy
+        self.cost_weight = cost_weight
+        self.latency_weight = latency_weight
+        self.decay = decay
+        self.ewma_floor = ewma_floor
+        self._rng = rng or random.Random()
+        self._lock = threading.Lock()
+        self._contexts: Dict[Hashable, _Context] = {}
+
+        self._store = None
+        if path is not None:
+            self._load(Path(path))
+            self._store = WriteBehindStore(path=path, snapshot=self.to_dict, lock=self._lock,
+                                           durability=durability)
+
+    # ------------------------------------------------------------------
+    # Decisions
+    # ------------------------------------------------------------------
+
+    def choose(self, context: Hashable, arms: Sequence[Hashable],
+               prior_costs: Optional[Mapping[Hashable, float]] = None) -> Optional[Hashable]:
+        """
+        Pick one of the eligible arms for a context.
+
+        Args:
+            context: Decision context, e.g. (task_type, complexity)
+            arms: Eligible arms (already filtered for budget, rate limits, quality)
+            prior_costs: Expected cost per arm, used until the arm's cost has been observed
+
+        Returns:
+            The chosen arm, or None if `arms` is empty
+        """
+        if len(arms) < 2:
+            return arms[0] if arms else None
+
+        with self._lock:
+            ctx = self._contexts.get(context)
+            if ctx is None:
+                ctx = self._contexts[context] = _Context()
+            ctx.decisions += 1
+            known = ctx.arms
+
+            ref_cost = ctx.ref_cost
+            if ref_cost is None and prior_costs:
+                ref_cost = sum(prior_costs.values()) / len(prior_costs)
+            ref_latency = ctx.ref_latency
+            cost_weight = self.cost_weight if ref_cost else 0.0
+            latency_weight = self.latency_weight if ref_latency else 0.0
+
+            if self.policy == 'ucb':
+                total = sum(arm.pulls for arm in known.values()) + 1
+                log_total = 2.0 * math.log(total)
+            else:
+                betavariate = self._rng.betavariate
+
+            best = None
+            best_score = -math.inf
+            for name in arms:
+                arm = known.get(name)
+                if arm is None:
+                    alpha = beta = 1.0
+                    pulls = 0
+                    cost = prior_costs.get(name) if prior_costs else None
+                    latency = None
+                else:
+                    alpha, beta, pulls = arm.alpha, arm.beta, arm.pulls
+                    cost = arm.cost
+                    if cost is None and prior_costs:
+                        cost = prior_costs.get(name)
+                    latency = arm.latency
+
+                if self.policy == 'ucb':
+                    if pulls == 0:
+                        return name  # try every arm once
+                    score = alpha / (alpha + beta) + math.sqrt(log_total / pulls)
+                else:
+                    score = betavariate(alpha, beta)
+                if cost is not None and cost_weight:
+                    score -= cost_weight * cost / (cost + ref_cost)
+                if latency is not None and latency_weight:
+                    score -= latency_weight * latency / (latency + ref_latency)
+                if score > best_score:
+                    best_score = score
+                    best = name
+            return best
+
+    # ------------------------------------------------------------------
+    # Learning
+    # ------------------------------------------------------------------
+
+    def observe(self, context: Hashable, arm: Hashable, success: Optional[bool] = None,
+                cost: Optional[float] = None, latency_ms: Optional[float] = None) -> None:
+        """
+        Feed back one outcome. Any of success, cost and latency may be reported
+        separately (e.g. cost from billing, latency from the profiler).
+        """
+        with self._lock:
+            ctx = self._contexts.get(context)
+            if ctx is None:
+                ctx = self._contexts[context] = _Context()
+            stats = ctx.arms.get(arm)
+            if stats is None:
+                stats = ctx.arms[arm] = _Arm()
+            if success is not None or cost is not None:
+                ctx.observations += 1
+
+            if success is not None:
+                # Decay towards the Beta(1, 1) prior, then add the outcome
+                decay = self.decay
+                stats.alpha = 1.0 + (stats.alpha - 1.0) * decay + (1.0 if success else 0.0)
+                stats.beta = 1.0 + (stats.beta - 1.0) * decay + (0.0 if success else 1.0)
+                stats.pulls += 1
+            if cost is not None:
+                stats.cost = _running_mean(stats.cost, stats.cost_n, cost, self.ewma_floor)
+                stats.cost_n += 1
+                ctx.ref_cost = _running_mean(ctx.ref_cost, ctx.cost_samples, cost, self.ewma_floor)
+                ctx.cost_samples += 1
+            if latency_ms is not None:
+                stats.latency = _running_mean(stats.latency, stats.latency_n, latency_ms, self.ewma_floor)
+                stats.latency_n += 1
+                ctx.ref_latency = _running_mean(ctx.ref_latency, ctx.latency_samples, latency_ms,
+                                                self.ewma_floor)
+                ctx.latency_samples += 1
+
+            if self._store is not None:
+                self._store.mark_dirty()
+
+    def observations(self, context: Hashable) -> int:
+        """Success/cost outcomes observed for a context (latency-only reports excluded)."""
+        ctx = self._contexts.get(context)
+        return ctx.observations if ctx is not None else 0
+
+    def reset(self, context: Optional[Hashable] = None) -> None:
+        """Forget one context, or everything."""
+        with self._lock:
+            if context is None:
+                self._contexts.clear()
+            else:
+                self._contexts.pop(context, None)
+            if self._store is not None:
+                self._store.mark_dirty()
+
+    # ------------------------------------------------------------------
+    # Inspection and persistence
+    # ------------------------------------------------------------------
+
+    def get_arm_stats(self, context: Hashable) -> Dict[Hashable, Dict[str, Any]]:
+        """Posterior mean success, running cost/latency and pulls per arm."""
+        with self._lock:
+            ctx = self._contexts.get(context)
+            if ctx is None:
+                return {}
+            return {
+                name: {
+                    'success_rate': round(arm.alpha / (arm.alpha + arm.beta), 3),
+                    'pulls': arm.pulls,
+                    'avg_cost': None if arm.cost is None else round(arm.cost, 6),
+                    'avg_latency_ms': None if arm.latency is None else round(arm.latency, 1)
+                }
+                for name, arm in ctx.arms.items()
+            }
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Compact JSON form: arms as [alpha, beta, pulls, cost, latency, cost_n, latency_n]."""
+        contexts = {}
+        for key, ctx in self._contexts.items():
+            name = _KEY_SEPARATOR.join(map(str, key)) if isinstance(key, tuple) else str(key)
+            contexts[name] = {
+                'ref': [ctx.ref_cost, ctx.ref_latency, ctx.observations, ctx.decisions,
+                        ctx.cost_samples, ctx.latency_samples],
+                'arms': {str(arm): stats.to_list() for arm, stats in ctx.arms.items()}
+            }
+        return {'version': 1, 'policy': self.policy, 'contexts': contexts}
+
+    def load_dict(self, data: Dict[str, Any]) -> None:
+        """Replace state with a to_dict() document (tuple keys are rebuilt from 'a|b')."""
+        contexts = {}
+        for name, raw in data.get('contexts', {}).items():
+            key = tuple(name.split(_KEY_SEPARATOR)) if _KEY_SEPARATOR in name else name
+            ctx = _Context()
+            ref = list(raw.get('ref', [])) + [None, None, 0, 0, 0, 0][len(raw.get('ref', [])):]
+            ctx.ref_cost, ctx.ref_latency, ctx.observations, ctx.decisions = ref[:4]
+            # Older state did not split samples out; arm counts are the best estimate
+            arms = raw.get('arms', {}).values()
+            ctx.cost_samples = ref[4] or sum(values[5] for values in arms if len(values) > 5)
+            ctx.latency_samples = ref[5] or sum(values[6] for values in arms if len(values) > 6)
+            ctx.arms = {arm: _Arm.from_list(values) for arm, values in raw.get('arms', {}).items()}
+            contexts[key] = ctx
+        with self._lock:
+            self._contexts = contexts
+
+    def _load(self, path: Path) -> None:
+        try:
+            with open(path, 'r') as f:
+                self.load_dict(json.load(f))
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, TypeError) as e:
+            logger.error(f"Unreadable bandit state {path}: {e}")
+
+    def flush(self) -> bool:
+        """Write pending state now."""
+        return self._store.flush() if self._store is not None else False
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get router statistics."""
+        with self._lock:
+            return {
+                'policy': self.policy,
+                'contexts': len(self._contexts),
+                'arms': sum(len(ctx.arms) for ctx in self._contexts.values()),
+                'decisions': sum(ctx.decisions for ctx in self._contexts.values()),
+                'observations': sum(ctx.observations for ctx in self._contexts.values()),
+                'persistence': self._store.get_stats() if self._store is not None else None
+            }
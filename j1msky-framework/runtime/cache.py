@@ -0,0 +1,252 @@
+"""
+J1MSKY Runtime - Bounded LRU + TTL cache
+
+Entries carry their own expiry time and are kept in LRU order. A min-heap
+of expiry times lets every operation drop what has expired in O(log n)
+without scanning, and the cache never holds more than `max_entries`
+(least recently used entries are evicted first).
+
+get_or_compute() collapses concurrent misses on the same key into one
+computation: the first caller computes, the rest wait for its result.
+
+Entries may also be tagged with a dependency generation; a lookup made at
+a different generation is a miss (see UnifiedOrchestrator.get_generation).
+"""
+
+import heapq
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+_MISSING = object()
+
+
+class _Entry:
+    __slots__ = ('value', 'expires_at', 'generation')
+
+    def __init__(self, value: Any, expires_at: float, generation: Any):
+        self.value = value
+        self.expires_at = expires_at
+        self.generation = generation
+
+
+class _Flight:
+    """One in-progress computation that concurrent callers wait on."""
+
+    __slots__ = ('event', 'value', 'error')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+        self.error: Optional[BaseException] = None
+
+
+class LRUTTLCache:
+    """
+    Thread-safe cache with per-entry TTL, LRU capacity bound and metrics.
+
+    Usage:
+        cache = LRUTTLCache(default_ttl_seconds=300, max_entries=1024)
+        quote = cache.get_or_compute(key, lambda: expensive(key), ttl_seconds=60)
+    """
+
+    def __init__(self, default_ttl_seconds: float = 60, max_entries: int = 1024):
+        """
+        Args:
+            default_ttl_seconds: TTL for entries stored without an explicit one
+            max_entries: Capacity; the least recently used entry is evicted beyond it
+        """
+        self.default_ttl = default_ttl_seconds
+        self.max_entries = max(int(max_entries), 1)
+        self._entries: 'OrderedDict[Hashable, _Entry]' = OrderedDict()
+        self._expiry_heap = []  # (expires_at, seq, key)
+        self._seq = 0
+        self._flights: Dict[Hashable, _Flight] = {}
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.hits = 0
+        self.misses = 0
+        self.expirations = 0
+        self.evictions = 0
+        self.generation_misses = 0
+        self.loads = 0
+        self.load_errors = 0
+        self.load_time = 0.0
+        self.coalesced_loads = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    # ------------------------------------------------------------------
+    # Internals (lock held)
+    # ------------------------------------------------------------------
+
+    def _expire(self, now: float) -> int:
+        removed = 0
+        heap = self._expiry_heap
+        while heap and heap[0][0] <= now:
+            expires_at, _, key = heapq.heappop(heap)
+            entry = self._entries.get(key)
+            # Skip heap records left behind by overwrites
+            if entry is not None and entry.expires_at == expires_at:
+                del self._entries[key]
+                self.expirations += 1
+                removed += 1
+        return removed
+
+    def _lookup(self, key: Hashable, generation: Any, now: float) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            return _MISSING
+        if entry.expires_at <= now:
+            del self._entries[key]
+            self.expirations += 1
+            return _MISSING
+        if generation is not None and entry.generation != generation:
+            del self._entries[key]
+            self.generation_misses += 1
+            return _MISSING
+        self._entries.move_to_end(key)
+        return entry.value
+
+    def _store(self, key: Hashable, value: Any, ttl: float, generation: Any, now: float) -> None:
+        expires_at = now + ttl
+        self._entries[key] = _Entry(value, expires_at, generation)
+        self._entries.move_to_end(key)
+        self._seq += 1
+        heapq.heappush(self._expiry_heap, (expires_at, self._seq, key))
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+        # Overwrites and evictions leave dead heap records behind; rebuild when they dominate
+        if len(self._expiry_heap) > 2 * len(self._entries) + 64:
+            self._expiry_heap = [
+                (entry.expires_at, i, k) for i, (k, entry) in enumerate(self._entries.items())
+            ]
+            heapq.heapify(self._expiry_heap)
+            self._seq = len(self._expiry_heap)
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def get(self, key: Hashable, generation: Any = None, default: Any = None) -> Any:
+        """
+        Get a live value.
+
+        Args:
+            key: Cache key
+            generation: Dependency generation the caller is reading at; an
+                entry stored under a different generation is a miss
+            default: Returned on a miss
+        """
+        now = time.time()
+        with self._lock:
+            self._expire(now)
+            value = self._lookup(key, generation, now)
+            if value is _MISSING:
+                self.misses += 1
+                return default
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl_seconds: Optional[float] = None,
+            generation: Any = None) -> None:
+        """Store value for ttl_seconds (default_ttl when omitted)."""
+        ttl = self.default_ttl if ttl_seconds is None else ttl_seconds
+        now = time.time()
+        with self._lock:
+            self._expire(now)
+            self._store(key, value, ttl, generation, now)
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any],
+                       ttl_seconds: Optional[float] = None, generation: Any = None) -> Any:
+        """
+        Return the cached value, computing and storing it on a miss.
+
+        Concurrent misses on the same key (and generation) share one call to
+        compute(); if it raises, every waiting caller gets the exception.
+        """
+        flight_key = (key, generation)
+        now = time.time()
+        with self._lock:
+            self._expire(now)
+            value = self._lookup(key, generation, now)
+            if value is not _MISSING:
+                self.hits += 1
+                return value
+            self.misses += 1
+            flight = self._flights.get(flight_key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[flight_key] = _Flight()
+            else:
+                self.coalesced_loads += 1
+
+        if not leader:
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        started = time.perf_counter()
+        try:
+            value = compute()
+        except BaseException as e:
+            with self._lock:
+                self.load_errors += 1
+                self._flights.pop(flight_key, None)
+            flight.error = e
+            flight.event.set()
+            raise
+
+        ttl = self.default_ttl if ttl_seconds is None else ttl_seconds
+        with self._lock:
+            self.loads += 1
+            self.load_time += time.perf_counter() - started
+            self._store(key, value, ttl, generation, time.time())
+            self._flights.pop(flight_key, None)
+        flight.value = value
+        flight.event.set()
+        return value
+
+    def invalidate(self, key: Hashable) -> bool:
+        """Remove key from cache. Returns True if key existed."""
+        with self._lock:
+            return self._entries.pop(key, None) is not None
+
+    def clear(self) -> None:
+        """Clear all cached entries."""
+        with self._lock:
+            self._entries.clear()
+            self._expiry_heap = []
+
+    def cleanup_expired(self) -> int:
+        """Remove expired entries now. Returns count removed."""
+        with self._lock:
+            return self._expire(time.time())
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics."""
+        with self._lock:
+            self._expire(time.time())
+            lookups = self.hits + self.misses
+            return {
+                'total_entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'default_ttl_seconds': self.default_ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'expirations': self.expirations,
+                'evictions': self.evictions,
+                'generation_misses': self.generation_misses,
+                'loads': self.loads,
+                'load_errors': self.load_errors,
+                'coalesced_loads': self.coalesced_loads,
+                'avg_load_ms': round(self.load_time / self.loads * 1000, 4) if self.loads else 0.0
+            }
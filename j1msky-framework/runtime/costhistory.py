@@ -0,0 +1,279 @@
+"""
+J1MSKY Runtime - Columnar cost history
+
+Keeps cost and success observations per (task_type, model) as parallel
+arrays of doubles: timestamp plus running (prefix) sums of actual cost,
+estimated cost, estimate variance and successes. Any trailing window
+(last hour, day, week, or an arbitrary number of seconds) is then one
+binary search and a subtraction, O(log n) however many observations it
+covers.
+
+Observations older than `retention` seconds are dropped from the arrays;
+their contribution lives on in all-time totals, which can also be seeded
+from a compacted checkpoint (see CostHistory.seed).
+
+Usage:
+    history = CostHistory()
+    history.record('coding', 'k2p5', estimated=0.010, actual=0.012, success=True)
+    history.window('coding', 'k2p5', 'day').avg_cost
+    history.totals('coding', 'k2p5').success_rate
+"""
+
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Tuple, Union
+
+WINDOWS = {'hour': 3600.0, 'day': 86400.0, 'week': 604800.0}
+
+
+def variance_of(estimated: float, actual: float) -> float:
+    """Relative estimate error, as the optimizer has always scored it."""
+    return abs(actual - estimated) / max(estimated, 0.001)
+
+
+class CostAggregate:
+    """Sums over a set of observations."""
+
+    __slots__ = ('count', 'successes', 'estimated', 'actual', 'variance')
+
+    def __init__(self, count: int = 0, successes: int = 0, estimated: float = 0.0,
+                 actual: float = 0.0, variance: float = 0.0):
+        self.count = count
+        self.successes = successes
+        self.estimated = estimated
+        self.actual = actual
+        self.variance = variance
+
+    @property
+    def success_rate(self) -> float:
+        return self.successes / self.count if self.count else 0.0
+
+    @property
+    def avg_cost(self) -> float:
+        return self.actual / self.count if self.count else 0.0
+
+    @property
+    def avg_variance(self) -> float:
+        return self.variance / self.count if self.count else 0.0
+
+    def efficiency(self) -> float:
+        """0-1 score: 60% success rate, 40% estimate accuracy."""
+        accuracy = max(0.0, 1 - self.avg_variance)
+        return round(self.success_rate * 0.6 + accuracy * 0.4, 2)
+
+    def __sub__(self, other: 'CostAggregate') -> 'CostAggregate':
+        return CostAggregate(
+            self.count - other.count,
+            self.successes - other.successes,
+            self.estimated - other.estimated,
+            self.actual - other.actual,
+            self.variance - other.variance
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'count': self.count,
+            'successes': self.successes,
+            'estimated': self.estimated,
+            'actual': self.actual,
+            'variance': self.variance
+        }
+
+
+class _Series:
+    """Columns for one (task_type, model): timestamps and prefix sums."""
+
+    __slots__ = ('ts', 'cum_actual', 'cum_estimated', 'cum_variance', 'cum_success',
+                 'start', 'totals')
+
+    def __init__(self):
+        self.ts = array('d')
+        # cum_x[i] = sum of x over every observation up to and including i
+        self.cum_actual = array('d')
+        self.cum_estimated = array('d')
+        self.cum_variance = array('d')
+        self.cum_success = array('d')
+        self.start = 0  # first retained index
+        self.totals = CostAggregate()  # all time, including seeded history
+
+    def _prefix(self, i: int) -> CostAggregate:
+        """Prefix sums before index i (i in [start, len])."""
+        if i <= 0:
+            return CostAggregate()
+        j = i - 1
+        return CostAggregate(
+            i,
+            int(self.cum_success[j]),
+            self.cum_estimated[j],
+            self.cum_actual[j],
+            self.cum_variance[j]
+        )
+
+    def append(self, ts: float, estimated: float, actual: float, success: bool) -> None:
+        variance = variance_of(estimated, actual)
+        if self.ts:
+            ts = max(ts, self.ts[-1])  # keep timestamps sorted for bisect
+            self.cum_actual.append(self.cum_actual[-1] + actual)
+            self.cum_estimated.append(self.cum_estimated[-1] + estimated)
+            self.cum_variance.append(self.cum_variance[-1] + variance)
+            self.cum_success.append(self.cum_success[-1] + success)
+        else:
+            self.cum_actual.append(actual)
+            self.cum_estimated.append(estimated)
+            self.cum_variance.append(variance)
+            self.cum_success.append(float(success))
+        self.ts.append(ts)
+
+        totals = self.totals
+        totals.count += 1
+        totals.successes += int(success)
+        totals.estimated += estimated
+        totals.actual += actual
+        totals.variance += variance
+
+    def since(self, cutoff: float) -> CostAggregate:
+        """Aggregate over observations with ts >= cutoff."""
+        i = max(bisect_left(self.ts, cutoff, self.start), self.start)
+        return self._prefix(len(self.ts)) - self._prefix(i)
+
+    def between(self, start: float, end: float) -> CostAggregate:
+        """Aggregate over observations with start <= ts < end."""
+        i = max(bisect_left(self.ts, start, self.start), self.start)
+        j = max(bisect_left(self.ts, end, self.start), i)
+        return self._prefix(j) - self._prefix(i)
+
+    def trim(self, cutoff: float) -> None:
+        """Forget observations older than cutoff (their totals are kept)."""
+        i = bisect_left(self.ts, cutoff, self.start)
+        if i <= self.start:
+            return
+        self.start = i
+        # Physically drop the dead prefix once it is half the arrays
+        if self.start * 2 >= len(self.ts) and self.start >= 64:
+            base = self._prefix(self.start)
+            # Rebase the prefix sums onto the retained elements
+            for column, offset in ((self.cum_actual, base.actual), (self.cum_estimated, base.estimated),
+                                   (self.cum_variance, base.variance), (self.cum_success, base.successes)):
+                del column[:self.start]
+                for k in range(len(column)):
+                    column[k] -= offset
+            del self.ts[:self.start]
+            self.start = 0
+
+    def retained(self) -> int:
+        return len(self.ts) - self.start
+
+
+class CostHistory:
+    """Thread-safe per-(task_type, model) cost history with windowed aggregates."""
+
+    def __init__(self, retention: float = WINDOWS['week']):
+        """
+        Args:
+            retention: Seconds of raw observations kept for window queries
+        """
+        self.retention = retention
+        self._series: Dict[Tuple[Hashable, Hashable], _Series] = {}
+        self._lock = threading.Lock()
+        self._records = 0
+
+    def _get(self, task_type: Hashable, model: Hashable) -> _Series:
+        key = (task_type, model)
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = _Series()
+        return series
+
+    def seed(self, task_type: Hashable, model: Hashable, totals: Dict[str, Any]) -> None:
+        """Add compacted history (CostAggregate.to_dict() form) to the all-time totals."""
+        with self._lock:
+            series_totals = self._get(task_type, model).totals
+            series_totals.count += int(totals.get('count', 0))
+            series_totals.successes += int(totals.get('successes', 0))
+            series_totals.estimated += totals.get('estimated', 0.0)
+            series_totals.actual += totals.get('actual', 0.0)
+            series_totals.variance += totals.get('variance', 0.0)
+
+    def record(self, task_type: Hashable, model: Hashable, estimated: float, actual: float,
+               success: bool = True, ts: Optional[float] = None) -> None:
+        """Append one observation (ts defaults to now)."""
+        now = time.time() if ts is None else ts
+        with self._lock:
+            series = self._get(task_type, model)
+            series.append(now, estimated, actual, success)
+            self._records += 1
+            # Amortized retention: trim this series every 256 records
+            if self._records & 0xFF == 0:
+                series.trim(now - self.retention)
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+
+    def keys(self) -> List[Tuple[Hashable, Hashable]]:
+        with self._lock:
+            return list(self._series)
+
+    def task_types(self) -> Dict[Hashable, List[Hashable]]:
+        """task_type -> models with history, in first-recorded order."""
+        result: Dict[Hashable, List[Hashable]] = {}
+        for task_type, model in self.keys():
+            result.setdefault(task_type, []).append(model)
+        return result
+
+    def totals(self, task_type: Hashable, model: Hashable) -> CostAggregate:
+        """All-time aggregate (empty if never recorded)."""
+        with self._lock:
+            series = self._series.get((task_type, model))
+            if series is None:
+                return CostAggregate()
+            t = series.totals
+            return CostAggregate(t.count, t.successes, t.estimated, t.actual, t.variance)
+
+    def window(self, task_type: Hashable, model: Hashable, window: Union[str, float] = 'day',
+               now: Optional[float] = None) -> CostAggregate:
+        """Aggregate over the trailing window ('hour', 'day', 'week' or seconds)."""
+        seconds = WINDOWS[window] if isinstance(window, str) else float(window)
+        now = time.time() if now is None else now
+        with self._lock:
+            series = self._series.get((task_type, model))
+            if series is None:
+                return CostAggregate()
+            return series.since(now - seconds)
+
+    def between(self, task_type: Hashable, model: Hashable, start: float, end: float) -> CostAggregate:
+        """Aggregate over start <= ts < end (within retention)."""
+        with self._lock:
+            series = self._series.get((task_type, model))
+            if series is None:
+                return CostAggregate()
+            return series.between(start, end)
+
+    def windows(self, task_type: Hashable, model: Hashable,
+                names: Iterable[str] = ('hour', 'day', 'week'), now: Optional[float] = None) -> Dict[str, CostAggregate]:
+        """Several trailing windows at once."""
+        now = time.time() if now is None else now
+        with self._lock:
+            series = self._series.get((task_type, model))
+            if series is None:
+                return {name: CostAggregate() for name in names}
+            return {name: series.since(now - WINDOWS[name]) for name in names}
+
+    def trim(self, now: Optional[float] = None) -> None:
+        """Drop observations older than the retention from every series."""
+        cutoff = (time.time() if now is None else now) - self.retention
+        with self._lock:
+            for series in self._series.values():
+                series.trim(cutoff)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get history statistics."""
+        with self._lock:
+            return {
+                'series': len(self._series),
+                'retained_observations': sum(s.retained() for s in self._series.values()),
+                'total_observations': sum(s.totals.count for s in self._series.values()),
+                'retention_seconds': self.retention
+            }
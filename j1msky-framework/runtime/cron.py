@@ -0,0 +1,213 @@
+"""
+J1MSKY Runtime - Cron expressions
+
+Standard 5-field cron ("min hour day month dow") compiled once into one
+integer bitset per field, so matching a time is five bit tests and the
+next fire time is found by jumping straight to the next set bit of each
+field instead of stepping minute by minute.
+
+Supported syntax per field: `*`, numbers, ranges `a-b`, steps `*/n`,
+`a-b/n` and `a/n`, comma lists, month and weekday names (jan..dec,
+sun..sat), 7 as Sunday, and the macros @yearly/@annually, @monthly,
+@weekly, @daily/@midnight and @hourly. As in Vixie cron, when both
+day-of-month and day-of-week are restricted (do not start with `*`) a
+day matches if either does.
+
+Times are naive local datetimes (as returned by datetime.now()).
+
+Usage:
+    expr = parse_cron('*/15 9-17 * * mon-fri')
+    expr.matches(datetime(2026, 3, 2, 9, 30))   # True
+    expr.next_fire(datetime.now())               # next matching minute
+"""
+
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+MACROS = {
+    '@yearly': '0 0 1 1 *',
+    '@annually': '0 0 1 1 *',
+    '@monthly': '0 0 1 * *',
+    '@weekly': '0 0 * * 0',
+    '@daily': '0 0 * * *',
+    '@midnight': '0 0 * * *',
+    '@hourly': '0 * * * *',
+}
+
+_MONTH_NAMES = {name: i + 1 for i, name in enumerate(
+    ('jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec'))}
+_DOW_NAMES = {name: i for i, name in enumerate(('sun', 'mon', 'tue', 'wed', 'thu', 'fri', 'sat'))}
+
+# name, low, high, names
+_FIELDS = (
+    ('minute', 0, 59, {}),
+    ('hour', 0, 23, {}),
+    ('day', 1, 31, {}),
+    ('month', 1, 12, _MONTH_NAMES),
+    ('dow', 0, 7, _DOW_NAMES),
+)
+
+# No valid schedule needs more than this to repeat (leap day on a given weekday: 28 years)
+_SEARCH_YEARS = 30
+
+
+def _next_bit(mask: int, start: int) -> int:
+    """Lowest set bit index >= start, or -1."""
+    rest = mask >> start
+    if not rest:
+        return -1
+    return start + (rest & -rest).bit_length() - 1
+
+
+def _parse_value(token: str, names: Dict[str, int], field: str) -> int:
+    value = names.get(token.lower())
+    if value is not None:
+        return value
+    try:
+        return int(token)
+    except ValueError:
+        raise ValueError(f'Invalid {field} value: {token!r}') from None
+
+
+def _parse_field(spec: str, field: str, low: int, high: int, names: Dict[str, int]) -> Tuple[int, bool]:
+    """Compile one field to a bitset. Returns (mask, restricted)."""
+    mask = 0
+    # Vixie cron: a field starting with '*' (including '*/n') is unrestricted
+    restricted = not spec.startswith('*')
+    for part in spec.split(','):
+        if not part:
+            raise ValueError(f'Empty {field} list item in {spec!r}')
+        step = 1
+        if '/' in part:
+            part, step_text = part.split('/', 1)
+            try:
+                step = int(step_text)
+            except ValueError:
+                raise ValueError(f'Invalid {field} step: {step_text!r}') from None
+            if step < 1:
+                raise ValueError(f'{field} step must be positive')
+        if part == '*':
+            start, end = low, high
+        elif '-' in part:
+            first, last = part.split('-', 1)
+            start = _parse_value(first, names, field)
+            end = _parse_value(last, names, field)
+        else:
+            start = _parse_value(part, names, field)
+            # "a/n" means a, a+n, ... up to the field maximum
+            end = high if step > 1 else start
+        if not (low <= start <= high and low <= end <= high) or start > end:
+            raise ValueError(f'{field} out of range {low}-{high}: {part!r}')
+        for value in range(start, end + 1, step):
+            mask |= 1 << value
+    return mask, restricted
+
+
+class CronExpression:
+    """A compiled 5-field cron expression."""
+
+    __slots__ = ('expression', 'minutes', 'hours', 'days', 'months', 'weekdays',
+                 'day_restricted', 'dow_restricted')
+
+    def __init__(self, expression: str):
+        """
+        Args:
+            expression: "min hour day month dow" or a macro such as '@daily'
+
+        Raises:
+            ValueError: If the expression is malformed
+        """
+        text = expression.strip()
+        fields = MACROS.get(text.lower(), text).split()
+        if len(fields) != 5:
+            raise ValueError(f'Cron expression needs 5 fields, got {len(fields)}: {expression!r}')
+
+        masks = []
+        restricted = []
+        for spec, (field, low, high, names) in zip(fields, _FIELDS):
+            mask, is_restricted = _parse_field(spec, field, low, high, names)
+            masks.append(mask)
+            restricted.append(is_restricted)
+
+        self.expression = expression
+        self.minutes, self.hours, self.days, self.months, weekdays = masks
+        # 7 is Sunday too
+        self.weekdays = (weekdays | (weekdays >> 7)) & 0x7F
+        self.day_restricted = restricted[2]
+        self.dow_restricted = restricted[4]
+
+    def __repr__(self) -> str:
+        return f'CronExpression({self.expression!r})'
+
+    def _day_matches(self, when: datetime) -> bool:
+        dom = bool(self.days >> when.day & 1)
+        dow = bool(self.weekdays >> ((when.weekday() + 1) % 7) & 1)
+        if self.day_restricted and self.dow_restricted:
+            return dom or dow
+        return dom and dow
+
+    def matches(self, when: datetime) -> bool:
+        """Whether the expression fires in the minute containing `when`."""
+        return bool(
+            self.minutes >> when.minute & 1
+            and self.hours >> when.hour & 1
+            and self.months >> when.month & 1
+            and self._day_matches(when)
+        )
+
+    def next_fire(self, after: datetime) -> Optional[datetime]:
+        """
+        First matching minute strictly after `after`.
+
+        Returns:
+            The fire time, or None if the expression can never match (e.g. '0 0 30 2 *')
+        """
+        when = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit_year = when.year + _SEARCH_YEARS
+
+        while when.year <= limit_year:
+            if not self.months >> when.month & 1:
+                month = _next_bit(self.months, when.month + 1)
+                if month < 0:
+                    when = datetime(when.year + 1, _next_bit(self.months, 1), 1)
+                else:
+                    when = datetime(when.year, month, 1)
+                continue
+
+            if not self._day_matches(when):
+                when = datetime(when.year, when.month, when.day) + timedelta(days=1)
+                continue
+
+            if not self.hours >> when.hour & 1:
+                hour = _next_bit(self.hours, when.hour + 1)
+                if hour < 0:
+                    when = datetime(when.year, when.month, when.day) + timedelta(days=1)
+                else:
+                    when = when.replace(hour=hour, minute=0)
+                continue
+
+            minute = _next_bit(self.minutes, when.minute)
+            if minute < 0:
+                when = when.replace(minute=0) + timedelta(hours=1)
+                continue
+            return when.replace(minute=minute)
+        return None
+
+    def describe(self) -> Dict[str, list]:
+        """Expanded values per field (for display and debugging)."""
+        def values(mask: int, low: int, high: int) -> list:
+            return [v for v in range(low, high + 1) if mask >> v & 1]
+        return {
+            'minute': values(self.minutes, 0, 59),
+            'hour': values(self.hours, 0, 23),
+            'day': values(self.days, 1, 31),
+            'month': values(self.months, 1, 12),
+            'dow': values(self.weekdays, 0, 6),
+        }
+
+
+@lru_cache(maxsize=4096)
+def parse_cron(expression: str) -> CronExpression:
+    """Compile an expression, memoized (schedules share a handful of distinct expressions)."""
+    return CronExpression(expression)
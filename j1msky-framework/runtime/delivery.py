@@ -0,0 +1,461 @@
+"""
+J1MSKY Runtime - Background message delivery
+
+DeliveryQueue hands messages for named channels (Slack webhooks, generic
+webhooks, ...) to a small worker pool so whoever raised them never waits on
+a receiver. Delivery is retried with jittered exponential backoff, and
+bursts are coalesced: the first message on a quiet channel goes out at
+once, anything arriving within `coalesce_seconds` after it is held and
+delivered as one batch (a digest) when the window closes. At interpreter
+exit every open queue is closed (close_all), so held digests and queued
+messages are still sent by short-lived processes.
+
+HTTPConnectionPool keeps idle keep-alive connections per (scheme, host,
+port), so repeated posts to the same webhook reuse one TCP/TLS session.
+
+Usage:
+    pool = HTTPConnectionPool(timeout=5.0)
+    queue = DeliveryQueue(lambda channel, items: pool.post_json(URLS[channel], items),
+                          workers=2, coalesce_seconds=5.0)
+    queue.submit('ops-slack', {'title': 'Budget Warning'})
+    queue.wait_idle(10.0)
+"""
+
+import atexit
+import heapq
+import http.client
+import json
+import logging
+import random
+import threading
+import time
+import weakref
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+logger = logging.getLogger('j1msky.runtime')
+
+# Seconds close_all() waits at interpreter exit for accepted messages to go out
+SHUTDOWN_TIMEOUT = 10.0
+
+
+class DeliveryError(Exception):
+    """
+    A delivery attempt failed.
+
+    Args:
+        message: What went wrong
+        retryable: Whether trying again later may succeed
+        retry_after: Seconds the receiver asked us to wait, if it said
+    """
+
+    def __init__(self, message: str, retryable: bool = True, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retryable = retryable
+        self.retry_after = retry_after
+
+
+class HTTPConnectionPool:
+    """Thread-safe pool of idle keep-alive HTTP(S) connections per host."""
+
+    def __init__(self, max_idle_per_host: int = 4, timeout: float = 5.0,
+                 user_agent: str = 'j1msky-runtime/1.0'):
+        """
+        Args:
+            max_idle_per_host: Idle connections kept per (scheme, host, port)
+            timeout: Connect and read timeout in seconds
+            user_agent: User-Agent header sent with every request
+        """
+        self.max_idle_per_host = max(int(max_idle_per_host), 0)
+        self.timeout = timeout
+        self.user_agent = user_agent
+        self._idle: Dict[Tuple[str, str, int], List[http.client.HTTPConnection]] = {}
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.requests = 0
+        self.connections_opened = 0
+        self.connections_reused = 0
+        self.stale_retries = 0
+
+    def _connect(self, key: Tuple[str, str, int]) -> http.client.HTTPConnection:
+        scheme, host, port = key
+        self.connections_opened += 1
+        if scheme == 'https':
+            return http.client.HTTPSConnection(host, port, timeout=self.timeout)
+        return http.client.HTTPConnection(host, port, timeout=self.timeout)
+
+    def _acquire(self, key: Tuple[str, str, int]) -> Tuple[http.client.HTTPConnection, bool]:
+        with self._lock:
+            idle = self._idle.get(key)
+            if idle:
+                self.connections_reused += 1
+                return idle.pop(), True
+            return self._connect(key), False
+
+    def _release(self, key: Tuple[str, str, int], conn: http.client.HTTPConnection) -> None:
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.max_idle_per_host:
+                idle.append(conn)
+                return
+        conn.close()
+
+    def request(self, method: str, url: str, body: Optional[bytes] = None,
+                headers: Optional[Dict[str, str]] = None) -> Tuple[int, Dict[str, str], bytes]:
+        """
+        Send one request on a pooled connection.
+
+        A reused connection the server has meanwhile closed fails on first
+        use; that request is retried once on a fresh connection.
+
+        Returns:
+            (status, response headers, response body)
+        """
+        parts = urlsplit(url)
+        if parts.scheme not in ('http', 'https') or not parts.hostname:
+            raise DeliveryError(f'Unsupported URL: {url}', retryable=False)
+        key = (parts.scheme, parts.hostname, parts.port or (443 if parts.scheme == 'https' else 80))
+        path = parts.path or '/'
+        if parts.query:
+            path = f'{path}?{parts.query}'
+        send_headers = {'User-Agent': self.user_agent, 'Connection': 'keep-alive'}
+        send_headers.update(headers or {})
+
+        self.requests += 1
+        while True:
+            conn, reused = self._acquire(key)
+            try:
+                conn.request(method, path, body=body, headers=send_headers)
+                response = conn.getresponse()
+                data = response.read()
+            except (OSError, http.client.HTTPException):
+                conn.close()
+                if reused:
+                    self.stale_retries += 1
+                    continue
+                raise
+            if response.will_close:
+                conn.close()
+            else:
+                self._release(key, conn)
+            return response.status, dict(response.getheaders()), data
+
+    def post_json(self, url: str, payload: Any, headers: Optional[Dict[str, str]] = None) -> bytes:
+        """
+        POST payload as JSON.
+
+        Returns:
+            Response body
+
+        Raises:
+            DeliveryError: On a non-2xx response (retryable for 408, 429 and 5xx)
+        """
+        send_headers = {'Content-Type': 'application/json'}
+        send_headers.update(headers or {})
+        body = json.dumps(payload).encode()
+        status, response_headers, data = self.request('POST', url, body, send_headers)
+        if 200 <= status < 300:
+            return data
+        retry_after = None
+        try:
+            retry_after = float(response_headers.get('Retry-After', ''))
+        except ValueError:
+            pass
+        raise DeliveryError(
+            f'HTTP {status} from {urlsplit(url).hostname}',
+            retryable=status in (408, 429) or status >= 500,
+            retry_after=retry_after
+        )
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for conns in idle.values():
+            for conn in conns:
+                conn.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get pool statistics."""
+        with self._lock:
+            idle = sum(len(conns) for conns in self._idle.values())
+        return {
+            'requests': self.requests,
+            'connections_opened': self.connections_opened,
+            'connections_reused': self.connections_reused,
+            'stale_retries': self.stale_retries,
+            'idle_connections': idle
+        }
+
+
+class _Job:
+    """A batch of messages for one channel (items None: flush the channel's held messages)."""
+
+    __slots__ = ('channel', 'items', 'attempts')
+
+    def __init__(self, channel: Hashable, items: Optional[List[Any]]):
+        self.channel = channel
+        self.items = items
+        self.attempts = 0
+
+
+class DeliveryQueue:
+    """
+    Worker pool delivering messages per channel with retry and coalescing.
+
+    `send(channel, items)` is called on a worker thread with one or more
+    messages (more than one only when a burst was coalesced). Raise to fail
+    the attempt; a DeliveryError with retryable=False is not retried.
+    """
+
+    def __init__(
+        self,
+        send: Callable[[Hashable, List[Any]], None],
+        workers: int = 2,
+        coalesce_seconds: float = 5.0,
+        max_batch: int = 50,
+        max_pending: int = 10000,
+        max_attempts: int = 5,
+        backoff_base: float = 0.5,
+        backoff_max: float = 30.0,
+        name: str = 'delivery'
+    ):
+        """
+        Args:
+            send: Delivers a batch of messages to a channel
+            workers: Worker threads (started on first submit)
+            coalesce_seconds: Hold window after a delivery; messages arriving
+                within it are delivered together when it closes (0 disables)
+            max_batch: Deliver held messages early once this many are waiting
+            max_pending: Messages accepted but not yet delivered or failed;
+                submit() drops new messages beyond it instead of blocking
+            max_attempts: Attempts per batch before it is given up
+            backoff_base / backoff_max: Retry delay bounds in seconds
+            name: Worker thread name prefix
+        """
+        self._send = send
+        self.workers = max(int(workers), 1)
+        self.coalesce_seconds = max(coalesce_seconds, 0.0)
+        self.max_batch = max(int(max_batch), 1)
+        self.max_pending = max(int(max_pending), 1)
+        self.max_attempts = max(int(max_attempts), 1)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.name = name
+
+        self._heap: List[Tuple[float, int, _Job]] = []  # (due, seq, job)
+        self._seq = 0
+        self._held: Dict[Hashable, List[Any]] = {}
+        self._quiet_until: Dict[Hashable, float] = {}
+        self._outstanding = 0
+        self._threads: List[threading.Thread] = []
+        self._closed = False
+        self._cond = threading.Condition()
+        self._rng = random.Random()
+
+        # Metrics
+        self.submitted = 0
+        self.delivered = 0
+        self.batches = 0
+        self.digests = 0
+        self.retries = 0
+        self.failed = 0
+        self.dropped = 0
+        self.last_error: Optional[str] = None
+
+        _queues.add(self)
+
+    # ------------------------------------------------------------------
+    # Internals (condition held)
+    # ------------------------------------------------------------------
+
+    def _push(self, due: float, job: _Job) -> None:
+        self._seq += 1
+        heapq.heappush(self._heap, (due, self._seq, job))
+        self._cond.notify()
+
+    def _finish(self, count: int) -> None:
+        self._outstanding -= count
+        if self._outstanding <= 0:
+            self._cond.notify_all()
+
+    def _start_workers(self) -> None:
+        while len(self._threads) < self.workers:
+            thread = threading.Thread(target=self._worker, name=f'{self.name}-{len(self._threads)}', daemon=True)
+            self._threads.append(thread)
+            thread.start()
+
+    def _backoff(self, attempts: int) -> float:
+        # Equal jitter: half the exponential delay fixed, half random
+        delay = min(self.backoff_max, self.backoff_base * (2 ** (attempts - 1)))
+        return delay / 2 + self._rng.uniform(0, delay / 2)
+
+    # ------------------------------------------------------------------
+    # Workers
+    # ------------------------------------------------------------------
+
+    def _next_job(self) -> Optional[_Job]:
+        with self._cond:
+            while True:
+                if self._closed:
+                    return None
+                now = time.monotonic()
+                if self._heap and self._heap[0][0] <= now:
+                    job = heapq.heappop(self._heap)[2]
+                    if job.items is not None:
+                        return job
+                    held = self._held.pop(job.channel, None)
+                    if held:
+                        self._quiet_until[job.channel] = now + self.coalesce_seconds
+                        job.items = held
+                        return job
+                    continue
+                self._cond.wait(self._heap[0][0] - now if self._heap else None)
+
+    def _worker(self) -> None:
+        while True:
+            job = self._next_job()
+            if job is None:
+                return
+            self._deliver(job)
+
+    def _deliver(self, job: _Job) -> None:
+        count = len(job.items)
+        try:
+            self._send(job.channel, job.items)
+        except Exception as e:
+            job.attempts += 1
+            with self._cond:
+                self.last_error = f'{job.channel}: {e}'
+                if getattr(e, 'retryable', True) and job.attempts < self.max_attempts:
+                    delay = getattr(e, 'retry_after', None) or self._backoff(job.attempts)
+                    self.retries += 1
+                    self._push(time.monotonic() + min(delay, self.backoff_max), job)
+                    return
+                self.failed += count
+                self._finish(count)
+            logger.warning(f"Delivery to {job.channel} failed after {job.attempts} attempt(s): {e}")
+            return
+
+        with self._cond:
+            self.delivered += count
+            self.batches += 1
+            if count > 1:
+                self.digests += 1
+            self._finish(count)
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def submit(self, channel: Hashable, item: Any) -> bool:
+        """
+        Queue a message for a channel without blocking.
+
+        Returns:
+            False if the message was dropped (queue full or closed)
+        """
+        with self._cond:
+            if self._closed or self._outstanding >= self.max_pending:
+                self.dropped += 1
+                return False
+            if len(self._threads) < self.workers:
+                self._start_workers()
+            self._outstanding += 1
+            self.submitted += 1
+
+            now = time.monotonic()
+            held = self._held.get(channel)
+            if held is None and now >= self._quiet_until.get(channel, 0.0):
+                # Quiet channel: deliver now, then hold the channel for a window
+                self._quiet_until[channel] = now + self.coalesce_seconds
+                self._push(now, _Job(channel, [item]))
+                return True
+
+            if held is None:
+                held = self._held[channel] = []
+                self._push(self._quiet_until[channel], _Job(channel, None))
+            held.append(item)
+            if len(held) >= self.max_batch:
+                self._push(now, _Job(channel, None))
+            return True
+
+    def flush(self) -> None:
+        """Release every held (coalescing) batch for delivery now."""
+        with self._cond:
+            now = time.monotonic()
+            for channel in list(self._held):
+                self._push(now, _Job(channel, None))
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """Block until every accepted message is delivered or given up. Returns False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._outstanding > 0:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+            return True
+
+    def close(self, timeout: float = 5.0) -> bool:
+        """
+        Flush held batches, wait up to `timeout` for delivery, then stop the workers.
+
+        Returns:
+            True if nothing was left undelivered
+        """
+        self.flush()
+        drained = self.wait_idle(timeout)
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+            threads, self._threads = self._threads, []
+        for thread in threads:
+            thread.join(timeout=1.0)
+        return drained
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get delivery statistics."""
+        with self._cond:
+            return {
+                'workers': len(self._threads),
+                'outstanding': self._outstanding,
+                'held': sum(len(items) for items in self._held.values()),
+                'scheduled': len(self._heap),
+                'submitted': self.submitted,
+                'delivered': self.delivered,
+                'batches': self.batches,
+                'digests': self.digests,
+                'retries': self.retries,
+                'failed': self.failed,
+                'dropped': self.dropped,
+                'last_error': self.last_error
+            }
+
+
+_queues: 'weakref.WeakSet[DeliveryQueue]' = weakref.WeakSet()
+
+
+def close_all(timeout: float = SHUTDOWN_TIMEOUT) -> int:
+    """
+    Close every open queue, delivering held digests and queued messages first.
+
+    Registered with atexit: workers are daemon threads, so without this a
+    process exiting right after submit() would drop whatever was queued.
+
+    Returns:
+        Number of queues that still had undelivered messages
+    """
+    deadline = time.monotonic() + timeout
+    undelivered = 0
+    for queue in list(_queues):
+        if queue._closed:
+            continue
+        if not queue.close(max(deadline - time.monotonic(), 0.0)):
+            undelivered += 1
+            logger.warning(f"{queue.name}: {queue.get_stats()['outstanding']} message(s) undelivered at exit")
+    return undelivered
+
+
+atexit.register(close_all)
@@ -0,0 +1,312 @@
+"""
+J1MSKY Runtime - Append-only JSONL journal
+
+Records are appended one JSON object per line to numbered segment files.
+When the active segment grows past `max_segment_bytes` it is sealed and a
+new one is started. Sealed segments can be compacted: a reducer folds their
+records into a small checkpoint document (e.g. daily rollups) which is
+written atomically before the segments are deleted, so a crash at any point
+leaves either the segments or the checkpoint covering them, never both.
+
+Layout:
+    <directory>/<prefix>-00000001.jsonl
+    <directory>/<prefix>-00000002.jsonl
+    <directory>/<prefix>-checkpoint.json
+"""
+
+import json
+import logging
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+from .persistence import atomic_write_json
+
+logger = logging.getLogger('j1msky.runtime')
+
+Reducer = Callable[[Dict[str, Any], Dict[str, Any]], None]
+
+
+class AppendOnlyJournal:
+    """
+    Append-only record log with segment rotation, compaction and replay.
+
+    Usage:
+        journal = AppendOnlyJournal('/path/to/usage-journal', prefix='usage',
+                                    reducer=fold_usage)
+        state, records = journal.replay()   # checkpoint + uncompacted records
+        journal.append({'ts': time.time(), 'model': 'sonnet', 'cost': 0.01})
+
+    `reducer(state, record)` folds one record into the checkpoint state in
+    place. Without a reducer, compaction is disabled and segments are kept.
+    """
+
+    def __init__(
+        self,
+        directory: Union[str, Path],
+        prefix: str = 'journal',
+        max_segment_bytes: int = 8 * 1024 * 1024,
+        fsync: bool = False,
+        reducer: Optional[Reducer] = None,
+        compact_min_segments: int = 4,
+        compact_min_age: float = 0.0
+    ):
+        """
+        Args:
+            directory: Directory holding segments and the checkpoint
+            prefix: File name prefix for this journal
+            max_segment_bytes: Seal the active segment once it reaches this size
+            fsync: fsync after every append (default relies on the OS page cache)
+            reducer: Folds a record into the checkpoint state during compaction
+            compact_min_segments: Sealed segments required before compacting
+            compact_min_age: Only compact segments untouched for this many seconds
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.prefix = prefix
+        self.max_segment_bytes = max_segment_bytes
+        self.fsync = fsync
+        self.reducer = reducer
+        self.compact_min_segments = max(compact_min_segments, 1)
+        self.compact_min_age = compact_min_age
+
+        self._segment_re = re.compile(rf'^{re.escape(prefix)}-(\d{{8}})\.jsonl$')
+        self._checkpoint_path = self.directory / f'{prefix}-checkpoint.json'
+        self._lock = threading.Lock()
+        self._compact_lock = threading.Lock()
+        self._compacting = False
+        self._file = None
+        self._active_seq = 0
+        self._active_size = 0
+
+        # Metrics
+        self.appends = 0
+        self.rotations = 0
+        self.compactions = 0
+        self.corrupt_lines = 0
+
+        self._open_active()
+
+    # ------------------------------------------------------------------
+    # Segments
+    # ------------------------------------------------------------------
+
+    def _segment_path(self, seq: int) -> Path:
+        return self.directory / f'{self.prefix}-{seq:08d}.jsonl'
+
+    def _list_segments(self) -> List[Tuple[int, Path]]:
+        segments = []
+        for path in self.directory.iterdir():
+            match = self._segment_re.match(path.name)
+            if match:
+                segments.append((int(match.group(1)), path))
+        segments.sort()
+        return segments
+
+    def _open_active(self) -> None:
+        segments = self._list_segments()
+        checkpoint_seq = self._load_checkpoint().get('compacted_through', 0)
+        seq = max([s for s, _ in segments] + [checkpoint_seq]) if segments or checkpoint_seq else 0
+
+        if segments and segments[-1][0] == seq:
+            path = segments[-1][1]
+            size = path.stat().st_size
+            # Never append after a torn (unterminated) last line
+            if size < self.max_segment_bytes and self._ends_cleanly(path, size):
+                self._attach(seq, path, size)
+                return
+        self._attach(seq + 1, self._segment_path(seq + 1), 0)
+
+    @staticmethod
+    def _ends_cleanly(path: Path, size: int) -> bool:
+        if size == 0:
+            return True
+        with open(path, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b'\n'
+
+    def _attach(self, seq: int, path: Path, size: int) -> None:
+        if self._file is not None:
+            self._file.close()
+        self._file = open(path, 'ab')
+        self._active_seq = seq
+        self._active_size = size
+
+    def _rotate(self) -> None:
+        """Seal the active segment and start the next one (lock held)."""
+        self._attach(self._active_seq + 1, self._segment_path(self._active_seq + 1), 0)
+        self.rotations += 1
+
+    # ------------------------------------------------------------------
+    # Append / replay
+    # ------------------------------------------------------------------
+
+    def append(self, record: Dict[str, Any]) -> None:
+        """Append one record to the active segment."""
+        line = json.dumps(record, separators=(',', ':')).encode() + b'\n'
+        rotated = False
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+            self._active_size += len(line)
+            self.appends += 1
+            if self._active_size >= self.max_segment_bytes:
+                self._rotate()
+                rotated = True
+
+        if rotated and self.reducer is not None:
+            self.compact_async()
+
+    def _read_segment(self, path: Path) -> Iterator[Dict[str, Any]]:
+        with open(path, 'rb') as f:
+            for raw in f:
+                if not raw.strip():
+                    continue
+                try:
+                    yield json.loads(raw)
+                except ValueError:
+                    # Torn write at the tail of a crashed segment
+                    self.corrupt_lines += 1
+                    logger.warning(f"Skipping corrupt journal line in {path.name}")
+
+    def replay(self) -> Tuple[Dict[str, Any], Iterator[Dict[str, Any]]]:
+        """
+        Return the checkpoint state and an iterator over uncompacted records.
+
+        Returns:
+            (state, records) where records are yielded oldest first
+        """
+        checkpoint = self._load_checkpoint()
+        through = checkpoint.get('compacted_through', 0)
+        with self._lock:
+            self._file.flush()
+            paths = [path for seq, path in self._list_segments() if seq > through]
+
+        def records():
+            for path in paths:
+                try:
+                    yield from self._read_segment(path)
+                except FileNotFoundError:
+                    continue
+
+        return checkpoint.get('state', {}), records()
+
+    # ------------------------------------------------------------------
+    # Compaction
+    # ------------------------------------------------------------------
+
+    def _load_checkpoint(self) -> Dict[str, Any]:
+        try:
+            with open(self._checkpoint_path, 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.error(f"Unreadable journal checkpoint {self._checkpoint_path}: {e}")
+            return {}
+
+    def compactable_segments(self) -> List[Tuple[int, Path]]:
+        """Sealed segments old enough to be folded into the checkpoint."""
+        with self._lock:
+            active_seq = self._active_seq
+        cutoff = time.time() - self.compact_min_age
+        eligible = []
+        for seq, path in self._list_segments():
+            if seq >= active_seq:
+                break
+            try:
+                if path.stat().st_mtime > cutoff:
+                    break
+            except FileNotFoundError:
+                continue
+            eligible.append((seq, path))
+        return eligible
+
+    def compact(self, force: bool = False) -> int:
+        """
+        Fold eligible sealed segments into the checkpoint and delete them.
+
+        Args:
+            force: Compact even if fewer than compact_min_segments are eligible
+
+        Returns:
+            Number of segments compacted
+        """
+        if self.reducer is None:
+            return 0
+
+        with self._compact_lock:
+            segments = self.compactable_segments()
+            if not segments or (len(segments) < self.compact_min_segments and not force):
+                return 0
+
+            checkpoint = self._load_checkpoint()
+            through = checkpoint.get('compacted_through', 0)
+            state = checkpoint.get('state', {})
+            for seq, path in segments:
+                if seq <= through:
+                    continue
+                for record in self._read_segment(path):
+                    self.reducer(state, record)
+                through = seq
+
+            atomic_write_json(self._checkpoint_path, {
+                'version': 1,
+                'compacted_through': through,
+                'compacted_at': time.time(),
+                'state': state
+            }, fsync=True)
+
+            for _, path in segments:
+                try:
+                    path.unlink()
+                except FileNotFoundError:
+                    pass
+            self.compactions += 1
+            return len(segments)
+
+    def compact_async(self) -> None:
+        """Run compact() on a background thread unless one is already running."""
+        with self._lock:
+            if self._compacting:
+                return
+            self._compacting = True
+
+        def worker():
+            try:
+                self.compact()
+            except Exception as e:
+                logger.error(f"Journal compaction failed: {e}")
+            finally:
+                with self._lock:
+                    self._compacting = False
+
+        threading.Thread(target=worker, name=f'{self.prefix}-compactor', daemon=True).start()
+
+    # ------------------------------------------------------------------
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get journal statistics."""
+        segments = self._list_segments()
+        return {
+            'directory': str(self.directory),
+            'active_segment': self._active_seq,
+            'active_bytes': self._active_size,
+            'segments': len(segments),
+            'compacted_through': self._load_checkpoint().get('compacted_through', 0),
+            'appends': self.appends,
+            'rotations': self.rotations,
+            'compactions': self.compactions,
+            'corrupt_lines': self.corrupt_lines
+        }
@@ -0,0 +1,303 @@
+"""
+J1MSKY Runtime - Quote ledger
+
+Keeps running totals over recorded quotes, grouped by segment, model, ISO
+week and experiment variant. Portfolio, weekly and experiment reports then
+read counters in O(groups) instead of re-scanning every quote per call.
+
+Quotes recorded with a quote_id can later be retracted or amended; their
+contribution is remembered so it can be subtracted exactly. Anonymous
+quotes (no id) are counted but not retained, so a ledger fed only
+anonymous quotes uses memory proportional to the number of groups.
+
+Usage:
+    ledger = QuoteLedger({'task': 55.0, 'subscription': 50.0})
+    ledger.record(quote, quote_id='q-17', variant='test', experiment_id='markup-v2')
+    ledger.amend('q-17', updated_quote)
+    ledger.totals().avg_margin(), ledger.groups('segment'), ledger.compliant_count('task')
+"""
+
+import threading
+from datetime import datetime
+from typing import Any, Dict, Hashable, Iterable, Optional
+
+DIMENSIONS = ('segment', 'model', 'week', 'variant')
+
+
+class QuoteTotals:
+    """Counters for one group of quotes."""
+
+    __slots__ = ('count', 'approved', 'margin', 'revenue', 'exceptions_created',
+                 'exceptions_closed', 'compliant')
+
+    def __init__(self, thresholds: int):
+        self.count = 0
+        self.approved = 0
+        self.margin = 0.0
+        self.revenue = 0
+        self.exceptions_created = 0
+        self.exceptions_closed = 0
+        self.compliant = [0] * thresholds
+
+    @property
+    def escalated(self) -> int:
+        return self.count - self.approved
+
+    def approval_rate(self, ndigits: int = 2) -> float:
+        return round(self.approved / self.count, ndigits) if self.count else 0.0
+
+    def avg_margin(self, ndigits: int = 2) -> float:
+        return round(self.margin / self.count, ndigits) if self.count else 0.0
+
+    def _apply(self, row: '_Row', sign: int) -> None:
+        self.count += sign
+        self.approved += sign * row.approved
+        self.exceptions_created += sign * row.exception_created
+        self.exceptions_closed += sign * row.exception_closed
+        # Plain left-to-right float sums, so a ledger built in order reports
+        # exactly what a batch sum() over the same quotes would
+        if sign > 0:
+            self.margin += row.margin
+            self.revenue += row.price
+        else:
+            self.margin -= row.margin
+            self.revenue -= row.price
+        compliant = self.compliant
+        for i, flag in enumerate(row.compliant):
+            compliant[i] += sign * flag
+
+
+class _Row:
+    """One quote's contribution to the ledger."""
+
+    __slots__ = ('groups', 'approved', 'margin', 'price', 'exception_created',
+                 'exception_closed', 'compliant')
+
+    def __init__(self, groups, approved, margin, price, exception_created, exception_closed, compliant):
+        self.groups = groups
+        self.approved = approved
+        self.margin = margin
+        self.price = price
+        self.exception_created = exception_created
+        self.exception_closed = exception_closed
+        self.compliant = compliant
+
+
+def _group_key(value: Any) -> Hashable:
+    """Group by the value itself, or by its string form when it is unhashable (e.g. a list)."""
+    try:
+        hash(value)
+    except TypeError:
+        return str(value)
+    return value
+
+
+def week_of(quote: Dict[str, Any]) -> str:
+    """ISO week ('2026-W07') from the quote's 'week', 'generated_at' or 'timestamp', else now."""
+    week = quote.get('week')
+    if week:
+        return str(week)
+    stamp = quote.get('generated_at') or quote.get('timestamp')
+    try:
+        when = datetime.fromisoformat(stamp) if stamp else datetime.now()
+    except (TypeError, ValueError):
+        when = datetime.now()
+    year, week_no, _ = when.isocalendar()
+    return f"{year}-W{week_no:02d}"
+
+
+class QuoteLedger:
+    """
+    Thread-safe running totals over recorded quotes.
+
+    Quotes are flat dicts in the shape the pricing paths produce
+    (decision_status, gross_margin_pct, recommended_price, segment, model,
+    exception_created, exception_closed).
+    """
+
+    def __init__(self, thresholds: Optional[Dict[str, float]] = None, default_threshold: float = 55.0):
+        """
+        Args:
+            thresholds: delivery_type -> minimum margin pct; compliance is
+                counted per distinct threshold so any delivery type reads in O(1)
+            default_threshold: Minimum margin pct for unknown delivery types
+        """
+        self.thresholds = dict(thresholds or {'task': 55.0, 'subscription': 50.0, 'enterprise': 45.0})
+        self.default_threshold = default_threshold
+        self._levels = tuple(sorted(set(self.thresholds.values()) | {default_threshold}))
+        self._level_index = {level: i for i, level in enumerate(self._levels)}
+
+        self._overall = QuoteTotals(len(self._levels))
+        self._groups: Dict[str, Dict[Hashable, QuoteTotals]] = {dim: {} for dim in DIMENSIONS}
+        self._rows: Dict[Hashable, _Row] = {}
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.recorded = 0
+        self.retracted = 0
+        self.amended = 0
+
+    @classmethod
+    def from_quotes(cls, quotes: Iterable[Dict[str, Any]], thresholds: Optional[Dict[str, float]] = None,
+                    default_threshold: float = 55.0) -> 'QuoteLedger':
+        """Build a ledger over anonymous quotes in one pass."""
+        ledger = cls(thresholds, default_threshold)
+        for quote in quotes:
+            ledger.record(quote)
+        return ledger
+
+    def __len__(self) -> int:
+        return self._overall.count
+
+    def __contains__(self, quote_id: Hashable) -> bool:
+        return quote_id in self._rows
+
+    # ------------------------------------------------------------------
+    # Recording
+    # ------------------------------------------------------------------
+
+    def _row(self, quote: Dict[str, Any], variant: Optional[str], experiment_id: Optional[str],
+             week: Optional[str]) -> _Row:
+        margin = quote.get('gross_margin_pct', 0.0)
+        if not isinstance(margin, (int, float)):
+            raise ValueError('gross_margin_pct must be a number')
+        # Revenue is informational: a missing or non-numeric price counts as 0
+        price = quote.get('recommended_price', 0)
+        if not isinstance(price, (int, float)):
+            price = 0
+        groups = [
+            ('segment', _group_key(quote.get('segment', 'unknown'))),
+            ('model', _group_key(quote.get('model', 'unknown'))),
+            ('week', week or week_of(quote))
+        ]
+        if variant is not None:
+            groups.append(('variant', (_group_key(experiment_id), _group_key(variant))))
+        return _Row(
+            tuple(groups),
+            int(quote.get('decision_status') == 'approved'),
+            margin,
+            price,
+            int(bool(quote.get('exception_created'))),
+            int(bool(quote.get('exception_closed'))),
+            tuple(int(margin >= level) for level in self._levels)
+        )
+
+    def _apply(self, row: _Row, sign: int) -> None:
+        self._overall._apply(row, sign)
+        for dim, key in row.groups:
+            groups = self._groups[dim]
+            totals = groups.get(key)
+            if totals is None:
+                totals = groups[key] = QuoteTotals(len(self._levels))
+            totals._apply(row, sign)
+            if totals.count == 0:
+                # Drop emptied groups (and any rounding residue left by retractions)
+                del groups[key]
+        if self._overall.count == 0:
+            self._overall = QuoteTotals(len(self._levels))
+
+    def record(self, quote: Dict[str, Any], quote_id: Optional[Hashable] = None,
+               variant: Optional[str] = None, experiment_id: Optional[str] = None,
+               week: Optional[str] = None) -> Optional[Hashable]:
+        """
+        Add a quote to the running totals.
+
+        Args:
+            quote: Flat quote/decision dict
+            quote_id: Keep the contribution under this id so it can be
+                retracted or amended (recording an existing id amends it)
+            variant: Experiment variant ('control', 'test', ...)
+            experiment_id: Experiment the variant belongs to
+            week: ISO week override (default: derived from the quote)
+
+        Returns:
+            quote_id
+        """
+        row = self._row(quote, variant, experiment_id, week)
+        with self._lock:
+            if quote_id is not None:
+                previous = self._rows.get(quote_id)
+                if previous is not None:
+                    self._apply(previous, -1)
+                    self.amended += 1
+                self._rows[quote_id] = row
+            self._apply(row, 1)
+            self.recorded += 1
+        return quote_id
+
+    def retract(self, quote_id: Hashable) -> bool:
+        """Remove a recorded quote's contribution. Returns True if it existed."""
+        with self._lock:
+            row = self._rows.pop(quote_id, None)
+            if row is None:
+                return False
+            self._apply(row, -1)
+            self.retracted += 1
+            return True
+
+    def amend(self, quote_id: Hashable, quote: Dict[str, Any], variant: Optional[str] = None,
+              experiment_id: Optional[str] = None, week: Optional[str] = None) -> bool:
+        """
+        Replace a recorded quote. Returns False (and records nothing) if the id is unknown.
+
+        The experiment variant, and the week unless the new quote carries a
+        timestamp, are kept from the original record when not given.
+        """
+        previous = self._rows.get(quote_id)
+        if previous is None:
+            return False
+        prior = dict(previous.groups)
+        if variant is None and 'variant' in prior:
+            experiment_id, variant = prior['variant']
+        if week is None and not any(quote.get(k) for k in ('week', 'generated_at', 'timestamp')):
+            week = prior['week']
+        self.record(quote, quote_id, variant=variant, experiment_id=experiment_id, week=week)
+        return True
+
+    def clear(self) -> None:
+        with self._lock:
+            self._overall = QuoteTotals(len(self._levels))
+            self._groups = {dim: {} for dim in DIMENSIONS}
+            self._rows.clear()
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+
+    def totals(self, dimension: Optional[str] = None, key: Hashable = None) -> QuoteTotals:
+        """Totals for one group (or every quote when dimension is None); empty totals if absent."""
+        if dimension is None:
+            return self._overall
+        return self._groups[dimension].get(key) or QuoteTotals(len(self._levels))
+
+    def groups(self, dimension: str) -> Dict[Hashable, QuoteTotals]:
+        """Snapshot of group key -> totals for a dimension, in first-recorded order."""
+        with self._lock:
+            return dict(self._groups[dimension])
+
+    def threshold(self, delivery_type: str) -> float:
+        return self.thresholds.get(delivery_type, self.default_threshold)
+
+    def compliant_count(self, delivery_type: str = 'task', totals: Optional[QuoteTotals] = None) -> int:
+        """Quotes whose margin meets delivery_type's minimum."""
+        totals = totals or self._overall
+        return totals.compliant[self._level_index[self.threshold(delivery_type)]]
+
+    def variant_totals(self, experiment_id: Optional[str] = None) -> Dict[str, QuoteTotals]:
+        """variant -> totals for one experiment."""
+        with self._lock:
+            return {variant: totals for (exp, variant), totals in self._groups['variant'].items()
+                    if exp == experiment_id}
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get ledger statistics."""
+        with self._lock:
+            return {
+                'quotes': self._overall.count,
+                'retained_quotes': len(self._rows),
+                'groups': {dim: len(groups) for dim, groups in self._groups.items()},
+                'recorded': self.recorded,
+                'retracted': self.retracted,
+                'amended': self.amended
+            }
+
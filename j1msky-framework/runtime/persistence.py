@@ -0,0 +1,307 @@
+"""
+J1MSKY Runtime - Write-behind JSON persistence
+
+Stores keep their document in memory and call mark_dirty() after each
+mutation. A single background flusher writes dirty documents to disk once
+they have been quiet for `flush_interval` seconds, or at the latest
+`max_delay` seconds after the first unsaved change. Writes are atomic
+(temp file + rename), so a crash never leaves a half-written file.
+"""
+
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import nullcontext
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Union
+
+logger = logging.getLogger('j1msky.runtime')
+
+# Durability presets (seconds). flush_interval=0 writes synchronously.
+DURABILITY_PRESETS: Dict[str, Dict[str, Any]] = {
+    'sync': {'flush_interval': 0.0, 'max_delay': 0.0, 'fsync': True},
+    'strict': {'flush_interval': 0.5, 'max_delay': 2.0, 'fsync': True},
+    'balanced': {'flush_interval': 2.0, 'max_delay': 10.0, 'fsync': False},
+    'relaxed': {'flush_interval': 5.0, 'max_delay': 30.0, 'fsync': False},
+}
+
+# After a failed flush, retry no sooner than this, doubling per consecutive failure
+RETRY_BACKOFF_BASE = 1.0
+RETRY_BACKOFF_MAX = 60.0
+
+
+def atomic_write_json(path: Union[str, Path], data: Any, indent: Optional[int] = None,
+                      fsync: bool = False) -> None:
+    """Serialize data and atomically replace path with it."""
+    encoded = _encode(data, indent)
+    _atomic_write_bytes(Path(path), encoded, fsync)
+
+
+def _encode(data: Any, indent: Optional[int]) -> bytes:
+    if indent is None:
+        return json.dumps(data, separators=(',', ':')).encode()
+    return json.dumps(data, indent=indent).encode()
+
+
+def _atomic_write_bytes(path: Path, payload: bytes, fsync: bool) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(payload)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            tmp_path.unlink()
+        except OSError:
+            pass
+        raise
+
+
+class WriteBehindStore:
+    """
+    Debounced, atomic JSON persistence for one in-memory document.
+
+    Usage:
+        self._lock = threading.Lock()
+        self._store = WriteBehindStore(
+            path=self.storage_path / 'metrics.json',
+            snapshot=lambda: self._metrics,
+            lock=self._lock,
+            durability='relaxed'
+        )
+
+        with self._lock:
+            self._metrics['count'] += 1
+            self._store.mark_dirty()
+
+    `snapshot` returns the document to serialize and is always called with
+    `lock` held. mark_dirty() must be called with `lock` held as well.
+    `path` may be a callable for stores whose file name changes over time.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path, Callable[[], Union[str, Path]]],
+        snapshot: Callable[[], Any],
+        lock: Optional[Any] = None,
+        durability: Union[str, Dict[str, Any], None] = 'balanced',
+        flush_interval: Optional[float] = None,
+        max_delay: Optional[float] = None,
+        fsync: Optional[bool] = None,
+        indent: Optional[int] = None
+    ):
+        settings = dict(DURABILITY_PRESETS['balanced'])
+        if isinstance(durability, str):
+            settings.update(DURABILITY_PRESETS.get(durability, {}))
+        elif durability:
+            settings.update(durability)
+        if flush_interval is not None:
+            settings['flush_interval'] = flush_interval
+        if max_delay is not None:
+            settings['max_delay'] = max_delay
+        if fsync is not None:
+            settings['fsync'] = fsync
+
+        self.flush_interval = max(float(settings['flush_interval']), 0.0)
+        self.max_delay = max(float(settings['max_delay']), self.flush_interval)
+        self.fsync = bool(settings['fsync'])
+        self.indent = indent
+
+        self._path = path
+        self._snapshot = snapshot
+        self._lock = lock
+        self._state_lock = threading.Lock()
+        self._io_lock = threading.Lock()
+        self._dirty_since: Optional[float] = None
+        self._last_mark = 0.0
+        self._version = 0
+        self._written_version = 0
+        self._failures = 0
+        self._retry_at: Optional[float] = None
+
+        # Metrics
+        self.writes = 0
+        self.write_errors = 0
+        self.marks = 0
+
+        if self.flush_interval > 0:
+            _flusher.register(self)
+
+    @property
+    def path(self) -> Path:
+        return Path(self._path() if callable(self._path) else self._path)
+
+    @property
+    def dirty(self) -> bool:
+        return self._dirty_since is not None
+
+    def mark_dirty(self) -> None:
+        """Record an unsaved change (call with the owner's lock held)."""
+        now = time.monotonic()
+        with self._state_lock:
+            self._version += 1
+            self.marks += 1
+            self._last_mark = now
+            became_dirty = self._dirty_since is None
+            if became_dirty:
+                self._dirty_since = now
+            version = self._version
+
+        if self.flush_interval <= 0:
+            # Synchronous durability: caller already holds the owner's lock
+            self._write_version(self._serialize(), version)
+        elif became_dirty:
+            _flusher.wake()
+
+    def due_at(self) -> Optional[float]:
+        """Monotonic time at which the pending changes must be written."""
+        with self._state_lock:
+            if self._dirty_since is None:
+                return None
+            due = min(self._last_mark + self.flush_interval, self._dirty_since + self.max_delay)
+            if self._retry_at is not None:
+                due = max(due, self._retry_at)
+            return due
+
+    def _record_failure(self) -> None:
+        """Back off before the next background attempt."""
+        with self._state_lock:
+            self._failures += 1
+            delay = min(RETRY_BACKOFF_BASE * 2 ** (self._failures - 1), RETRY_BACKOFF_MAX)
+            self._retry_at = time.monotonic() + delay
+
+    def flush(self) -> bool:
+        """Write pending changes now. Returns True if anything was written."""
+        with self._lock if self._lock is not None else nullcontext():
+            with self._state_lock:
+                if self._dirty_since is None:
+                    return False
+                version = self._version
+            try:
+                payload = self._serialize()
+            except Exception:
+                self._record_failure()
+                raise
+        return self._write_version(payload, version)
+
+    def close(self) -> None:
+        """Flush pending changes and stop background flushing."""
+        _flusher.unregister(self)
+        self.flush()
+
+    def _serialize(self) -> bytes:
+        return _encode(self._snapshot(), self.indent)
+
+    def _write_version(self, payload: bytes, version: int) -> bool:
+        with self._io_lock:
+            if version <= self._written_version:
+                return False
+            try:
+                _atomic_write_bytes(self.path, payload, self.fsync)
+            except OSError as e:
+                self.write_errors += 1
+                logger.error(f"Write-behind flush failed for {self.path}: {e}")
+                self._record_failure()
+                return False
+            self._written_version = version
+            self.writes += 1
+
+        with self._state_lock:
+            self._failures = 0
+            self._retry_at = None
+            if self._version == version:
+                self._dirty_since = None
+        return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get persistence statistics."""
+        return {
+            'path': str(self.path),
+            'dirty': self.dirty,
+            'flush_interval': self.flush_interval,
+            'max_delay': self.max_delay,
+            'fsync': self.fsync,
+            'marks': self.marks,
+            'writes': self.writes,
+            'write_errors': self.write_errors,
+            'consecutive_failures': self._failures,
+            'coalesced': max(self.marks - self.writes, 0)
+        }
+
+
+class _Flusher:
+    """Single background thread that flushes every registered store."""
+
+    def __init__(self):
+        self._stores = []
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+
+    def register(self, store: WriteBehindStore) -> None:
+        with self._cond:
+            self._stores.append(store)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='j1msky-flusher', daemon=True)
+                self._thread.start()
+
+    def unregister(self, store: WriteBehindStore) -> None:
+        with self._cond:
+            if store in self._stores:
+                self._stores.remove(store)
+
+    def wake(self) -> None:
+        with self._cond:
+            self._cond.notify()
+
+    def stores(self):
+        with self._cond:
+            return list(self._stores)
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                now = time.monotonic()
+                due = []
+                next_due = None
+                for store in self._stores:
+                    at = store.due_at()
+                    if at is None:
+                        continue
+                    if at <= now:
+                        due.append(store)
+                    elif next_due is None or at < next_due:
+                        next_due = at
+                if not due:
+                    self._cond.wait(None if next_due is None else next_due - now)
+                    continue
+
+            for store in due:
+                try:
+                    store.flush()
+                except Exception as e:
+                    logger.error(f"Write-behind flusher error: {e}")
+
+
+_flusher = _Flusher()
+
+
+def flush_all() -> int:
+    """Flush every registered store. Returns number of stores written."""
+    written = 0
+    for store in _flusher.stores():
+        try:
+            if store.flush():
+                written += 1
+        except Exception as e:
+            logger.error(f"Flush on shutdown failed for {store.path}: {e}")
+    return written
+
+
+atexit.register(flush_all)
@@ -0,0 +1,261 @@
+"""
+J1MSKY Runtime - Columnar quote engine
+
+Prices whole batches of quotes at once from parallel columns (model,
+complexity, segment, token counts) instead of building several dicts per
+row. Results are column lists that round-trip to exactly the values the
+scalar quoting paths produce:
+
+    UnifiedOrchestrator.recommend_task_price / evaluate_pricing_guardrails
+    CostTracker.recommend_task_quote / evaluate_margin_guardrail
+
+NumPy is used when installed. Without it the same arithmetic runs as a
+tight pure-Python loop over precomputed tables, which gives identical
+results more slowly.
+
+Python's round() is correctly rounded while numpy.round() scales, rounds
+and unscales. The two agree except when the scaled value sits within an ulp
+of a .5 boundary, so those few elements are re-rounded with round().
+"""
+
+import json
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # optional: pure-Python fallback below
+    np = None
+
+Columns = Dict[str, List[Any]]
+
+# Scaled values closer than this to a .5 boundary are re-rounded exactly
+_ROUND_GUARD = 1e-6
+
+
+class QuotePolicy:
+    """
+    Pricing rules for one quoting path.
+
+    Args:
+        rates: model -> (input cost per 1k tokens, output cost per 1k tokens)
+        complexity_markup: complexity -> base markup
+        default_markup: Base markup for unknown complexities
+        segment_adjustments: segment -> markup adjustment (unknown segments: 0.0)
+        minimum_price: Floor for the customer price
+        min_markup / max_markup: Clamp for the final markup (None: no clamp)
+        margin_on_rounded_price: Compute margin from the price rounded to cents
+            (CostTracker) instead of the unrounded price (orchestrator)
+        guardrail_thresholds: delivery_type -> minimum margin pct
+        default_threshold: Minimum margin pct for unknown delivery types
+    """
+
+    def __init__(
+        self,
+        rates: Dict[str, Tuple[float, float]],
+        complexity_markup: Dict[str, float],
+        default_markup: float,
+        segment_adjustments: Dict[str, float],
+        minimum_price: float,
+        min_markup: Optional[float] = None,
+        max_markup: Optional[float] = None,
+        margin_on_rounded_price: bool = False,
+        guardrail_thresholds: Optional[Dict[str, float]] = None,
+        default_threshold: float = 55.0
+    ):
+        self.rates = dict(rates)
+        self.complexity_markup = dict(complexity_markup)
+        self.default_markup = default_markup
+        self.segment_adjustments = dict(segment_adjustments)
+        self.minimum_price = minimum_price
+        self.min_markup = min_markup
+        self.max_markup = max_markup
+        self.margin_on_rounded_price = margin_on_rounded_price
+        self.guardrail_thresholds = dict(guardrail_thresholds or {'task': 55.0, 'subscription': 50.0, 'enterprise': 45.0})
+        self.default_threshold = default_threshold
+
+        # The scalar paths pass ints from config straight through to the output
+        # (e.g. a minimum_price of 1 prices as 1, not 1.0); the NumPy path would
+        # turn them into floats, so it is only used when every figure is a float.
+        figures = [default_markup, minimum_price, min_markup, max_markup, default_threshold]
+        figures += list(self.complexity_markup.values()) + list(self.segment_adjustments.values())
+        figures += list(self.guardrail_thresholds.values())
+        self.float_only = all(v is None or isinstance(v, float) for v in figures)
+
+    def markup(self, complexity: str, segment: str) -> Tuple[float, float, float]:
+        """(base_markup, segment_adjustment, final_markup) exactly as the scalar path computes them."""
+        base = self.complexity_markup.get(complexity, self.default_markup)
+        adj = self.segment_adjustments.get(segment, 0.0)
+        markup = base + adj
+        if self.min_markup is not None and self.max_markup is not None:
+            markup = min(max(markup, self.min_markup), self.max_markup)
+        return base, adj, markup
+
+    def threshold(self, delivery_type: str) -> float:
+        return self.guardrail_thresholds.get(delivery_type, self.default_threshold)
+
+
+def numpy_available() -> bool:
+    return np is not None
+
+
+def price_quotes(
+    policy: QuotePolicy,
+    models: Sequence[str],
+    complexities: Sequence[str],
+    segments: Sequence[str],
+    input_tokens: Sequence[int],
+    output_tokens: Optional[Sequence[int]] = None,
+    delivery_types: Any = 'task',
+    use_numpy: Optional[bool] = None
+) -> Columns:
+    """
+    Price a batch of validated quote rows.
+
+    Every model must appear in policy.rates. `delivery_types` is either one
+    delivery type for the whole batch or a sequence with one per row.
+
+    Returns:
+        Columns: internal_cost, base_markup, segment_adjustment, final_markup,
+        recommended_price, gross_margin_pct, margin_band, minimum_margin_pct,
+        is_compliant (one list entry per row)
+    """
+    n = len(models)
+    if output_tokens is None:
+        output_tokens = [0] * n
+    if isinstance(delivery_types, str):
+        thresholds: Any = policy.threshold(delivery_types)
+    else:
+        thresholds = [policy.threshold(d) for d in delivery_types]
+
+    if use_numpy is None:
+        use_numpy = np is not None and n >= 64 and policy.float_only
+    if use_numpy and (np is None or not policy.float_only):
+        raise RuntimeError("NumPy path unavailable (not installed, or policy has non-float figures)")
+    if use_numpy:
+        return _price_numpy(policy, models, complexities, segments, input_tokens, output_tokens, thresholds)
+    return _price_python(policy, models, complexities, segments, input_tokens, output_tokens, thresholds)
+
+
+def _markup_table(policy: QuotePolicy, complexities: Iterable[str], segments: Iterable[str]):
+    return {(c, s): policy.markup(c, s) for c in set(complexities) for s in set(segments)}
+
+
+def _price_python(policy, models, complexities, segments, input_tokens, output_tokens, thresholds) -> Columns:
+    rates = policy.rates
+    markups = _markup_table(policy, complexities, segments)
+    minimum_price = policy.minimum_price
+    on_rounded = policy.margin_on_rounded_price
+    per_row_threshold = isinstance(thresholds, list)
+
+    cols: Columns = {key: [] for key in (
+        'internal_cost', 'base_markup', 'segment_adjustment', 'final_markup', 'recommended_price',
+        'gross_margin_pct', 'margin_band', 'minimum_margin_pct', 'is_compliant'
+    )}
+    internal_cost = cols['internal_cost'].append
+    base_markup = cols['base_markup'].append
+    segment_adjustment = cols['segment_adjustment'].append
+    final_markup = cols['final_markup'].append
+    recommended_price = cols['recommended_price'].append
+    gross_margin = cols['gross_margin_pct'].append
+    margin_band = cols['margin_band'].append
+    minimum_margin = cols['minimum_margin_pct'].append
+    is_compliant = cols['is_compliant'].append
+
+    for i, (model, complexity, segment, tokens_in, tokens_out) in enumerate(
+            zip(models, complexities, segments, input_tokens, output_tokens)):
+        rate_in, rate_out = rates[model]
+        base, adj, markup = markups[(complexity, segment)]
+        cost = round((tokens_in / 1000) * rate_in + (tokens_out / 1000) * rate_out, 4)
+        price = max(cost * markup, minimum_price)
+        if on_rounded:
+            price = round(price, 2)
+        margin = round(((price - cost) / price) * 100, 2) if price else 0.0
+        threshold = thresholds[i] if per_row_threshold else thresholds
+
+        internal_cost(cost)
+        base_markup(base)
+        segment_adjustment(adj)
+        final_markup(round(markup, 2))
+        recommended_price(round(price, 2))
+        gross_margin(margin)
+        margin_band('strong' if margin >= 70 else 'healthy' if margin >= 55 else 'at_risk')
+        minimum_margin(threshold)
+        is_compliant(margin >= threshold)
+    return cols
+
+
+def _exact_round(values, ndigits: int):
+    """numpy.round with Python round() semantics."""
+    rounded = np.round(values, ndigits)
+    scaled = values * (10.0 ** ndigits)
+    near_half = np.abs(scaled - np.floor(scaled) - 0.5) < _ROUND_GUARD
+    if near_half.any():
+        idx = np.nonzero(near_half)[0]
+        rounded[idx] = [round(float(v), ndigits) for v in values[idx]]
+    return rounded
+
+
+def _codes(values: Sequence[str]):
+    """Dictionary-encode a string column: (distinct values, per-row codes)."""
+    index: Dict[str, int] = {}
+    codes = np.fromiter((index.setdefault(v, len(index)) for v in values), dtype=np.intp, count=len(values))
+    return list(index), codes
+
+
+def _price_numpy(policy, models, complexities, segments, input_tokens, output_tokens, thresholds) -> Columns:
+    model_values, model_codes = _codes(models)
+    rate_table = np.asarray([policy.rates[m] for m in model_values], dtype=np.float64).reshape(-1, 2)
+    rate_in = rate_table[model_codes, 0]
+    rate_out = rate_table[model_codes, 1]
+
+    complexity_values, complexity_codes = _codes(complexities)
+    segment_values, segment_codes = _codes(segments)
+    markup_table = np.asarray(
+        [[policy.markup(c, s) for s in segment_values] for c in complexity_values], dtype=np.float64
+    ).reshape(len(complexity_values), len(segment_values), 3)
+    markups = markup_table[complexity_codes, segment_codes]
+    base, adj, markup = markups[:, 0], markups[:, 1], markups[:, 2]
+
+    tokens_in = np.asarray(input_tokens, dtype=np.float64)
+    tokens_out = np.asarray(output_tokens, dtype=np.float64)
+    cost = _exact_round((tokens_in / 1000) * rate_in + (tokens_out / 1000) * rate_out, 4)
+    price = np.maximum(cost * markup, policy.minimum_price)
+    if policy.margin_on_rounded_price:
+        price = _exact_round(price, 2)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        margin = np.where(price != 0, _exact_round(((price - cost) / price) * 100, 2), 0.0)
+
+    threshold = np.broadcast_to(np.asarray(thresholds, dtype=np.float64), margin.shape)
+    band = np.where(margin >= 70, 'strong', np.where(margin >= 55, 'healthy', 'at_risk'))
+
+    return {
+        'internal_cost': cost.tolist(),
+        'base_markup': base.tolist(),
+        'segment_adjustment': adj.tolist(),
+        'final_markup': _exact_round(markup, 2).tolist(),
+        'recommended_price': _exact_round(price, 2).tolist(),
+        'gross_margin_pct': margin.tolist(),
+        'margin_band': band.tolist(),
+        'minimum_margin_pct': threshold.tolist(),
+        'is_compliant': (margin >= threshold).tolist()
+    }
+
+
+def iter_rows(columns: Dict[str, Sequence[Any]], keys: Sequence[Tuple[str, str]]) -> Iterator[Dict[str, Any]]:
+    """
+    Yield one dict per row.
+
+    Args:
+        columns: Column lists of equal length
+        keys: (output key, column name) pairs, in output order
+    """
+    names = [name for name, _ in keys]
+    for values in zip(*(columns[column] for _, column in keys)):
+        yield dict(zip(names, values))
+
+
+def iter_ndjson(rows: Iterable[Dict[str, Any]]) -> Iterator[bytes]:
+    """Encode rows as newline-delimited JSON, one bytes line per row."""
+    encode = json.JSONEncoder().encode
+    for row in rows:
+        yield encode(row).encode() + b'\n'
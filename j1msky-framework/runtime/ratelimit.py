@@ -0,0 +1,404 @@
+"""
+J1MSKY Runtime - Rate limiting
+
+Two thread-safe limiters with the same interface:
+
+    TokenBucket      smooth refill at limit/window per second, bounded burst
+    SlidingLogLimiter  at most `limit` events in any trailing `window` seconds
+
+Both keep their state in a small array of doubles. By default it lives in
+process memory; pass `shared_dir` to keep it in an mmap'd file instead, so
+every process on the host that opens the same limiter draws from one budget
+(guarded by flock). Rejections take a lock-free peek first, so a saturated
+limiter costs callers almost nothing.
+"""
+
+import fcntl
+import logging
+import mmap
+import os
+import re
+import struct
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Tuple, Union
+
+logger = logging.getLogger('j1msky.runtime')
+
+_MAGIC = 0x4A314D52  # 'J1MR'
+_HEADER = struct.Struct('<IIQ')  # magic, slot count, reserved
+_SLOT = struct.Struct('<d')
+
+
+class _LocalState:
+    """Limiter state held in process memory."""
+
+    shared = False
+
+    def __init__(self, size: int, initial: Iterable[float]):
+        self._values = list(initial)
+        assert len(self._values) == size
+        self._lock = threading.Lock()
+
+    def get(self, i: int) -> float:
+        return self._values[i]
+
+    def set(self, i: int, value: float) -> None:
+        self._values[i] = value
+
+    @contextmanager
+    def guard(self):
+        with self._lock:
+            yield
+
+    def close(self) -> None:
+        pass
+
+
+class _MmapState:
+    """Limiter state held in an mmap'd file shared by every process on the host."""
+
+    shared = True
+
+    def __init__(self, path: Path, size: int, initial: Iterable[float]):
+        self.path = path
+        self._lock = threading.Lock()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        length = _HEADER.size + size * _SLOT.size
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            if os.fstat(self._fd).st_size != length:
+                os.ftruncate(self._fd, length)
+            self._map = mmap.mmap(self._fd, length)
+            magic, slots, _ = _HEADER.unpack_from(self._map, 0)
+            if magic != _MAGIC or slots != size:
+                # First user (or incompatible layout): initialize
+                for i, value in enumerate(initial):
+                    _SLOT.pack_into(self._map, _HEADER.size + i * _SLOT.size, value)
+                _HEADER.pack_into(self._map, 0, _MAGIC, size, 0)
+                self._map.flush()
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def get(self, i: int) -> float:
+        return _SLOT.unpack_from(self._map, _HEADER.size + i * _SLOT.size)[0]
+
+    def set(self, i: int, value: float) -> None:
+        _SLOT.pack_into(self._map, _HEADER.size + i * _SLOT.size, value)
+
+    @contextmanager
+    def guard(self):
+        with self._lock:
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def close(self) -> None:
+        try:
+            self._map.close()
+        finally:
+            os.close(self._fd)
+
+
+class RateLimiter:
+    """
+    Base class: subclasses implement _try(n, now) and _peek(n, now).
+
+    try_acquire(n) takes n permits if available without blocking.
+    acquire(n, timeout) blocks until the permits are granted or the timeout
+    expires (timeout=None waits indefinitely).
+    """
+
+    algorithm = 'base'
+
+    def __init__(self, name: str, limit: int, window: float,
+                 shared_dir: Optional[Union[str, Path]] = None):
+        if limit <= 0 or window <= 0:
+            raise ValueError("limit and window must be positive")
+        self.name = name
+        self.limit = int(limit)
+        self.window = float(window)
+        size, initial = self._layout()
+        if shared_dir:
+            safe = re.sub(r'[^A-Za-z0-9_.-]', '_', name)
+            path = Path(shared_dir) / f"{safe}.{self.algorithm}.{self.limit}-{int(self.window)}.bin"
+            self._state = _MmapState(path, size, initial)
+        else:
+            self._state = _LocalState(size, initial)
+
+        # Metrics
+        self.granted = 0
+        self.rejected = 0
+
+    @property
+    def shared(self) -> bool:
+        return self._state.shared
+
+    def _layout(self) -> Tuple[int, Iterable[float]]:
+        raise NotImplementedError
+
+    def _try(self, n: int, now: float) -> Tuple[bool, float]:
+        raise NotImplementedError
+
+    def _peek(self, n: int, now: float) -> float:
+        """Seconds until n permits could be granted (0 if available now)."""
+        raise NotImplementedError
+
+    def _available(self, now: float) -> int:
+        raise NotImplementedError
+
+    def try_acquire(self, n: int = 1) -> bool:
+        """Take n permits now if available."""
+        ok, _ = self._attempt(n)
+        return ok
+
+    def acquire(self, n: int = 1, timeout: Optional[float] = None) -> bool:
+        """
+        Take n permits, waiting up to `timeout` seconds for them.
+
+        Returns:
+            True if granted, False on timeout
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            ok, wait = self._attempt(n, peek=False)
+            if ok:
+                return True
+            if wait == float('inf'):
+                return False
+            if deadline is not None:
+                left = deadline - time.monotonic()
+                if left <= 0:
+                    return False
+                wait = min(wait, left)
+            time.sleep(max(wait, 0.001))
+
+    def _attempt(self, n: int, peek: bool = True) -> Tuple[bool, float]:
+        if n > self.limit:
+            self.rejected += 1
+            return False, float('inf')
+        if peek:
+            # Lock-free peek: reject without touching the lock when saturated.
+            # A racing grant can make this read stale, so blocking callers
+            # skip it to get an exact wait time.
+            wait = self._peek(n, time.time())
+            if wait > 0:
+                self.rejected += 1
+                return False, wait
+        with self._state.guard():
+            ok, wait = self._try(n, time.time())
+        if ok:
+            self.granted += n
+        else:
+            self.rejected += 1
+        return ok, wait
+
+    def available(self, n: int = 1) -> bool:
+        """
+        Lock-free check whether n permits could be granted now.
+
+        Suitable for routing decisions; a concurrent grant can make the
+        answer momentarily stale, so callers that must hold the permits
+        should use try_acquire().
+        """
+        return n <= self.limit and self._peek(n, time.time()) <= 0
+
+    def remaining(self) -> int:
+        """Permits available right now."""
+        with self._state.guard():
+            return self._available(time.time())
+
+    def used(self) -> int:
+        """Permits consumed within the current window."""
+        return self.limit - self.remaining()
+
+    def retry_after(self, n: int = 1) -> float:
+        """Seconds until n permits become available."""
+        if n > self.limit:
+            return float('inf')
+        with self._state.guard():
+            return self._peek(n, time.time())
+
+    def preload(self, timestamps: Iterable[float]) -> None:
+        """Replay past grants (epoch seconds, oldest first) into a fresh limiter."""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        self._state.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get limiter statistics."""
+        return {
+            'name': self.name,
+            'algorithm': self.algorithm,
+            'limit': self.limit,
+            'window': self.window,
+            'remaining': self.remaining(),
+            'retry_after': round(self.retry_after(), 3),
+            'shared': self.shared,
+            'granted': self.granted,
+            'rejected': self.rejected
+        }
+
+
+class TokenBucket(RateLimiter):
+    """
+    Token bucket refilling limit/window tokens per second.
+
+    `burst` caps how many tokens can accumulate (default: limit), so unlike a
+    fixed window the budget is spread over the window instead of being
+    available all at once after every reset.
+    """
+
+    algorithm = 'token_bucket'
+
+    # State slots
+    _TOKENS, _STAMP = 0, 1
+
+    def __init__(self, name: str, limit: int, window: float, burst: Optional[int] = None,
+                 shared_dir: Optional[Union[str, Path]] = None):
+        self.burst = int(burst) if burst else int(limit)
+        self.rate = limit / window
+        super().__init__(name, limit, window, shared_dir)
+
+    def _layout(self):
+        return 2, (float(self.burst), time.time())
+
+    def _level(self, now: float) -> float:
+        tokens = self._state.get(self._TOKENS)
+        elapsed = max(now - self._state.get(self._STAMP), 0.0)
+        return min(self.burst, tokens + elapsed * self.rate)
+
+    def _peek(self, n, now):
+        missing = n - self._level(now)
+        return 0.0 if missing <= 0 else missing / self.rate
+
+    def _try(self, n, now):
+        tokens = self._level(now)
+        if tokens >= n:
+            self._state.set(self._TOKENS, tokens - n)
+            self._state.set(self._STAMP, now)
+            return True, 0.0
+        return False, (n - tokens) / self.rate
+
+    def _attempt(self, n, peek=True):
+        if n > self.burst:
+            self.rejected += 1
+            return False, float('inf')
+        return super()._attempt(n, peek)
+
+    def available(self, n: int = 1) -> bool:
+        return n <= self.burst and self._peek(n, time.time()) <= 0
+
+    def _available(self, now):
+        return int(self._level(now))
+
+    def used(self) -> int:
+        return self.burst - self.remaining()
+
+    def retry_after(self, n: int = 1) -> float:
+        if n > self.burst:
+            return float('inf')
+        with self._state.guard():
+            return self._peek(n, time.time())
+
+    def preload(self, timestamps):
+        with self._state.guard():
+            tokens, stamp = float(self.burst), None
+            for ts in timestamps:
+                if stamp is not None:
+                    tokens = min(self.burst, tokens + max(ts - stamp, 0.0) * self.rate)
+                tokens = max(tokens - 1, 0.0)
+                stamp = ts
+            if stamp is not None:
+                self._state.set(self._TOKENS, tokens)
+                self._state.set(self._STAMP, stamp)
+
+
+class SlidingLogLimiter(RateLimiter):
+    """
+    Exact sliding-window limiter: at most `limit` grants in any `window` seconds.
+
+    Grant times are kept in a fixed ring of `limit` slots ordered oldest
+    first from `head`, so checking and recording a grant is O(n) in the
+    permits requested, not in the window size.
+    """
+
+    algorithm = 'sliding_log'
+
+    # State slots: [head, ring...]
+    _HEAD = 0
+
+    def _layout(self):
+        return self.limit + 1, [0.0] * (self.limit + 1)
+
+    def _slot(self, head: int, offset: int) -> int:
+        return 1 + (head + offset) % self.limit
+
+    def _peek(self, n, now):
+        head = int(self._state.get(self._HEAD))
+        # The n-th oldest grant must have left the window
+        expires = self._state.get(self._slot(head, n - 1)) + self.window
+        return max(expires - now, 0.0)
+
+    def _try(self, n, now):
+        wait = self._peek(n, now)
+        if wait > 0:
+            return False, wait
+        head = int(self._state.get(self._HEAD))
+        for i in range(n):
+            self._state.set(self._slot(head, i), now)
+        self._state.set(self._HEAD, float((head + n) % self.limit))
+        return True, 0.0
+
+    def _available(self, now):
+        head = int(self._state.get(self._HEAD))
+        cutoff = now - self.window
+        # Ring is chronological from head: binary search for the first live grant
+        lo, hi = 0, self.limit
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._state.get(self._slot(head, mid)) <= cutoff:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def preload(self, timestamps):
+        stamps = list(timestamps)[-self.limit:]
+        with self._state.guard():
+            head = int(self._state.get(self._HEAD))
+            for i, ts in enumerate(stamps):
+                self._state.set(self._slot(head, i), ts)
+            self._state.set(self._HEAD, float((head + len(stamps)) % self.limit))
+
+
+ALGORITHMS = {
+    TokenBucket.algorithm: TokenBucket,
+    SlidingLogLimiter.algorithm: SlidingLogLimiter,
+}
+
+
+def create_limiter(name: str, limit: int, window: float = 3600,
+                   algorithm: str = 'sliding_log',
+                   shared_dir: Optional[Union[str, Path]] = None,
+                   **kwargs) -> RateLimiter:
+    """
+    Build a limiter by algorithm name.
+
+    Args:
+        name: Budget name; limiters sharing a name and shared_dir share state
+        limit: Permits per window
+        window: Window length in seconds
+        algorithm: 'sliding_log' or 'token_bucket'
+        shared_dir: Directory for the mmap'd state (e.g. /dev/shm/j1msky-ratelimit)
+    """
+    cls = ALGORITHMS.get(algorithm)
+    if cls is None:
+        raise ValueError(f"Unknown rate limit algorithm: {algorithm}")
+    return cls(name, limit, window, shared_dir=shared_dir, **kwargs)
@@ -0,0 +1,258 @@
+"""
+J1MSKY Runtime - Streaming sketches
+
+QuantileSketch is a DDSketch: positive values are counted in logarithmic
+buckets whose width grows with the value, so any quantile is answered
+within a fixed relative error (1% by default) from a bounded array of
+counters, however many values were added. Adding a value is one log() and
+one list increment.
+
+Memory is capped at `max_bins` buckets. Past that the lowest buckets are
+merged, which only costs accuracy on the smallest values (the high
+percentiles that matter for latency stay exact to `relative_accuracy`).
+With 1% accuracy, 1µs to 1 hour of milliseconds fits in ~1200 buckets.
+
+Usage:
+    sketch = QuantileSketch()
+    sketch.add(12.5)
+    sketch.quantile(0.99)
+    QuantileSketch.from_dict(sketch.to_dict())
+
+DistinctCounter is a HyperLogLog: it counts distinct items (e.g. users
+exposed to an experiment) from 2^precision one-byte registers, about 1.6%
+standard error at the default 4096 registers, and stays exact-ish for small
+counts via linear counting. Adding an item is one register compare.
+
+Usage:
+    users = DistinctCounter()
+    users.add_hash(hash64_of_user_id)
+    users.estimate()
+"""
+
+import base64
+import math
+import zlib
+from typing import Any, Dict, Iterable, List, Optional
+
+# Values at or below this are counted as zero
+_MIN_VALUE = 1e-9
+
+
+class QuantileSketch:
+    """Fixed-memory quantile estimates with bounded relative error. Not thread-safe."""
+
+    __slots__ = ('relative_accuracy', 'max_bins', 'count', 'zero_count', '_gamma', '_log_gamma',
+                 '_offset', '_bins')
+
+    def __init__(self, relative_accuracy: float = 0.01, max_bins: int = 2048):
+        """
+        Args:
+            relative_accuracy: Quantile estimates are within this fraction of the true value
+            max_bins: Bucket cap; the lowest buckets are merged beyond it
+        """
+        if not 0 < relative_accuracy < 1:
+            raise ValueError('relative_accuracy must be between 0 and 1')
+        self.relative_accuracy = relative_accuracy
+        self.max_bins = max(int(max_bins), 16)
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self.count = 0
+        self.zero_count = 0
+        self._offset = 0  # bucket key of _bins[0]
+        self._bins: List[int] = []
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _value(self, key: int) -> float:
+        # Midpoint (in relative terms) of bucket (gamma^(key-1), gamma^key]
+        return 2 * self._gamma ** key / (self._gamma + 1)
+
+    def _add_key(self, key: int, weight: int) -> None:
+        bins = self._bins
+        if not bins:
+            self._offset = key
+            bins.append(weight)
+            return
+        index = key - self._offset
+        if index < 0:
+            if len(bins) - index > self.max_bins:
+                # Below a full range: fold into the lowest bucket kept
+                bins[0] += weight
+                return
+            bins[:0] = [0] * -index
+            self._offset = key
+            index = 0
+        elif index >= len(bins):
+            bins.extend([0] * (index - len(bins) + 1))
+        bins[index] += weight
+        if len(bins) > self.max_bins:
+            self._collapse()
+
+    def _collapse(self) -> None:
+        bins = self._bins
+        excess = len(bins) - self.max_bins
+        merged = sum(bins[:excess + 1])
+        del bins[:excess]
+        bins[0] = merged
+        self._offset += excess
+
+    def add(self, value: float, weight: int = 1) -> None:
+        """Count a value (negative values count as zero)."""
+        self.count += weight
+        if value <= _MIN_VALUE:
+            self.zero_count += weight
+        else:
+            self._add_key(math.ceil(math.log(value) / self._log_gamma), weight)
+
+    def extend(self, values: Iterable[float]) -> None:
+        for value in values:
+            self.add(value)
+
+    def merge(self, other: 'QuantileSketch') -> None:
+        """Add another sketch's counts (same relative_accuracy required)."""
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError('Cannot merge sketches with different relative_accuracy')
+        self.count += other.count
+        self.zero_count += other.zero_count
+        for i, weight in enumerate(other._bins):
+            if weight:
+                self._add_key(other._offset + i, weight)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Estimate the value at quantile q (0..1) by nearest rank, or None if empty.
+
+        Rank is min(int(q * count), count - 1), i.e. sorted(values)[rank].
+        """
+        if self.count == 0:
+            return None
+        rank = min(int(max(q, 0.0) * self.count), self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return 0.0
+        for i, weight in enumerate(self._bins):
+            seen += weight
+            if rank < seen:
+                return self._value(self._offset + i)
+        return self._value(self._offset + len(self._bins) - 1)
+
+    def quantiles(self, qs: Iterable[float]) -> List[Optional[float]]:
+        """Several quantiles in one pass over the buckets."""
+        qs = list(qs)
+        if self.count == 0:
+            return [None] * len(qs)
+        ranks = sorted((min(int(max(q, 0.0) * self.count), self.count - 1), j) for j, q in enumerate(qs))
+        out: List[Optional[float]] = [None] * len(qs)
+        seen = self.zero_count
+        pos = 0
+        while pos < len(ranks) and ranks[pos][0] < seen:
+            out[ranks[pos][1]] = 0.0
+            pos += 1
+        for i, weight in enumerate(self._bins):
+            if pos >= len(ranks):
+                break
+            seen += weight
+            while pos < len(ranks) and ranks[pos][0] < seen:
+                out[ranks[pos][1]] = self._value(self._offset + i)
+                pos += 1
+        last = self._value(self._offset + len(self._bins) - 1) if self._bins else 0.0
+        return [last if v is None else v for v in out]
+
+    def clear(self) -> None:
+        self.count = 0
+        self.zero_count = 0
+        self._offset = 0
+        self._bins = []
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Compact JSON-able form (leading/trailing empty buckets trimmed)."""
+        bins = self._bins
+        start = 0
+        while start < len(bins) and not bins[start]:
+            start += 1
+        end = len(bins)
+        while end > start and not bins[end - 1]:
+            end -= 1
+        return {
+            'alpha': self.relative_accuracy,
+            'count': self.count,
+            'zero': self.zero_count,
+            'offset': self._offset + start,
+            'bins': bins[start:end]
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], max_bins: int = 2048) -> 'QuantileSketch':
+        sketch = cls(data.get('alpha', 0.01), max_bins)
+        sketch.zero_count = int(data.get('zero', 0))
+        sketch.count = sketch.zero_count
+        offset = int(data.get('offset', 0))
+        for i, weight in enumerate(data.get('bins', [])):
+            if weight:
+                sketch.count += weight
+                sketch._add_key(offset + i, int(weight))
+        return sketch
+
+
+class DistinctCounter:
+    """HyperLogLog distinct count over 64-bit hashes. Not thread-safe."""
+
+    __slots__ = ('precision', '_registers')
+
+    def __init__(self, precision: int = 12):
+        """
+        Args:
+            precision: log2 of the register count (4-16); error is about 1.04 / sqrt(2^precision)
+        """
+        if not 4 <= precision <= 16:
+            raise ValueError('precision must be between 4 and 16')
+        self.precision = precision
+        self._registers = bytearray(1 << precision)
+
+    def add_hash(self, value: int) -> bool:
+        """
+        Count an item by its uniformly distributed 64-bit hash.
+
+        Returns:
+            True if the sketch changed (callers can skip persisting otherwise)
+        """
+        p = self.precision
+        rest_bits = 64 - p
+        index = (value >> rest_bits) & ((1 << p) - 1)
+        rank = rest_bits - (value & ((1 << rest_bits) - 1)).bit_length() + 1
+        if rank > self._registers[index]:
+            self._registers[index] = rank
+            return True
+        return False
+
+    def merge(self, other: 'DistinctCounter') -> None:
+        """Union with another counter of the same precision."""
+        if other.precision != self.precision:
+            raise ValueError('Cannot merge counters with different precision')
+        self._registers = bytearray(map(max, self._registers, other._registers))
+
+    def estimate(self) -> int:
+        m = len(self._registers)
+        zeros = self._registers.count(0)
+        if zeros == m:
+            return 0
+        raw = (0.7213 / (1 + 1.079 / m)) * m * m / sum(2.0 ** -r for r in self._registers)
+        if raw <= 2.5 * m and zeros:
+            return round(m * math.log(m / zeros))  # linear counting for small cardinalities
+        return round(raw)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Compact JSON-able form (registers compressed and base64-encoded)."""
+        return {
+            'p': self.precision,
+            'registers': base64.b64encode(zlib.compress(bytes(self._registers))).decode('ascii')
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'DistinctCounter':
+        counter = cls(int(data.get('p', 12)))
+        registers = zlib.decompress(base64.b64decode(data['registers']))
+        if len(registers) == len(counter._registers):
+            counter._registers = bytearray(registers)
+        return counter
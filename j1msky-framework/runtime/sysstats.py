@@ -0,0 +1,290 @@
+"""
+J1MSKY Runtime - Shared system-stats sampler
+
+One background thread per process reads /proc, /sys and os.statvfs at a
+fixed rate and publishes each sample as an immutable-by-convention dict.
+Dashboards and agents call latest() instead of reading /proc themselves,
+so a page render or status poll costs an attribute read rather than a
+handful of file reads plus `df` and `ps` forks.
+
+Usage:
+    from runtime.sysstats import get_sampler
+    stats = get_sampler().latest()
+    stats['temp'], stats['load'], stats['mem_pct'], stats['disk_free_h']
+    any('replicate' in cmd for cmd in stats['python_cmdlines'])
+"""
+
+import logging
+import math
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger('j1msky.runtime')
+
+DEFAULT_INTERVAL = float(os.environ.get('J1MSKY_STATS_INTERVAL', '2.0'))
+DEFAULT_HISTORY = int(os.environ.get('J1MSKY_STATS_HISTORY', '300'))
+
+THERMAL_PATH = '/sys/class/thermal/thermal_zone0/temp'
+
+
+def format_bytes_h(num: float) -> str:
+    """Human-readable size in the style of `df -h` (e.g. 4.2G, 117G)."""
+    for unit in ('B', 'K', 'M', 'G', 'T'):
+        if num < 1024 or unit == 'T':
+            break
+        num /= 1024.0
+    if unit == 'B':
+        return f"{int(num)}B"
+    return f"{num:.1f}{unit}" if num < 10 else f"{num:.0f}{unit}"
+
+
+def format_uptime(seconds: float) -> str:
+    """Format seconds as '12h 05m'."""
+    return f"{int(seconds // 3600)}h {int((seconds % 3600) // 60):02d}m"
+
+
+def _read_first_line(path: str) -> Optional[str]:
+    try:
+        with open(path, 'r') as f:
+            return f.readline()
+    except OSError:
+        return None
+
+
+def _read_meminfo() -> Dict[str, int]:
+    fields = {}
+    try:
+        with open('/proc/meminfo', 'r') as f:
+            for line in f:
+                key, _, rest = line.partition(':')
+                parts = rest.split()
+                if parts:
+                    fields[key] = int(parts[0])
+    except (OSError, ValueError):
+        pass
+    return fields
+
+
+def _read_cpu_times() -> Optional[List[int]]:
+    line = _read_first_line('/proc/stat')
+    if not line or not line.startswith('cpu '):
+        return None
+    try:
+        return [int(v) for v in line.split()[1:]]
+    except ValueError:
+        return None
+
+
+def _read_cmdline(pid: str) -> str:
+    try:
+        with open(f'/proc/{pid}/cmdline', 'rb') as f:
+            return f.read().replace(b'\0', b' ').decode('utf-8', 'replace').strip()
+    except OSError:
+        return ''
+
+
+def _scan_processes() -> Dict[str, Any]:
+    """Count processes (and python processes, with their command lines) from /proc/[pid]."""
+    total = 0
+    python_cmdlines = []
+    try:
+        entries = os.listdir('/proc')
+    except OSError:
+        return {'processes': 0, 'python_processes': 0, 'python_cmdlines': ()}
+    for entry in entries:
+        if not entry.isdigit():
+            continue
+        total += 1
+        comm = _read_first_line(f'/proc/{entry}/comm')
+        if comm and comm.startswith('python'):
+            python_cmdlines.append(_read_cmdline(entry))
+    return {
+        'processes': total,
+        'python_processes': len(python_cmdlines),
+        'python_cmdlines': tuple(python_cmdlines)
+    }
+
+
+class SystemSampler:
+    """
+    Background sampler publishing host stats at a fixed interval.
+
+    latest() returns the most recent sample without doing any I/O; the
+    returned dict is shared and must not be mutated. history() returns up to
+    `history` recent samples, oldest first, from a fixed-size ring.
+    """
+
+    def __init__(self, interval: float = DEFAULT_INTERVAL, history: int = DEFAULT_HISTORY,
+                 disk_path: str = '/'):
+        """
+        Args:
+            interval: Seconds between samples
+            history: Number of samples kept in the ring buffer
+            disk_path: Mount point reported by the disk fields
+        """
+        self.interval = max(float(interval), 0.1)
+        self.disk_path = disk_path
+        self._ring: deque = deque(maxlen=max(int(history), 1))
+        self._latest: Optional[Dict[str, Any]] = None
+        self._prev_cpu: Optional[List[int]] = None
+        self._sample_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._cpu_count = os.cpu_count() or 1
+
+        # Metrics
+        self.samples = 0
+        self.errors = 0
+
+    # ------------------------------------------------------------------
+
+    def start(self) -> 'SystemSampler':
+        """Start the background thread (idempotent)."""
+        with self._sample_lock:
+            if self._thread is not None and self._thread.is_alive():
+                return self
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='j1msky-sysstats', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.sample_now()
+            except Exception as e:
+                self.errors += 1
+                logger.error(f"System stats sample failed: {e}")
+            self._stop.wait(self.interval)
+
+    # ------------------------------------------------------------------
+
+    def latest(self) -> Dict[str, Any]:
+        """Most recent sample (samples synchronously if none exists yet)."""
+        sample = self._latest
+        if sample is None:
+            sample = self.sample_now()
+        return sample
+
+    def history(self, n: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Up to n recent samples, oldest first."""
+        samples = list(self._ring)
+        return samples if n is None else samples[-n:]
+
+    def sample_now(self) -> Dict[str, Any]:
+        """Take a sample, publish it and return it."""
+        with self._sample_lock:
+            sample = self._collect()
+            self._ring.append(sample)
+            self._latest = sample
+            self.samples += 1
+            return sample
+
+    def _collect(self) -> Dict[str, Any]:
+        now = time.time()
+        sample: Dict[str, Any] = {'timestamp': now, 'cpu_count': self._cpu_count}
+
+        # Temperature
+        raw = _read_first_line(THERMAL_PATH)
+        try:
+            sample['temp'] = round(int(raw) / 1000.0, 1) if raw else 0
+        except ValueError:
+            sample['temp'] = 0
+
+        # Load average
+        raw = _read_first_line('/proc/loadavg')
+        try:
+            load_1, load_5, load_15 = (float(v) for v in raw.split()[:3])
+        except (AttributeError, ValueError):
+            load_1 = load_5 = load_15 = 0.0
+        sample['load'] = round(load_1, 2)
+        sample['load_5'] = round(load_5, 2)
+        sample['load_15'] = round(load_15, 2)
+        sample['load_pct'] = round(min(100.0, load_1 / self._cpu_count * 100), 1)
+
+        # CPU utilisation since the previous sample
+        cpu = _read_cpu_times()
+        cpu_pct = 0.0
+        if cpu and self._prev_cpu:
+            total = sum(cpu) - sum(self._prev_cpu)
+            idle = (cpu[3] + cpu[4]) - (self._prev_cpu[3] + self._prev_cpu[4]) if len(cpu) > 4 else 0
+            if total > 0:
+                cpu_pct = round((total - idle) / total * 100, 1)
+        self._prev_cpu = cpu
+        sample['cpu_pct'] = cpu_pct
+
+        # Memory
+        mem = _read_meminfo()
+        total_kb = mem.get('MemTotal', 0)
+        available_kb = mem.get('MemAvailable', mem.get('MemFree', 0))
+        sample['mem_total_kb'] = total_kb
+        sample['mem_available_kb'] = available_kb
+        sample['mem_pct'] = round((total_kb - available_kb) / total_kb * 100, 1) if total_kb else 0
+
+        # Uptime
+        raw = _read_first_line('/proc/uptime')
+        try:
+            uptime = float(raw.split()[0])
+        except (AttributeError, ValueError, IndexError):
+            uptime = 0.0
+        sample['uptime_seconds'] = uptime
+        sample['uptime'] = format_uptime(uptime) if uptime else '--:--'
+
+        # Disk
+        try:
+            st = os.statvfs(self.disk_path)
+            disk_total = st.f_blocks * st.f_frsize
+            disk_free = st.f_bavail * st.f_frsize
+            disk_used = (st.f_blocks - st.f_bfree) * st.f_frsize
+        except OSError:
+            disk_total = disk_free = disk_used = 0
+        sample['disk_total'] = disk_total
+        sample['disk_free'] = disk_free
+        sample['disk_used'] = disk_used
+        # df reports use% against used + available (reserved blocks excluded)
+        usable = disk_used + disk_free
+        sample['disk_pct'] = math.ceil(disk_used / usable * 100) if usable else 0
+        sample['disk_total_h'] = format_bytes_h(disk_total)
+        sample['disk_free_h'] = format_bytes_h(disk_free)
+        sample['disk_used_h'] = format_bytes_h(disk_used)
+
+        # Processes
+        sample.update(_scan_processes())
+        return sample
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get sampler statistics."""
+        return {
+            'interval': self.interval,
+            'running': self._thread is not None and self._thread.is_alive(),
+            'samples': self.samples,
+            'errors': self.errors,
+            'history': len(self._ring),
+            'history_max': self._ring.maxlen,
+            'last_sample': self._latest['timestamp'] if self._latest else None
+        }
+
+
+_sampler: Optional[SystemSampler] = None
+_sampler_lock = threading.Lock()
+
+
+def get_sampler() -> SystemSampler:
+    """Process-wide sampler, started on first use."""
+    global _sampler
+    if _sampler is None:
+        with _sampler_lock:
+            if _sampler is None:
+                _sampler = SystemSampler().start()
+    return _sampler
+
+
+def latest() -> Dict[str, Any]:
+    """Shortcut for get_sampler().latest()."""
+    return get_sampler().latest()
@@ -0,0 +1,395 @@
+"""
+J1MSKY Runtime - Spend time-series and forecasting
+
+SpendSeries keeps daily and hourly spend totals in two fixed-size rings of
+doubles (each slot paired with the day/hour it holds), so a year of history
+costs a few kilobytes and never grows. With a path the rings live in an
+mmap'd file: every add() is on disk as soon as the kernel writes the page
+back, and the history survives restarts without a separate save step.
+
+forecast_spend() fits additive Holt-Winters (weekly season) to the daily
+totals, falling back to Holt's linear trend or a plain EWMA when there is
+too little history, and returns the projected total for a horizon with a
+confidence band. Parameters are picked by a small grid search on one-step
+errors. SpendSeries.forecast() caches the fit per (day, history version),
+so repeated queries only sum the cached path.
+
+Usage:
+    series = SpendSeries('/path/spend-series.bin')
+    series.add(0.042)
+    series.forecast(horizon=30)['projected_spend']
+"""
+
+import math
+import mmap
+import os
+import struct
+import threading
+import time
+from datetime import date, datetime
+from pathlib import Path
+from statistics import NormalDist
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+DEFAULT_DAYS = int(os.environ.get('J1MSKY_SPEND_SERIES_DAYS', '400'))
+DEFAULT_HOURS = int(os.environ.get('J1MSKY_SPEND_SERIES_HOURS', str(24 * 35)))
+DEFAULT_LOOKBACK = int(os.environ.get('J1MSKY_SPEND_FORECAST_LOOKBACK', '90'))
+
+SEASON = 7  # weekly
+
+_MAGIC = 0x4A314D53  # 'J1MS'
+_HEADER = struct.Struct('<IIIIdd')  # magic, version, days, hours, first_day, seeded
+_FORMAT_VERSION = 1
+
+# Smoothing parameter grid (alpha, beta, gamma); beta/gamma unused by simpler models
+_ALPHAS = (0.1, 0.2, 0.3, 0.5, 0.7)
+_BETAS = (0.0, 0.05, 0.2)
+_GAMMAS = (0.05, 0.2, 0.4)
+
+
+def _stamps(ts: float) -> Tuple[int, int]:
+    """(local day ordinal, local hour ordinal) for an epoch timestamp."""
+    when = datetime.fromtimestamp(ts)
+    day = when.toordinal()
+    return day, day * 24 + when.hour
+
+
+class SpendSeries:
+    """
+    Daily and hourly spend rings, optionally backed by an mmap'd file.
+
+    Slot i of the daily ring holds the total for the day whose ordinal is
+    stamped next to it; a slot stamped with an older day reads as zero, so
+    gaps and wrap-around need no cleanup.
+    """
+
+    def __init__(self, path: Optional[Union[str, Path]] = None, days: int = DEFAULT_DAYS,
+                 hours: int = DEFAULT_HOURS):
+        """
+        Args:
+            path: Backing file (None: in-memory only)
+            days: Days of daily history kept
+            hours: Hours of hourly history kept
+        """
+        self.days = max(int(days), SEASON * 2)
+        self.hours = max(int(hours), 24)
+        self.path = Path(path) if path else None
+        self._lock = threading.Lock()
+        self._map: Optional[mmap.mmap] = None
+        self._fd: Optional[int] = None
+
+        slots = 2 * self.days + 2 * self.hours
+        length = _HEADER.size + slots * 8
+        if self.path is not None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            if os.fstat(self._fd).st_size != length:
+                os.ftruncate(self._fd, length)
+            self._map = mmap.mmap(self._fd, length)
+            buf = self._map
+        else:
+            buf = bytearray(length)
+
+        magic, version, days_, hours_, first_day, _ = _HEADER.unpack_from(buf, 0)
+        if not (magic == _MAGIC and version == _FORMAT_VERSION and days_ == self.days and hours_ == self.hours):
+            buf[:] = bytes(length)
+            _HEADER.pack_into(buf, 0, _MAGIC, _FORMAT_VERSION, self.days, self.hours, 0.0, 0.0)
+        self._buf = buf
+
+        # Doubles after the header: [day values | day stamps | hour values | hour stamps]
+        self._slots = memoryview(buf)[_HEADER.size:].cast('d')
+        self._day_values = self._slots[:self.days]
+        self._day_stamps = self._slots[self.days:2 * self.days]
+        self._hour_values = self._slots[2 * self.days:2 * self.days + self.hours]
+        self._hour_stamps = self._slots[2 * self.days + self.hours:]
+
+        # Bumped whenever a completed day changes, invalidating cached fits
+        self.version = 0
+        self._fit_cache: Dict[Tuple[int, int, int], '_Fit'] = {}
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+
+    @property
+    def first_day(self) -> Optional[int]:
+        first = _HEADER.unpack_from(self._buf, 0)[4]
+        return int(first) if first else None
+
+    @property
+    def seeded(self) -> bool:
+        """True once mark_seeded() has run on this file (survives restarts)."""
+        return bool(_HEADER.unpack_from(self._buf, 0)[5])
+
+    def _set_header(self, index: int, value: float) -> None:
+        header = list(_HEADER.unpack_from(self._buf, 0))
+        header[index] = value
+        _HEADER.pack_into(self._buf, 0, *header)
+
+    def mark_seeded(self) -> None:
+        """Record in the header that the initial seed completed."""
+        with self._lock:
+            self._set_header(5, 1.0)
+            if self._map is not None:
+                self._map.flush()
+
+    def clear(self) -> None:
+        """Zero both rings and the header's first day and seeded flag."""
+        with self._lock:
+            self._buf[_HEADER.size:] = bytes(len(self._buf) - _HEADER.size)
+            self._set_header(4, 0.0)
+            self._set_header(5, 0.0)
+            self.version += 1
+
+    def add(self, amount: float, ts: Optional[float] = None) -> None:
+        """Add spend at ts (default now) to its day and hour."""
+        if ts is None:
+            ts = time.time()
+        day, hour = _stamps(ts)
+        with self._lock:
+            self._bump(self._day_values, self._day_stamps, day % self.days, day, amount)
+            self._bump(self._hour_values, self._hour_stamps, hour % self.hours, hour, amount)
+            first = self.first_day
+            if first is None or day < first:
+                self._set_header(4, float(day))
+            if day < date.today().toordinal():
+                self.version += 1
+
+    @staticmethod
+    def _bump(values, stamps, slot: int, stamp: int, amount: float) -> None:
+        if stamps[slot] == stamp:
+            values[slot] += amount
+        elif stamps[slot] < stamp:
+            stamps[slot] = stamp
+            values[slot] = amount
+        # Older than the ring holds: dropped
+
+    def set_day(self, day: Union[date, int], total: float) -> None:
+        """Overwrite a day's total (used when seeding from rollups)."""
+        ordinal = day if isinstance(day, int) else day.toordinal()
+        with self._lock:
+            slot = ordinal % self.days
+            if self._day_stamps[slot] <= ordinal:
+                self._day_stamps[slot] = ordinal
+                self._day_values[slot] = total
+            first = self.first_day
+            if first is None or ordinal < first:
+                self._set_header(4, float(ordinal))
+            self.version += 1
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+
+    def day_total(self, day: Union[date, int]) -> float:
+        ordinal = day if isinstance(day, int) else day.toordinal()
+        slot = ordinal % self.days
+        return self._day_values[slot] if self._day_stamps[slot] == ordinal else 0.0
+
+    def daily(self, n: int, end: Optional[int] = None) -> List[float]:
+        """Totals for the n days ending at ordinal `end` (default today), oldest first."""
+        end = date.today().toordinal() if end is None else end
+        n = min(n, self.days)
+        values, stamps, size = self._day_values, self._day_stamps, self.days
+        out = []
+        for ordinal in range(end - n + 1, end + 1):
+            slot = ordinal % size
+            out.append(values[slot] if stamps[slot] == ordinal else 0.0)
+        return out
+
+    def hourly(self, n: int, end: Optional[int] = None) -> List[float]:
+        """Totals for the n hours ending at hour ordinal `end` (default this hour), oldest first."""
+        end = _stamps(time.time())[1] if end is None else end
+        n = min(n, self.hours)
+        values, stamps, size = self._hour_values, self._hour_stamps, self.hours
+        out = []
+        for ordinal in range(end - n + 1, end + 1):
+            slot = ordinal % size
+            out.append(values[slot] if stamps[slot] == ordinal else 0.0)
+        return out
+
+    def history(self, lookback: int = DEFAULT_LOOKBACK, end: Optional[int] = None) -> List[float]:
+        """Completed days before `end` (default today) since the first recorded day, at most lookback."""
+        end = date.today().toordinal() if end is None else end
+        first = self.first_day
+        if first is None or first >= end:
+            return []
+        n = min(lookback, end - first, self.days)
+        return self.daily(n, end - 1)
+
+    def forecast(self, horizon: int = 30, lookback: int = DEFAULT_LOOKBACK,
+                 confidence: float = 0.95, today: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Forecast spend for `horizon` days starting today.
+
+        Today's recorded spend is a floor for today's forecast. The fit over
+        completed days is cached until the day changes or a completed day is
+        rewritten, so repeat calls cost O(horizon).
+        """
+        today = date.today().toordinal() if today is None else today
+        key = (today, self.version, lookback)
+        fit = self._fit_cache.get(key)
+        if fit is None:
+            fit = _fit(self.history(lookback, today))
+            self._fit_cache = {key: fit}
+        return fit.project(horizon, confidence, spent_today=self.day_total(today))
+
+    def close(self) -> None:
+        if self._map is not None:
+            # Release the views before closing the map they point into
+            for view in (self._day_values, self._day_stamps, self._hour_values, self._hour_stamps, self._slots):
+                view.release()
+            self._map.flush()
+            self._map.close()
+            self._map = None
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get series statistics."""
+        first = self.first_day
+        return {
+            'path': str(self.path) if self.path else None,
+            'days_capacity': self.days,
+            'hours_capacity': self.hours,
+            'first_day': date.fromordinal(first).isoformat() if first else None,
+            'history_days': len(self.history(self.days)),
+            'version': self.version
+        }
+
+
+# ----------------------------------------------------------------------
+# Forecasting
+# ----------------------------------------------------------------------
+
+class _Fit:
+    """Fitted model state: per-step point forecasts plus the error-propagation weights."""
+
+    __slots__ = ('method', 'params', 'history_days', 'sigma', '_level', '_trend', '_season',
+                 '_n', '_alpha', '_beta', '_gamma', '_m')
+
+    def __init__(self, method: str, params: Dict[str, float], history_days: int, sigma: float,
+                 level: float, trend: float, season: Sequence[float], n: int):
+        self.method = method
+        self.params = params
+        self.history_days = history_days
+        self.sigma = sigma
+        self._level = level
+        self._trend = trend
+        self._season = list(season)
+        self._n = n
+        self._alpha = params.get('alpha', 0.0)
+        self._beta = params.get('beta', 0.0)
+        self._gamma = params.get('gamma', 0.0)
+        self._m = len(self._season)
+
+    def point(self, h: int) -> float:
+        """h-step-ahead mean (h >= 1)."""
+        value = self._level + h * self._trend
+        if self._m:
+            value += self._season[(self._n + h - 1) % self._m]
+        return value
+
+    def project(self, horizon: int, confidence: float, spent_today: float = 0.0) -> Dict[str, Any]:
+        horizon = max(int(horizon), 1)
+        points = [max(self.point(h), 0.0) for h in range(1, horizon + 1)]
+        points[0] = max(points[0], spent_today)
+        total = sum(points)
+
+        # Innovations state-space model: the error on the horizon total is
+        # sum_k e_k * (1 + C_{H-k}), with C_i = sum_{j<=i} c_j and
+        # c_j = alpha * (1 + j * beta) + gamma * [j % m == 0]
+        alpha, beta, gamma, m = self._alpha, self._beta, self._gamma, self._m
+        cumulative = [0.0]
+        for j in range(1, horizon):
+            c = alpha * (1 + j * beta) + (gamma if m and j % m == 0 else 0.0)
+            cumulative.append(cumulative[-1] + c)
+        variance = self.sigma ** 2 * sum((1 + cumulative[horizon - k]) ** 2 for k in range(1, horizon + 1))
+        z = NormalDist().inv_cdf(0.5 + confidence / 2)
+        margin = z * math.sqrt(variance)
+
+        return {
+            'method': self.method,
+            'params': self.params,
+            'history_days': self.history_days,
+            'horizon_days': horizon,
+            'projected_spend': round(total, 4),
+            'lower': round(max(total - margin, spent_today), 4),
+            'upper': round(total + margin, 4),
+            'confidence': confidence,
+            'daily_mean': round(total / horizon, 4),
+            'daily_sigma': round(self.sigma, 4)
+        }
+
+
+def _holt_winters(y: Sequence[float], alpha: float, beta: float, gamma: float, m: int):
+    """Additive Holt-Winters; returns (sse, level, trend, season). m=0 disables the season."""
+    if m:
+        level = sum(y[:m]) / m
+        trend = (sum(y[m:2 * m]) - sum(y[:m])) / (m * m) if beta else 0.0
+        season = [v - level for v in y[:m]]
+        start = m
+    else:
+        level = y[0]
+        trend = (y[1] - y[0]) if beta and len(y) > 1 else 0.0
+        season = []
+        start = 1
+    sse = 0.0
+    for t in range(start, len(y)):
+        x = y[t]
+        s = season[t % m] if m else 0.0
+        err = x - (level + trend + s)
+        sse += err * err
+        new_level = alpha * (x - s) + (1 - alpha) * (level + trend)
+        if beta:
+            trend = beta * (new_level - level) + (1 - beta) * trend
+        if m:
+            season[t % m] = gamma * (x - new_level) + (1 - gamma) * s
+        level = new_level
+    return sse, level, trend, season
+
+
+def _fit(y: Sequence[float]) -> _Fit:
+    n = len(y)
+    if n == 0:
+        return _Fit('none', {}, 0, 0.0, 0.0, 0.0, [], 0)
+    if n == 1:
+        return _Fit('last_value', {}, 1, 0.0, y[0], 0.0, [], 1)
+
+    if n >= 2 * SEASON:
+        method, m, grid = 'holt_winters', SEASON, [(a, b, g) for a in _ALPHAS for b in _BETAS for g in _GAMMAS]
+    elif n >= 4:
+        method, m, grid = 'holt_linear', 0, [(a, b, 0.0) for a in _ALPHAS for b in _BETAS]
+    else:
+        method, m, grid = 'ewma', 0, [(a, 0.0, 0.0) for a in _ALPHAS]
+
+    best = None
+    for alpha, beta, gamma in grid:
+        result = _holt_winters(y, alpha, beta, gamma, m)
+        if best is None or result[0] < best[1][0]:
+            best = ((alpha, beta, gamma), result)
+    (alpha, beta, gamma), (sse, level, trend, season) = best
+
+    residuals = n - (m or 1)
+    sigma = math.sqrt(sse / residuals) if residuals > 0 else 0.0
+    params = {'alpha': alpha}
+    if method != 'ewma':
+        params['beta'] = beta
+    if m:
+        params['gamma'] = gamma
+    return _Fit(method, params, n, sigma, level, trend, season, n)
+
+
+def forecast_spend(history: Sequence[float], horizon: int = 30, confidence: float = 0.95,
+                   spent_today: float = 0.0) -> Dict[str, Any]:
+    """
+    Forecast total spend over the next `horizon` days from daily totals.
+
+    Args:
+        history: Completed daily totals, oldest first
+        horizon: Days to project, starting today
+        confidence: Two-sided band coverage (e.g. 0.95)
+        spent_today: Spend already recorded today (a floor for today's forecast)
+    """
+    return _fit(list(history)).project(horizon, confidence, spent_today)
@@ -6,21 +6,311 @@ CEO-Worker hierarchy with automatic fallbacks
 """
 
 import json
+import os
+import sys
 import time
 import random
 import threading
 import hashlib
-from datetime import datetime
+import heapq
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, Any, Optional, List
-from collections import defaultdict
+from types import MappingProxyType
+from typing import Dict, Any, Iterable, Iterator, Optional, List, Mapping, NamedTuple, Sequence, Tuple
+from collections import defaultdict, deque
+
+sys.path.insert(0, "/home/m1ndb0t/Desktop/J1MSKY/j1msky-framework")
+from runtime.bandit import BanditRouter
+from runtime.cache import LRUTTLCache
+from runtime.costhistory import WINDOWS as COST_WINDOWS, CostAggregate, CostHistory, variance_of as cost_variance
+from runtime.cron import parse_cron
+from runtime.delivery import DeliveryError, DeliveryQueue, HTTPConnectionPool
+from runtime.journal import AppendOnlyJournal
+from runtime.ledger import QuoteLedger, QuoteTotals
+from runtime.persistence import WriteBehindStore
+from runtime.quoting import QuotePolicy, price_quotes
+from runtime.ratelimit import create_limiter
+from runtime.sketch import DistinctCounter, QuantileSketch
+from runtime.timeseries import SpendSeries
+
+USAGE_JOURNAL_DIR = "/home/m1ndb0t/Desktop/J1MSKY/logs/usage-journal"
+
+# Daily/hourly spend rings (mmap'd), kept next to the usage journal
+SPEND_SERIES_FILE = "spend-series.bin"
+
+# Provider rate limiting (same settings as the teams server, so a shared dir shares budgets)
+RATE_LIMIT_ALGORITHM = os.environ.get("J1MSKY_RATE_LIMIT_ALGORITHM", "sliding_log")
+RATE_LIMIT_SHARED_DIR = os.environ.get("J1MSKY_RATE_LIMIT_SHARED_DIR") or None
+
+# Longest a change made outside record_usage (another process drawing on a shared
+# limiter, a window draining, midnight) can go unnoticed by cache generations
+GENERATION_POLL_SECONDS = float(os.environ.get("J1MSKY_CACHE_GENERATION_POLL", "1.0"))
+
+# Alert delivery: HTTP channels are posted by a background worker pool, and
+# alerts arriving within the coalesce window of a delivery go out as one digest
+ALERT_DELIVERY_WORKERS = int(os.environ.get("J1MSKY_ALERT_WORKERS", "2"))
+ALERT_COALESCE_SECONDS = float(os.environ.get("J1MSKY_ALERT_COALESCE_SECONDS", "5.0"))
+ALERT_HTTP_TIMEOUT = float(os.environ.get("J1MSKY_ALERT_HTTP_TIMEOUT", "5.0"))
+ALERT_HISTORY_LIMIT = 1000
+
+# Raw cost observations kept for windowed efficiency/anomaly queries; older ones
+# survive only as per-(task_type, model) totals in the journal checkpoint
+COST_HISTORY_RETENTION = float(os.environ.get("J1MSKY_COST_HISTORY_RETENTION", str(7 * 86400)))
+
+# Online model routing: "thompson", "ucb" or "off". A (task_type, complexity)
+# context keeps the static tables until it has this many observed outcomes.
+BANDIT_POLICY = os.environ.get("J1MSKY_BANDIT_POLICY", "thompson")
+BANDIT_MIN_OBSERVATIONS = int(os.environ.get("J1MSKY_BANDIT_MIN_OBSERVATIONS", "20"))
+
+# Scheduled tasks are run on this many worker threads
+SCHEDULER_WORKERS = int(os.environ.get("J1MSKY_SCHEDULER_WORKERS", "4"))
+
+# A fire later than this is a misfire, handled by the task's misfire policy
+SCHEDULER_MISFIRE_GRACE = float(os.environ.get("J1MSKY_SCHEDULER_MISFIRE_GRACE", "60"))
+# Most missed fires a "fire_all" task replays after downtime
+SCHEDULER_MAX_CATCHUP = int(os.environ.get("J1MSKY_SCHEDULER_MAX_CATCHUP", "10"))
+# Default start jitter ceiling (also capped at 10% of the task's period)
+SCHEDULER_DEFAULT_JITTER = float(os.environ.get("J1MSKY_SCHEDULER_JITTER", "30"))
+# Share of each provider's rate limit scheduled runs leave for interactive traffic
+SCHEDULER_HEADROOM_RESERVE = float(os.environ.get("J1MSKY_SCHEDULER_HEADROOM_RESERVE", "0.2"))
+# How long low-priority runs wait while the daily budget is critical
+SCHEDULER_BUDGET_DEFER_SECONDS = float(os.environ.get("J1MSKY_SCHEDULER_BUDGET_DEFER", "300"))
+
+
+def fold_usage_rollup(state: Dict[str, Any], record: Dict[str, Any]) -> None:
+    """Fold one usage journal record into the daily rollup checkpoint."""
+    day = record.get("day") or datetime.fromtimestamp(record.get("ts", 0)).strftime("%Y-%m-%d")
+    daily = state.setdefault("daily", {}).setdefault(day, {"spend": 0.0, "calls": 0, "tokens": 0, "models": {}})
+    model = daily["models"].setdefault(record.get("model", "unknown"), {"spend": 0.0, "calls": 0, "tokens": 0})
+    for bucket in (daily, model):
+        bucket["spend"] += record.get("cost", 0.0)
+        bucket["calls"] += 1
+        bucket["tokens"] += record.get("tokens", 0)
+
+
+def fold_cost_totals(state: Dict[str, Any], record: Dict[str, Any]) -> None:
+    """Fold one cost journal record into the per-(task_type, model) totals checkpoint."""
+    totals = state.setdefault("totals", {}).setdefault(record["task_type"], {}).setdefault(
+        record["model"], {"count": 0, "successes": 0, "estimated": 0.0, "actual": 0.0, "variance": 0.0})
+    if record.get("op") == "seed":
+        for field in totals:
+            totals[field] += record.get(field, 0)
+        return
+    estimated = record.get("est", 0.0)
+    actual = record.get("act", 0.0)
+    totals["count"] += 1
+    totals["successes"] += int(record.get("ok", 1))
+    totals["estimated"] += estimated
+    totals["actual"] += actual
+    totals["variance"] += cost_variance(estimated, actual)
+
+
+def new_ab_counters() -> Dict[str, float]:
+    """Empty per-variant outcome counters."""
+    return {"conversions": 0, "outcomes": 0, "revenue": 0.0, "engagement": 0.0, "engagement_count": 0}
+
+
+def fold_ab_outcome(state: Dict[str, Any], record: Dict[str, Any]) -> None:
+    """Fold one A/B outcome journal record into the per-variant counters."""
+    counters = state.setdefault("results", {}).setdefault(record["e"], {}).setdefault(
+        record["v"], new_ab_counters())
+    counters["conversions"] += record.get("c", 0)
+    counters["revenue"] += record.get("r", 0.0)
+    counters["engagement"] += record.get("g", 0.0)
+    counters["engagement_count"] += record.get("gn", 0)
+    if record.get("op") != "seed":
+        counters["outcomes"] += 1
+
+
+def fold_alert_history(state: Dict[str, Any], record: Dict[str, Any]) -> None:
+    """Fold one alert journal record into the bounded history checkpoint."""
+    alerts = state.setdefault("alerts", [])
+    if record.get("op") == "ack":
+        for alert in alerts:
+            if alert["id"] == record["id"]:
+                alert["acknowledged"] = True
+                alert["acknowledged_at"] = record.get("at")
+                break
+    elif "alert" in record:
+        alerts.append(record["alert"])
+        if len(alerts) > ALERT_HISTORY_LIMIT:
+            del alerts[:len(alerts) - ALERT_HISTORY_LIMIT]
+
+
+class RouteCandidate(NamedTuple):
+    """One model in a routing decision, with everything resolved up front."""
+    alias: str
+    provider: Optional[str]
+    cost_per_1k: float
+    fallback: str
+    fallback_provider: Optional[str]
+
+
+class RoutingIndex:
+    """
+    Immutable routing tables compiled from model-stack.json.
+
+    Built once per config load. Selecting a model walks a pre-built tuple of
+    candidates, so the hot path does no dict construction or config lookups.
+    """
+
+    __slots__ = ("routes", "default_route", "providers", "provider_names", "costs", "budget_order")
+
+    def __init__(self, routes: Mapping[str, Tuple[RouteCandidate, ...]],
+                 default_route: Tuple[RouteCandidate, ...],
+                 providers: Mapping[str, Optional[str]],
+                 costs: Mapping[str, float],
+                 budget_order: Tuple[RouteCandidate, ...]):
+        self.routes = routes
+        self.default_route = default_route
+        self.providers = providers
+        self.provider_names = tuple(sorted({p for p in providers.values() if p}))
+        self.costs = costs
+        self.budget_order = budget_order
+
+    def route(self, task_type: str) -> Tuple[RouteCandidate, ...]:
+        """Ordered candidates for a task type."""
+        return self.routes.get(task_type, self.default_route)
+
+    @classmethod
+    def compile(cls, config: Dict[str, Any], task_models: Dict[str, List[str]],
+                provider_map: Dict[str, str], cost_map: Dict[str, float],
+                budget_order: List[str], default_models: List[str],
+                default_cost: float = 0.003) -> "RoutingIndex":
+        """
+        Resolve providers, fallbacks and per-1k costs for every route.
+
+        Args:
+            config: Parsed model-stack.json; its model entries override the
+                built-in provider and cost tables
+            task_models: task_type -> preferred model aliases
+            provider_map: Built-in alias -> provider table
+            cost_map: Built-in alias -> cost per 1k tokens table
+            budget_order: Aliases tried, in order, when the budget is tight
+            default_models: Route for unknown task types
+            default_cost: Cost per 1k tokens for unknown aliases
+        """
+        providers = dict(provider_map)
+        costs = dict(cost_map)
+        for provider, provider_config in config.get("models", {}).items():
+            for model in provider_config.get("models", {}).values():
+                alias = model.get("alias")
+                if not alias:
+                    continue
+                providers[alias] = provider
+                if "cost_per_1k" in model:
+                    costs[alias] = float(model["cost_per_1k"])
+        fallbacks = config.get("orchestration", {}).get("fallback_chain", {})
+
+        def candidate(alias: str) -> RouteCandidate:
+            fallback = fallbacks.get(alias, "sonnet")
+            return RouteCandidate(alias, providers.get(alias), costs.get(alias, default_cost),
+                                  fallback, providers.get(fallback))
+
+        routes = {task: tuple(candidate(a) for a in aliases) for task, aliases in task_models.items()}
+        return cls(
+            routes=MappingProxyType(routes),
+            default_route=tuple(candidate(a) for a in default_models),
+            providers=MappingProxyType(providers),
+            costs=MappingProxyType(costs),
+            budget_order=tuple(candidate(a) for a in budget_order)
+        )
+
 
 class UnifiedOrchestrator:
-    def __init__(self):
+    PROVIDER_MAP = {
+        "opus": "anthropic",
+        "sonnet": "anthropic",
+        "k2p5": "kimi-coding",
+        "minimax-m2.5": "minimax-portal",
+        "codex": "openai-codex"
+    }
+
+    TASK_MODELS = {
+        "architecture": ["opus", "k2p5"],
+        "strategy": ["opus"],
+        "complex_reasoning": ["opus"],
+        "implementation": ["sonnet", "minimax-m2.5"],
+        "documentation": ["sonnet"],
+        "coding": ["k2p5", "minimax-m2.5", "codex"],
+        "fast_coding": ["minimax-m2.5", "k2p5"],
+        "api_integration": ["codex", "k2p5"],
+        "specialized_coding": ["codex"],
+        "ui_design": ["sonnet", "minimax-m2.5"],
+        "business_analysis": ["opus", "sonnet"]
+    }
+
+    COST_PER_1K = {
+        "opus": 0.015,
+        "sonnet": 0.003,
+        "k2p5": 0.001,
+        "minimax-m2.5": 0.001,
+        "codex": 0.002
+    }
+
+    # Budget-aware fallbacks ordered by relative cost efficiency
+    BUDGET_FALLBACK_ORDER = ["k2p5", "minimax-m2.5", "sonnet", "codex", "opus"]
+
+    # Quote validation and pricing rules
+    QUOTE_MODELS = ["k2p5", "sonnet", "opus", "minimax-m2.5", "codex"]
+    QUOTE_COMPLEXITIES = ["low", "medium", "high"]
+    QUOTE_SEGMENTS = ["enterprise", "mid_market", "smb", "startup"]
+    SEGMENT_MARKUP_ADJUSTMENTS = {
+        "enterprise": 0.5,
+        "mid_market": 0.0,
+        "smb": -0.5,
+        "startup": -1.0
+    }
+    MARGIN_THRESHOLDS = {
+        "task": 55.0,
+        "subscription": 50.0,
+        "enterprise": 45.0
+    }
+
+    # Status report sections: name -> (TTL seconds, generations it depends on).
+    # A memoized section is rebuilt once its TTL lapses or a dependency moves.
+    STATUS_SECTIONS = {
+        "providers": (2, ("rate_limit", "config")),
+        "usage": (5, ("config",)),
+        "budget": (5, ("budget", "config")),
+        "operations": (5, ("rate_limit", "budget", "config")),
+        "pricing": (3600, ("rate_limit", "budget", "config")),
+        "anomalies": (5, ("config",)),
+        "forecast": (60, ("budget", "config"))
+    }
+
+    def __init__(self, journal_dir: Optional[str] = None):
+        # Cache dependency generations; cached results miss once any they read moves
+        self.generations = {"rate_limit": 0, "budget": 0, "config": 0}
+        self._generation_lock = threading.Lock()
+        self._rate_limit_mask = 0
+        self._budget_level = "ok"
+        self._next_generation_check = 0.0
+
         self.config_path = Path("/home/m1ndb0t/Desktop/J1MSKY/config/model-stack.json")
         self.config = self.load_config()
-        self.usage_log = []
+        self.routing = self.build_routing_index()
+        self.usage_log = deque()
+        # model -> [calls, tokens] over usage_log, maintained as entries are added and pruned
+        self._usage_by_model: Dict[Any, List[int]] = {}
+        self._status_cache = LRUTTLCache(default_ttl_seconds=60, max_entries=len(self.STATUS_SECTIONS))
         self.daily_spend = defaultdict(float)
+        self.rate_limiters = {}
+        self._rate_limiters_lock = threading.Lock()
+        # Online router shared with the cost optimizer (wired up once both exist)
+        self.router: Optional[BanditRouter] = None
+        self.spend_series = SpendSeries(Path(journal_dir or USAGE_JOURNAL_DIR) / SPEND_SERIES_FILE)
+        self.usage_journal = AppendOnlyJournal(
+            journal_dir or USAGE_JOURNAL_DIR,
+            prefix="usage",
+            reducer=fold_usage_rollup,
+            # Keep raw records for at least one rate-limit window so replay can rebuild counters
+            compact_min_age=self._max_rate_limit_window()
+        )
+        self.replay_usage_journal()
+        # Running pricing totals; reports read these instead of re-scanning quotes
+        self.quote_ledger = QuoteLedger(self.MARGIN_THRESHOLDS)
 
     def load_config(self):
         """Load model stack configuration"""
@@ -31,16 +321,163 @@ class UnifiedOrchestrator:
             print(f"Error loading config: {e}")
             return self.get_default_config()
 
+    def build_routing_index(self) -> RoutingIndex:
+        """Compile the current config into a routing index."""
+        return RoutingIndex.compile(
+            self.config,
+            task_models=self.TASK_MODELS,
+            provider_map=self.PROVIDER_MAP,
+            cost_map=self.COST_PER_1K,
+            budget_order=self.BUDGET_FALLBACK_ORDER,
+            default_models=["sonnet"]
+        )
+
+    def reload_config(self) -> RoutingIndex:
+        """Re-read model-stack.json and rebuild the routing index."""
+        self.config = self.load_config()
+        self.routing = self.build_routing_index()
+        self.bump_generation("config")
+        return self.routing
+
     def save_config(self):
         """Persist orchestrator config to disk."""
         self.config_path.parent.mkdir(parents=True, exist_ok=True)
         with open(self.config_path, 'w') as f:
             json.dump(self.config, f, indent=2)
+        self.bump_generation("config")
+
+    def bump_generation(self, name: str) -> int:
+        """
+        Advance a cache dependency generation.
+
+        Call with "config" after changing self.config in place.
+        """
+        with self._generation_lock:
+            self.generations[name] += 1
+            return self.generations[name]
+
+    def get_generation(self, *names: str) -> Tuple[int, ...]:
+        """
+        Current generations of the named dependencies ("rate_limit", "budget", "config").
+
+        Rate-limit and budget state are re-observed at most every
+        GENERATION_POLL_SECONDS (sooner when an exhausted provider is due to
+        recover), and immediately after record_usage().
+        """
+        if time.monotonic() >= self._next_generation_check:
+            self.observe_generations()
+        generations = self.generations
+        return tuple(generations[name] for name in names)
+
+    def observe_generations(self) -> None:
+        """Bump the rate-limit and budget generations if their state has changed."""
+        with self._generation_lock:
+            mask = 0
+            recheck = GENERATION_POLL_SECONDS
+            for bit, provider in enumerate(self.routing.provider_names):
+                limiter = self._rate_limiter(provider)
+                if not limiter.available():
+                    mask |= 1 << bit
+                    recheck = min(recheck, limiter.retry_after())
+            if mask != self._rate_limit_mask:
+                self._rate_limit_mask = mask
+                self.generations["rate_limit"] += 1
+
+            level = self.get_budget_alert_level()
+            if level != self._budget_level:
+                self._budget_level = level
+                self.generations["budget"] += 1
+
+            self._next_generation_check = time.monotonic() + max(recheck, 0.001)
 
     def prune_usage_log(self, max_entries: int = 5000):
         """Keep usage log bounded to avoid unbounded memory growth."""
-        if len(self.usage_log) > max_entries:
-            self.usage_log = self.usage_log[-max_entries:]
+        usage_log = self.usage_log
+        while len(usage_log) > max_entries:
+            self._count_usage(usage_log.popleft(), -1)
+
+    def _count_usage(self, item: Dict[str, Any], sign: int) -> None:
+        """Add (sign=1) or remove (sign=-1) one usage_log entry from the per-model counters."""
+        model = item.get("model", "unknown")
+        counts = self._usage_by_model.get(model)
+        if counts is None:
+            counts = self._usage_by_model[model] = [0, 0]
+        counts[0] += sign
+        counts[1] += sign * item.get("tokens", 0)
+        if counts[0] == 0:
+            del self._usage_by_model[model]
+
+    def _max_rate_limit_window(self) -> float:
+        """Longest configured rate-limit window in seconds."""
+        windows = [limits.get("window", 3600) for limits in self.config.get("rate_limits", {}).values()]
+        return float(max(windows + [3600]))
+
+    def replay_usage_journal(self) -> Dict[str, int]:
+        """
+        Rebuild daily spend, recent usage and rate-limit counters from the journal.
+
+        Returns:
+            Counts of rolled-up days and replayed raw records
+        """
+        state, records = self.usage_journal.replay()
+        self.daily_spend = defaultdict(float)
+        for day, rollup in state.get("daily", {}).items():
+            self.daily_spend[day] += rollup.get("spend", 0.0)
+
+        # The spend series is seeded from the journal once; after that it persists itself.
+        # The flag is only set once the seed completes, so an interrupted seed starts over.
+        seed_series = not self.spend_series.seeded
+        if seed_series:
+            self.spend_series.clear()
+            for day, spend in self.daily_spend.items():
+                self.spend_series.set_day(datetime.strptime(day, "%Y-%m-%d").date(), spend)
+
+        now = time.time()
+        rate_limits = self.config.setdefault("rate_limits", {})
+        window_counts: Dict[str, List[float]] = defaultdict(list)
+        replayed = 0
+        usage_log = deque()
+        self._usage_by_model = {}
+
+        for record in records:
+            replayed += 1
+            self.daily_spend[record["day"]] += record.get("cost", 0.0)
+            if seed_series:
+                self.spend_series.add(record.get("cost", 0.0), record.get("ts"))
+            usage = {
+                "timestamp": record.get("timestamp"),
+                "model": record.get("model"),
+                "task": record.get("task"),
+                "tokens": record.get("tokens", 0)
+            }
+            usage_log.append(usage)
+            self._count_usage(usage, 1)
+            provider = record.get("provider")
+            if provider:
+                window = rate_limits.get(provider, {}).get("window", 3600)
+                if now - record.get("ts", 0) < window:
+                    window_counts[provider].append(record["ts"])
+
+        self.usage_log = usage_log
+        self.prune_usage_log()
+
+        # Limiters restart from the journal, never from values left in the config file.
+        # Shared limiters already hold the host-wide state.
+        for provider, stamps in window_counts.items():
+            if provider not in rate_limits:
+                rate_limits[provider] = {"hourly": 100, "current": 0, "window": 3600}
+            limiter = self._rate_limiter(provider)
+            if not limiter.shared:
+                limiter.preload(sorted(stamps))
+        for provider in rate_limits:
+            self._refresh_rate_limit_window(provider)
+
+        if seed_series:
+            self.spend_series.mark_seeded()
+
+        # Fold anything that aged out while we were down
+        self.usage_journal.compact_async()
+        return {"days": len(state.get("daily", {})), "records": replayed}
 
     def get_default_config(self):
         """Default configuration if file missing"""
@@ -74,71 +511,70 @@ class UnifiedOrchestrator:
         """
         Select best model for task based on type, complexity, and priority
         """
-        task_models = {
-            "architecture": ["opus", "k2p5"],
-            "strategy": ["opus"],
-            "complex_reasoning": ["opus"],
-            "implementation": ["sonnet", "minimax-m2.5"],
-            "documentation": ["sonnet"],
-            "coding": ["k2p5", "minimax-m2.5", "codex"],
-            "fast_coding": ["minimax-m2.5", "k2p5"],
-            "api_integration": ["codex", "k2p5"],
-            "specialized_coding": ["codex"],
-            "ui_design": ["sonnet", "minimax-m2.5"],
-            "business_analysis": ["opus", "sonnet"]
-        }
-
-        # Get preferred models for task
-        preferred = task_models.get(task_type, ["sonnet"])
-
-        # Check rate limits and availability
-        available = []
-        for model in preferred:
-            if self.check_model_available(model):
-                available.append(model)
+        route = self.routing.route(task_type)
+
+        # Learned routing once the context has enough outcomes
+        router = self.router
+        if router is not None and len(route) > 1 and \
+                router.observations((task_type, complexity)) >= BANDIT_MIN_OBSERVATIONS:
+            eligible = [c.alias for c in route if self._provider_available(c.provider)]
+            if eligible:
+                return router.choose((task_type, complexity), eligible)
+
+        # First preferred model within its rate limit
+        for candidate in route:
+            if self._provider_available(candidate.provider):
+                return candidate.alias
 
         # If none available, use fallback chain
-        if not available:
-            for model in preferred:
-                fallback = self.get_fallback(model)
-                if self.check_model_available(fallback):
-                    available.append(fallback)
+        for candidate in route:
+            if self._provider_available(candidate.fallback_provider):
+                return candidate.fallback
 
-        # Return best available or default to sonnet
-        return available[0] if available else "sonnet"
+        # Default to sonnet
+        return "sonnet"
 
-    def _refresh_rate_limit_window(self, provider: str):
-        """Reset provider counters when hourly window rolls over."""
+    def _rate_limiter(self, provider: str):
+        """Get the limiter for a provider, rebuilt if its configured limit changes."""
         rate_limits = self.config.setdefault("rate_limits", {})
-        limits = rate_limits.setdefault(provider, {"hourly": 100, "current": 0})
-        last_reset = limits.get("last_reset", time.time())
-        window_seconds = limits.get("window", 3600)
-
-        if (time.time() - last_reset) >= window_seconds:
-            limits["current"] = 0
-            limits["last_reset"] = time.time()
+        limits = rate_limits.get(provider)
+        if limits is None:
+            limits = rate_limits.setdefault(provider, {"hourly": 100, "current": 0})
+        hourly = limits.get("hourly", 100)
+        window = limits.get("window", 3600)
+
+        # Fast path: limiter exists and matches the configured limit
+        limiter = self.rate_limiters.get(provider)
+        if limiter is not None and limiter.limit == hourly and limiter.window == window:
+            return limiter
+
+        with self._rate_limiters_lock:
+            limiter = self.rate_limiters.get(provider)
+            if limiter is None or limiter.limit != hourly or limiter.window != window:
+                limiter = create_limiter(
+                    provider,
+                    hourly,
+                    window,
+                    algorithm=RATE_LIMIT_ALGORITHM,
+                    shared_dir=RATE_LIMIT_SHARED_DIR
+                )
+                self.rate_limiters[provider] = limiter
+            return limiter
 
-    def check_model_available(self, model_alias):
-        """Check if model is within rate limits"""
-        # Map alias to provider
-        provider_map = {
-            "opus": "anthropic",
-            "sonnet": "anthropic",
-            "k2p5": "kimi-coding",
-            "minimax-m2.5": "minimax-portal",
-            "codex": "openai-codex"
-        }
+    def _refresh_rate_limit_window(self, provider: str):
+        """Sync the provider's "current" counter with its limiter."""
+        limiter = self._rate_limiter(provider)
+        self.config["rate_limits"][provider]["current"] = limiter.used()
 
-        provider = provider_map.get(model_alias)
-        if not provider:
+    def _provider_available(self, provider: Optional[str]) -> bool:
+        """Whether a provider has rate-limit headroom (unknown providers always do)."""
+        if provider is None:
             return True
+        return self._rate_limiter(provider).available()
 
-        self._refresh_rate_limit_window(provider)
-        limits = self.config.get("rate_limits", {}).get(provider, {})
-        hourly_limit = limits.get("hourly", 100)
-        current = limits.get("current", 0)
-
-        return current < hourly_limit
+    def check_model_available(self, model_alias):
+        """Check if model is within rate limits"""
+        return self._provider_available(self.routing.providers.get(model_alias))
 
     def get_fallback(self, model_alias):
         """Get fallback model"""
@@ -154,17 +590,17 @@ class UnifiedOrchestrator:
         errors = []
         
         # Validate model
-        valid_models = ["k2p5", "sonnet", "opus", "minimax-m2.5", "codex"]
+        valid_models = self.QUOTE_MODELS
         if model not in valid_models:
             errors.append(f"Invalid model '{model}'. Must be one of: {', '.join(valid_models)}")
         
         # Validate complexity
-        valid_complexities = ["low", "medium", "high"]
+        valid_complexities = self.QUOTE_COMPLEXITIES
         if complexity not in valid_complexities:
             errors.append(f"Invalid complexity '{complexity}'. Must be one of: {', '.join(valid_complexities)}")
         
         # Validate segment
-        valid_segments = ["enterprise", "mid_market", "smb", "startup"]
+        valid_segments = self.QUOTE_SEGMENTS
         if segment not in valid_segments:
             errors.append(f"Invalid segment '{segment}'. Must be one of: {', '.join(valid_segments)}")
         
@@ -190,6 +626,184 @@ class UnifiedOrchestrator:
             "estimated_output": estimated_output
         }
 
+    def get_quote_policy(self) -> QuotePolicy:
+        """Pricing rules of recommend_task_price/evaluate_pricing_guardrails for the columnar engine."""
+        policy = self.get_pricing_policy()
+        return QuotePolicy(
+            rates={alias: (cost, 0.0) for alias, cost in self.routing.costs.items()},
+            complexity_markup=policy["complexity_markup"],
+            default_markup=policy["target_markup"],
+            segment_adjustments=self.SEGMENT_MARKUP_ADJUSTMENTS,
+            minimum_price=policy["minimum_price"],
+            min_markup=policy["min_markup"],
+            max_markup=policy["max_markup"],
+            guardrail_thresholds=self.MARGIN_THRESHOLDS
+        )
+
+    def _validate_quote_columns(self, models, complexities, segments, inputs, outputs):
+        """
+        Validate quote rows, returning (valid row indexes, sanitized inputs, errors by index).
+
+        Well-formed rows are checked inline; anything else goes through
+        validate_quote_request so errors and int coercion match exactly.
+        """
+        valid_models = frozenset(self.QUOTE_MODELS)
+        valid_complexities = frozenset(self.QUOTE_COMPLEXITIES)
+        valid_segments = frozenset(self.QUOTE_SEGMENTS)
+        valid_idx, tokens, errors = [], [], {}
+        for idx, (model, complexity, segment, est_in, est_out) in enumerate(
+                zip(models, complexities, segments, inputs, outputs)):
+            if (type(est_in) is int and type(est_out) is int
+                    and 1 <= est_in <= 100000 and 1 <= est_out <= 100000
+                    and model in valid_models and complexity in valid_complexities
+                    and segment in valid_segments):
+                valid_idx.append(idx)
+                tokens.append(est_in)
+                continue
+            is_valid, error_msg, params = self.validate_quote_request(model, complexity, segment, est_in, est_out)
+            if is_valid:
+                valid_idx.append(idx)
+                tokens.append(params["estimated_input"])
+            else:
+                errors[idx] = error_msg
+        return valid_idx, tokens, errors
+
+    def bulk_generate_quotes_columnar(
+        self,
+        models: Sequence[str],
+        complexities: Sequence[str],
+        segments: Sequence[str],
+        estimated_input: Sequence[Any],
+        estimated_output: Optional[Sequence[Any]] = None,
+        delivery_types: Any = "task"
+    ) -> Dict[str, List[Any]]:
+        """
+        Price a batch of quotes from parallel columns.
+
+        Produces the same numbers as bulk_generate_quotes without building
+        per-row dicts; uses NumPy when it is installed.
+
+        Args:
+            models, complexities, segments, estimated_input: One entry per row
+            estimated_output: One entry per row (default 500, validated only)
+            delivery_types: One delivery type for the batch, or one per row
+
+        Returns:
+            Columns with one entry per input row: index, success, error,
+            estimated_tokens and the quote/guardrail fields (None where the
+            row failed validation)
+        """
+        n = len(models)
+        if estimated_output is None:
+            estimated_output = [500] * n
+        valid_idx, tokens, errors = self._validate_quote_columns(
+            models, complexities, segments, estimated_input, estimated_output
+        )
+        per_row_delivery = not isinstance(delivery_types, str)
+        priced = price_quotes(
+            self.get_quote_policy(),
+            [models[i] for i in valid_idx],
+            [complexities[i] for i in valid_idx],
+            [segments[i] for i in valid_idx],
+            tokens,
+            delivery_types=[delivery_types[i] for i in valid_idx] if per_row_delivery else delivery_types
+        )
+
+        columns: Dict[str, List[Any]] = {
+            "index": list(range(n)),
+            "success": [True] * n,
+            "error": [None] * n
+        }
+        if not errors:
+            # Every row priced: the priced columns already line up with the input
+            columns["estimated_tokens"] = tokens
+            columns.update(priced)
+            return columns
+
+        columns["estimated_tokens"] = [None] * n
+        for name in priced:
+            columns[name] = [None] * n
+        for idx, error in errors.items():
+            columns["success"][idx] = False
+            columns["error"][idx] = error
+        for pos, idx in enumerate(valid_idx):
+            columns["estimated_tokens"][idx] = tokens[pos]
+        for name, values in priced.items():
+            column = columns[name]
+            for pos, idx in enumerate(valid_idx):
+                column[idx] = values[pos]
+        return columns
+
+    def iter_bulk_quotes(self, tasks: Iterable[Dict[str, Any]], chunk_size: int = 4096) -> Iterator[Dict[str, Any]]:
+        """
+        Yield bulk_generate_quotes results one row at a time.
+
+        Tasks are priced columnar in chunks of chunk_size, so memory stays
+        bounded however many tasks the iterable produces.
+        """
+        chunk: List[Dict[str, Any]] = []
+        offset = 0
+        for task in tasks:
+            chunk.append(task)
+            if len(chunk) >= chunk_size:
+                yield from self._quote_chunk(chunk, offset)
+                offset += len(chunk)
+                chunk = []
+        if chunk:
+            yield from self._quote_chunk(chunk, offset)
+
+    def _quote_chunk(self, tasks: List[Dict[str, Any]], offset: int) -> Iterator[Dict[str, Any]]:
+        models = [task.get("model", "k2p5") for task in tasks]
+        complexities = [task.get("complexity", "medium") for task in tasks]
+        segments = [task.get("segment", "mid_market") for task in tasks]
+        delivery_types = [task.get("delivery_type", "task") for task in tasks]
+        cols = self.bulk_generate_quotes_columnar(
+            models,
+            complexities,
+            segments,
+            [task.get("estimated_input", 1000) for task in tasks],
+            [task.get("estimated_output", 500) for task in tasks],
+            delivery_types
+        )
+
+        for i, task in enumerate(tasks):
+            preview = task.get("task_preview", "unnamed task")
+            if not cols["success"][i]:
+                yield {
+                    "index": offset + i,
+                    "success": False,
+                    "error": cols["error"][i],
+                    "task_preview": preview
+                }
+                continue
+            margin = cols["gross_margin_pct"][i]
+            compliant = cols["is_compliant"][i]
+            yield {
+                "index": offset + i,
+                "success": True,
+                "quote": {
+                    "model": models[i],
+                    "complexity": complexities[i],
+                    "segment": segments[i],
+                    "estimated_tokens": cols["estimated_tokens"][i],
+                    "internal_cost": cols["internal_cost"][i],
+                    "base_markup": cols["base_markup"][i],
+                    "segment_adjustment": cols["segment_adjustment"][i],
+                    "final_markup": cols["final_markup"][i],
+                    "recommended_price": cols["recommended_price"][i],
+                    "gross_margin_pct": margin,
+                    "margin_band": cols["margin_band"][i]
+                },
+                "guardrail": {
+                    "delivery_type": delivery_types[i],
+                    "minimum_margin_pct": cols["minimum_margin_pct"][i],
+                    "actual_margin_pct": margin,
+                    "is_compliant": compliant,
+                    "action": "approve_quote" if compliant else "escalate_deal_desk"
+                },
+                "task_preview": preview
+            }
+
     def bulk_generate_quotes(self, tasks: list) -> list:
         """
         Generate quotes for multiple tasks in a single batch operation.
@@ -202,54 +816,7 @@ class UnifiedOrchestrator:
         Returns:
             List of quote result dicts with validation status
         """
-        results = []
-        
-        for idx, task in enumerate(tasks):
-            # Validate each task
-            is_valid, error_msg, params = self.validate_quote_request(
-                task.get("model", "k2p5"),
-                task.get("complexity", "medium"),
-                task.get("segment", "mid_market"),
-                task.get("estimated_input", 1000),
-                task.get("estimated_output", 500)
-            )
-            
-            if not is_valid:
-                results.append({
-                    "index": idx,
-                    "success": False,
-                    "error": error_msg,
-                    "task_preview": task.get("task_preview", "unnamed task")
-                })
-                continue
-            
-            # Generate quote
-            try:
-                quote = self.recommend_task_price(
-                    params["model"],
-                    params["estimated_input"],
-                    params["complexity"],
-                    params["segment"]
-                )
-                
-                guardrail = self.evaluate_pricing_guardrails(quote, task.get("delivery_type", "task"))
-                
-                results.append({
-                    "index": idx,
-                    "success": True,
-                    "quote": quote,
-                    "guardrail": guardrail,
-                    "task_preview": task.get("task_preview", "unnamed task")
-                })
-            except Exception as e:
-                results.append({
-                    "index": idx,
-                    "success": False,
-                    "error": str(e),
-                    "task_preview": task.get("task_preview", "unnamed task")
-                })
-        
-        return results
+        return list(self.iter_bulk_quotes(tasks))
 
     def record_usage(self, model_alias, task, tokens=0):
         """Record model usage"""
@@ -260,35 +827,43 @@ class UnifiedOrchestrator:
             "tokens": tokens
         }
         self.usage_log.append(usage)
+        self._count_usage(usage, 1)
         self.prune_usage_log()
 
-        # Track spend by day
+        # Track spend by day (and in the persisted daily/hourly series)
         estimated_cost = self.estimate_cost(model_alias, tokens or 1000)
-        day_key = datetime.now().strftime("%Y-%m-%d")
+        now = time.time()
+        day_key = datetime.fromtimestamp(now).strftime("%Y-%m-%d")
         self.daily_spend[day_key] += estimated_cost
+        self.spend_series.add(estimated_cost, now)
 
         # Update rate limit counter
-        provider_map = {
-            "opus": "anthropic",
-            "sonnet": "anthropic",
-            "k2p5": "kimi-coding",
-            "minimax-m2.5": "minimax-portal",
-            "codex": "openai-codex"
-        }
-        provider = provider_map.get(model_alias)
+        provider = self.routing.providers.get(model_alias)
         if provider:
-            if provider not in self.config["rate_limits"]:
-                self.config["rate_limits"][provider] = {
+            rate_limits = self.config.setdefault("rate_limits", {})
+            if provider not in rate_limits:
+                rate_limits[provider] = {
                     "hourly": 100,
                     "current": 0,
-                    "window": 3600,
-                    "last_reset": time.time()
+                    "window": 3600
                 }
+            self._rate_limiter(provider).try_acquire()
             self._refresh_rate_limit_window(provider)
-            self.config["rate_limits"][provider]["current"] += 1
 
-        # Persist counters and budget context
-        self.save_config()
+        # Usage may have exhausted the provider or moved the budget level
+        self.observe_generations()
+
+        # Append to the usage journal; counters and spend are rebuilt from it on startup
+        self.usage_journal.append({
+            "ts": now,
+            "timestamp": usage["timestamp"],
+            "day": day_key,
+            "model": model_alias,
+            "provider": provider,
+            "task": task,
+            "tokens": tokens,
+            "cost": estimated_cost
+        })
 
     def get_team_for_project(self, project_type):
         """Get recommended team composition for project type"""
@@ -328,14 +903,7 @@ class UnifiedOrchestrator:
 
     def estimate_cost(self, model_alias, estimated_tokens=1000):
         """Estimate cost for task"""
-        cost_map = {
-            "opus": 0.015,
-            "sonnet": 0.003,
-            "k2p5": 0.001,
-            "minimax-m2.5": 0.001,
-            "codex": 0.002
-        }
-        cost_per_1k = cost_map.get(model_alias, 0.003)
+        cost_per_1k = self.routing.costs.get(model_alias, 0.003)
         return (estimated_tokens / 1000) * cost_per_1k
 
     def get_pricing_policy(self) -> Dict[str, Any]:
@@ -358,13 +926,7 @@ class UnifiedOrchestrator:
         internal_cost = round(self.estimate_cost(model_alias, estimated_tokens), 4)
 
         # Segment markup adjustments
-        segment_adjustments = {
-            "enterprise": 0.5,
-            "mid_market": 0.0,
-            "smb": -0.5,
-            "startup": -1.0
-        }
-        segment_adj = segment_adjustments.get(segment, 0.0)
+        segment_adj = self.SEGMENT_MARKUP_ADJUSTMENTS.get(segment, 0.0)
 
         complexity_map = policy.get("complexity_markup", {})
         base_markup = complexity_map.get(complexity, policy.get("target_markup", 4.0))
@@ -398,12 +960,7 @@ class UnifiedOrchestrator:
     def evaluate_pricing_guardrails(self, quote: Dict[str, Any], delivery_type: str = "task") -> Dict[str, Any]:
         """Evaluate quote against margin guardrails for ops approvals."""
         margin = quote.get("gross_margin_pct", 0.0)
-        threshold_map = {
-            "task": 55.0,
-            "subscription": 50.0,
-            "enterprise": 45.0
-        }
-        threshold = threshold_map.get(delivery_type, 55.0)
+        threshold = self.MARGIN_THRESHOLDS.get(delivery_type, 55.0)
         is_compliant = margin >= threshold
 
         return {
@@ -430,9 +987,43 @@ class UnifiedOrchestrator:
             "generated_at": datetime.now().isoformat()
         }
 
-    def summarize_quote_portfolio(self, quotes: List[Dict[str, Any]], delivery_type: str = "task") -> Dict[str, Any]:
-        """Return compliance rollup for a list of quote candidates."""
-        if not quotes:
+    def _quote_ledger_for(self, quotes: Optional[Iterable[Dict[str, Any]]]) -> QuoteLedger:
+        """The orchestrator's ledger, or a one-pass ledger over an explicit quote list."""
+        if quotes is None:
+            return self.quote_ledger
+        return QuoteLedger.from_quotes(quotes, self.MARGIN_THRESHOLDS)
+
+    def record_quote(self, quote: Dict[str, Any], quote_id: Optional[str] = None, variant: Optional[str] = None,
+                     experiment_id: Optional[str] = None) -> Optional[str]:
+        """
+        Add a quote or decision record to the running pricing totals.
+
+        Args:
+            quote: Flat quote/decision dict (decision_status, gross_margin_pct, ...)
+            quote_id: Id to retract or amend it by later (anonymous quotes are not retained)
+            variant: Experiment variant, when the quote is part of an experiment
+            experiment_id: Experiment the variant belongs to
+
+        Returns:
+            quote_id
+        """
+        return self.quote_ledger.record(quote, quote_id, variant=variant, experiment_id=experiment_id)
+
+    def retract_quote(self, quote_id: str) -> bool:
+        """Remove a recorded quote from the running totals."""
+        return self.quote_ledger.retract(quote_id)
+
+    def amend_quote(self, quote_id: str, quote: Dict[str, Any], variant: Optional[str] = None,
+                    experiment_id: Optional[str] = None) -> bool:
+        """Replace a recorded quote in the running totals."""
+        return self.quote_ledger.amend(quote_id, quote, variant=variant, experiment_id=experiment_id)
+
+    def summarize_quote_portfolio(self, quotes: Optional[List[Dict[str, Any]]] = None,
+                                  delivery_type: str = "task") -> Dict[str, Any]:
+        """Return compliance rollup for a list of quote candidates (default: every recorded quote)."""
+        ledger = self._quote_ledger_for(quotes)
+        totals = ledger.totals()
+        if not totals.count:
             return {
                 "delivery_type": delivery_type,
                 "scenario_count": 0,
@@ -441,19 +1032,16 @@ class UnifiedOrchestrator:
                 "average_margin_pct": 0.0
             }
 
-        results = [self.evaluate_pricing_guardrails(q, delivery_type=delivery_type) for q in quotes]
-        compliant_count = sum(1 for r in results if r.get("is_compliant"))
-        avg_margin = round(sum(q.get("gross_margin_pct", 0.0) for q in quotes) / len(quotes), 2)
-
-        compliance_ratio = round(compliant_count / len(quotes), 2)
+        compliant_count = ledger.compliant_count(delivery_type)
+        compliance_ratio = round(compliant_count / totals.count, 2)
         return {
             "delivery_type": delivery_type,
-            "scenario_count": len(quotes),
+            "scenario_count": totals.count,
             "compliant_count": compliant_count,
             "compliance_ratio": compliance_ratio,
-            "needs_escalation": compliant_count < len(quotes),
+            "needs_escalation": compliant_count < totals.count,
             "requires_executive_review": compliance_ratio < 0.67,
-            "average_margin_pct": avg_margin
+            "average_margin_pct": totals.avg_margin()
         }
 
     def assess_exception_aging(self, open_exception_days: List[int]) -> Dict[str, Any]:
@@ -537,9 +1125,18 @@ class UnifiedOrchestrator:
             "recommended_action": "route_to_executive_review" if needs_exec else "proceed_with_caution" if ratio < 1.0 else "send_proposal"
         }
 
-    def aggregate_weekly_pricing_metrics(self, weekly_quotes: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Aggregate weekly pricing decisions for retrospective analysis."""
-        if not weekly_quotes:
+    def aggregate_weekly_pricing_metrics(self, weekly_quotes: Optional[List[Dict[str, Any]]] = None,
+                                         week: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Aggregate weekly pricing decisions for retrospective analysis.
+
+        Args:
+            weekly_quotes: Decisions to aggregate; None reads the recorded quotes
+            week: ISO week ('2026-W07') to restrict recorded quotes to
+        """
+        ledger = self._quote_ledger_for(weekly_quotes)
+        totals = ledger.totals() if week is None else ledger.totals("week", week)
+        if not totals.count:
             return {
                 "total_quotes": 0,
                 "approved_count": 0,
@@ -550,19 +1147,14 @@ class UnifiedOrchestrator:
                 "exceptions_closed": 0
             }
 
-        total = len(weekly_quotes)
-        approved = sum(1 for q in weekly_quotes if q.get("decision_status") == "approved")
-        escalated = total - approved
-        avg_margin = round(sum(q.get("gross_margin_pct", 0.0) for q in weekly_quotes) / total, 2)
-
         return {
-            "total_quotes": total,
-            "approved_count": approved,
-            "escalated_count": escalated,
-            "approval_rate": round(approved / total, 2),
-            "avg_margin_pct": avg_margin,
-            "exceptions_created": sum(1 for q in weekly_quotes if q.get("exception_created")),
-            "exceptions_closed": sum(1 for q in weekly_quotes if q.get("exception_closed"))
+            "total_quotes": totals.count,
+            "approved_count": totals.approved,
+            "escalated_count": totals.escalated,
+            "approval_rate": totals.approval_rate(),
+            "avg_margin_pct": totals.avg_margin(),
+            "exceptions_created": totals.exceptions_created,
+            "exceptions_closed": totals.exceptions_closed
         }
 
     def compare_weekly_metrics(self, current: Dict[str, Any], previous: Dict[str, Any]) -> Dict[str, Any]:
@@ -593,8 +1185,10 @@ class UnifiedOrchestrator:
             "requires_review": len(alerts) > 0
         }
 
-    def track_experiment(self, experiment_id: str, variant: str, quote: Dict[str, Any]) -> Dict[str, Any]:
-        """Track a quote as part of a pricing experiment."""
+    def track_experiment(self, experiment_id: str, variant: str, quote: Dict[str, Any],
+                         quote_id: Optional[str] = None) -> Dict[str, Any]:
+        """Track a quote as part of a pricing experiment (recorded in the quote ledger)."""
+        self.record_quote(quote, quote_id, variant=variant, experiment_id=experiment_id)
         return {
             "experiment_id": experiment_id,
             "variant": variant,
@@ -603,28 +1197,39 @@ class UnifiedOrchestrator:
             "tracked": True
         }
 
-    def summarize_experiment(self, experiment_quotes: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Summarize experiment results for decision-making."""
-        if not experiment_quotes:
-            return {"status": "no_data", "control": {}, "test": {}}
+    def summarize_experiment(self, experiment_quotes: Optional[List[Dict[str, Any]]] = None,
+                             experiment_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Summarize experiment results for decision-making.
 
-        control = [q for q in experiment_quotes if q.get("variant") == "control"]
-        test = [q for q in experiment_quotes if q.get("variant") == "test"]
+        Args:
+            experiment_quotes: track_experiment() records; None reads the
+                variants recorded for experiment_id
+            experiment_id: Experiment to read from the recorded quotes
+        """
+        if experiment_quotes is not None:
+            if not experiment_quotes:
+                return {"status": "no_data", "control": {}, "test": {}}
+            ledger = QuoteLedger(self.MARGIN_THRESHOLDS)
+            for q in experiment_quotes:
+                ledger.record(q.get("quote", {}), variant=q.get("variant"), experiment_id=experiment_id)
+            variants = ledger.variant_totals(experiment_id)
+        else:
+            variants = self.quote_ledger.variant_totals(experiment_id)
+            if not variants:
+                return {"status": "no_data", "control": {}, "test": {}}
 
-        def summarize_variant(quotes):
-            if not quotes:
+        def summarize_variant(totals: Optional[QuoteTotals]) -> Dict[str, Any]:
+            if totals is None:
                 return {}
-            total = len(quotes)
-            approved = sum(1 for q in quotes if q.get("quote", {}).get("decision_status") == "approved")
-            avg_margin = sum(q.get("quote", {}).get("gross_margin_pct", 0) for q in quotes) / total
             return {
-                "count": total,
-                "approval_rate": round(approved / total, 2),
-                "avg_margin_pct": round(avg_margin, 2)
+                "count": totals.count,
+                "approval_rate": totals.approval_rate(),
+                "avg_margin_pct": totals.avg_margin()
             }
 
-        control_summary = summarize_variant(control)
-        test_summary = summarize_variant(test)
+        control_summary = summarize_variant(variants.get("control"))
+        test_summary = summarize_variant(variants.get("test"))
 
         recommendation = "inconclusive"
         if control_summary and test_summary:
@@ -637,15 +1242,18 @@ class UnifiedOrchestrator:
                 recommendation = "discard"
 
         return {
-            "status": "complete" if control and test else "in_progress",
+            "status": "complete" if control_summary and test_summary else "in_progress",
             "control": control_summary,
             "test": test_summary,
             "recommendation": recommendation
         }
 
-    def generate_pricing_summary_report(self, quotes: List[Dict[str, Any]], period: str = "weekly") -> Dict[str, Any]:
-        """Generate a comprehensive pricing summary report for a given period."""
-        if not quotes:
+    def generate_pricing_summary_report(self, quotes: Optional[List[Dict[str, Any]]] = None,
+                                        period: str = "weekly") -> Dict[str, Any]:
+        """Generate a comprehensive pricing summary report for a given period (default: every recorded quote)."""
+        ledger = self._quote_ledger_for(quotes)
+        totals = ledger.totals()
+        if not totals.count:
             return {
                 "period": period,
                 "generated_at": datetime.now().isoformat(),
@@ -653,40 +1261,27 @@ class UnifiedOrchestrator:
                 "metrics": {}
             }
 
-        # Overall metrics
-        total = len(quotes)
-        approved = sum(1 for q in quotes if q.get("decision_status") == "approved")
-        escalated = total - approved
-        avg_margin = sum(q.get("gross_margin_pct", 0) for q in quotes) / total
-        total_revenue = sum(q.get("recommended_price", 0) for q in quotes)
+        total = totals.count
+        approved = totals.approved
+        escalated = totals.escalated
 
         # Segment breakdown
-        segments = {}
-        for q in quotes:
-            seg = q.get("segment", "unknown")
-            if seg not in segments:
-                segments[seg] = {"count": 0, "approved": 0, "revenue": 0}
-            segments[seg]["count"] += 1
-            if q.get("decision_status") == "approved":
-                segments[seg]["approved"] += 1
-            segments[seg]["revenue"] += q.get("recommended_price", 0)
-
-        for seg in segments:
-            seg_quotes = [q for q in quotes if q.get("segment") == seg]
-            segments[seg]["avg_margin"] = round(sum(q.get("gross_margin_pct", 0) for q in seg_quotes) / len(seg_quotes), 2)
-            segments[seg]["approval_rate"] = round(segments[seg]["approved"] / segments[seg]["count"], 2)
+        segments = {
+            seg: {
+                "count": t.count,
+                "approved": t.approved,
+                "revenue": t.revenue,
+                "avg_margin": t.avg_margin(),
+                "approval_rate": t.approval_rate()
+            }
+            for seg, t in ledger.groups("segment").items()
+        }
 
         # Model breakdown
-        models = {}
-        for q in quotes:
-            model = q.get("model", "unknown")
-            if model not in models:
-                models[model] = {"count": 0}
-            models[model]["count"] += 1
-
-        for model in models:
-            model_quotes = [q for q in quotes if q.get("model") == model]
-            models[model]["avg_margin"] = round(sum(q.get("gross_margin_pct", 0) for q in model_quotes) / len(model_quotes), 2)
+        models = {
+            model: {"count": t.count, "avg_margin": t.avg_margin()}
+            for model, t in ledger.groups("model").items()
+        }
 
         return {
             "period": period,
@@ -696,15 +1291,15 @@ class UnifiedOrchestrator:
                 "total_quotes": total,
                 "approved_count": approved,
                 "escalated_count": escalated,
-                "approval_rate": round(approved / total, 2),
-                "avg_margin_pct": round(avg_margin, 2),
-                "total_revenue": round(total_revenue, 2)
+                "approval_rate": totals.approval_rate(),
+                "avg_margin_pct": totals.avg_margin(),
+                "total_revenue": round(totals.revenue, 2)
             },
             "by_segment": segments,
             "by_model": models,
             "exceptions": {
-                "created": sum(1 for q in quotes if q.get("exception_created")),
-                "closed": sum(1 for q in quotes if q.get("exception_closed"))
+                "created": totals.exceptions_created,
+                "closed": totals.exceptions_closed
             }
         }
 
@@ -730,7 +1325,7 @@ class UnifiedOrchestrator:
                 "remaining": remaining,
                 "utilization_pct": utilization,
                 "window": limits.get("window", 3600),
-                "last_reset": limits.get("last_reset")
+                "retry_after": round(self.rate_limiters[provider].retry_after(), 3)
             }
         return snapshot
 
@@ -746,57 +1341,92 @@ class UnifiedOrchestrator:
         Select a model while enforcing daily budget constraints.
         Falls back to cheaper available models if preferred model exceeds remaining budget.
         """
+        daily_budget = self.config.get("cost_tracking", {}).get("daily_budget", 50)
+        today_spend = self.get_daily_spend()
+        scale = estimated_tokens / 1000
+        costs = self.routing.costs
+
         preferred_model = self.get_model_for_task(task_type, complexity, priority)
-        if self.is_budget_available(preferred_model, estimated_tokens):
+        if today_spend + scale * costs.get(preferred_model, 0.003) <= daily_budget:
             return preferred_model
 
         # Budget-aware fallbacks ordered by relative cost efficiency
-        cost_ordered = ["k2p5", "minimax-m2.5", "sonnet", "codex", "opus"]
-        for model in cost_ordered:
-            if self.check_model_available(model) and self.is_budget_available(model, estimated_tokens):
-                return model
+        budget_order = self.routing.budget_order
+        for candidate in budget_order:
+            if (today_spend + scale * candidate.cost_per_1k <= daily_budget
+                    and self._provider_available(candidate.provider)):
+                return candidate.alias
 
         # If no model fits budget, return cheapest available to avoid hard failure
-        for model in cost_ordered:
-            if self.check_model_available(model):
-                return model
+        for candidate in budget_order:
+            if self._provider_available(candidate.provider):
+                return candidate.alias
 
         return "sonnet"
 
-    def forecast_monthly_spend(self, days: int = 30) -> Dict[str, float]:
-        """Forecast monthly spend from recent average usage."""
-        today_spend = self.get_daily_spend()
-        recent_days = max(min(days, 30), 1)
+    def forecast_monthly_spend(self, days: int = 30, confidence: float = 0.95) -> Dict[str, Any]:
+        """
+        Forecast spend over the next `days` days (max 30) from daily spend history.
+
+        Fits Holt-Winters (weekly season) to recent completed days, falling
+        back to simpler smoothing on short histories and to today's spend
+        times `days` when there is no history yet. The fit is cached per day,
+        so this is cheap enough for every dashboard refresh.
 
-        # Approximate using current day as baseline if no historical breakdown exists
-        projected_monthly = round(today_spend * recent_days, 4)
+        Returns:
+            projected_spend with a confidence band (lower_bound/upper_bound),
+            budget ceiling and delta, plus the model used
+        """
+        recent_days = max(min(days, 30), 1)
         daily_budget = self.config.get("cost_tracking", {}).get("daily_budget", 50)
         budget_monthly = round(daily_budget * recent_days, 4)
 
+        forecast = self.spend_series.forecast(horizon=recent_days, confidence=confidence)
+        if forecast["history_days"]:
+            projected = forecast["projected_spend"]
+            lower, upper = forecast["lower"], forecast["upper"]
+            method = forecast["method"]
+        else:
+            # No completed days yet: use the current day as baseline
+            projected = lower = upper = round(self.get_daily_spend() * recent_days, 4)
+            method = "today_baseline"
+
         return {
-            "projected_spend": projected_monthly,
+            "projected_spend": projected,
             "budget_ceiling": budget_monthly,
-            "delta_to_budget": round(budget_monthly - projected_monthly, 4)
+            "delta_to_budget": round(budget_monthly - projected, 4),
+            "lower_bound": lower,
+            "upper_bound": upper,
+            "confidence": confidence,
+            "method": method,
+            "history_days": forecast["history_days"],
+            "exceeds_budget_probable": lower > budget_monthly
+        }
+
+    def get_spend_history(self, days: int = 30, hours: int = 24) -> Dict[str, Any]:
+        """Recent daily totals (oldest first, ending today) and hourly totals (ending this hour)."""
+        days = min(days, self.spend_series.days)
+        today = datetime.now().date()
+        return {
+            "days": [
+                {"day": (today - timedelta(days=days - 1 - i)).isoformat(), "spend": round(v, 4)}
+                for i, v in enumerate(self.spend_series.daily(days))
+            ],
+            "hourly": [round(v, 4) for v in self.spend_series.hourly(hours)]
         }
 
     def get_usage_summary(self, limit: int = 5) -> Dict[str, Any]:
         """Return a compact usage summary by model for quick ops review."""
-        by_model: Dict[str, Dict[str, float]] = defaultdict(lambda: {"calls": 0, "tokens": 0})
-        for item in self.usage_log:
-            model = item.get("model", "unknown")
-            by_model[model]["calls"] += 1
-            by_model[model]["tokens"] += item.get("tokens", 0)
-
-        ranked = sorted(by_model.items(), key=lambda kv: kv[1]["calls"], reverse=True)[:limit]
+        # Read the running per-model counters; no pass over usage_log
+        ranked = sorted(list(self._usage_by_model.items()), key=lambda kv: kv[1][0], reverse=True)[:limit]
         top_models = []
-        for model, stats in ranked:
-            calls = max(stats["calls"], 1)
-            avg_tokens = round(stats["tokens"] / calls, 2)
-            est_cost = round(self.estimate_cost(model, stats["tokens"]), 4)
+        for model, (calls, tokens) in ranked:
+            avg_tokens = round(tokens / max(calls, 1), 2)
+            est_cost = round(self.estimate_cost(model, tokens), 4)
             top_models.append({
                 "model": model,
-                "calls": stats["calls"],
-                "tokens": stats["tokens"],
+                "calls": calls,
+                "tokens": tokens,
                 "avg_tokens_per_call": avg_tokens,
                 "estimated_spend": est_cost
             })
@@ -908,11 +1538,37 @@ class UnifiedOrchestrator:
             "reason": "Normal operating range"
         }
 
-    def get_status_report(self):
-        """Get current orchestrator status"""
-        today = datetime.now().strftime("%Y-%m-%d")
+    def _status_providers(self) -> Dict[str, Any]:
+        return {
+            "rate_limits": self.config.get("rate_limits", {}),
+            "provider_usage": self.get_provider_usage_snapshot()
+        }
+
+    def _status_usage(self) -> Dict[str, Any]:
+        return {
+            "usage_summary": self.get_usage_summary(),
+            "recent_usage": len(self.usage_log),
+            "usage_journal": self.usage_journal.get_stats()
+        }
+
+    def _status_budget(self) -> Dict[str, Any]:
         daily_budget = self.config.get("cost_tracking", {}).get("daily_budget", 50)
-        today_spend = self.get_daily_spend(today)
+        today_spend = self.get_daily_spend()
+        return {
+            "daily_budget": daily_budget,
+            "today_spend": today_spend,
+            "budget_remaining": round(max(daily_budget - today_spend, 0), 4),
+            "budget_utilization_pct": self.get_budget_utilization_pct(),
+            "budget_alert_level": self.get_budget_alert_level()
+        }
+
+    def _status_operations(self) -> Dict[str, Any]:
+        return {
+            "operational_flags": self.get_operational_flags(),
+            "model_mix_recommendation": self.get_model_mix_recommendation()
+        }
+
+    def _status_pricing(self) -> Dict[str, Any]:
         default_quote_model = self.get_model_for_task("coding", "medium", "normal")
         sample_quote = self.recommend_task_price(default_quote_model, estimated_tokens=2000, complexity="medium")
         sample_guardrail = self.evaluate_pricing_guardrails(sample_quote, delivery_type="task")
@@ -925,19 +1581,6 @@ class UnifiedOrchestrator:
         sample_exception_aging = self.assess_exception_aging([4, 11, 19, 33])
         sample_exception_alert = self.build_exception_alert(sample_exception_aging)
         return {
-            "timestamp": datetime.now().isoformat(),
-            "models_active": len(self.config["models"]),
-            "rate_limits": self.config.get("rate_limits", {}),
-            "provider_usage": self.get_provider_usage_snapshot(),
-            "usage_summary": self.get_usage_summary(),
-            "recent_usage": len(self.usage_log),
-            "daily_budget": daily_budget,
-            "today_spend": today_spend,
-            "budget_remaining": round(max(daily_budget - today_spend, 0), 4),
-            "budget_utilization_pct": self.get_budget_utilization_pct(),
-            "budget_alert_level": self.get_budget_alert_level(),
-            "operational_flags": self.get_operational_flags(),
-            "model_mix_recommendation": self.get_model_mix_recommendation(),
             "pricing_policy": self.get_pricing_policy(),
             "example_task_quote": sample_quote,
             "pricing_guardrail_check": sample_guardrail,
@@ -953,14 +1596,68 @@ class UnifiedOrchestrator:
                 {"total_quotes": 45, "approval_rate": 0.88, "avg_margin_pct": 68.0, "exceptions_created": 2}
             ),
             "exception_aging_preview": sample_exception_aging,
-            "exception_alert_preview": sample_exception_alert,
-            "usage_anomalies": self.detect_usage_anomalies(),
-            "monthly_forecast": self.forecast_monthly_spend(),
+            "exception_alert_preview": sample_exception_alert
+        }
+
+    def _status_anomalies(self) -> Dict[str, Any]:
+        return {"usage_anomalies": self.detect_usage_anomalies()}
+
+    def _status_forecast(self) -> Dict[str, Any]:
+        return {"monthly_forecast": self.forecast_monthly_spend()}
+
+    def get_status_section(self, name: str, refresh: bool = False) -> Dict[str, Any]:
+        """
+        One memoized status report section (see STATUS_SECTIONS).
+
+        Args:
+            name: Section name
+            refresh: Rebuild the section even if the memoized copy is fresh
+
+        Returns:
+            The section's report keys; shared with other callers, so treat as read-only
+        """
+        if name not in self.STATUS_SECTIONS:
+            raise ValueError(f"Unknown status section: {name}")
+        ttl, dependencies = self.STATUS_SECTIONS[name]
+        builder = getattr(self, f"_status_{name}")
+        if refresh:
+            self._status_cache.invalidate(name)
+        return self._status_cache.get_or_compute(
+            name, builder, ttl_seconds=ttl, generation=self.get_generation(*dependencies)
+        )
+
+    def get_status_report(self, sections: Optional[Iterable[str]] = None, refresh: bool = False) -> Dict[str, Any]:
+        """
+        Get current orchestrator status.
+
+        Args:
+            sections: Names from STATUS_SECTIONS to include (default: all).
+                timestamp, models_active and the orchestration roles are always included.
+            refresh: Rebuild the requested sections instead of serving memoized copies
+
+        Returns:
+            Status report dict
+        """
+        names = set(self.STATUS_SECTIONS if sections is None else sections)
+        unknown = names - self.STATUS_SECTIONS.keys()
+        if unknown:
+            raise ValueError(f"Unknown status sections: {', '.join(sorted(unknown))}")
+
+        report = {
+            "timestamp": datetime.now().isoformat(),
+            "models_active": len(self.config["models"])
+        }
+        # Sections in declaration order, so the full report keeps a stable key order
+        for name in self.STATUS_SECTIONS:
+            if name in names:
+                report.update(self.get_status_section(name, refresh=refresh))
+        report.update({
             "orchestration_mode": "unified",
             "ceo_model": "opus",
             "ops_model": "sonnet",
             "dev_models": ["k2p5", "minimax-m2.5", "codex"]
-        }
+        })
+        return report
 
 # Global orchestrator instance
 orchestrator = UnifiedOrchestrator()
@@ -999,91 +1696,16 @@ class OrchestratorMonitor:
 monitor = OrchestratorMonitor(orchestrator)
 
 
-# Simple TTL Cache for expensive operations
-class SimpleTTLCache:
-    """
-    Thread-safe TTL cache for expensive operations.
-    Used to cache model recommendations and pricing calculations.
-    """
-    
-    def __init__(self, default_ttl_seconds: int = 60):
-        self._cache: Dict[str, Any] = {}
-        self._timestamps: Dict[str, float] = {}
-        self._lock = threading.Lock()
-        self.default_ttl = default_ttl_seconds
-    
-    def get(self, key: str) -> Optional[Any]:
-        """Get value if not expired."""
-        with self._lock:
-            if key not in self._cache:
-                return None
-            
-            timestamp = self._timestamps.get(key, 0)
-            if (time.time() - timestamp) > self.default_ttl:
-                # Expired - clean up
-                del self._cache[key]
-                del self._timestamps[key]
-                return None
-            
-            return self._cache[key]
-    
-    def set(self, key: str, value: Any, ttl_seconds: Optional[int] = None) -> None:
-        """Store value with optional custom TTL."""
-        ttl = ttl_seconds or self.default_ttl
-        with self._lock:
-            self._cache[key] = value
-            self._timestamps[key] = time.time()
-    
-    def invalidate(self, key: str) -> bool:
-        """Remove key from cache. Returns True if key existed."""
-        with self._lock:
-            if key in self._cache:
-                del self._cache[key]
-                del self._timestamps[key]
-                return True
-            return False
-    
-    def clear(self) -> None:
-        """Clear all cached entries."""
-        with self._lock:
-            self._cache.clear()
-            self._timestamps.clear()
-    
-    def cleanup_expired(self) -> int:
-        """Remove expired entries. Returns count removed."""
-        now = time.time()
-        removed = 0
-        with self._lock:
-            expired_keys = [
-                k for k, ts in self._timestamps.items()
-                if (now - ts) > self.default_ttl
-            ]
-            for k in expired_keys:
-                del self._cache[k]
-                del self._timestamps[k]
-                removed += 1
-        return removed
-    
-    def get_stats(self) -> Dict[str, Any]:
-        """Get cache statistics."""
-        with self._lock:
-            now = time.time()
-            expired = sum(
-                1 for ts in self._timestamps.values()
-                if (now - ts) > self.default_ttl
-            )
-            return {
-                "total_entries": len(self._cache),
-                "expired_entries": expired,
-                "valid_entries": len(self._cache) - expired,
-                "default_ttl_seconds": self.default_ttl
-            }
-
+# Caches for expensive operations
+# Entries are tagged with the orchestrator generations they depend on, so a
+# rate-limit, budget-level or config change invalidates them before their TTL.
+_model_cache = LRUTTLCache(default_ttl_seconds=300, max_entries=1024)
+_pricing_cache = LRUTTLCache(default_ttl_seconds=3600, max_entries=4096)
+_team_cache = LRUTTLCache(default_ttl_seconds=3600, max_entries=256)
 
-# Global cache instances
-_model_cache = SimpleTTLCache(default_ttl_seconds=30)  # Model availability changes frequently
-_pricing_cache = SimpleTTLCache(default_ttl_seconds=300)  # Pricing policy changes less often
-_team_cache = SimpleTTLCache(default_ttl_seconds=60)  # Team compositions stable
+MODEL_CACHE_DEPENDENCIES = ("rate_limit", "budget", "config")
+PRICING_CACHE_DEPENDENCIES = ("config",)
+TEAM_CACHE_DEPENDENCIES = ("config",)
 
 
 def cached_model_selection(task_type: str, complexity: str, priority: str) -> str:
@@ -1092,16 +1714,11 @@ def cached_model_selection(task_type: str, complexity: str, priority: str) -> st
     Cache key includes all parameters that affect selection.
     """
     cache_key = f"model:{task_type}:{complexity}:{priority}"
-    
-    # Try cache first
-    cached = _model_cache.get(cache_key)
-    if cached is not None:
-        monitor.record_request()
-        return cached
-    
-    # Compute and cache
-    result = orchestrator.get_model_for_task(task_type, complexity, priority)
-    _model_cache.set(cache_key, result)
+    result = _model_cache.get_or_compute(
+        cache_key,
+        lambda: orchestrator.get_model_for_task(task_type, complexity, priority),
+        generation=orchestrator.get_generation(*MODEL_CACHE_DEPENDENCIES)
+    )
     monitor.record_request()
     return result
 
@@ -1109,14 +1726,11 @@ def cached_model_selection(task_type: str, complexity: str, priority: str) -> st
 def cached_team_recommendation(project_type: str) -> Dict[str, str]:
     """Get team composition with caching."""
     cache_key = f"team:{project_type}"
-    
-    cached = _team_cache.get(cache_key)
-    if cached is not None:
-        return cached
-    
-    result = orchestrator.get_team_for_project(project_type)
-    _team_cache.set(cache_key, result)
-    return result
+    return _team_cache.get_or_compute(
+        cache_key,
+        lambda: orchestrator.get_team_for_project(project_type),
+        generation=orchestrator.get_generation(*TEAM_CACHE_DEPENDENCIES)
+    )
 
 
 def cached_price_quote(model: str, tokens: int, complexity: str, segment: str) -> Dict[str, Any]:
@@ -1124,14 +1738,11 @@ def cached_price_quote(model: str, tokens: int, complexity: str, segment: str) -
     # Round tokens to nearest 100 for better cache hit rate
     rounded_tokens = round(tokens / 100) * 100
     cache_key = f"price:{model}:{rounded_tokens}:{complexity}:{segment}"
-    
-    cached = _pricing_cache.get(cache_key)
-    if cached is not None:
-        return cached
-    
-    result = orchestrator.recommend_task_price(model, tokens, complexity, segment)
-    _pricing_cache.set(cache_key, result)
-    return result
+    return _pricing_cache.get_or_compute(
+        cache_key,
+        lambda: orchestrator.recommend_task_price(model, tokens, complexity, segment),
+        generation=orchestrator.get_generation(*PRICING_CACHE_DEPENDENCIES)
+    )
 
 
 def invalidate_caches(cache_type: Optional[str] = None) -> Dict[str, int]:
@@ -1139,7 +1750,7 @@ def invalidate_caches(cache_type: Optional[str] = None) -> Dict[str, int]:
     Invalidate cache entries.
     
     Args:
-        cache_type: 'model', 'pricing', 'team', or None for all
+        cache_type: 'model', 'pricing', 'team', 'status', or None for all
     
     Returns:
         Dict with counts of invalidated entries by cache type
@@ -1147,30 +1758,45 @@ def invalidate_caches(cache_type: Optional[str] = None) -> Dict[str, int]:
     results = {}
     
     if cache_type is None or cache_type == "model":
-        count = len(_model_cache._cache)
+        count = len(_model_cache)
         _model_cache.clear()
         results["model"] = count
     
     if cache_type is None or cache_type == "pricing":
-        count = len(_pricing_cache._cache)
+        count = len(_pricing_cache)
         _pricing_cache.clear()
         results["pricing"] = count
     
     if cache_type is None or cache_type == "team":
-        count = len(_team_cache._cache)
+        count = len(_team_cache)
         _team_cache.clear()
         results["team"] = count
     
+    if cache_type is None or cache_type == "status":
+        count = len(orchestrator._status_cache)
+        orchestrator._status_cache.clear()
+        results["status"] = count
+    
     return results
 
 
 def get_cache_status() -> Dict[str, Any]:
     """Get status of all caches for monitoring."""
-    return {
+    caches = {
         "model_cache": _model_cache.get_stats(),
         "pricing_cache": _pricing_cache.get_stats(),
         "team_cache": _team_cache.get_stats(),
-        "cache_hit_savings_estimate": "~5-15ms per cached call"
+        "status_cache": orchestrator._status_cache.get_stats()
+    }
+    hits = sum(stats["hits"] for stats in caches.values())
+    lookups = hits + sum(stats["misses"] for stats in caches.values())
+    # Time saved = hits x measured average compute time for that cache
+    saved_ms = sum(stats["hits"] * stats["avg_load_ms"] for stats in caches.values())
+    return {
+        **caches,
+        "generations": dict(orchestrator.generations),
+        "overall_hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+        "estimated_time_saved_ms": round(saved_ms, 3)
     }
 
 
@@ -1179,6 +1805,11 @@ class ABTestFramework:
     """
     A/B testing framework for pricing optimization and feature experiments.
     
+    Assignment is a pure function of (experiment_id, user_id), so nothing is
+    stored per user: exposed users are counted with a distinct-count sketch
+    per variant, and outcomes are appended to a journal whose compaction
+    rolls them up into per-variant counters.
+    
     Usage:
         ab = ABTestFramework()
         
@@ -1206,23 +1837,121 @@ class ABTestFramework:
         self.storage_path = Path(storage_path)
         self.storage_path.mkdir(parents=True, exist_ok=True)
         self.experiments_file = self.storage_path / "ab_experiments.json"
-        self.experiments = self._load_experiments()
         self._lock = threading.Lock()
+        
+        # Experiment definitions plus exposure sketches: small, written behind
+        self.experiments: Dict[str, Dict[str, Any]] = {}
+        self._exposures: Dict[str, Dict[str, DistinctCounter]] = {}
+        self._store = WriteBehindStore(
+            path=self.experiments_file,
+            snapshot=self._snapshot,
+            lock=self._lock,
+            durability="relaxed",
+            indent=2
+        )
+        
+        # Outcomes: append-only journal, rolled up into per-variant counters
+        self._results: Dict[str, Dict[str, Dict[str, float]]] = {}
+        self.outcome_journal = AppendOnlyJournal(
+            self.storage_path / "ab-journal",
+            prefix="outcomes",
+            max_segment_bytes=1024 * 1024,
+            reducer=fold_ab_outcome
+        )
+        self._load_experiments()
     
-    def _load_experiments(self) -> Dict[str, Any]:
-        """Load experiments from disk."""
+    def _load_experiments(self):
+        """Load experiments and replay outcomes (migrating legacy per-user assignments once)."""
         if self.experiments_file.exists():
             try:
                 with open(self.experiments_file, 'r') as f:
-                    return json.load(f)
+                    stored = json.load(f)
             except Exception:
-                return {}
-        return {}
+                stored = {}
+        else:
+            stored = {}
+        
+        state, records = self.outcome_journal.replay()
+        for experiment_id, variants in state.get("results", {}).items():
+            for variant, counters in variants.items():
+                self._add_counters(experiment_id, variant, counters)
+        for record in records:
+            self._apply_outcome(record)
+        
+        migrated = False
+        for experiment_id, experiment in stored.items():
+            exposures = experiment.pop("exposures", {})
+            assignments = experiment.pop("assignments", None)
+            legacy_results = experiment.pop("results", None)
+            self.experiments[experiment_id] = experiment
+            self._exposures[experiment_id] = {
+                variant: DistinctCounter.from_dict(exposures[variant]) if variant in exposures else DistinctCounter()
+                for variant in experiment["variants"]
+            }
+            
+            if assignments is not None:
+                # Legacy format: count the stored users once and journal their totals
+                for user_id, variant in assignments.items():
+                    counter = self._exposures[experiment_id].get(variant)
+                    if counter is not None:
+                        counter.add_hash(self._user_hash(experiment_id, user_id) >> 64)
+                for variant, data in (legacy_results or {}).items():
+                    record = {
+                        "op": "seed",
+                        "e": experiment_id,
+                        "v": variant,
+                        "c": data.get("conversions", 0),
+                        "r": data.get("revenue", 0.0),
+                        "g": data.get("engagement", 0.0),
+                        "gn": data.get("engagement_count", 0)
+                    }
+                    self._apply_outcome(record)
+                    self.outcome_journal.append(record)
+                migrated = True
+        
+        if migrated:
+            # Rewrite without the per-user map right away so the seeds are never journaled twice
+            with self._lock:
+                self._store.mark_dirty()
+            self._store.flush()
+    
+    def _snapshot(self) -> Dict[str, Any]:
+        return {
+            experiment_id: {
+                **experiment,
+                "exposures": {
+                    variant: counter.to_dict()
+                    for variant, counter in self._exposures.get(experiment_id, {}).items()
+                }
+            }
+            for experiment_id, experiment in self.experiments.items()
+        }
+    
+    def _add_counters(self, experiment_id: str, variant: str, counters: Dict[str, float]):
+        totals = self._results.setdefault(experiment_id, {}).setdefault(variant, new_ab_counters())
+        for key in totals:
+            totals[key] += counters.get(key, 0)
+    
+    def _apply_outcome(self, record: Dict[str, Any]):
+        """Fold one journal record into the in-memory counters."""
+        fold_ab_outcome({"results": self._results}, record)
     
-    def _save_experiments(self):
-        """Save experiments to disk."""
-        with open(self.experiments_file, 'w') as f:
-            json.dump(self.experiments, f, indent=2)
+    @staticmethod
+    def _user_hash(experiment_id: str, user_id: str) -> int:
+        """128-bit assignment hash: low bits pick the variant, high 64 bits feed the exposure sketch."""
+        return int(hashlib.md5(f"{experiment_id}:{user_id}".encode()).hexdigest(), 16)
+    
+    @staticmethod
+    def _variant_for(experiment: Dict[str, Any], hash_val: int) -> str:
+        """Variant for an assignment hash (same split as ever, so users keep their variant)."""
+        variants = list(experiment["variants"].keys())
+        if len(variants) < 2:
+            return variants[0] if variants else "control"
+        
+        # Assign to test variant based on traffic split
+        if (hash_val % 100) < (experiment["traffic_split"] * 100):
+            return "test" if "test" in variants else variants[1]
+        return "control" if "control" in variants else variants[0]
     
     def create_experiment(
         self,
@@ -1258,15 +1987,13 @@ class ABTestFramework:
             "min_sample_size": min_sample_size,
             "success_metric": success_metric,
             "status": "running",
-            "created_at": datetime.now().isoformat(),
-            "assignments": {},  # user_id -> variant
-            "results": {variant: {"conversions": 0, "total": 0, "revenue": 0.0} 
-                       for variant in variants.keys()}
+            "created_at": datetime.now().isoformat()
         }
         
         with self._lock:
             self.experiments[experiment_id] = experiment
-            self._save_experiments()
+            self._exposures[experiment_id] = {variant: DistinctCounter() for variant in variants}
+            self._store.mark_dirty()
         
         return {"success": True, "experiment": experiment}
     
@@ -1274,40 +2001,26 @@ class ABTestFramework:
         """
         Assign a user to a variant for an experiment.
         Returns the variant name assigned.
+        
+        Deterministic in (experiment_id, user_id); no per-user state or I/O.
         """
-        with self._lock:
-            if experiment_id not in self.experiments:
-                return "control"  # Default fallback
-            
-            experiment = self.experiments[experiment_id]
-            
-            if experiment["status"] != "running":
-                return "control"
-            
-            # Check if already assigned
-            if user_id in experiment["assignments"]:
-                return experiment["assignments"][user_id]
-            
-            # Assign based on traffic split
-            variants = list(experiment["variants"].keys())
-            if len(variants) < 2:
-                return variants[0] if variants else "control"
-            
-            # Use hash for deterministic but random-looking assignment
-            hash_input = f"{experiment_id}:{user_id}"
-            hash_val = int(hashlib.md5(hash_input.encode()).hexdigest(), 16)
-            
-            # Assign to test variant based on traffic split
-            if (hash_val % 100) < (experiment["traffic_split"] * 100):
-                variant = "test" if "test" in variants else variants[1]
-            else:
-                variant = "control" if "control" in variants else variants[0]
-            
-            experiment["assignments"][user_id] = variant
-            experiment["results"][variant]["total"] += 1
-            self._save_experiments()
-            
-            return variant
+        experiment = self.experiments.get(experiment_id)
+        if experiment is None:
+            return "control"  # Default fallback
+        
+        if experiment["status"] != "running":
+            return "control"
+        
+        hash_val = self._user_hash(experiment_id, user_id)
+        variant = self._variant_for(experiment, hash_val)
+        
+        counter = self._exposures.get(experiment_id, {}).get(variant)
+        if counter is not None:
+            with self._lock:
+                if counter.add_hash(hash_val >> 64):
+                    self._store.mark_dirty()
+        
+        return variant
     
     def record_outcome(
         self,
@@ -1317,33 +2030,38 @@ class ABTestFramework:
         revenue: float = 0.0,
         engagement: float = 0.0
     ):
-        """Record an outcome for a user in an experiment."""
+        """Record an outcome for a user in an experiment (ignored unless it is running)."""
+        experiment = self.experiments.get(experiment_id)
+        if experiment is None:
+            return
+        
+        hash_val = self._user_hash(experiment_id, user_id)
+        variant = self._variant_for(experiment, hash_val)
+        record = {
+            "ts": round(time.time(), 3),
+            "e": experiment_id,
+            "v": variant,
+            "c": int(bool(converted)),
+            "r": revenue,
+            "g": engagement if engagement > 0 else 0.0,
+            "gn": int(engagement > 0)
+        }
+        
         with self._lock:
-            if experiment_id not in self.experiments:
-                return
-            
-            experiment = self.experiments[experiment_id]
-            
-            if user_id not in experiment["assignments"]:
+            # Outside a run assign_variant serves "control" to everyone, so the hash
+            # says nothing about what the user saw; stopped results stay final
+            if experiment["status"] != "running":
                 return
-            
-            variant = experiment["assignments"][user_id]
-            
-            if converted:
-                experiment["results"][variant]["conversions"] += 1
-            
-            experiment["results"][variant]["revenue"] += revenue
-            
-            # Track engagement separately if provided
-            if "engagement" not in experiment["results"][variant]:
-                experiment["results"][variant]["engagement"] = 0.0
-                experiment["results"][variant]["engagement_count"] = 0
-            
-            if engagement > 0:
-                experiment["results"][variant]["engagement"] += engagement
-                experiment["results"][variant]["engagement_count"] += 1
-            
-            self._save_experiments()
+            # A user with an outcome was exposed, even if assigned by another process
+            counter = self._exposures.get(experiment_id, {}).get(variant)
+            if counter is not None and counter.add_hash(hash_val >> 64):
+                self._store.mark_dirty()
+            self._apply_outcome(record)
+        self.outcome_journal.append(record)
+    
+    def rollup(self) -> int:
+        """Fold sealed outcome segments into the per-variant counter checkpoint now."""
+        return self.outcome_journal.compact(force=True)
     
     def get_results(self, experiment_id: str) -> Dict[str, Any]:
         """Get statistical results for an experiment."""
@@ -1352,13 +2070,18 @@ class ABTestFramework:
                 return {"error": "Experiment not found"}
             
             experiment = self.experiments[experiment_id]
-            results = experiment["results"]
+            exposures = self._exposures.get(experiment_id, {})
+            counters = self._results.get(experiment_id, {})
+            results = {
+                variant: (exposures[variant].estimate() if variant in exposures else 0,
+                          dict(counters.get(variant) or new_ab_counters()))
+                for variant in list(experiment["variants"]) + [v for v in counters if v not in experiment["variants"]]
+            }
             
             # Calculate conversion rates and confidence intervals
             analysis = {}
-            for variant, data in results.items():
-                total = data["total"]
-                conversions = data["conversions"]
+            for variant, (total, data) in results.items():
+                conversions = int(data["conversions"])
                 revenue = data["revenue"]
                 
                 conversion_rate = conversions / max(total, 1)
@@ -1412,13 +2135,13 @@ class ABTestFramework:
             if winner:
                 self.experiments[experiment_id]["winner"] = winner
             
-            self._save_experiments()
-            
-            return {
-                "success": True,
-                "experiment_id": experiment_id,
-                "final_results": self.get_results(experiment_id)
-            }
+            self._store.mark_dirty()
+        
+        return {
+            "success": True,
+            "experiment_id": experiment_id,
+            "final_results": self.get_results(experiment_id)
+        }
     
     def list_experiments(self) -> List[Dict[str, Any]]:
         """List all experiments with summary."""
@@ -1429,12 +2152,17 @@ class ABTestFramework:
                     "name": exp["name"],
                     "status": exp["status"],
                     "variants": list(exp["variants"].keys()),
-                    "total_assignments": len(exp["assignments"]),
+                    "total_assignments": sum(
+                        counter.estimate() for counter in self._exposures.get(exp["id"], {}).values()
+                    ),
                     "created_at": exp["created_at"]
                 }
                 for exp in self.experiments.values()
             ]
-
+    
+    def flush(self):
+        """Write pending experiment state now."""
+        self._store.flush()
 
 # Initialize A/B testing framework
 ab_testing = ABTestFramework()
@@ -1455,7 +2183,9 @@ class AlertManager:
     - Alert throttling (prevent spam)
     - Alert severity levels
     - Alert acknowledgment
-    - Alert history
+    - Alert history (bounded ring, append-only journal)
+    - Background HTTP delivery with keep-alive connections, jittered
+      retries and digests for bursts
     
     Usage:
         alerts = AlertManager()
@@ -1477,16 +2207,45 @@ class AlertManager:
     SEVERITY_WARNING = "warning"
     SEVERITY_CRITICAL = "critical"
     
-    def __init__(self, storage_path: str = "/home/m1ndb0t/Desktop/J1MSKY/config"):
+    SEVERITY_RANK = {SEVERITY_INFO: 0, SEVERITY_WARNING: 1, SEVERITY_CRITICAL: 2}
+    
+    # Channel types posted over HTTP from the delivery workers
+    HTTP_CHANNEL_TYPES = ("slack", "webhook")
+    
+    def __init__(
+        self,
+        storage_path: str = "/home/m1ndb0t/Desktop/J1MSKY/config",
+        delivery_workers: int = ALERT_DELIVERY_WORKERS,
+        coalesce_seconds: float = ALERT_COALESCE_SECONDS
+    ):
         self.storage_path = Path(storage_path)
         self.storage_path.mkdir(parents=True, exist_ok=True)
         self.alerts_file = self.storage_path / "alerts.json"
         self.config_file = self.storage_path / "alert_channels.json"
         
         self.channels = self._load_channels()
-        self.alert_history = self._load_alerts()
         self._lock = threading.Lock()
         
+        # History: bounded ring in memory, append-only journal on disk
+        self.alert_history: deque = deque(maxlen=ALERT_HISTORY_LIMIT)
+        self._alert_index: Dict[str, Dict] = {}
+        self.alert_journal = AppendOnlyJournal(
+            self.storage_path / "alert-journal",
+            prefix="alerts",
+            max_segment_bytes=1024 * 1024,
+            reducer=fold_alert_history
+        )
+        self._load_alerts()
+        
+        # Delivery: pooled keep-alive HTTP, worker pool, retries and digests
+        self.http_pool = HTTPConnectionPool(timeout=ALERT_HTTP_TIMEOUT, user_agent="j1msky-alerts/1.0")
+        self.delivery = DeliveryQueue(
+            self._deliver,
+            workers=delivery_workers,
+            coalesce_seconds=coalesce_seconds,
+            name="alert-delivery"
+        )
+        
         # Throttling: track last alert time by (severity, category)
         self._last_alert_time: Dict[str, float] = {}
         self._throttle_intervals = {
@@ -1510,20 +2269,36 @@ class AlertManager:
         with open(self.config_file, 'w') as f:
             json.dump(self.channels, f, indent=2)
     
-    def _load_alerts(self) -> List[Dict]:
-        """Load alert history."""
-        if self.alerts_file.exists():
+    def _remember(self, alert: Dict) -> None:
+        """Add an alert to the history ring (lock held)."""
+        if len(self.alert_history) == self.alert_history.maxlen:
+            self._alert_index.pop(self.alert_history[0]["id"], None)
+        self.alert_history.append(alert)
+        self._alert_index[alert["id"]] = alert
+    
+    def _load_alerts(self):
+        """Rebuild alert history from the journal (importing a legacy alerts.json once)."""
+        state, records = self.alert_journal.replay()
+        for alert in state.get("alerts", []):
+            self._remember(alert)
+        for record in records:
+            if record.get("op") == "ack":
+                alert = self._alert_index.get(record["id"])
+                if alert is not None:
+                    alert["acknowledged"] = True
+                    alert["acknowledged_at"] = record.get("at")
+            elif "alert" in record:
+                self._remember(record["alert"])
+        
+        if not self.alert_history and self.alerts_file.exists():
             try:
                 with open(self.alerts_file, 'r') as f:
-                    return json.load(f)[-1000:]  # Keep last 1000
+                    legacy = json.load(f)[-ALERT_HISTORY_LIMIT:]
             except Exception:
-                return []
-        return []
-    
-    def _save_alerts(self):
-        """Save alert history."""
-        with open(self.alerts_file, 'w') as f:
-            json.dump(self.alert_history[-1000:], f, indent=2)  # Keep last 1000
+                legacy = []
+            for alert in legacy:
+                self._remember(alert)
+                self.alert_journal.append({"op": "alert", "alert": alert})
     
     def add_slack_channel(self, name: str, webhook_url: str, channel: str = None):
         """Add Slack webhook channel."""
@@ -1618,12 +2393,12 @@ class AlertManager:
             "acknowledged": False
         }
         
-        # Save to history
+        # Save to history (one journal line, not a rewrite of the whole file)
         with self._lock:
-            self.alert_history.append(alert)
-            self._save_alerts()
+            self._remember(alert)
+            self.alert_journal.append({"op": "alert", "alert": alert})
         
-        # Deliver to channels
+        # Deliver to channels; HTTP channels are queued so a slow receiver never blocks the caller
         results = {}
         target_channels = channels or list(self.channels.keys())
         
@@ -1641,12 +2416,11 @@ class AlertManager:
                 if channel["type"] == "console":
                     self._send_console(alert)
                     results[channel_name] = {"success": True}
-                elif channel["type"] == "slack":
-                    self._send_slack(alert, channel)
-                    results[channel_name] = {"success": True}
-                elif channel["type"] == "webhook":
-                    self._send_webhook(alert, channel)
-                    results[channel_name] = {"success": True}
+                elif channel["type"] in self.HTTP_CHANNEL_TYPES:
+                    if self.delivery.submit(channel_name, alert):
+                        results[channel_name] = {"success": True, "queued": True}
+                    else:
+                        results[channel_name] = {"success": False, "error": "Delivery queue full"}
                 else:
                     results[channel_name] = {"success": False, "error": "Unknown channel type"}
             except Exception as e:
@@ -1674,33 +2448,58 @@ class AlertManager:
         if alert['data']:
             print(f"  Data: {json.dumps(alert['data'], indent=2)}")
     
+    def _build_digest(self, alerts: List[Dict]) -> Dict:
+        """Combine a coalesced burst into one alert-shaped digest."""
+        severity = max((a["severity"] for a in alerts), key=lambda s: self.SEVERITY_RANK.get(s, 0))
+        return {
+            "id": f"digest_{alerts[0]['id']}",
+            "severity": severity,
+            "title": f"{len(alerts)} alerts",
+            "message": "\n".join(f"[{a['severity'].upper()}] {a['title']}: {a['message']}" for a in alerts),
+            "category": "digest",
+            "timestamp": alerts[-1]["timestamp"],
+            "data": {"alert_ids": [a["id"] for a in alerts]},
+            "alerts": alerts
+        }
+    
+    def _deliver(self, channel_name: str, alerts: List[Dict]):
+        """Deliver one alert or a coalesced digest (runs on a delivery worker)."""
+        channel = self.channels.get(channel_name)
+        if channel is None or not channel.get("enabled", True):
+            raise DeliveryError(f"Channel {channel_name} removed or disabled", retryable=False)
+        alert = alerts[0] if len(alerts) == 1 else self._build_digest(alerts)
+        if channel["type"] == "slack":
+            self._send_slack(alert, channel)
+        elif channel["type"] == "webhook":
+            self._send_webhook(alert, channel)
+    
     def _send_slack(self, alert: Dict, channel: Dict):
         """Send alert to Slack webhook."""
-        # Note: In production, this would make an HTTP POST
-        # For now, we just log that it would be sent
         webhook_url = channel.get("webhook_url", "")
-        if webhook_url:
-            # In production: requests.post(webhook_url, json=payload)
-            pass
+        if not webhook_url:
+            raise DeliveryError("Slack channel has no webhook_url", retryable=False)
+        payload = {"text": f"*[{alert['severity'].upper()}] {alert['title']}*\n{alert['message']}"}
+        if channel.get("channel"):
+            payload["channel"] = channel["channel"]
+        self.http_pool.post_json(webhook_url, payload)
     
     def _send_webhook(self, alert: Dict, channel: Dict):
         """Send alert to generic webhook."""
-        # Note: In production, this would make an HTTP POST
         url = channel.get("url", "")
-        if url:
-            # In production: requests.post(url, json=alert, headers=headers)
-            pass
+        if not url:
+            raise DeliveryError("Webhook channel has no url", retryable=False)
+        self.http_pool.post_json(url, alert, headers=channel.get("headers"))
     
     def acknowledge_alert(self, alert_id: str) -> bool:
         """Acknowledge an alert."""
         with self._lock:
-            for alert in self.alert_history:
-                if alert["id"] == alert_id:
-                    alert["acknowledged"] = True
-                    alert["acknowledged_at"] = datetime.now().isoformat()
-                    self._save_alerts()
-                    return True
-            return False
+            alert = self._alert_index.get(alert_id)
+            if alert is None:
+                return False
+            alert["acknowledged"] = True
+            alert["acknowledged_at"] = datetime.now().isoformat()
+            self.alert_journal.append({"op": "ack", "id": alert_id, "at": alert["acknowledged_at"]})
+            return True
     
     def get_active_alerts(self, severity: str = None) -> List[Dict]:
         """Get non-acknowledged alerts."""
@@ -1713,14 +2512,28 @@ class AlertManager:
     def get_alert_history(self, limit: int = 100) -> List[Dict]:
         """Get alert history."""
         with self._lock:
-            return self.alert_history[-limit:]
+            return list(self.alert_history)[-limit:]
+    
+    def flush_deliveries(self, timeout: float = 10.0) -> bool:
+        """Send any held digests now and wait for queued deliveries. Returns False on timeout."""
+        self.delivery.flush()
+        return self.delivery.wait_idle(timeout)
+    
+    def get_delivery_stats(self) -> Dict[str, Any]:
+        """Get delivery queue, HTTP pool and history journal statistics."""
+        return {
+            "queue": self.delivery.get_stats(),
+            "http": self.http_pool.get_stats(),
+            "history_size": len(self.alert_history),
+            "journal": self.alert_journal.get_stats()
+        }
     
     def check_and_alert(self):
         """
         Check system conditions and send alerts if needed.
         Should be called periodically (e.g., every minute).
         """
-        status = orchestrator.get_status_report()
+        status = orchestrator.get_status_report(sections=("budget", "operations", "anomalies"))
         
         # Check budget
         budget_alert = status.get("budget_alert_level", "ok")
@@ -1798,12 +2611,41 @@ class CostOptimizer:
         )
     """
     
-    def __init__(self, storage_path: str = "/home/m1ndb0t/Desktop/J1MSKY/config"):
+    # Efficiency is scored over this trailing window once it has enough samples
+    EFFICIENCY_WINDOW = "week"
+    MIN_WINDOW_SAMPLES = 5
+    # A window this much more expensive than its baseline is an anomaly
+    ANOMALY_COST_RATIO = 1.5
+    # ...and a success rate this far below the baseline
+    ANOMALY_SUCCESS_DROP = 0.2
+    ANOMALY_MIN_SAMPLES = 3
+    
+    def __init__(
+        self,
+        storage_path: str = "/home/m1ndb0t/Desktop/J1MSKY/config",
+        routing_policy: str = BANDIT_POLICY
+    ):
         self.storage_path = Path(storage_path)
         self.storage_path.mkdir(parents=True, exist_ok=True)
         self.cost_db_file = self.storage_path / "cost_optimizer.json"
-        self.task_history = self._load_history()
-        self._lock = threading.Lock()
+        
+        # Online router learning from observed success, cost and latency
+        self.router = None
+        if routing_policy != "off":
+            self.router = BanditRouter(self.storage_path / "bandit-router.json", policy=routing_policy)
+        # Complexity of the last recommendation per (task_type, model), to attribute outcomes
+        self._last_complexity: Dict[Tuple[str, str], str] = {}
+        
+        # Observations: columnar arrays in memory, append-only journal on disk.
+        # Only segments older than the retention are compacted into per-key totals.
+        self.history = CostHistory(retention=COST_HISTORY_RETENTION)
+        self.cost_journal = AppendOnlyJournal(
+            self.storage_path / "cost-journal",
+            prefix="costs",
+            reducer=fold_cost_totals,
+            compact_min_age=COST_HISTORY_RETENTION
+        )
+        self._load_history()
         
         # Model cost profiles (cost per 1K tokens)
         self.model_profiles = {
@@ -1814,20 +2656,41 @@ class CostOptimizer:
             "codex": {"input": 0.002, "output": 0.006, "speed": "fast", "quality": "excellent"}
         }
     
-    def _load_history(self) -> Dict[str, Any]:
-        """Load cost history from disk."""
-        if self.cost_db_file.exists():
+    def _load_history(self):
+        """Rebuild the cost history from the journal (importing a legacy cost_optimizer.json once)."""
+        state, records = self.cost_journal.replay()
+        for task_type, models in state.get("totals", {}).items():
+            for model, totals in models.items():
+                self.history.seed(task_type, model, totals)
+        seen = bool(state.get("totals"))
+        for record in records:
+            seen = True
+            if record.get("op") == "seed":
+                self.history.seed(record["task_type"], record["model"], record)
+            else:
+                self.history.record(
+                    record["task_type"], record["model"], record.get("est", 0.0),
+                    record.get("act", 0.0), bool(record.get("ok", 1)), ts=record.get("ts")
+                )
+        self.history.trim()
+        
+        if not seen and self.cost_db_file.exists():
             try:
                 with open(self.cost_db_file, 'r') as f:
-                    return json.load(f)
+                    legacy = json.load(f).get("task_types", {})
             except Exception:
-                return {}
-        return {"task_types": {}, "model_efficiency": {}}
-    
-    def _save_history(self):
-        """Save cost history to disk."""
-        with open(self.cost_db_file, 'w') as f:
-            json.dump(self.task_history, f, indent=2)
+                legacy = {}
+            for task_type, models in legacy.items():
+                for model, data in models.items():
+                    totals = {
+                        "count": data.get("total_tasks", 0),
+                        "successes": data.get("successful_tasks", 0),
+                        "estimated": data.get("total_estimated_cost", 0.0),
+                        "actual": data.get("total_actual_cost", 0.0),
+                        "variance": data.get("cost_variance_sum", 0.0)
+                    }
+                    self.history.seed(task_type, model, totals)
+                    self.cost_journal.append({"op": "seed", "task_type": task_type, "model": model, **totals})
     
     def estimate_task_cost(self, model: str, input_tokens: int, output_tokens: int) -> float:
         """Estimate cost for a task."""
@@ -1861,6 +2724,11 @@ class CostOptimizer:
             Recommendation with model, estimated cost, and reasoning
         """
         candidates = []
+        context = (task_type, complexity)
+        observed = self.router.observations(context) if self.router is not None else 0
+        # Learned routing doesn't use the efficiency heuristic, so skip its lookups
+        learned = observed >= BANDIT_MIN_OBSERVATIONS
+        efficiencies = None if learned else self.get_model_efficiencies(task_type)
         
         for model, profile in self.model_profiles.items():
             # Check quality match
@@ -1876,7 +2744,7 @@ class CostOptimizer:
                 continue
             
             # Calculate efficiency score
-            efficiency = self._get_model_efficiency(task_type, model)
+            efficiency = efficiencies[model] if efficiencies is not None else None
             
             # Estimate cost for typical task
             estimated_input = 1500 if complexity == "low" else 3000 if complexity == "medium" else 5000
@@ -1889,7 +2757,7 @@ class CostOptimizer:
                 continue
             
             # Calculate score (lower is better): cost / efficiency
-            score = estimated_cost / max(efficiency, 0.1)
+            score = estimated_cost / max(efficiency, 0.1) if efficiency is not None else estimated_cost
             
             candidates.append({
                 "model": model,
@@ -1913,43 +2781,65 @@ class CostOptimizer:
         candidates.sort(key=lambda x: x["score"])
         
         best = candidates[0]
-        alternatives = candidates[1:3]  # Next 2 best options
+        if learned and len(candidates) > 1:
+            # Learned choice among candidates with rate-limit headroom
+            eligible = [c for c in candidates if orchestrator.check_model_available(c["model"])] or candidates
+            chosen = self.router.choose(
+                context,
+                [c["model"] for c in eligible],
+                prior_costs={c["model"]: c["estimated_cost"] for c in eligible}
+            )
+            best = next(c for c in eligible if c["model"] == chosen)
+            reasoning = f"Learned {self.router.policy} routing over {observed} observed outcomes"
+        else:
+            efficiency = best["efficiency"] if best["efficiency"] is not None else self._get_model_efficiency(
+                task_type, best["model"])
+            reasoning = f"Best balance of cost ({best['estimated_cost']}) and efficiency ({efficiency:.2f})"
+        
+        self._last_complexity[(task_type, best["model"])] = complexity
+        alternatives = [c for c in candidates if c is not best][:2]  # Next 2 best options
         
         return {
             "model": best["model"],
             "estimated_cost": best["estimated_cost"],
             "quality": best["quality"],
             "speed": best["speed"],
-            "reasoning": f"Best balance of cost ({best['estimated_cost']}) and efficiency ({best['efficiency']:.2f})",
+            "reasoning": reasoning,
             "alternatives": [
                 {"model": alt["model"], "estimated_cost": alt["estimated_cost"]} 
                 for alt in alternatives
             ]
         }
     
+    def _efficiency_of(self, task_type: str, model: str, now: float) -> float:
+        # Recent window when it has enough samples, otherwise all-time totals
+        window = self.history.window(task_type, model, self.EFFICIENCY_WINDOW, now=now)
+        if window.count < self.MIN_WINDOW_SAMPLES:
+            window = self.history.totals(task_type, model)
+            if window.count == 0:
+                return 0.5  # Default neutral efficiency
+        return window.efficiency()
+    
     def _get_model_efficiency(self, task_type: str, model: str) -> float:
         """Get efficiency score for model on task type (0-1 scale)."""
-        with self._lock:
-            task_data = self.task_history.get("task_types", {}).get(task_type, {})
-            model_data = task_data.get(model, {})
-            
-            if not model_data:
-                return 0.5  # Default neutral efficiency
-            
-            # Calculate efficiency based on success rate and cost accuracy
-            total_tasks = model_data.get("total_tasks", 0)
-            successful_tasks = model_data.get("successful_tasks", 0)
-            
-            if total_tasks == 0:
-                return 0.5
-            
-            success_rate = successful_tasks / total_tasks
-            
-            # Cost accuracy (how close were estimates to actual)
-            cost_variance = model_data.get("avg_cost_variance", 0)
-            accuracy_score = max(0, 1 - cost_variance)
-            
-            return round((success_rate * 0.6 + accuracy_score * 0.4), 2)
+        return self._efficiency_of(task_type, model, time.time())
+    
+    def get_model_efficiencies(self, task_type: str, models: Iterable[str] = None) -> Dict[str, float]:
+        """
+        Efficiency scores for several models on one task type, as of one instant.
+        
+        Args:
+            task_type: Task type to score
+            models: Models to score (defaults to every profiled model)
+        
+        Returns:
+            Dict of model -> efficiency (0-1)
+        """
+        now = time.time()
+        return {
+            model: self._efficiency_of(task_type, model, now)
+            for model in (self.model_profiles if models is None else models)
+        }
     
     def record_actual_cost(
         self,
@@ -1957,123 +2847,180 @@ class CostOptimizer:
         model: str,
         estimated_cost: float,
         actual_cost: float,
-        success: bool = True
+        success: bool = True,
+        complexity: str = None
     ):
-        """Record actual cost for learning and optimization."""
-        with self._lock:
-            if "task_types" not in self.task_history:
-                self.task_history["task_types"] = {}
-            
-            if task_type not in self.task_history["task_types"]:
-                self.task_history["task_types"][task_type] = {}
-            
-            if model not in self.task_history["task_types"][task_type]:
-                self.task_history["task_types"][task_type][model] = {
-                    "total_tasks": 0,
-                    "successful_tasks": 0,
-                    "total_estimated_cost": 0,
-                    "total_actual_cost": 0,
-                    "cost_variance_sum": 0
-                }
-            
-            model_data = self.task_history["task_types"][task_type][model]
-            model_data["total_tasks"] += 1
-            if success:
-                model_data["successful_tasks"] += 1
-            
-            model_data["total_estimated_cost"] += estimated_cost
-            model_data["total_actual_cost"] += actual_cost
-            
-            # Track variance
-            variance = abs(actual_cost - estimated_cost) / max(estimated_cost, 0.001)
-            model_data["cost_variance_sum"] += variance
-            
-            # Calculate averages
-            n = model_data["total_tasks"]
-            model_data["avg_cost_variance"] = model_data["cost_variance_sum"] / n
-            model_data["avg_actual_cost"] = model_data["total_actual_cost"] / n
-            
-            self._save_history()
+        """
+        Record actual cost for learning and optimization.
+        
+        Args:
+            complexity: Complexity the task was routed as (defaults to that of the
+                last recommendation of this model for the task type)
+        """
+        now = time.time()
+        self.history.record(task_type, model, estimated_cost, actual_cost, success, ts=now)
+        if self.router is not None:
+            self.router.observe(self._context(task_type, model, complexity), model,
+                                success=success, cost=actual_cost)
+        self.cost_journal.append({
+            "ts": now,
+            "task_type": task_type,
+            "model": model,
+            "est": estimated_cost,
+            "act": actual_cost,
+            "ok": int(bool(success))
+        })
+    
+    def _context(self, task_type: str, model: str, complexity: Optional[str]) -> Tuple[str, str]:
+        return (task_type, complexity or self._last_complexity.get((task_type, model), "medium"))
+    
+    def observe_latency(self, task_type: str, model: str, latency_ms: float, complexity: str = None):
+        """Feed an observed model latency to the router."""
+        if self.router is not None:
+            self.router.observe(self._context(task_type, model, complexity), model, latency_ms=latency_ms)
+    
+    def get_window_stats(self, task_type: str, model: str = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Cost and success over the last hour, day and week.
+        
+        Args:
+            task_type: Task type to summarize
+            model: One model, or None for every model seen on the task type
+        
+        Returns:
+            Dict of window name -> tasks, total_cost, avg_cost, success_rate
+        """
+        now = time.time()
+        models = [model] if model else self.history.task_types().get(task_type, [])
+        totals = {name: CostAggregate() for name in COST_WINDOWS}
+        for series_model in models:
+            for name, window in self.history.windows(task_type, series_model, COST_WINDOWS, now=now).items():
+                acc = totals[name]
+                acc.count += window.count
+                acc.successes += window.successes
+                acc.actual += window.actual
+        return {
+            name: {
+                "tasks": acc.count,
+                "total_cost": round(acc.actual, 4),
+                "avg_cost": round(acc.avg_cost, 4),
+                "success_rate": round(acc.success_rate, 2)
+            }
+            for name, acc in totals.items()
+        }
     
     def get_optimization_report(self) -> Dict[str, Any]:
         """Generate cost optimization report."""
-        with self._lock:
-            report = {
-                "generated_at": datetime.now().isoformat(),
-                "task_type_stats": {},
-                "model_efficiency": {},
-                "recommendations": []
-            }
+        report = {
+            "generated_at": datetime.now().isoformat(),
+            "task_type_stats": {},
+            "model_efficiency": {},
+            "recommendations": []
+        }
+        
+        # Analyze each task type
+        for task_type, models in self.history.task_types().items():
+            efficiencies = self.get_model_efficiencies(task_type, list(self.model_profiles) + models)
+            best_model = None
+            best_efficiency = 0
+            total_cost = 0
             
-            # Analyze each task type
-            for task_type, models in self.task_history.get("task_types", {}).items():
-                best_model = None
-                best_efficiency = 0
-                total_cost = 0
-                
-                for model, data in models.items():
-                    efficiency = self._get_model_efficiency(task_type, model)
-                    if efficiency > best_efficiency:
-                        best_efficiency = efficiency
-                        best_model = model
-                    
-                    total_cost += data.get("total_actual_cost", 0)
+            for model in models:
+                efficiency = efficiencies[model]
+                if efficiency > best_efficiency:
+                    best_efficiency = efficiency
+                    best_model = model
                 
-                report["task_type_stats"][task_type] = {
-                    "best_model": best_model,
-                    "best_efficiency": best_efficiency,
-                    "total_cost": round(total_cost, 2)
-                }
+                total_cost += self.history.totals(task_type, model).actual
             
-            # Generate recommendations
-            for task_type, stats in report["task_type_stats"].items():
-                current = stats["best_model"]
-                # Find cheaper alternative with similar efficiency
-                for model in self.model_profiles:
-                    if model != current:
-                        alt_efficiency = self._get_model_efficiency(task_type, model)
-                        if alt_efficiency >= stats["best_efficiency"] * 0.9:
-                            current_cost = self.model_profiles[current]["input"]
-                            alt_cost = self.model_profiles[model]["input"]
-                            if alt_cost < current_cost:
-                                savings_pct = (current_cost - alt_cost) / current_cost * 100
-                                report["recommendations"].append({
-                                    "task_type": task_type,
-                                    "current_model": current,
-                                    "recommended_model": model,
-                                    "potential_savings_pct": round(savings_pct, 1),
-                                    "reasoning": f"Similar efficiency ({alt_efficiency:.2f}) at lower cost"
-                                })
+            report["task_type_stats"][task_type] = {
+                "best_model": best_model,
+                "best_efficiency": best_efficiency,
+                "total_cost": round(total_cost, 2),
+                "windows": self.get_window_stats(task_type)
+            }
+            report["model_efficiency"][task_type] = {model: efficiencies[model] for model in models}
             
-            return report
+            # Find cheaper alternative with similar efficiency
+            current = best_model
+            if current not in self.model_profiles:
+                continue
+            current_cost = self.model_profiles[current]["input"]
+            for model, profile in self.model_profiles.items():
+                if model == current:
+                    continue
+                alt_efficiency = efficiencies[model]
+                if alt_efficiency >= best_efficiency * 0.9 and profile["input"] < current_cost:
+                    savings_pct = (current_cost - profile["input"]) / current_cost * 100
+                    report["recommendations"].append({
+                        "task_type": task_type,
+                        "current_model": current,
+                        "recommended_model": model,
+                        "potential_savings_pct": round(savings_pct, 1),
+                        "reasoning": f"Similar efficiency ({alt_efficiency:.2f}) at lower cost"
+                    })
+        
+        return report
     
     def detect_cost_anomalies(self, lookback_hours: int = 24) -> List[Dict]:
-        """Detect unusual cost patterns."""
-        with self._lock:
-            anomalies = []
+        """
+        Detect unusual cost patterns.
+        
+        Compares the last `lookback_hours` of each (task_type, model) against the
+        rest of the retained history before it (or all-time totals if that is too thin).
+        """
+        anomalies = []
+        now = time.time()
+        cutoff = now - lookback_hours * 3600
+        
+        for task_type, model in self.history.keys():
+            recent = self.history.window(task_type, model, lookback_hours * 3600, now=now)
+            if recent.count < self.ANOMALY_MIN_SAMPLES:
+                continue
+            baseline = self.history.between(task_type, model, now - COST_HISTORY_RETENTION, cutoff)
+            if baseline.count < self.MIN_WINDOW_SAMPLES:
+                baseline = self.history.totals(task_type, model) - recent
+            if baseline.count == 0:
+                continue
             
-            # Get average costs per task type
-            for task_type, models in self.task_history.get("task_types", {}).items():
-                for model, data in models.items():
-                    avg_cost = data.get("avg_actual_cost", 0)
-                    recent_cost = data.get("recent_avg_cost", avg_cost)
-                    
-                    # Check for significant increase
-                    if avg_cost > 0 and recent_cost > avg_cost * 1.5:
-                        anomalies.append({
-                            "type": "cost_increase",
-                            "task_type": task_type,
-                            "model": model,
-                            "average_cost": round(avg_cost, 4),
-                            "recent_cost": round(recent_cost, 4),
-                            "increase_pct": round((recent_cost - avg_cost) / avg_cost * 100, 1)
-                        })
+            avg_cost = baseline.avg_cost
+            recent_cost = recent.avg_cost
             
-            return anomalies
-
+            # Check for significant increase
+            if avg_cost > 0 and recent_cost > avg_cost * self.ANOMALY_COST_RATIO:
+                anomalies.append({
+                    "type": "cost_increase",
+                    "task_type": task_type,
+                    "model": model,
+                    "average_cost": round(avg_cost, 4),
+                    "recent_cost": round(recent_cost, 4),
+                    "increase_pct": round((recent_cost - avg_cost) / avg_cost * 100, 1),
+                    "recent_tasks": recent.count
+                })
+            
+            if recent.success_rate < baseline.success_rate - self.ANOMALY_SUCCESS_DROP:
+                anomalies.append({
+                    "type": "success_drop",
+                    "task_type": task_type,
+                    "model": model,
+                    "average_success_rate": round(baseline.success_rate, 2),
+                    "recent_success_rate": round(recent.success_rate, 2),
+                    "recent_tasks": recent.count
+                })
+        
+        return anomalies
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cost history, journal and router statistics."""
+        return {
+            "history": self.history.get_stats(),
+            "journal": self.cost_journal.get_stats(),
+            "router": self.router.get_stats() if self.router is not None else None
+        }
 
 # Initialize cost optimizer
 cost_optimizer = CostOptimizer()
+orchestrator.router = cost_optimizer.router
 
 
 # Task Scheduler for Recurring Automation
@@ -2088,6 +3035,20 @@ class TaskScheduler:
     - Task history and retry logic
     - Budget-aware scheduling
     
+    Tasks are kept in a min-heap by next fire time. The scheduler thread
+    sleeps until the earliest one is due (or until a schedule change wakes
+    it) and hands due tasks to a worker pool, so a slow task never delays
+    the others. Cron expressions are compiled once to bitsets
+    (runtime.cron) and next fire times are computed, not polled.
+    
+    Fires later than the misfire grace (after a restart or a stall) follow
+    the task's misfire policy: "fire_once" runs one coalesced catch-up,
+    "fire_all" replays up to max_catchup missed fires, "skip" drops them.
+    Each task starts at a deterministic offset (jitter) after its nominal
+    time so identical schedules don't fire together, and runs are deferred
+    while the model's provider lacks headroom or, for non-high-priority
+    tasks, while the daily budget is critical.
+    
     Usage:
         scheduler = TaskScheduler()
         
@@ -2115,15 +3076,51 @@ class TaskScheduler:
         scheduler.start()
     """
     
-    def __init__(self, orchestrator_ref=None):
+    HISTORY_LIMIT = 1000
+    
+    MISFIRE_POLICIES = ("fire_once", "fire_all", "skip")
+    
+    # Longest single sleep; bounds how late a wall-clock jump is noticed
+    MAX_SLEEP_SECONDS = 60.0
+    
+    def __init__(self, orchestrator_ref=None, storage_path: Optional[str] = None,
+                 workers: int = SCHEDULER_WORKERS):
         self.orchestrator = orchestrator_ref or orchestrator
         self.scheduled_tasks: Dict[str, Dict] = {}
-        self.task_history: List[Dict] = []
+        self.task_history: deque = deque(maxlen=self.HISTORY_LIMIT)
+        self.workers = max(int(workers), 1)
         self._running = False
         self._scheduler_thread: Optional[threading.Thread] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
         self._lock = threading.Lock()
-        self.storage_path = Path("/home/m1ndb0t/Desktop/J1MSKY/config/scheduler.json")
+        self._wakeup = threading.Condition(self._lock)
+        
+        # (due timestamp, seq, task_id); entries not matching _due are stale.
+        # _nominal holds the schedule time each due time was derived from
+        # (due = nominal + jitter, or later when deferred).
+        self._heap: List[Tuple[float, int, str]] = []
+        self._due: Dict[str, float] = {}
+        self._nominal: Dict[str, float] = {}
+        self._seq = 0
+        self._in_flight: set = set()
+        
+        # Metrics
+        self.dispatched = 0
+        self.skipped_overlaps = 0
+        self.misfires = 0
+        self.skipped_misfires = 0
+        self.catch_up_runs = 0
+        self.deferrals = 0
+        
+        self.storage_path = Path(storage_path or "/home/m1ndb0t/Desktop/J1MSKY/config/scheduler.json")
         self._load_tasks()
+        self._store = WriteBehindStore(
+            path=self.storage_path,
+            snapshot=self._snapshot,
+            lock=self._lock,
+            durability="balanced",
+            indent=2
+        )
     
     def _load_tasks(self):
         """Load scheduled tasks from disk."""
@@ -2132,18 +3129,120 @@ class TaskScheduler:
                 with open(self.storage_path, 'r') as f:
                     data = json.load(f)
                     self.scheduled_tasks = data.get("tasks", {})
-                    self.task_history = data.get("history", [])[-1000:]  # Keep last 1000
+                    self.task_history.extend(data.get("history", [])[-self.HISTORY_LIMIT:])
             except Exception:
                 pass
+        
+        now = time.time()
+        with self._lock:
+            for task_id, task in self.scheduled_tasks.items():
+                if "jitter_seconds" not in task:
+                    task["jitter_seconds"] = self._default_jitter(task)
+                try:
+                    nominal = datetime.fromisoformat(task["next_run"]).timestamp()
+                except (KeyError, TypeError, ValueError):
+                    nominal = self._next_due(task, now)
+                # Anything that fell due while we were down surfaces as a misfire
+                self._push(task_id, nominal)
+    
+    def _snapshot(self) -> Dict[str, Any]:
+        return {
+            "tasks": self.scheduled_tasks,
+            "history": list(self.task_history)
+        }
     
     def _save_tasks(self):
-        """Save scheduled tasks to disk."""
-        self.storage_path.parent.mkdir(parents=True, exist_ok=True)
-        with open(self.storage_path, 'w') as f:
-            json.dump({
-                "tasks": self.scheduled_tasks,
-                "history": self.task_history[-1000:]
-            }, f, indent=2)
+        """Schedule a write of the task table (lock held)."""
+        self._store.mark_dirty()
+    
+    # ------------------------------------------------------------------
+    # Heap (lock held)
+    # ------------------------------------------------------------------
+    
+    def _push(self, task_id: str, nominal: Optional[float], at: Optional[float] = None):
+        """
+        (Re)schedule task_id for its fire at `nominal`, starting at nominal + jitter
+        (or at `at` when deferred). Unschedules it when nominal is None or the task is disabled.
+        """
+        task = self.scheduled_tasks.get(task_id)
+        if nominal is None or task is None or not task.get("enabled", True):
+            self._due.pop(task_id, None)
+            self._nominal.pop(task_id, None)
+        else:
+            due = at if at is not None else nominal + self._jitter(task_id, task)
+            self._due[task_id] = due
+            self._nominal[task_id] = nominal
+            self._seq += 1
+            heapq.heappush(self._heap, (due, self._seq, task_id))
+        # Drop stale entries once they dominate the heap
+        if len(self._heap) > 2 * len(self._due) + 64:
+            self._heap = [(d, s, t) for d, s, t in self._heap if self._due.get(t) == d]
+            heapq.heapify(self._heap)
+        self._wakeup.notify()
+    
+    def _peek(self) -> Optional[Tuple[float, str]]:
+        heap = self._heap
+        while heap:
+            due, _, task_id = heap[0]
+            if self._due.get(task_id) == due:
+                return due, task_id
+            heapq.heappop(heap)
+        return None
+    
+    def _jitter(self, task_id: str, task: Dict) -> float:
+        """Deterministic start offset in [0, jitter_seconds), stable across restarts."""
+        spread = task.get("jitter_seconds", 0)
+        if not spread:
+            return 0.0
+        digest = hashlib.blake2b(task_id.encode(), digest_size=8).digest()
+        return int.from_bytes(digest, "big") / 2 ** 64 * spread
+    
+    def _default_jitter(self, task: Dict) -> float:
+        """SCHEDULER_DEFAULT_JITTER, capped at 10% of the task's period (none for one-time tasks)."""
+        if task.get("type") == "once":
+            return 0.0
+        first = self._next_due(task, time.time())
+        second = self._next_due(task, first) if first is not None else None
+        if second is None:
+            return 0.0
+        return round(min(SCHEDULER_DEFAULT_JITTER, (second - first) * 0.1), 3)
+    
+    def _next_due(self, task: Dict, after: float) -> Optional[float]:
+        """Next fire time strictly after `after` (None: never again)."""
+        kind = task.get("type")
+        if kind == "cron":
+            try:
+                fire = parse_cron(task["cron"]).next_fire(datetime.fromtimestamp(after))
+            except ValueError:
+                return None
+            return fire.timestamp() if fire else None
+        if kind == "interval":
+            return after + task.get("interval_seconds", 3600)
+        if kind == "once":
+            run_at = datetime.fromisoformat(task["run_at"]).timestamp()
+            return run_at if task.get("run_count", 0) == 0 else None
+        return None
+    
+    # ------------------------------------------------------------------
+    # Scheduling API
+    # ------------------------------------------------------------------
+    
+    def _add_task(self, task_id: str, task: Dict[str, Any], due: Optional[float],
+                  misfire_policy: str = "fire_once", max_catchup: Optional[int] = None,
+                  jitter_seconds: Optional[float] = None) -> None:
+        """Insert or replace a task (lock held)."""
+        task["misfire_policy"] = misfire_policy
+        task["max_catchup"] = SCHEDULER_MAX_CATCHUP if max_catchup is None else max(int(max_catchup), 1)
+        task["jitter_seconds"] = self._default_jitter(task) if jitter_seconds is None else max(jitter_seconds, 0.0)
+        task["next_run"] = datetime.fromtimestamp(due).isoformat() if due is not None else None
+        self.scheduled_tasks[task_id] = task
+        self._push(task_id, due)
+        self._save_tasks()
+    
+    def _check_policy(self, misfire_policy: str) -> Optional[Dict[str, Any]]:
+        if misfire_policy not in self.MISFIRE_POLICIES:
+            return {"success": False, "error": f"misfire_policy must be one of {', '.join(self.MISFIRE_POLICIES)}"}
+        return None
     
     def schedule_cron(
         self,
@@ -2151,7 +3250,10 @@ class TaskScheduler:
         cron: str,
         task: Dict[str, Any],
         enabled: bool = True,
-        max_retries: int = 3
+        max_retries: int = 3,
+        misfire_policy: str = "fire_once",
+        max_catchup: Optional[int] = None,
+        jitter_seconds: Optional[float] = None
     ) -> Dict[str, Any]:
         """
         Schedule a task using cron expression.
@@ -2160,16 +3262,34 @@ class TaskScheduler:
         - min: 0-59
         - hour: 0-23
         - day: 1-31
-        - month: 1-12
-        - dow: 0-6 (0=Sunday)
+        - month: 1-12 (or jan-dec)
+        - dow: 0-6 (0=Sunday, 7=Sunday, or sun-sat)
+        
+        Each field takes *, lists, ranges and steps; @hourly, @daily,
+        @weekly, @monthly and @yearly are accepted too.
         
         Examples:
         - "0 9 * * *" = 9am daily
         - "0 9 * * 1" = 9am Mondays
         - "*/30 * * * *" = Every 30 minutes
+        - "0 9-17/2 * * mon-fri" = Every 2 hours 9am-5pm on weekdays
+        
+        misfire_policy ("fire_once", "fire_all", "skip"), max_catchup and
+        jitter_seconds (default: SCHEDULER_DEFAULT_JITTER, at most 10% of
+        the period) are accepted by every schedule_* method.
         """
+        error = self._check_policy(misfire_policy)
+        if error:
+            return error
+        try:
+            first_fire = parse_cron(cron).next_fire(datetime.now())
+        except ValueError as e:
+            return {"success": False, "error": str(e)}
+        if first_fire is None:
+            return {"success": False, "error": f"Cron expression never fires: {cron}"}
+        
         with self._lock:
-            self.scheduled_tasks[task_id] = {
+            self._add_task(task_id, {
                 "id": task_id,
                 "type": "cron",
                 "cron": cron,
@@ -2177,14 +3297,13 @@ class TaskScheduler:
                 "enabled": enabled,
                 "max_retries": max_retries,
                 "last_run": None,
-                "next_run": self._calculate_next_run(cron),
                 "run_count": 0,
                 "fail_count": 0,
                 "created_at": datetime.now().isoformat()
-            }
-            self._save_tasks()
+            }, first_fire.timestamp(), misfire_policy, max_catchup, jitter_seconds)
+            next_run = self.scheduled_tasks[task_id]["next_run"]
         
-        return {"success": True, "task_id": task_id, "next_run": self.scheduled_tasks[task_id]["next_run"]}
+        return {"success": True, "task_id": task_id, "next_run": next_run}
     
     def schedule_interval(
         self,
@@ -2193,28 +3312,32 @@ class TaskScheduler:
         hours: int = 0,
         days: int = 0,
         task: Dict[str, Any] = None,
-        enabled: bool = True
+        enabled: bool = True,
+        misfire_policy: str = "fire_once",
+        max_catchup: Optional[int] = None,
+        jitter_seconds: Optional[float] = None
     ) -> Dict[str, Any]:
         """Schedule a task to run at regular intervals."""
         interval_seconds = (days * 86400) + (hours * 3600) + (minutes * 60)
         
         if interval_seconds < 60:
             return {"success": False, "error": "Interval must be at least 60 seconds"}
+        error = self._check_policy(misfire_policy)
+        if error:
+            return error
         
         with self._lock:
-            self.scheduled_tasks[task_id] = {
+            self._add_task(task_id, {
                 "id": task_id,
                 "type": "interval",
                 "interval_seconds": interval_seconds,
                 "task": task,
                 "enabled": enabled,
                 "last_run": None,
-                "next_run": (datetime.now() + timedelta(seconds=interval_seconds)).isoformat(),
                 "run_count": 0,
                 "fail_count": 0,
                 "created_at": datetime.now().isoformat()
-            }
-            self._save_tasks()
+            }, time.time() + interval_seconds, misfire_policy, max_catchup, jitter_seconds)
         
         return {"success": True, "task_id": task_id, "interval_seconds": interval_seconds}
     
@@ -2222,75 +3345,47 @@ class TaskScheduler:
         self,
         task_id: str,
         run_at: datetime,
-        task: Dict[str, Any]
+        task: Dict[str, Any],
+        misfire_policy: str = "fire_once",
+        jitter_seconds: Optional[float] = None
     ) -> Dict[str, Any]:
-        """Schedule a one-time task."""
+        """Schedule a one-time task ("skip" drops it if it is missed by more than the grace)."""
+        error = self._check_policy(misfire_policy)
+        if error:
+            return error
         with self._lock:
-            self.scheduled_tasks[task_id] = {
+            self._add_task(task_id, {
                 "id": task_id,
                 "type": "once",
                 "run_at": run_at.isoformat(),
                 "task": task,
                 "enabled": True,
                 "last_run": None,
-                "next_run": run_at.isoformat(),
                 "run_count": 0,
                 "created_at": datetime.now().isoformat()
-            }
-            self._save_tasks()
+            }, run_at.timestamp(), misfire_policy, 1, jitter_seconds)
         
         return {"success": True, "task_id": task_id, "scheduled_for": run_at.isoformat()}
     
-    def _calculate_next_run(self, cron: str) -> str:
+    def _calculate_next_run(self, cron: str) -> Optional[str]:
         """Calculate next run time from cron expression."""
-        # Simplified cron parser - in production use croniter library
-        parts = cron.split()
-        if len(parts) != 5:
-            return (datetime.now() + timedelta(hours=1)).isoformat()
-        
-        minute, hour, day, month, dow = parts
-        now = datetime.now()
-        
-        # For simple hourly schedules like */30
-        if minute.startswith("*/"):
-            try:
-                interval = int(minute[2:])
-                next_minute = ((now.minute // interval) + 1) * interval
-                if next_minute >= 60:
-                    next_run = now.replace(minute=0) + timedelta(hours=1)
-                else:
-                    next_run = now.replace(minute=next_minute)
-                return next_run.isoformat()
-            except:
-                pass
-        
-        # Default: next hour
-        return (now + timedelta(hours=1)).isoformat()
+        fire = parse_cron(cron).next_fire(datetime.now())
+        return fire.isoformat() if fire else None
     
-    def _should_run(self, task: Dict) -> bool:
-        """Check if a task should run now."""
-        if not task.get("enabled", True):
-            return False
-        
-        next_run = task.get("next_run")
-        if not next_run:
-            return False
-        
-        try:
-            next_run_dt = datetime.fromisoformat(next_run)
-            return datetime.now() >= next_run_dt
-        except:
-            return False
+    # ------------------------------------------------------------------
+    # Execution
+    # ------------------------------------------------------------------
     
-    def _execute_task(self, task_config: Dict) -> Dict[str, Any]:
-        """Execute a scheduled task."""
+    def _execute_task(self, task_config: Dict, model: Optional[str] = None) -> Dict[str, Any]:
+        """Execute a scheduled task (model: already resolved at admission)."""
         try:
-            task = task_config.get("task", {})
-            model = task.get("model", "k2p5")
+            task = task_config.get("task") or {}
+            resolved = model
+            model = model or task.get("model", "k2p5")
             prompt = task.get("prompt", "")
             
             # Get model recommendation if budget constrained
-            if "max_budget" in task:
+            if "max_budget" in task and resolved is None:
                 rec = cost_optimizer.recommend_model(
                     task_type=task.get("task_type", "general"),
                     max_budget=task["max_budget"]
@@ -2311,94 +3406,234 @@ class TaskScheduler:
         except Exception as e:
             return {"success": False, "error": str(e)}
     
-    def _update_next_run(self, task: Dict):
-        """Update next run time after execution."""
-        task["last_run"] = datetime.now().isoformat()
-        task["run_count"] = task.get("run_count", 0) + 1
+    def _resolve_model(self, task_config: Dict, cache: Dict) -> str:
+        """Model a run will use: CostOptimizer's pick for budget-capped tasks, else the task's own."""
+        task = task_config.get("task") or {}
+        if "max_budget" not in task:
+            return task.get("model", "k2p5")
+        key = (task.get("task_type", "general"), task["max_budget"])
+        if key not in cache:
+            cache[key] = cost_optimizer.recommend_model(task_type=key[0], max_budget=key[1])["model"]
+        return cache[key]
+    
+    def _admission_delay(self, task_id: str, task_config: Dict, model: str, runs: int, batch_state: Dict) -> float:
+        """
+        Seconds to defer a run (0: run now).
+        
+        Scheduled runs may only use the provider headroom above
+        SCHEDULER_HEADROOM_RESERVE of its limit; low-priority runs also wait
+        while the daily budget is critical. Deferred runs are spread by
+        their jitter so they don't return as a herd.
+        """
+        orch = self.orchestrator
+        priority = (task_config.get("task") or {}).get("priority", "normal")
+        if priority not in ("high", "critical"):
+            if "budget_level" not in batch_state:
+                batch_state["budget_level"] = orch.get_budget_alert_level()
+            if batch_state["budget_level"] == "critical":
+                return SCHEDULER_BUDGET_DEFER_SECONDS + self._jitter(task_id, task_config)
         
-        if task["type"] == "cron":
-            task["next_run"] = self._calculate_next_run(task["cron"])
-        elif task["type"] == "interval":
-            interval = task.get("interval_seconds", 3600)
-            task["next_run"] = (datetime.now() + timedelta(seconds=interval)).isoformat()
-        elif task["type"] == "once":
-            task["enabled"] = False  # Disable one-time tasks after run
+        provider = orch.routing.providers.get(model)
+        if provider is None:
+            return 0.0
+        headroom = batch_state.setdefault("headroom", {})
+        if provider not in headroom:
+            limiter = orch._rate_limiter(provider)
+            headroom[provider] = [limiter.remaining() - int(limiter.limit * SCHEDULER_HEADROOM_RESERVE), limiter]
+        budget = headroom[provider]
+        if budget[0] >= runs:
+            budget[0] -= runs
+            return 0.0
+        limiter = budget[1]
+        wait = limiter.retry_after(max(int(limiter.limit * SCHEDULER_HEADROOM_RESERVE), 1) + runs)
+        if wait == float('inf'):
+            wait = limiter.window
+        return max(wait, 1.0) + self._jitter(task_id, task_config)
+    
+    def _dispatch_due(self, now: float) -> List[Tuple[str, Dict, int, str]]:
+        """Pop every task due by `now`, apply misfire policy and admission, advance schedules (lock held)."""
+        batch = []
+        batch_state: Dict[str, Any] = {}
+        models: Dict = {}
+        while True:
+            top = self._peek()
+            if top is None or top[0] > now:
+                return batch
+            due, task_id = top
+            heapq.heappop(self._heap)
+            task = self.scheduled_tasks[task_id]
+            nominal = self._nominal.get(task_id, due)
+            policy = task.get("misfire_policy", "fire_once")
+            late = now - due > task.get("misfire_grace_seconds", SCHEDULER_MISFIRE_GRACE)
+            
+            # Runs owed for this fire, and the next nominal fire time
+            if task["type"] == "once":
+                runs = 0 if late and policy == "skip" else 1
+                next_due = None
+                if late:
+                    self.misfires += 1
+            else:
+                next_due = self._next_due(task, nominal)
+                missed = 0
+                max_catchup = task.get("max_catchup", SCHEDULER_MAX_CATCHUP)
+                while next_due is not None and next_due <= now and missed < max_catchup:
+                    missed += 1
+                    next_due = self._next_due(task, next_due)
+                if next_due is not None and next_due <= now:
+                    next_due = self._next_due(task, now)
+                if late or missed:
+                    self.misfires += 1
+                    runs = {"skip": 0, "fire_all": min(1 + missed, max_catchup)}.get(policy, 1)
+                else:
+                    runs = 1
+            
+            if runs and task_id not in self._in_flight:
+                model = self._resolve_model(task, models)
+                delay = self._admission_delay(task_id, task, model, runs, batch_state)
+                if delay > 0:
+                    # Same fire, later; a deferral past the next fire becomes a misfire
+                    self.deferrals += 1
+                    self._push(task_id, nominal, at=now + delay)
+                    continue
+            
+            if task["type"] == "once":
+                task["enabled"] = False  # Disable one-time tasks after run
+            task["next_run"] = datetime.fromtimestamp(next_due).isoformat() if next_due is not None else None
+            self._push(task_id, next_due)
+            
+            if not runs:
+                self.skipped_misfires += 1
+                continue
+            if task_id in self._in_flight:
+                # Previous run still going; never run one task concurrently with itself
+                self.skipped_overlaps += 1
+                continue
+            self._in_flight.add(task_id)
+            self.dispatched += 1
+            self.catch_up_runs += runs - 1
+            batch.append((task_id, task, runs, model))
+    
+    def _run_task(self, task_id: str, task: Dict, runs: int = 1, model: Optional[str] = None):
+        """Run one task (runs > 1: catch-up replays, back to back) on a worker and record the outcome."""
+        for run in range(runs):
+            try:
+                result = self._execute_task(task, model)
+            except Exception as e:
+                result = {"success": False, "error": str(e)}
+            
+            with self._lock:
+                task["last_run"] = datetime.now().isoformat()
+                task["run_count"] = task.get("run_count", 0) + 1
+                if not result.get("success"):
+                    task["fail_count"] = task.get("fail_count", 0) + 1
+                entry = {
+                    "task_id": task_id,
+                    "executed_at": task["last_run"],
+                    "result": result
+                }
+                if run:
+                    entry["catch_up"] = True
+                self.task_history.append(entry)
+                if run == runs - 1:
+                    self._in_flight.discard(task_id)
+                self._save_tasks()
+    
+    def run_pending(self, now: Optional[float] = None) -> int:
+        """
+        Dispatch every task due by `now` (default: current time) to the worker pool.
+        
+        Runs them inline when the scheduler has not been started.
+        
+        Returns:
+            Number of tasks dispatched
+        """
+        with self._lock:
+            batch = self._dispatch_due(time.time() if now is None else now)
+            executor = self._executor
+        for task_id, task, runs, model in batch:
+            if executor is not None:
+                executor.submit(self._run_task, task_id, task, runs, model)
+            else:
+                self._run_task(task_id, task, runs, model)
+        return len(batch)
     
     def _scheduler_loop(self):
-        """Main scheduler loop."""
+        """Main scheduler loop: sleep until the next task is due, then dispatch."""
         while self._running:
             try:
                 with self._lock:
-                    for task_id, task in self.scheduled_tasks.items():
-                        if self._should_run(task):
-                            # Execute task
-                            result = self._execute_task(task)
-                            
-                            # Record in history
-                            self.task_history.append({
-                                "task_id": task_id,
-                                "executed_at": datetime.now().isoformat(),
-                                "result": result
-                            })
-                            
-                            # Update next run
-                            self._update_next_run(task)
-                            
-                            # Track failures
-                            if not result.get("success"):
-                                task["fail_count"] = task.get("fail_count", 0) + 1
-                            
-                            self._save_tasks()
-                
-                # Sleep for 30 seconds before next check
-                time.sleep(30)
-                
+                    top = self._peek()
+                    delay = self.MAX_SLEEP_SECONDS if top is None else top[0] - time.time()
+                    if delay > 0:
+                        # Woken early by schedule changes and stop()
+                        self._wakeup.wait(min(delay, self.MAX_SLEEP_SECONDS))
+                        continue
+                self.run_pending()
             except Exception as e:
                 print(f"Scheduler error: {e}")
-                time.sleep(60)
+                time.sleep(1)
     
     def start(self):
         """Start the scheduler."""
-        if self._running:
-            return {"success": False, "error": "Scheduler already running"}
+        with self._lock:
+            if self._running:
+                return {"success": False, "error": "Scheduler already running"}
+            self._running = True
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="scheduler-worker")
         
-        self._running = True
-        self._scheduler_thread = threading.Thread(target=self._scheduler_loop, daemon=True)
+        self._scheduler_thread = threading.Thread(target=self._scheduler_loop, name="scheduler", daemon=True)
         self._scheduler_thread.start()
         
         return {"success": True, "message": "Scheduler started"}
     
     def stop(self):
         """Stop the scheduler."""
-        self._running = False
+        with self._lock:
+            self._running = False
+            self._wakeup.notify_all()
+            executor, self._executor = self._executor, None
         if self._scheduler_thread:
             self._scheduler_thread.join(timeout=5)
+        if executor is not None:
+            executor.shutdown(wait=True)
+        self._store.flush()
         
         return {"success": True, "message": "Scheduler stopped"}
     
     def get_status(self) -> Dict[str, Any]:
         """Get scheduler status."""
-        return {
-            "running": self._running,
-            "scheduled_tasks_count": len(self.scheduled_tasks),
-            "enabled_tasks": sum(1 for t in self.scheduled_tasks.values() if t.get("enabled")),
-            "tasks": [
-                {
-                    "id": t["id"],
-                    "type": t["type"],
-                    "enabled": t.get("enabled"),
-                    "next_run": t.get("next_run"),
-                    "run_count": t.get("run_count", 0)
-                }
-                for t in self.scheduled_tasks.values()
-            ]
-        }
+        with self._lock:
+            top = self._peek()
+            return {
+                "running": self._running,
+                "scheduled_tasks_count": len(self.scheduled_tasks),
+                "enabled_tasks": sum(1 for t in self.scheduled_tasks.values() if t.get("enabled")),
+                "next_due": datetime.fromtimestamp(top[0]).isoformat() if top else None,
+                "in_flight": len(self._in_flight),
+                "dispatched": self.dispatched,
+                "skipped_overlaps": self.skipped_overlaps,
+                "misfires": self.misfires,
+                "skipped_misfires": self.skipped_misfires,
+                "catch_up_runs": self.catch_up_runs,
+                "deferrals": self.deferrals,
+                "tasks": [
+                    {
+                        "id": t["id"],
+                        "type": t["type"],
+                        "enabled": t.get("enabled"),
+                        "next_run": t.get("next_run"),
+                        "run_count": t.get("run_count", 0)
+                    }
+                    for t in self.scheduled_tasks.values()
+                ]
+            }
     
     def disable_task(self, task_id: str) -> Dict[str, Any]:
         """Disable a scheduled task."""
         with self._lock:
             if task_id in self.scheduled_tasks:
                 self.scheduled_tasks[task_id]["enabled"] = False
+                self._push(task_id, None)
                 self._save_tasks()
                 return {"success": True}
             return {"success": False, "error": "Task not found"}
@@ -2407,7 +3642,13 @@ class TaskScheduler:
         """Enable a scheduled task."""
         with self._lock:
             if task_id in self.scheduled_tasks:
-                self.scheduled_tasks[task_id]["enabled"] = True
+                task = self.scheduled_tasks[task_id]
+                task["enabled"] = True
+                due = self._next_due(task, time.time())
+                if task["type"] == "once" and due is not None and due < time.time():
+                    due = time.time()
+                task["next_run"] = datetime.fromtimestamp(due).isoformat() if due is not None else None
+                self._push(task_id, due)
                 self._save_tasks()
                 return {"success": True}
             return {"success": False, "error": "Task not found"}
@@ -2417,6 +3658,7 @@ class TaskScheduler:
         with self._lock:
             if task_id in self.scheduled_tasks:
                 del self.scheduled_tasks[task_id]
+                self._push(task_id, None)
                 self._save_tasks()
                 return {"success": True}
             return {"success": False, "error": "Task not found"}
@@ -2427,16 +3669,115 @@ task_scheduler = TaskScheduler()
 
 
 # Performance Profiler for System Optimization
+class _OperationStats:
+    """Running totals for one profiled operation, guarded by its own lock."""
+    
+    __slots__ = ("lock", "count", "total_duration", "min_duration", "max_duration",
+                 "success_count", "failure_count", "sketch")
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.count = 0
+        self.total_duration = 0.0
+        self.min_duration = float('inf')
+        self.max_duration = 0.0
+        self.success_count = 0
+        self.failure_count = 0
+        self.sketch = QuantileSketch()
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "total_duration": self.total_duration,
+            "min_duration": self.min_duration,
+            "max_duration": self.max_duration,
+            "success_count": self.success_count,
+            "failure_count": self.failure_count,
+            "sketch": self.sketch.to_dict()
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "_OperationStats":
+        op = cls()
+        op.count = data.get("count", 0)
+        op.total_duration = data.get("total_duration", 0.0)
+        op.min_duration = data.get("min_duration", float('inf'))
+        op.max_duration = data.get("max_duration", 0.0)
+        op.success_count = data.get("success_count", 0)
+        op.failure_count = data.get("failure_count", 0)
+        if "sketch" in data:
+            op.sketch = QuantileSketch.from_dict(data["sketch"])
+        else:
+            # Older files kept only the last 100 durations
+            op.sketch.extend(data.get("recent_durations", []))
+        return op
+
+
+class _ModelStats:
+    """Running totals for one model, guarded by its own lock."""
+    
+    __slots__ = ("lock", "total_calls", "total_duration", "total_tokens_in", "total_tokens_out",
+                 "success_count", "failure_count", "by_task_type", "sketch")
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.total_calls = 0
+        self.total_duration = 0.0
+        self.total_tokens_in = 0
+        self.total_tokens_out = 0
+        self.success_count = 0
+        self.failure_count = 0
+        self.by_task_type: Dict[str, List[float]] = {}  # task_type -> [count, total_duration]
+        self.sketch = QuantileSketch()
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "total_calls": self.total_calls,
+            "total_duration": self.total_duration,
+            "total_tokens_in": self.total_tokens_in,
+            "total_tokens_out": self.total_tokens_out,
+            "success_count": self.success_count,
+            "failure_count": self.failure_count,
+            "by_task_type": {
+                task: {"count": count, "total_duration": total}
+                for task, (count, total) in self.by_task_type.items()
+            },
+            "sketch": self.sketch.to_dict()
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "_ModelStats":
+        model = cls()
+        model.total_calls = data.get("total_calls", 0)
+        model.total_duration = data.get("total_duration", 0.0)
+        model.total_tokens_in = data.get("total_tokens_in", 0)
+        model.total_tokens_out = data.get("total_tokens_out", 0)
+        model.success_count = data.get("success_count", 0)
+        model.failure_count = data.get("failure_count", 0)
+        model.by_task_type = {
+            task: [t.get("count", 0), t.get("total_duration", 0.0)]
+            for task, t in data.get("by_task_type", {}).items()
+        }
+        if "sketch" in data:
+            model.sketch = QuantileSketch.from_dict(data["sketch"])
+        return model
+
+
 class PerformanceProfiler:
     """
     Profile and analyze system performance for optimization.
     
     Tracks:
-    - Response times by endpoint/operation
+    - Response times by endpoint/operation (p50/p95/p99/p999 from
+      fixed-memory quantile sketches)
     - Memory usage patterns
     - Model latency and throughput
     - Bottleneck identification
     
+    Each operation and model has its own lock, and metrics are snapshotted
+    to disk by a background write-behind store, so recording is a few
+    microseconds and never touches the disk.
+    
     Usage:
         profiler = PerformanceProfiler()
         
@@ -2450,187 +3791,225 @@ class PerformanceProfiler:
         report = profiler.get_report()
     """
     
-    def __init__(self, storage_path: str = "/home/m1ndb0t/Desktop/J1MSKY/logs"):
+    # Reported percentiles: key -> quantile
+    PERCENTILES = {"p50_ms": 0.5, "p95_ms": 0.95, "p99_ms": 0.99, "p999_ms": 0.999}
+    
+    def __init__(self, storage_path: str = "/home/m1ndb0t/Desktop/J1MSKY/logs", durability: str = "relaxed"):
         self.storage_path = Path(storage_path)
         self.storage_path.mkdir(parents=True, exist_ok=True)
         self.metrics_file = self.storage_path / "performance_metrics.json"
-        self.metrics = self._load_metrics()
-        self._lock = threading.Lock()
         
-    def _load_metrics(self) -> Dict[str, Any]:
+        # One lock per operation/model; the registry lock is only taken to add a name
+        self._operations: Dict[str, _OperationStats] = {}
+        self._models: Dict[str, _ModelStats] = {}
+        self._registry_lock = threading.Lock()
+        self._daily_stats: Dict[str, Any] = {}
+        self._load_metrics()
+        
+        # Snapshots are written in the background, never on the recording path
+        self._store = WriteBehindStore(
+            path=self.metrics_file,
+            snapshot=self._snapshot,
+            durability=durability
+        )
+    
+    def _load_metrics(self):
         """Load historical metrics."""
-        if self.metrics_file.exists():
-            try:
-                with open(self.metrics_file, 'r') as f:
-                    return json.load(f)
-            except Exception:
-                pass
+        if not self.metrics_file.exists():
+            return
+        try:
+            with open(self.metrics_file, 'r') as f:
+                data = json.load(f)
+        except Exception:
+            return
+        self._operations = {
+            name: _OperationStats.from_dict(op) for name, op in data.get("operations", {}).items()
+        }
+        self._models = {
+            model: _ModelStats.from_dict(stats) for model, stats in data.get("models", {}).items()
+        }
+        self._daily_stats = data.get("daily_stats", {})
+    
+    def _snapshot(self) -> Dict[str, Any]:
+        """Document written to performance_metrics.json."""
+        operations = {}
+        for name, op in list(self._operations.items()):
+            with op.lock:
+                operations[name] = op.to_dict()
+        models = {}
+        for model, stats in list(self._models.items()):
+            with stats.lock:
+                models[model] = stats.to_dict()
         return {
-            "operations": {},
-            "models": {},
-            "daily_stats": {},
+            "operations": operations,
+            "models": models,
+            "daily_stats": self._daily_stats,
             "bottlenecks": []
         }
     
-    def _save_metrics(self):
-        """Save metrics to disk."""
-        with open(self.metrics_file, 'w') as f:
-            json.dump(self.metrics, f, indent=2)
+    @property
+    def metrics(self) -> Dict[str, Any]:
+        """Current metrics in their persisted form."""
+        return self._snapshot()
+    
+    def _touch(self):
+        """Schedule a background snapshot."""
+        # Mark every change: a record landing during a flush must bump the version
+        # so the store stays dirty and writes it next time
+        self._store.mark_dirty()
+    
+    def _operation(self, name: str) -> _OperationStats:
+        op = self._operations.get(name)
+        if op is None:
+            with self._registry_lock:
+                op = self._operations.setdefault(name, _OperationStats())
+        return op
+    
+    def _model(self, model: str) -> _ModelStats:
+        stats = self._models.get(model)
+        if stats is None:
+            with self._registry_lock:
+                stats = self._models.setdefault(model, _ModelStats())
+        return stats
     
     def record_operation(self, operation_name: str, duration_ms: float, 
                         success: bool = True, metadata: Dict = None):
         """Record timing for an operation."""
-        with self._lock:
-            if operation_name not in self.metrics["operations"]:
-                self.metrics["operations"][operation_name] = {
-                    "count": 0,
-                    "total_duration": 0,
-                    "min_duration": float('inf'),
-                    "max_duration": 0,
-                    "success_count": 0,
-                    "failure_count": 0,
-                    "recent_durations": []
-                }
-            
-            op = self.metrics["operations"][operation_name]
-            op["count"] += 1
-            op["total_duration"] += duration_ms
-            op["min_duration"] = min(op["min_duration"], duration_ms)
-            op["max_duration"] = max(op["max_duration"], duration_ms)
-            
+        op = self._operation(operation_name)
+        with op.lock:
+            op.count += 1
+            op.total_duration += duration_ms
+            if duration_ms < op.min_duration:
+                op.min_duration = duration_ms
+            if duration_ms > op.max_duration:
+                op.max_duration = duration_ms
             if success:
-                op["success_count"] += 1
+                op.success_count += 1
             else:
-                op["failure_count"] += 1
-            
-            # Keep last 100 durations for percentile calculation
-            op["recent_durations"].append(duration_ms)
-            op["recent_durations"] = op["recent_durations"][-100:]
-            
-            self._save_metrics()
+                op.failure_count += 1
+            op.sketch.add(duration_ms)
+        self._touch()
     
     def record_model_performance(self, model: str, task_type: str, 
                                  duration_ms: float, tokens_in: int, 
                                  tokens_out: int, success: bool = True):
         """Record performance metrics for a model."""
-        with self._lock:
-            if model not in self.metrics["models"]:
-                self.metrics["models"][model] = {
-                    "total_calls": 0,
-                    "total_duration": 0,
-                    "total_tokens_in": 0,
-                    "total_tokens_out": 0,
-                    "success_count": 0,
-                    "failure_count": 0,
-                    "by_task_type": {}
-                }
-            
-            model_stats = self.metrics["models"][model]
-            model_stats["total_calls"] += 1
-            model_stats["total_duration"] += duration_ms
-            model_stats["total_tokens_in"] += tokens_in
-            model_stats["total_tokens_out"] += tokens_out
-            
+        stats = self._model(model)
+        with stats.lock:
+            stats.total_calls += 1
+            stats.total_duration += duration_ms
+            stats.total_tokens_in += tokens_in
+            stats.total_tokens_out += tokens_out
             if success:
-                model_stats["success_count"] += 1
+                stats.success_count += 1
             else:
-                model_stats["failure_count"] += 1
+                stats.failure_count += 1
             
             # Track by task type
-            if task_type not in model_stats["by_task_type"]:
-                model_stats["by_task_type"][task_type] = {
-                    "count": 0,
-                    "total_duration": 0
-                }
-            
-            model_stats["by_task_type"][task_type]["count"] += 1
-            model_stats["by_task_type"][task_type]["total_duration"] += duration_ms
-            
-            self._save_metrics()
+            by_task = stats.by_task_type.get(task_type)
+            if by_task is None:
+                by_task = stats.by_task_type[task_type] = [0, 0.0]
+            by_task[0] += 1
+            by_task[1] += duration_ms
+            stats.sketch.add(duration_ms)
+        self._touch()
+        cost_optimizer.observe_latency(task_type, model, duration_ms)
+    
+    def _percentiles(self, sketch: QuantileSketch, low: float, high: float) -> Dict[str, float]:
+        """Sketch percentiles, clamped to the exact min/max."""
+        values = sketch.quantiles(self.PERCENTILES.values())
+        return {
+            key: round(min(max(value, low), high), 2) if value is not None else 0
+            for key, value in zip(self.PERCENTILES, values)
+        }
     
     def get_operation_stats(self, operation_name: str = None) -> Dict[str, Any]:
         """Get statistics for operations."""
-        with self._lock:
-            if operation_name:
-                if operation_name not in self.metrics["operations"]:
-                    return {"error": "Operation not found"}
-                
-                op = self.metrics["operations"][operation_name]
-                durations = op["recent_durations"]
-                
-                return {
-                    "operation": operation_name,
-                    "count": op["count"],
-                    "avg_duration_ms": round(op["total_duration"] / op["count"], 2) if op["count"] > 0 else 0,
-                    "min_duration_ms": op["min_duration"] if op["min_duration"] != float('inf') else 0,
-                    "max_duration_ms": op["max_duration"],
-                    "p50_ms": round(sorted(durations)[len(durations)//2], 2) if durations else 0,
-                    "p95_ms": round(sorted(durations)[int(len(durations)*0.95)], 2) if durations else 0,
-                    "success_rate": round(op["success_count"] / op["count"] * 100, 2) if op["count"] > 0 else 0
-                }
-            else:
-                # Return stats for all operations
-                return {
-                    name: self.get_operation_stats(name)
-                    for name in self.metrics["operations"].keys()
-                }
+        if not operation_name:
+            # Return stats for all operations
+            return {name: self.get_operation_stats(name) for name in list(self._operations)}
+        
+        op = self._operations.get(operation_name)
+        if op is None:
+            return {"error": "Operation not found"}
+        
+        with op.lock:
+            count = op.count
+            min_duration = op.min_duration if op.min_duration != float('inf') else 0
+            stats = {
+                "operation": operation_name,
+                "count": count,
+                "avg_duration_ms": round(op.total_duration / count, 2) if count > 0 else 0,
+                "min_duration_ms": min_duration,
+                "max_duration_ms": op.max_duration
+            }
+            stats.update(self._percentiles(op.sketch, min_duration, op.max_duration))
+            stats["success_rate"] = round(op.success_count / count * 100, 2) if count > 0 else 0
+        return stats
     
     def get_model_stats(self) -> Dict[str, Any]:
         """Get performance statistics by model."""
-        with self._lock:
-            stats = {}
-            for model, data in self.metrics["models"].items():
-                if data["total_calls"] > 0:
-                    stats[model] = {
-                        "total_calls": data["total_calls"],
-                        "avg_latency_ms": round(data["total_duration"] / data["total_calls"], 2),
-                        "tokens_per_call": round((data["total_tokens_in"] + data["total_tokens_out"]) / data["total_calls"], 1),
-                        "success_rate": round(data["success_count"] / data["total_calls"] * 100, 2),
-                        "by_task_type": {
-                            task: {
-                                "count": t["count"],
-                                "avg_duration_ms": round(t["total_duration"] / t["count"], 2) if t["count"] > 0 else 0
-                            }
-                            for task, t in data["by_task_type"].items()
+        stats = {}
+        for model, data in list(self._models.items()):
+            with data.lock:
+                if data.total_calls == 0:
+                    continue
+                stats[model] = {
+                    "total_calls": data.total_calls,
+                    "avg_latency_ms": round(data.total_duration / data.total_calls, 2),
+                    "p95_latency_ms": round(data.sketch.quantile(0.95) or 0, 2),
+                    "tokens_per_call": round((data.total_tokens_in + data.total_tokens_out) / data.total_calls, 1),
+                    "success_rate": round(data.success_count / data.total_calls * 100, 2),
+                    "by_task_type": {
+                        task: {
+                            "count": count,
+                            "avg_duration_ms": round(total / count, 2) if count > 0 else 0
                         }
+                        for task, (count, total) in data.by_task_type.items()
                     }
-            return stats
+                }
+        return stats
+    
+    def flush(self) -> bool:
+        """Write a snapshot now if anything changed. Returns True if written."""
+        return self._store.flush()
     
     def identify_bottlenecks(self) -> List[Dict[str, Any]]:
         """Identify performance bottlenecks."""
-        with self._lock:
-            bottlenecks = []
+        bottlenecks = []
+        
+        for op_name, op in list(self._operations.items()):
+            with op.lock:
+                count, total_duration, failure_count = op.count, op.total_duration, op.failure_count
+            if count < 10:  # Need sufficient data
+                continue
             
-            for op_name, op_data in self.metrics["operations"].items():
-                if op_data["count"] < 10:  # Need sufficient data
-                    continue
-                
-                avg_duration = op_data["total_duration"] / op_data["count"]
-                
-                # Flag slow operations
-                if avg_duration > 5000:  # > 5 seconds
-                    bottlenecks.append({
-                        "type": "slow_operation",
-                        "operation": op_name,
-                        "avg_duration_ms": round(avg_duration, 2),
-                        "severity": "critical" if avg_duration > 10000 else "warning"
-                    })
-                
-                # Flag high failure rate
-                failure_rate = op_data["failure_count"] / op_data["count"] if op_data["count"] > 0 else 0
-                if failure_rate > 0.1:  # > 10% failure
-                    bottlenecks.append({
-                        "type": "high_failure_rate",
-                        "operation": op_name,
-                        "failure_rate": round(failure_rate * 100, 2),
-                        "severity": "critical" if failure_rate > 0.25 else "warning"
-                    })
+            avg_duration = total_duration / count
             
-            # Sort by severity
-            severity_order = {"critical": 0, "warning": 1, "info": 2}
-            bottlenecks.sort(key=lambda x: severity_order.get(x["severity"], 3))
+            # Flag slow operations
+            if avg_duration > 5000:  # > 5 seconds
+                bottlenecks.append({
+                    "type": "slow_operation",
+                    "operation": op_name,
+                    "avg_duration_ms": round(avg_duration, 2),
+                    "severity": "critical" if avg_duration > 10000 else "warning"
+                })
             
-            return bottlenecks[:10]  # Top 10 bottlenecks
+            # Flag high failure rate
+            failure_rate = failure_count / count
+            if failure_rate > 0.1:  # > 10% failure
+                bottlenecks.append({
+                    "type": "high_failure_rate",
+                    "operation": op_name,
+                    "failure_rate": round(failure_rate * 100, 2),
+                    "severity": "critical" if failure_rate > 0.25 else "warning"
+                })
+        
+        # Sort by severity
+        severity_order = {"critical": 0, "warning": 1, "info": 2}
+        bottlenecks.sort(key=lambda x: severity_order.get(x["severity"], 3))
+        
+        return bottlenecks[:10]  # Top 10 bottlenecks
     
     def get_optimization_recommendations(self) -> List[Dict[str, Any]]:
         """Generate optimization recommendations."""
@@ -2675,7 +4054,7 @@ class PerformanceProfiler:
     def profile(self, func):
         """Decorator to profile a function."""
         def wrapper(*args, **kwargs):
-            start_time = time.time()
+            start_time = time.perf_counter()
             try:
                 result = func(*args, **kwargs)
                 success = True
@@ -2684,7 +4063,7 @@ class PerformanceProfiler:
                 success = False
                 raise
             finally:
-                duration_ms = (time.time() - start_time) * 1000
+                duration_ms = (time.perf_counter() - start_time) * 1000
                 self.record_operation(func.__name__, duration_ms, success)
         
         wrapper.__name__ = func.__name__
@@ -2758,7 +4137,7 @@ class ReportGenerator:
     
     def _generate_executive_report(self, period: str, date: datetime) -> Dict[str, Any]:
         """Generate executive summary report."""
-        status = orchestrator.get_status_report()
+        status = orchestrator.get_status_report(sections=("providers", "budget", "operations", "anomalies"))
         
         # Get key metrics
         today_spend = status.get("today_spend", 0)
@@ -2789,7 +4168,7 @@ class ReportGenerator:
     
     def _generate_operations_report(self, period: str, date: datetime) -> Dict[str, Any]:
         """Generate detailed operations report."""
-        status = orchestrator.get_status_report()
+        status = orchestrator.get_status_report(sections=("providers", "usage", "operations", "anomalies"))
         perf_stats = performance_profiler.get_report()
         
         return {
@@ -2811,7 +4190,7 @@ class ReportGenerator:
     
     def _generate_financial_report(self, period: str, date: datetime) -> Dict[str, Any]:
         """Generate financial report with costs and margins."""
-        status = orchestrator.get_status_report()
+        status = orchestrator.get_status_report(sections=("budget", "pricing", "forecast"))
         
         # Calculate financial metrics
         today_spend = status.get("today_spend", 0)
@@ -2867,7 +4246,7 @@ class ReportGenerator:
     
     def _generate_usage_report(self, period: str, date: datetime) -> Dict[str, Any]:
         """Generate usage analytics report."""
-        status = orchestrator.get_status_report()
+        status = orchestrator.get_status_report(sections=("providers", "usage", "operations"))
         
         return {
             "report_type": "Usage Report",
@@ -3017,7 +4396,7 @@ class ReportGenerator:
 report_generator = ReportGenerator()
 
 
-if __name__ == "__main__"::
+if __name__ == "__main__":
     print("J1MSKY Unified Model Orchestrator v5.1")
     print("=" * 50)
 
@@ -3045,7 +4424,7 @@ if __name__ == "__main__"::
         print(f"  {project:15} -> {team}")
 
     print("\nStatus Report:")
-    status = orchestrator.get_status_report()
+    status = orchestrator.get_status_report(sections=("providers", "budget"))
     print(f"  Models: {status['models_active']}")
     print(f"  Rate Limits: {status['rate_limits']}")
     print(f"  Daily Budget: ${status['daily_budget']}")
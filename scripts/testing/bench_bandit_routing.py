@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Offline replay simulator for bandit model routing.
+
+Builds per-(task_type, model) outcome pools (cost, success) from the cost
+journal written by CostOptimizer.record_actual_cost, then replays a stream
+of tasks through each routing policy, drawing every routed task's outcome
+from the chosen model's recorded pool (bootstrap). Policies compared:
+
+    static    the model recorded most often for the task type (what the
+              static tables routed), i.e. the logged policy
+    thompson  BanditRouter(policy='thompson')
+    ucb       BanditRouter(policy='ucb')
+    oracle    best expected reward per task type, known in advance
+
+The headline metric is cost per successful task. Also measures the router's
+per-decision overhead.
+
+Without a journal (or with --synthetic) a synthetic history is generated
+whose static routes are the TASK_MODELS defaults.
+
+Usage:
+    python3 scripts/testing/bench_bandit_routing.py [--journal DIR] [--tasks N] [--synthetic] [--seed S]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from collections import Counter, defaultdict
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "j1msky-framework"))
+from runtime.bandit import BanditRouter  # noqa: E402
+from runtime.journal import AppendOnlyJournal  # noqa: E402
+
+DEFAULT_JOURNAL = "/home/m1ndb0t/Desktop/J1MSKY/config/cost-journal"
+
+# Pools with fewer recorded outcomes than this are left out of the replay
+MIN_POOL = 5
+
+# task_type -> model -> (success probability, mean cost); the first model is the static route
+SYNTHETIC_WORLD = {
+    "coding": {
+        "k2p5": (0.86, 0.0030),
+        "minimax-m2.5": (0.84, 0.0004),
+        "codex": (0.93, 0.0120),
+        "sonnet": (0.95, 0.0450),
+    },
+    "documentation": {
+        "sonnet": (0.95, 0.0450),
+        "k2p5": (0.90, 0.0030),
+        "minimax-m2.5": (0.88, 0.0004),
+    },
+    "architecture": {
+        "opus": (0.96, 0.2250),
+        "sonnet": (0.93, 0.0450),
+        "k2p5": (0.70, 0.0030),
+    },
+}
+
+
+def synthetic_pools(rng, records=20000):
+    """Recorded history: 80% on the static route, the rest spread over alternatives."""
+    pools = defaultdict(list)
+    counts = Counter()
+    task_types = list(SYNTHETIC_WORLD)
+    for _ in range(records):
+        task_type = rng.choice(task_types)
+        models = list(SYNTHETIC_WORLD[task_type])
+        model = models[0] if rng.random() < 0.8 else rng.choice(models[1:])
+        success_p, mean_cost = SYNTHETIC_WORLD[task_type][model]
+        cost = rng.lognormvariate(0, 0.4) * mean_cost
+        pools[(task_type, model)].append((cost, rng.random() < success_p))
+        counts[task_type] += 1
+    return pools, counts
+
+
+def journal_pools(directory):
+    """Outcome pools from a cost journal's uncompacted records."""
+    pools = defaultdict(list)
+    counts = Counter()
+    state, records = AppendOnlyJournal(directory, prefix="costs").replay()
+    for record in records:
+        if record.get("op") == "seed":
+            continue
+        pools[(record["task_type"], record["model"])].append((record.get("act", 0.0), bool(record.get("ok", 1))))
+        counts[record["task_type"]] += 1
+    return pools, counts
+
+
+def build_world(pools, counts):
+    """task_type -> {model: pool} for pools big enough to sample, and the static route per task type."""
+    world = defaultdict(dict)
+    for (task_type, model), pool in pools.items():
+        if len(pool) >= MIN_POOL:
+            world[task_type][model] = pool
+    world = {task_type: models for task_type, models in world.items() if len(models) > 1}
+    static = {
+        task_type: max(models, key=lambda m: len(models[m]))
+        for task_type, models in world.items()
+    }
+    weights = {task_type: counts[task_type] for task_type in world}
+    return world, static, weights
+
+
+def expected(pool):
+    cost = sum(c for c, _ in pool) / len(pool)
+    success = sum(1 for _, ok in pool if ok) / len(pool)
+    return cost, success
+
+
+def simulate(world, choose, observe, task_stream, rng):
+    cost = 0.0
+    successes = 0
+    for task_type in task_stream:
+        model = choose(task_type)
+        outcome_cost, ok = rng.choice(world[task_type][model])
+        cost += outcome_cost
+        successes += ok
+        observe(task_type, model, ok, outcome_cost)
+    return cost, successes
+
+
+def bandit_policy(world, policy, seed):
+    router = BanditRouter(policy=policy, rng=random.Random(seed))
+    arms = {task_type: list(models) for task_type, models in world.items()}
+
+    def choose(task_type):
+        return router.choose((task_type, "medium"), arms[task_type])
+
+    def observe(task_type, model, ok, cost):
+        router.observe((task_type, "medium"), model, success=ok, cost=cost)
+
+    return router, choose, observe
+
+
+def oracle_policy(world, router):
+    """Best arm per task type under the router's own scoring, from true pool means."""
+    best = {}
+    for task_type, models in world.items():
+        means = {model: expected(pool) for model, pool in models.items()}
+        ref_cost = sum(c for c, _ in means.values()) / len(means)
+        best[task_type] = max(
+            means,
+            key=lambda m: means[m][1] - router.cost_weight * means[m][0] / (means[m][0] + ref_cost)
+        )
+    return best
+
+
+def decision_overhead(arms=5, decisions=100000):
+    """Mean microseconds per choose() over `arms` warmed-up arms."""
+    results = {}
+    names = [f"model-{i}" for i in range(arms)]
+    for policy in ("thompson", "ucb"):
+        router = BanditRouter(policy=policy, rng=random.Random(1))
+        for i in range(1000):
+            router.observe(("coding", "medium"), names[i % arms], success=i % 7 != 0,
+                           cost=0.001 * (1 + i % arms), latency_ms=500 + i % 300)
+        start = time.perf_counter()
+        for _ in range(decisions):
+            router.choose(("coding", "medium"), names)
+        results[policy] = (time.perf_counter() - start) / decisions * 1e6
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--journal", default=DEFAULT_JOURNAL, help="cost journal directory")
+    parser.add_argument("--tasks", type=int, default=20000, help="tasks to replay per policy")
+    parser.add_argument("--synthetic", action="store_true", help="use a synthetic history")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    source = "synthetic"
+    pools = counts = None
+    if not args.synthetic and os.path.isdir(args.journal):
+        pools, counts = journal_pools(args.journal)
+        source = args.journal
+    world = static = weights = None
+    if pools:
+        world, static, weights = build_world(pools, counts)
+    if not world:
+        if source != "synthetic":
+            print(f"Not enough recorded alternatives in {source}; using a synthetic history")
+        source = "synthetic"
+        pools, counts = synthetic_pools(rng)
+        world, static, weights = build_world(pools, counts)
+
+    task_types = list(weights)
+    stream = rng.choices(task_types, weights=[weights[t] for t in task_types], k=args.tasks)
+
+    results = {}
+    results["static"] = simulate(world, static.__getitem__, lambda *a: None, stream, random.Random(args.seed))
+    for policy in ("thompson", "ucb"):
+        router, choose, observe = bandit_policy(world, policy, args.seed)
+        results[policy] = simulate(world, choose, observe, stream, random.Random(args.seed))
+    best = oracle_policy(world, router)
+    results["oracle"] = simulate(world, best.__getitem__, lambda *a: None, stream, random.Random(args.seed))
+
+    print(f"Bandit routing replay ({args.tasks:,} tasks, history: {source})")
+    print("-" * 72)
+    for task_type in task_types:
+        models = ", ".join(
+            f"{m} ({len(p)}: ${expected(p)[0]:.4f}, {expected(p)[1]:.0%})" for m, p in world[task_type].items()
+        )
+        print(f"{task_type:16s} static={static[task_type]:14s} {models}")
+    print("-" * 72)
+    base_cost, base_ok = results["static"]
+    base_cps = base_cost / max(base_ok, 1)
+    for name, (cost, ok) in results.items():
+        cps = cost / max(ok, 1)
+        print(f"{name:9s} cost ${cost:>10.2f}  success {ok / args.tasks:6.1%}  "
+              f"$/success {cps:.5f}  savings {(1 - cps / base_cps):6.1%}")
+
+    print("-" * 72)
+    for policy, micros in decision_overhead().items():
+        print(f"{policy:9s} choose() over 5 arms: {micros:.1f}µs/decision")
+
+    router, choose, observe = bandit_policy(world, "thompson", args.seed)
+    simulate(world, choose, observe, stream, random.Random(args.seed))
+    state = json.dumps(router.to_dict(), separators=(",", ":"))
+    print(f"Persisted state: {len(state):,} bytes for {router.get_stats()['arms']} arms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Benchmark pricing reports: quote ledger vs batch recompute.
+
+The batch path re-scans every quote on each report (the previous
+implementation of summarize_quote_portfolio, aggregate_weekly_pricing_metrics,
+summarize_experiment and generate_pricing_summary_report, reproduced below as
+batch_reports). The ledger keeps running totals as quotes are recorded,
+retracted and amended, so each report reads O(groups) counters.
+
+Usage:
+    python3 scripts/testing/bench_quote_ledger.py [quotes] [reports]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "ops"))
+import orchestrator as orch_module  # noqa: E402
+
+SEGMENTS = ["enterprise", "mid_market", "smb", "startup"]
+MODELS = ["opus", "sonnet", "k2p5", "minimax-m2.5", "codex"]
+
+
+def make_quote(rng):
+    return {
+        "segment": rng.choice(SEGMENTS),
+        "model": rng.choice(MODELS),
+        "decision_status": rng.choice(["approved", "approved", "escalated"]),
+        "gross_margin_pct": round(rng.uniform(20, 95), 2),
+        "recommended_price": round(rng.uniform(0.5, 40), 2),
+        "exception_created": rng.random() < 0.1,
+        "exception_closed": rng.random() < 0.05
+    }
+
+
+def batch_reports(orch, quotes, experiment_quotes):
+    """The four reports as before: one full scan (or several) per call."""
+    thresholds = orch.MARGIN_THRESHOLDS
+    total = len(quotes)
+    compliant = sum(1 for q in quotes if q.get("gross_margin_pct", 0.0) >= thresholds.get("task", 55.0))
+    portfolio = (total, compliant, round(sum(q.get("gross_margin_pct", 0.0) for q in quotes) / total, 2))
+
+    approved = sum(1 for q in quotes if q.get("decision_status") == "approved")
+    weekly = (total, approved, round(sum(q.get("gross_margin_pct", 0.0) for q in quotes) / total, 2),
+              sum(1 for q in quotes if q.get("exception_created")),
+              sum(1 for q in quotes if q.get("exception_closed")))
+
+    variants = {}
+    for variant in ("control", "test"):
+        entries = [q for q in experiment_quotes if q.get("variant") == variant]
+        variants[variant] = (len(entries), round(
+            sum(q["quote"].get("gross_margin_pct", 0) for q in entries) / len(entries), 2))
+
+    segments = {}
+    for seg in {q.get("segment", "unknown") for q in quotes}:
+        seg_quotes = [q for q in quotes if q.get("segment") == seg]
+        segments[seg] = (len(seg_quotes), round(
+            sum(q.get("gross_margin_pct", 0) for q in seg_quotes) / len(seg_quotes), 2))
+    return portfolio, weekly, variants, segments
+
+
+# Quotes the weekly-metrics form handler has always accepted, including
+# fields it never read holding odd values
+WEEKLY_EDGE_QUOTES = [
+    {"recommended_price": None, "gross_margin_pct": 50},
+    {"recommended_price": "12.50", "gross_margin_pct": 61.5, "decision_status": "approved"},
+    {"segment": [1], "model": {"name": "k2p5"}, "gross_margin_pct": 70, "exception_created": True},
+    {"decision_status": "approved", "exception_closed": 1},
+]
+
+
+def baseline_weekly_metrics(quotes):
+    """The /api/pricing/weekly-metrics form handler before the ledger, verbatim."""
+    total = len(quotes)
+    approved = sum(1 for q in quotes if q.get("decision_status") == "approved")
+    return {
+        "total_quotes": total,
+        "approved_count": approved,
+        "escalated_count": total - approved,
+        "approval_rate": round(approved / max(total, 1), 2),
+        "avg_margin_pct": round(sum(q.get("gross_margin_pct", 0.0) for q in quotes) / max(total, 1), 2) if total else 0.0,
+        "exceptions_created": sum(1 for q in quotes if q.get("exception_created")),
+        "exceptions_closed": sum(1 for q in quotes if q.get("exception_closed"))
+    }
+
+
+def check_weekly_parity(orch):
+    """The ledger-backed weekly metrics match the old handler, one quote at a time and all together."""
+    for quotes in [[q] for q in WEEKLY_EDGE_QUOTES] + [WEEKLY_EDGE_QUOTES, []]:
+        assert orch.aggregate_weekly_pricing_metrics(quotes) == baseline_weekly_metrics(quotes), quotes
+
+
+def ledger_reports(orch):
+    portfolio = orch.summarize_quote_portfolio()
+    weekly = orch.aggregate_weekly_pricing_metrics()
+    experiment = orch.summarize_experiment(experiment_id="bench")
+    report = orch.generate_pricing_summary_report()
+    return (
+        (portfolio["scenario_count"], portfolio["compliant_count"], portfolio["average_margin_pct"]),
+        (weekly["total_quotes"], weekly["approved_count"], weekly["avg_margin_pct"],
+         weekly["exceptions_created"], weekly["exceptions_closed"]),
+        {v: (experiment[v]["count"], experiment[v]["avg_margin_pct"]) for v in ("control", "test")},
+        {seg: (s["count"], s["avg_margin"]) for seg, s in report["by_segment"].items()}
+    )
+
+
+def main():
+    n_quotes = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    n_reports = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    rng = random.Random(7)
+
+    with tempfile.TemporaryDirectory() as journal_dir:
+        orch = orch_module.UnifiedOrchestrator(journal_dir=journal_dir)
+        check_weekly_parity(orch)
+        quotes = {f"q{i}": make_quote(rng) for i in range(n_quotes)}
+        variant_of = {qid: rng.choice(["control", "test"]) for qid in quotes}
+
+        start = time.perf_counter()
+        for qid, quote in quotes.items():
+            orch.track_experiment("bench", variant_of[qid], quote, quote_id=qid)
+        record_s = time.perf_counter() - start
+
+        # Churn: retract 5% and amend 5% of the quotes
+        start = time.perf_counter()
+        ids = list(quotes)
+        rng.shuffle(ids)
+        churn = n_quotes // 20
+        for qid in ids[:churn]:
+            orch.retract_quote(qid)
+            del quotes[qid]
+        for qid in ids[churn:2 * churn]:
+            quotes[qid] = make_quote(rng)
+            orch.amend_quote(qid, quotes[qid])
+        churn_s = time.perf_counter() - start
+
+        quote_list = list(quotes.values())
+        experiment_quotes = [{"variant": variant_of[qid], "quote": q} for qid, q in quotes.items()]
+
+        # Both paths must agree before their speed means anything
+        assert batch_reports(orch, quote_list, experiment_quotes) == ledger_reports(orch)
+
+        start = time.perf_counter()
+        for _ in range(n_reports):
+            batch_reports(orch, quote_list, experiment_quotes)
+        batch_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for _ in range(n_reports):
+            ledger_reports(orch)
+        ledger_s = time.perf_counter() - start
+
+        print(f"Pricing report benchmark ({len(quote_list):,} live quotes, {n_reports} report rounds)")
+        print("-" * 64)
+        print(f"record            {n_quotes / record_s:>11,.0f} quotes/s")
+        print(f"retract + amend   {2 * churn / churn_s:>11,.0f} ops/s")
+        print(f"batch recompute   {batch_s / n_reports * 1000:>11.3f} ms/round")
+        print(f"ledger read       {ledger_s / n_reports * 1000:>11.3f} ms/round  x{batch_s / ledger_s:.0f}")
+
+        orch.usage_journal.close()
+
+
+if __name__ == "__main__":
+    main()
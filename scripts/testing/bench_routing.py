@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Benchmark UnifiedOrchestrator model selection.
+
+Compares the precomputed routing index against the previous implementation
+(per-call task/provider/cost dicts plus a locked limiter refresh per check),
+reproduced below as LegacyRouter.
+
+Usage:
+    python3 scripts/testing/bench_routing.py [iterations]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "ops"))
+import orchestrator as orch_module  # noqa: E402
+from runtime.ratelimit import create_limiter  # noqa: E402
+
+TASK_TYPES = [
+    "architecture", "coding", "fast_coding", "implementation", "api_integration",
+    "documentation", "ui_design", "business_analysis", "unknown_task"
+]
+
+
+class LegacyRouter:
+    """The selection path as it was before the routing index."""
+
+    def __init__(self, orch):
+        self.orch = orch
+        self.config = orch.config
+        self.rate_limiters = {}
+        self._lock = orch._rate_limiters_lock
+
+    def _rate_limiter(self, provider):
+        limits = self.config.setdefault("rate_limits", {}).setdefault(provider, {"hourly": 100, "current": 0})
+        hourly = limits.get("hourly", 100)
+        window = limits.get("window", 3600)
+        with self._lock:
+            limiter = self.rate_limiters.get(provider)
+            if limiter is None or limiter.limit != hourly or limiter.window != window:
+                limiter = create_limiter(provider, hourly, window,
+                                         algorithm=orch_module.RATE_LIMIT_ALGORITHM)
+                self.rate_limiters[provider] = limiter
+            return limiter
+
+    def _refresh_rate_limit_window(self, provider):
+        limiter = self._rate_limiter(provider)
+        self.config["rate_limits"][provider]["current"] = limiter.used()
+
+    def check_model_available(self, model_alias):
+        provider_map = {
+            "opus": "anthropic",
+            "sonnet": "anthropic",
+            "k2p5": "kimi-coding",
+            "minimax-m2.5": "minimax-portal",
+            "codex": "openai-codex"
+        }
+        provider = provider_map.get(model_alias)
+        if not provider:
+            return True
+        self._refresh_rate_limit_window(provider)
+        return self._rate_limiter(provider).remaining() > 0
+
+    def get_fallback(self, model_alias):
+        fallbacks = self.config.get("orchestration", {}).get("fallback_chain", {})
+        return fallbacks.get(model_alias, "sonnet")
+
+    def get_model_for_task(self, task_type, complexity="medium", priority="normal"):
+        task_models = {
+            "architecture": ["opus", "k2p5"],
+            "strategy": ["opus"],
+            "complex_reasoning": ["opus"],
+            "implementation": ["sonnet", "minimax-m2.5"],
+            "documentation": ["sonnet"],
+            "coding": ["k2p5", "minimax-m2.5", "codex"],
+            "fast_coding": ["minimax-m2.5", "k2p5"],
+            "api_integration": ["codex", "k2p5"],
+            "specialized_coding": ["codex"],
+            "ui_design": ["sonnet", "minimax-m2.5"],
+            "business_analysis": ["opus", "sonnet"]
+        }
+        preferred = task_models.get(task_type, ["sonnet"])
+        available = []
+        for model in preferred:
+            if self.check_model_available(model):
+                available.append(model)
+        if not available:
+            for model in preferred:
+                fallback = self.get_fallback(model)
+                if self.check_model_available(fallback):
+                    available.append(fallback)
+        return available[0] if available else "sonnet"
+
+    def estimate_cost(self, model_alias, estimated_tokens=1000):
+        cost_map = {
+            "opus": 0.015,
+            "sonnet": 0.003,
+            "k2p5": 0.001,
+            "minimax-m2.5": 0.001,
+            "codex": 0.002
+        }
+        return (estimated_tokens / 1000) * cost_map.get(model_alias, 0.003)
+
+    def is_budget_available(self, model_alias, estimated_tokens=1000):
+        daily_budget = self.config.get("cost_tracking", {}).get("daily_budget", 50)
+        projected_cost = self.estimate_cost(model_alias, estimated_tokens)
+        return (self.orch.get_daily_spend() + projected_cost) <= daily_budget
+
+    def get_model_for_task_with_budget(self, task_type, complexity="medium", priority="normal",
+                                       estimated_tokens=1000):
+        preferred_model = self.get_model_for_task(task_type, complexity, priority)
+        if self.is_budget_available(preferred_model, estimated_tokens):
+            return preferred_model
+        cost_ordered = ["k2p5", "minimax-m2.5", "sonnet", "codex", "opus"]
+        for model in cost_ordered:
+            if self.check_model_available(model) and self.is_budget_available(model, estimated_tokens):
+                return model
+        for model in cost_ordered:
+            if self.check_model_available(model):
+                return model
+        return "sonnet"
+
+
+def run(select, iterations):
+    n = len(TASK_TYPES)
+    start = time.perf_counter()
+    for i in range(iterations):
+        select(TASK_TYPES[i % n])
+    elapsed = time.perf_counter() - start
+    return iterations / elapsed
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    with tempfile.TemporaryDirectory() as journal_dir:
+        orch = orch_module.UnifiedOrchestrator(journal_dir=journal_dir)
+        legacy = LegacyRouter(orch)
+
+        # Both paths must agree before their speed means anything
+        for task in TASK_TYPES:
+            assert legacy.get_model_for_task(task) == orch.get_model_for_task(task), task
+            assert legacy.get_model_for_task_with_budget(task, estimated_tokens=4000) == \
+                orch.get_model_for_task_with_budget(task, estimated_tokens=4000), task
+
+        print(f"Model selection benchmark ({iterations:,} selections, {len(TASK_TYPES)} task types)")
+        print("-" * 64)
+        for label, old, new in [
+            ("get_model_for_task", legacy.get_model_for_task, orch.get_model_for_task),
+            ("get_model_for_task_with_budget",
+             lambda t: legacy.get_model_for_task_with_budget(t, estimated_tokens=4000),
+             lambda t: orch.get_model_for_task_with_budget(t, estimated_tokens=4000)),
+        ]:
+            before = run(old, iterations)
+            after = run(new, iterations)
+            print(f"{label:32s} before {before:>11,.0f}/s  after {after:>11,.0f}/s  x{after / before:.1f}")
+
+        orch.usage_journal.close()
+
+
+if __name__ == "__main__":
+    main()